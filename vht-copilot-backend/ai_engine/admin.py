@@ -2,7 +2,10 @@
 AI Engine Admin
 """
 from django.contrib import admin
-from .models import CaseSubmission
+from .models import (
+    AudioBlob, AudioUploadSession, CaseSubmission, LiveIntakeSegment, LiveIntakeSession, TranscriptionCache,
+    TranslationMemory, TTSCacheEntry
+)
 
 
 @admin.register(CaseSubmission)
@@ -12,6 +15,7 @@ class CaseSubmissionAdmin(admin.ModelAdmin):
     list_filter = ['status', 'language', 'created_at']
     search_fields = ['patient__vht_code', 'patient__first_name', 'patient__last_name']
     readonly_fields = ['created_at', 'completed_at']
+    raw_id_fields = ['audio_blob']
     date_hierarchy = 'created_at'
     
     fieldsets = (
@@ -19,7 +23,7 @@ class CaseSubmissionAdmin(admin.ModelAdmin):
             'fields': ('patient', 'submitted_by', 'status', 'language')
         }),
         ('Audio', {
-            'fields': ('audio_file', 'audio_duration')
+            'fields': ('audio_file', 'audio_blob', 'audio_duration', 'audio_fingerprint')
         }),
         ('Processing', {
             'fields': ('processing_time', 'error_message', 'transcription', 
@@ -33,3 +37,63 @@ class CaseSubmissionAdmin(admin.ModelAdmin):
             'classes': ('collapse',)
         }),
     )
+
+
+@admin.register(TranscriptionCache)
+class TranscriptionCacheAdmin(admin.ModelAdmin):
+    list_display = ['fingerprint', 'language', 'variant', 'audio_duration',
+                    'hit_count', 'created_at', 'last_hit_at']
+    list_filter = ['language', 'variant', 'created_at']
+    search_fields = ['fingerprint']
+    readonly_fields = ['created_at', 'last_hit_at', 'hit_count']
+
+
+@admin.register(AudioUploadSession)
+class AudioUploadSessionAdmin(admin.ModelAdmin):
+    list_display = ['id', 'patient', 'created_by', 'filename', 'received_bytes',
+                    'total_size', 'status', 'updated_at']
+    list_filter = ['status', 'created_at']
+    readonly_fields = ['created_at', 'updated_at']
+
+
+class LiveIntakeSegmentInline(admin.TabularInline):
+    model = LiveIntakeSegment
+    extra = 0
+    fields = ['index', 'duration', 'transcription', 'confidence', 'provider', 'error_message']
+    readonly_fields = fields
+
+
+@admin.register(LiveIntakeSession)
+class LiveIntakeSessionAdmin(admin.ModelAdmin):
+    list_display = ['id', 'patient', 'created_by', 'language', 'status',
+                    'case_submission', 'updated_at']
+    list_filter = ['status', 'language', 'created_at']
+    readonly_fields = ['created_at', 'updated_at']
+    inlines = [LiveIntakeSegmentInline]
+
+
+@admin.register(AudioBlob)
+class AudioBlobAdmin(admin.ModelAdmin):
+    list_display = ['sha256', 'original_name', 'tier', 'codec', 'original_size',
+                    'size', 'last_used_at', 'archived_at']
+    list_filter = ['tier', 'codec']
+    search_fields = ['sha256', 'original_name']
+    readonly_fields = ['created_at', 'last_used_at', 'archived_at']
+
+
+@admin.register(TTSCacheEntry)
+class TTSCacheEntryAdmin(admin.ModelAdmin):
+    list_display = ['key', 'instruction', 'language', 'voice', 'size', 'pinned',
+                    'hit_count', 'last_used_at']
+    list_filter = ['language', 'voice', 'pinned']
+    search_fields = ['key', 'instruction', 'text']
+    readonly_fields = ['created_at', 'last_used_at', 'hit_count']
+
+
+@admin.register(TranslationMemory)
+class TranslationMemoryAdmin(admin.ModelAdmin):
+    list_display = ['source_text', 'source_language', 'target_language', 'model',
+                    'hit_count', 'created_at', 'last_hit_at']
+    list_filter = ['source_language', 'target_language', 'model']
+    search_fields = ['source_text', 'translated_text']
+    readonly_fields = ['created_at', 'last_hit_at', 'hit_count']
@@ -7,11 +7,13 @@ import time
 from typing import Dict
 from django.utils import timezone
 from .rag_engine import rag_engine
+from .asr_router import asr_router
 from .whisper_service import whisper_service
 from .symptom_normalizer import symptom_normalizer
 from .triage_engine import triage_engine
 from .validator import ai_validator
 from .tools import ai_tools
+from .transcription_cache import transcription_cache
 from patients.models import Patient
 
 logger = logging.getLogger(__name__)
@@ -20,7 +22,7 @@ logger = logging.getLogger(__name__)
 class AgentRunner:
     """
     Main autonomous agent that orchestrates:
-    1. Audio transcription (Whisper)
+    1. Audio transcription (local ASR / Google / Whisper)
     2. Symptom normalization
     3. RAG context retrieval
     4. Triage analysis (GPT-4o-mini)
@@ -45,7 +47,9 @@ class AgentRunner:
         transcription_text: str = None,
         patient: Patient = None,
         user = None,
-        language: str = 'en'
+        language: str = 'en',
+        transcription_result: Dict = None,
+        symptom_analysis: Dict = None
     ) -> Dict:
         """
         Process a complete case through the AI pipeline
@@ -56,6 +60,11 @@ class AgentRunner:
             patient: Patient object
             user: VHT user
             language: Language code
+            transcription_result: Transcription already produced for this
+                audio (e.g. during a resumable upload); skips Step 1 ASR
+            symptom_analysis: symptoms_raw and guideline_context already
+                extracted while the VHT was recording (live intake); skips
+                the extraction in Step 2 and the retrieval in Step 3
         
         Returns:
             Complete AI response with referral and alert status
@@ -70,31 +79,23 @@ class AgentRunner:
             logger.info(f"Starting case processing for patient {patient.id}")
             
             # Step 1: Transcription (if audio provided)
-            if audio_file_path:
+            if transcription_result is not None:
+                logger.info("Step 1: Using transcription produced during upload / recording")
+            elif audio_file_path:
                 logger.info("Step 1: Transcribing audio...")
                 
-                # Try FREE speech recognition first (no API key needed!)
-                try:
-                    from .free_speech_service import free_speech_service
-                    
-                    logger.info("Using FREE Speech Recognition (Google Web API - no auth)")
-                    transcription_result = free_speech_service.transcribe_audio(
-                        audio_file_path,
-                        language=language
-                    )
-                    
-                    # If free service fails, fallback to Whisper
-                    if not transcription_result.get('success'):
-                        logger.warning("Free service failed, falling back to Whisper")
-                        transcription_result = self.whisper.transcribe_audio(
-                            audio_file_path, language
-                        )
-                    
-                except Exception as e:
-                    logger.warning(f"Free speech service error ({e}), falling back to Whisper")
-                    transcription_result = self.whisper.transcribe_audio(
-                        audio_file_path, language
-                    )
+                # Retried uploads of the same recording come from the cache; otherwise
+                # the router picks local / Google / Whisper by measured latency
+                transcription_result = transcription_cache.transcribe(
+                    audio_file_path,
+                    language,
+                    'case',
+                    lambda pcm: asr_router.transcribe(audio_file_path, language, pcm)
+                )
+            
+            if transcription_result is not None:
+                result['audio_fingerprint'] = transcription_result.get('audio_fingerprint', '')
+                result['transcription_cache_hit'] = transcription_result.get('cache_hit', False)
                 
                 if transcription_result.get('error'):
                     # Don't fail - allow continuing with transcription_text parameter
@@ -123,7 +124,10 @@ class AgentRunner:
             
             # Step 2: Extract and normalize symptoms
             logger.info("Step 2: Normalizing symptoms...")
-            raw_symptoms = self.normalizer.extract_symptom_list(transcription_text)
+            if symptom_analysis is not None:
+                raw_symptoms = symptom_analysis['symptoms_raw']
+            else:
+                raw_symptoms = self.normalizer.extract_symptom_list(transcription_text)
             normalized_symptoms = self.normalizer.normalize(raw_symptoms)
             symptom_categories = self.normalizer.categorize_symptoms(normalized_symptoms)
             
@@ -132,12 +136,16 @@ class AgentRunner:
             result['symptom_categories'] = symptom_categories
             
             # Step 3: Retrieve RAG context
-            logger.info("Step 3: Retrieving clinical guidelines...")
-            guideline_context = self.rag_engine.retrieve_relevant_context(
-                result['symptoms_normalized'],
-                patient.age,
-                patient.gender
-            )
+            if symptom_analysis is not None:
+                logger.info("Step 3: Using guidelines retrieved during recording")
+                guideline_context = symptom_analysis['guideline_context']
+            else:
+                logger.info("Step 3: Retrieving clinical guidelines...")
+                guideline_context = self.rag_engine.retrieve_relevant_context(
+                    result['symptoms_normalized'],
+                    patient.age,
+                    patient.gender
+                )
             result['guideline_context'] = guideline_context
             
             # Step 4: Triage analysis
@@ -253,5 +261,6 @@ class AgentRunner:
             return result
 
 
+
 # Singleton instance
 agent_runner = AgentRunner()
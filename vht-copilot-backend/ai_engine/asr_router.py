@@ -0,0 +1,197 @@
+"""
+ASR Router - Chooses a speech recognition provider per case
+Providers are tried fastest-first by measured latency per second of audio
+(EWMA); providers that keep failing are put on cooldown so a dropped
+connection does not cost a network timeout on every case
+
+Providers:
+- local: Offline Vosk model resident in this worker (no network)
+- google: Free Google Web Speech API (Sphinx fallback inside)
+- whisper: OpenAI Whisper API (requires API key)
+"""
+import logging
+import threading
+import time
+from typing import Dict, List
+from django.conf import settings
+from .audio_processing import pcm_duration
+
+logger = logging.getLogger(__name__)
+
+# Starting latency estimates (seconds per second of audio) before any measurements
+PRIOR_LATENCY = {
+    'local': 0.3,
+    'google': 0.6,
+    'whisper': 1.0,
+}
+
+
+class ASRRouter:
+    """
+    Latency- and availability-aware provider selection
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stats = {
+            name: {
+                'calls': 0,
+                'successes': 0,
+                'failures': 0,
+                'consecutive_failures': 0,
+                'latency_per_audio_second': None,
+                'cooldown_until': 0.0,
+            }
+            for name in PRIOR_LATENCY
+        }
+
+    def _providers(self) -> Dict:
+        from .free_speech_service import free_speech_service
+        from .local_asr_service import local_asr_service
+        from .whisper_service import whisper_service
+
+        return {
+            'local': local_asr_service,
+            'google': free_speech_service,
+            'whisper': whisper_service,
+        }
+
+    def _is_eligible(self, name: str, service, language: str) -> bool:
+        if name == 'local':
+            return service.supports(language) and service.is_available()
+        if name == 'whisper':
+            return bool(service.api_key)
+        return True
+
+    def plan(self, language: str) -> List[str]:
+        """
+        Order eligible providers for this language
+
+        Providers on cooldown go last rather than being dropped, so a case
+        still gets transcribed if everything has been failing
+        """
+        providers = self._providers()
+        eligible = [
+            name for name in settings.ASR_PROVIDERS
+            if name in providers and self._is_eligible(name, providers[name], language)
+        ]
+
+        now = time.monotonic()
+        with self._lock:
+            def sort_key(item):
+                position, name = item
+                stats = self.stats[name]
+                cooling = stats['cooldown_until'] > now
+                if settings.ASR_ROUTING == 'fixed':
+                    return (cooling, position)
+                latency = stats['latency_per_audio_second']
+                return (cooling, PRIOR_LATENCY[name] if latency is None else latency, position)
+
+            return [name for _, name in sorted(enumerate(eligible), key=sort_key)]
+
+    def transcribe(self, audio_file_path: str, language: str = 'en', pcm: bytes = None) -> Dict:
+        """
+        Transcribe with the best available provider, falling through on
+        failure or low confidence
+
+        Args:
+            audio_file_path: Path to audio file
+            language: Language code
+            pcm: Already-decoded 16 kHz mono PCM
+
+        Returns:
+            Transcription result from the chosen provider, with provider
+            and provider_attempts added
+        """
+        providers = self._providers()
+        order = self.plan(language)
+        if not order:
+            return {
+                'success': False,
+                'error': 'No speech recognition provider available',
+                'transcription': '',
+                'language_detected': language,
+                'confidence': 0.0,
+                'duration_seconds': 0
+            }
+
+        audio_seconds = pcm_duration(pcm) if pcm else None
+        attempts = []
+        best = None
+
+        for name in order:
+            started = time.monotonic()
+            try:
+                if name == 'whisper':
+                    result = providers[name].transcribe_audio(audio_file_path, language, pcm=pcm)
+                else:
+                    result = providers[name].transcribe_audio(audio_file_path, language=language, pcm=pcm)
+            except Exception as e:
+                logger.warning(f"ASR provider {name} raised: {e}")
+                result = {'success': False, 'error': str(e), 'transcription': '', 'confidence': 0.0}
+            elapsed = time.monotonic() - started
+
+            succeeded = not result.get('error') and bool(result.get('transcription'))
+            self._record(name, succeeded, elapsed, audio_seconds or result.get('duration_seconds'))
+            attempts.append({
+                'provider': name,
+                'success': succeeded,
+                'latency_seconds': round(elapsed, 3),
+                'confidence': result.get('confidence', 0.0),
+            })
+
+            if not succeeded:
+                logger.warning(f"ASR provider {name} failed: {result.get('error')}")
+                best = best or result
+                continue
+
+            result['provider'] = name
+            if best is None or best.get('error') or result['confidence'] > best['confidence']:
+                best = result
+            if result['confidence'] >= settings.ASR_MIN_CONFIDENCE:
+                break
+            logger.info(f"ASR provider {name} confidence {result['confidence']:.2f} below threshold, trying next")
+
+        best['provider_attempts'] = attempts
+        return best
+
+    def _record(self, name: str, succeeded: bool, elapsed: float, audio_seconds: float):
+        """Update EWMA latency and the failure cooldown for one call"""
+        with self._lock:
+            stats = self.stats[name]
+            stats['calls'] += 1
+            if succeeded:
+                stats['successes'] += 1
+                stats['consecutive_failures'] = 0
+                if audio_seconds:
+                    sample = elapsed / audio_seconds
+                    previous = stats['latency_per_audio_second']
+                    alpha = settings.ASR_LATENCY_EWMA_ALPHA
+                    stats['latency_per_audio_second'] = round(
+                        sample if previous is None else alpha * sample + (1 - alpha) * previous, 4
+                    )
+                return
+
+            stats['failures'] += 1
+            stats['consecutive_failures'] += 1
+            if stats['consecutive_failures'] >= settings.ASR_FAILURE_THRESHOLD:
+                stats['cooldown_until'] = time.monotonic() + settings.ASR_COOLDOWN_SECONDS
+                logger.warning(
+                    f"ASR provider {name} failed {stats['consecutive_failures']} times, "
+                    f"cooling down for {settings.ASR_COOLDOWN_SECONDS}s"
+                )
+
+    def get_stats(self) -> Dict:
+        now = time.monotonic()
+        with self._lock:
+            return {
+                name: {
+                    **{key: value for key, value in stats.items() if key != 'cooldown_until'},
+                    'cooldown_remaining_seconds': round(max(0.0, stats['cooldown_until'] - now), 1),
+                }
+                for name, stats in self.stats.items()
+            }
+
+
+# Singleton instance
+asr_router = ASRRouter()
@@ -0,0 +1,306 @@
+"""
+Audio Processing - In-memory decoding and speech preprocessing
+Streams uploads through ffmpeg over pipes into 16 kHz mono 16-bit PCM,
+so no temporary WAV files are written next to the upload, then trims
+silence with an energy-based voice activity detector
+
+ffmpeg is discovered from settings.FFMPEG_BINARY or the PATH
+"""
+import io
+import logging
+import math
+import shutil
+import subprocess
+import wave
+from typing import Dict, List
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000  # Optimal for speech recognition
+SAMPLE_WIDTH = 2     # 16-bit PCM
+CHANNELS = 1
+NOISE_WINDOW_MS = 240  # Shortest pause the noise floor estimate can rely on
+
+
+class AudioConversionError(Exception):
+    """Raised when an upload cannot be decoded to PCM"""
+
+
+def find_ffmpeg() -> str:
+    """
+    Locate the ffmpeg binary (settings.FFMPEG_BINARY, then PATH)
+    """
+    configured = getattr(settings, 'FFMPEG_BINARY', '')
+    if configured:
+        resolved = shutil.which(configured)
+        if resolved:
+            return resolved
+        raise AudioConversionError(f"FFmpeg not found at FFMPEG_BINARY={configured}")
+
+    resolved = shutil.which('ffmpeg')
+    if not resolved:
+        raise AudioConversionError("FFmpeg not found on PATH (set FFMPEG_BINARY)")
+    return resolved
+
+
+def decode_to_pcm(input_path: str) -> bytes:
+    """
+    Decode any supported audio file to 16 kHz mono 16-bit PCM in memory
+
+    WAV files already in the target format are read natively; everything
+    else is piped through ffmpeg. The input is passed by path because MP4/M4A
+    containers need a seekable source.
+
+    Args:
+        input_path: Path to the uploaded audio file
+
+    Returns:
+        Raw little-endian PCM bytes
+    """
+    pcm = _read_native_wav(input_path)
+    if pcm is not None:
+        return pcm
+
+    command = [
+        find_ffmpeg(),
+        '-nostdin', '-hide_banner', '-loglevel', 'error',
+        '-i', input_path,
+        '-f', 's16le', '-acodec', 'pcm_s16le',
+        '-ac', str(CHANNELS), '-ar', str(SAMPLE_RATE),
+        'pipe:1',
+    ]
+
+    try:
+        completed = subprocess.run(
+            command,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            timeout=settings.FFMPEG_TIMEOUT_SECONDS,
+            check=False,
+        )
+    except subprocess.TimeoutExpired:
+        raise AudioConversionError(f"FFmpeg timed out decoding {input_path}")
+
+    if completed.returncode != 0 or not completed.stdout:
+        error = completed.stderr.decode('utf-8', errors='replace').strip()
+        raise AudioConversionError(f"FFmpeg could not decode {input_path}: {error or 'no audio'}")
+
+    logger.info(f"Decoded {input_path} to {pcm_duration(completed.stdout):.1f}s of 16 kHz mono PCM")
+    return completed.stdout
+
+
+def _read_native_wav(input_path: str):
+    """Return PCM frames if the file is already 16 kHz mono 16-bit WAV"""
+    if not input_path.lower().endswith('.wav'):
+        return None
+    try:
+        with wave.open(input_path, 'rb') as wav_file:
+            if (wav_file.getframerate() == SAMPLE_RATE and
+                    wav_file.getnchannels() == CHANNELS and
+                    wav_file.getsampwidth() == SAMPLE_WIDTH):
+                return wav_file.readframes(wav_file.getnframes())
+    except (wave.Error, EOFError):
+        pass  # Compressed or unusual WAV - let ffmpeg handle it
+    return None
+
+
+def pcm_to_wav(pcm: bytes) -> bytes:
+    """Wrap PCM in a WAV header (in memory)"""
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav_file:
+        wav_file.setnchannels(CHANNELS)
+        wav_file.setsampwidth(SAMPLE_WIDTH)
+        wav_file.setframerate(SAMPLE_RATE)
+        wav_file.writeframes(pcm)
+    return buffer.getvalue()
+
+
+def pcm_duration(pcm: bytes) -> float:
+    """Duration of a PCM buffer in seconds"""
+    return len(pcm) / float(SAMPLE_RATE * SAMPLE_WIDTH * CHANNELS)
+
+
+def encode_pcm(pcm: bytes, codec: str = 'libopus', bitrate: str = '24k', container: str = 'ogg') -> bytes:
+    """
+    Compress PCM in memory (default Ogg/Opus, accepted by Whisper)
+    """
+    command = [
+        find_ffmpeg(),
+        '-nostdin', '-hide_banner', '-loglevel', 'error',
+        '-f', 's16le', '-ac', str(CHANNELS), '-ar', str(SAMPLE_RATE), '-i', 'pipe:0',
+        '-c:a', codec, '-b:a', bitrate,
+        '-f', container, 'pipe:1',
+    ]
+    try:
+        completed = subprocess.run(
+            command,
+            input=pcm,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            timeout=settings.FFMPEG_TIMEOUT_SECONDS,
+            check=False,
+        )
+    except subprocess.TimeoutExpired:
+        raise AudioConversionError("FFmpeg timed out encoding audio")
+
+    if completed.returncode != 0 or not completed.stdout:
+        error = completed.stderr.decode('utf-8', errors='replace').strip()
+        raise AudioConversionError(f"FFmpeg could not encode audio: {error or 'no output'}")
+    return completed.stdout
+
+
+def frame_energy(pcm: bytes):
+    """
+    Split PCM into VAD frames and return (frames, per-frame RMS energy)
+    """
+    import numpy as np
+
+    frame_length = int(SAMPLE_RATE * settings.VAD_FRAME_MS / 1000)
+    samples = np.frombuffer(pcm, dtype='<i2', count=len(pcm) // SAMPLE_WIDTH)
+    frame_count = len(samples) // frame_length
+    frames = samples[:frame_count * frame_length].reshape(frame_count, frame_length)
+    energy = np.sqrt(np.mean(frames.astype(np.float32) ** 2, axis=1))
+    return frames, energy
+
+
+def _speech_mask(energy):
+    """
+    Classify frames as speech from the noise floor, padded so word onsets
+    and tails are not clipped
+
+    The noise floor is the quietest NOISE_WINDOW_MS stretch (minimum
+    statistics), so dense speech with only short pauses is still measured
+    against the background rather than against itself
+
+    Returns:
+        (speech mask, noise floor RMS, speech threshold RMS)
+    """
+    import numpy as np
+
+    window = max(1, int(NOISE_WINDOW_MS / settings.VAD_FRAME_MS))
+    if len(energy) > window:
+        noise_floor = float(np.convolve(energy, np.ones(window) / window, mode='valid').min())
+    else:
+        noise_floor = float(energy.min())
+    threshold = max(noise_floor * settings.VAD_THRESHOLD_RATIO, settings.VAD_MIN_ENERGY)
+    speech = energy > threshold
+
+    padding = int(math.ceil(settings.VAD_PADDING_MS / settings.VAD_FRAME_MS))
+    if padding and speech.any():
+        kernel = np.ones(2 * padding + 1, dtype=np.int32)
+        speech = np.convolve(speech.astype(np.int32), kernel, mode='same') > 0
+
+    return speech, noise_floor, threshold
+
+
+def preprocess_speech(pcm: bytes) -> Dict:
+    """
+    Energy-based voice activity preprocessing, in a single pass:
+    - trims leading and trailing silence
+    - collapses internal pauses longer than VAD_MAX_PAUSE_MS
+    - estimates the noise floor
+
+    Audio with no detected speech is returned unchanged so the recognizer
+    still gets a chance at very quiet recordings.
+
+    Args:
+        pcm: 16 kHz mono 16-bit PCM
+
+    Returns:
+        Dict with:
+            - pcm: Trimmed PCM
+            - noise_floor: Background RMS energy
+            - original_duration / speech_duration: Seconds before and after trimming
+            - speech_detected: False if no frame rose above the noise floor
+    """
+    import numpy as np
+
+    original_duration = pcm_duration(pcm)
+    result = {
+        'pcm': pcm,
+        'noise_floor': 0.0,
+        'original_duration': original_duration,
+        'speech_duration': original_duration,
+        'speech_detected': False,
+    }
+
+    frames, energy = frame_energy(pcm)
+    if len(energy) == 0:
+        return result
+
+    speech, noise_floor, threshold = _speech_mask(energy)
+    result['noise_floor'] = round(noise_floor, 1)
+
+    speech_frames = np.flatnonzero(speech)
+    if len(speech_frames) == 0:
+        logger.info("VAD found no speech above the noise floor, keeping audio as-is")
+        return result
+
+    first, last = speech_frames[0], speech_frames[-1]
+    keep = np.zeros(len(speech), dtype=bool)
+    keep[first:last + 1] = True
+
+    # Collapse long internal pauses to VAD_MAX_PAUSE_MS (half kept at each edge)
+    max_pause = max(1, int(settings.VAD_MAX_PAUSE_MS / settings.VAD_FRAME_MS))
+    silent = np.concatenate(([0], (~speech[first:last + 1]).astype(np.int8), [0]))
+    edges = np.diff(silent)
+    for start, end in zip(np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)):
+        if end - start > max_pause:
+            head = max_pause // 2
+            keep[first + start + head:first + end - (max_pause - head)] = False
+
+    trimmed = frames[keep].tobytes()
+    result.update({
+        'pcm': trimmed,
+        'speech_duration': pcm_duration(trimmed),
+        'speech_detected': True,
+    })
+    logger.info(
+        f"VAD trimmed audio {original_duration:.1f}s -> {result['speech_duration']:.1f}s "
+        f"(noise floor {noise_floor:.0f}, threshold {threshold:.0f})"
+    )
+    return result
+
+
+def split_on_silence(pcm: bytes, max_chunk_seconds: float, min_chunk_seconds: float) -> List[Dict]:
+    """
+    Split PCM into bounded chunks, cutting at the quietest frame between
+    min_chunk_seconds and max_chunk_seconds so words are not split
+
+    Args:
+        pcm: 16 kHz mono 16-bit PCM (ideally already VAD-trimmed)
+        max_chunk_seconds: Hard upper bound per chunk
+        min_chunk_seconds: Earliest point a cut may be placed
+
+    Returns:
+        List of dicts with pcm, start_seconds and duration, in order
+    """
+    import numpy as np
+
+    frames, energy = frame_energy(pcm)
+    frame_seconds = settings.VAD_FRAME_MS / 1000.0
+    max_frames = max(1, int(max_chunk_seconds / frame_seconds))
+    min_frames = min(max_frames, max(1, int(min_chunk_seconds / frame_seconds)))
+
+    boundaries = [0]
+    while len(energy) - boundaries[-1] > max_frames:
+        start = boundaries[-1]
+        window = energy[start + min_frames:start + max_frames + 1]
+        boundaries.append(start + min_frames + int(np.argmin(window)))
+    boundaries.append(len(energy))
+
+    chunks = []
+    for index, (start, end) in enumerate(zip(boundaries, boundaries[1:])):
+        # The last chunk keeps any sub-frame remainder
+        chunk_pcm = frames[start:end].tobytes()
+        if end == len(energy):
+            chunk_pcm += pcm[len(energy) * frames.shape[1] * SAMPLE_WIDTH:]
+        if not chunk_pcm:
+            continue
+        chunks.append({
+            'pcm': chunk_pcm,
+            'start_seconds': round(start * frame_seconds, 2),
+            'duration': pcm_duration(chunk_pcm),
+        })
+    return chunks
@@ -0,0 +1,289 @@
+"""
+Audio Store - Content-addressed storage for case recordings
+Recordings are stored once per SHA-256 of their bytes under
+AUDIO_STORE_PREFIX/<ab>/<sha256>.<ext>, so retried and re-submitted uploads
+share one file. Recordings unused for AUDIO_ARCHIVE_AFTER_DAYS are
+transcoded to Opus and moved to AUDIO_COLD_PREFIX, which keeps an
+append-only index.jsonl of everything archived; uploading an archived
+recording again brings the original back to the hot tier. Submissions and
+live intake segments keep pointing at the current location through audio_file.
+"""
+import hashlib
+import json
+import logging
+import os
+from datetime import timedelta
+from typing import Dict, Optional
+from django.conf import settings
+from django.core.files import File
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from .audio_processing import AudioConversionError, pcm_duration
+from .audio_workers import audio_pool
+
+logger = logging.getLogger(__name__)
+
+HASH_BLOCK_SIZE = 64 * 1024
+
+
+def file_sha256(path: str):
+    """Return (sha256 hex, size) of a file, read in blocks"""
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, 'rb') as audio_file:
+        for block in iter(lambda: audio_file.read(HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+            size += len(block)
+    return digest.hexdigest(), size
+
+
+def _extension(name: str) -> str:
+    return os.path.splitext(name)[1].lower() or '.bin'
+
+
+class AudioStore:
+    """
+    Stores, deduplicates, archives and releases recordings
+    """
+
+    def store(self, path: str, original_name: str):
+        """
+        Store a recording, or reuse the blob of an identical earlier upload
+
+        Args:
+            path: Local path of the received file
+            original_name: Filename the client sent (keeps the extension)
+
+        Returns:
+            AudioBlob (its storage_name is the pointer for audio_file)
+        """
+        from .models import AudioBlob
+
+        sha256, size = file_sha256(path)
+        existing = self._touch(sha256)
+        if existing is not None and existing.tier == AudioBlob.Tier.COLD:
+            # Archived copy is lossy: keep the original bytes just received instead
+            return self._restore(existing, path, original_name)
+        if existing is not None:
+            logger.info(f"Audio {original_name} deduplicated to {existing.storage_name}")
+            return existing
+
+        name = self._save_hot(path, sha256, original_name)
+
+        try:
+            with transaction.atomic():
+                return AudioBlob.objects.create(
+                    sha256=sha256,
+                    storage_name=name,
+                    original_name=os.path.basename(original_name)[:255],
+                    original_size=size,
+                    size=size
+                )
+        except IntegrityError:
+            # A concurrent upload of the same bytes stored it first
+            blob = self._touch(sha256)
+            if name != blob.storage_name:
+                default_storage.delete(name)
+            return blob
+
+    def _save_hot(self, path: str, sha256: str, original_name: str) -> str:
+        """Save the received file at its content address (reused if already there)"""
+        name = f'{settings.AUDIO_STORE_PREFIX}/{sha256[:2]}/{sha256}{_extension(original_name)}'
+        if not default_storage.exists(name):
+            with open(path, 'rb') as audio_file:
+                name = default_storage.save(name, File(audio_file))
+        return name
+
+    def _restore(self, blob, path: str, original_name: str):
+        """
+        Bring an archived blob back to the hot tier from a new upload of the
+        same bytes, repointing its references and deleting the archived copy
+        """
+        from .models import AudioBlob, CaseSubmission, LiveIntakeSegment
+
+        name = self._save_hot(path, blob.sha256, original_name)
+        with transaction.atomic():
+            current = AudioBlob.objects.select_for_update().get(pk=blob.pk)
+            if current.tier != AudioBlob.Tier.COLD:
+                # A concurrent upload restored it first
+                if name != current.storage_name:
+                    default_storage.delete(name)
+                return current
+
+            cold_name = current.storage_name
+            current.storage_name = name
+            current.tier = AudioBlob.Tier.HOT
+            current.codec = 'original'
+            current.size = default_storage.size(name)
+            current.archived_at = None
+            current.save()
+            CaseSubmission.objects.filter(audio_blob=current).update(audio_file=name)
+            LiveIntakeSegment.objects.filter(audio_blob=current).update(audio_file=name)
+
+        default_storage.delete(cold_name)
+        logger.info(f"Audio {original_name} restored from the cold tier to {name}")
+        return current
+
+    def _touch(self, sha256: str):
+        """
+        Mark a blob as used and return it with its current location
+        (locked so an archive run cannot move it between the read and the touch)
+        """
+        from .models import AudioBlob
+
+        with transaction.atomic():
+            blob = AudioBlob.objects.select_for_update().filter(sha256=sha256).first()
+            if blob is not None:
+                blob.last_used_at = timezone.now()
+                blob.save(update_fields=['last_used_at'])
+        return blob
+
+    def attach(self, instance, blob, update_fields=None):
+        """Point a CaseSubmission or LiveIntakeSegment at a blob"""
+        instance.audio_blob = blob
+        instance.audio_file = blob.storage_name
+        if update_fields is not None:
+            instance.save(update_fields=['audio_blob', 'audio_file'] + list(update_fields))
+
+    def adopt(self, instance) -> Optional[int]:
+        """
+        Move a recording stored before the content-addressed layout into a
+        blob, deleting the legacy file
+
+        Returns:
+            Bytes freed (0 if it became a new blob), or None if the file is missing
+        """
+        name = instance.audio_file.name
+        if not name or not default_storage.exists(name):
+            return None
+
+        path = default_storage.path(name)
+        size = os.path.getsize(path)
+        started = timezone.now()
+        blob = self.store(path, name)
+        if blob.storage_name != name:
+            default_storage.delete(name)
+        self.attach(instance, blob, update_fields=[])
+        # Only a duplicate of an existing blob frees space; a new blob was a copy
+        return size if blob.created_at < started else 0
+
+    def archive(self, blob, days: int = None) -> Optional[int]:
+        """
+        Transcode a hot blob to Opus and move it to the cold tier
+        (skipped if it was used again within `days` while transcoding)
+
+        Returns:
+            Bytes saved, or None if the blob was used again meanwhile and skipped
+        """
+        from .models import AudioBlob, CaseSubmission, LiveIntakeSegment
+
+        cutoff = self._archive_cutoff(days)
+        hot_name = blob.storage_name
+        pcm = audio_pool.decode(default_storage.path(hot_name))
+        encoded = audio_pool.encode(pcm, bitrate=settings.AUDIO_ARCHIVE_BITRATE)
+
+        cold_prefix = f'{settings.AUDIO_COLD_PREFIX}/{blob.sha256[:2]}/{blob.sha256}'
+        if len(encoded) < blob.size:
+            codec = 'opus'
+            cold_name = default_storage.save(f'{cold_prefix}.ogg', ContentFile(encoded))
+        else:
+            # Already compact (e.g. short Opus note) - move it as it is
+            codec = blob.codec
+            with default_storage.open(hot_name, 'rb') as hot_file:
+                cold_name = default_storage.save(f'{cold_prefix}{_extension(hot_name)}', File(hot_file))
+
+        with transaction.atomic():
+            current = AudioBlob.objects.select_for_update().get(pk=blob.pk)
+            if current.tier != AudioBlob.Tier.HOT or current.last_used_at >= cutoff:
+                default_storage.delete(cold_name)
+                return None
+
+            current.storage_name = cold_name
+            current.tier = AudioBlob.Tier.COLD
+            current.codec = codec
+            current.size = default_storage.size(cold_name)
+            current.duration = pcm_duration(pcm)
+            current.archived_at = timezone.now()
+            current.save()
+            CaseSubmission.objects.filter(audio_blob=current).update(audio_file=cold_name)
+            LiveIntakeSegment.objects.filter(audio_blob=current).update(audio_file=cold_name)
+
+        default_storage.delete(hot_name)
+        self._append_index(current)
+        return blob.size - current.size
+
+    def archive_stale(self, days: int = None, dry_run: bool = False) -> Dict:
+        """
+        Archive every hot blob unused for `days` (AUDIO_ARCHIVE_AFTER_DAYS)
+
+        Returns:
+            Dict with archived, failed, bytes_saved (candidates / bytes on dry run)
+        """
+        from .models import AudioBlob
+
+        stale = AudioBlob.objects.filter(
+            tier=AudioBlob.Tier.HOT,
+            last_used_at__lt=self._archive_cutoff(days)
+        ).order_by('last_used_at')
+
+        summary = {'archived': 0, 'failed': 0, 'bytes_saved': 0}
+        if dry_run:
+            summary['archived'] = stale.count()
+            summary['bytes_saved'] = sum(stale.values_list('size', flat=True))
+            return summary
+
+        for blob in stale.iterator():
+            try:
+                saved = self.archive(blob, days)
+            except (AudioConversionError, OSError) as e:
+                logger.error(f"Archiving audio {blob.sha256[:12]} failed: {e}")
+                summary['failed'] += 1
+                continue
+            if saved is not None:
+                summary['archived'] += 1
+                summary['bytes_saved'] += saved
+        return summary
+
+    def discard(self, blob) -> bool:
+        """
+        Delete a blob and its file if nothing references it any more
+
+        Returns:
+            True if deleted
+        """
+        with transaction.atomic():
+            blob = type(blob).objects.select_for_update().get(pk=blob.pk)
+            if blob.case_submissions.exists() or blob.live_segments.exists():
+                return False
+            name = blob.storage_name
+            blob.delete()
+        default_storage.delete(name)
+        return True
+
+    def _archive_cutoff(self, days: int = None):
+        if days is None:
+            days = settings.AUDIO_ARCHIVE_AFTER_DAYS
+        return timezone.now() - timedelta(days=days)
+
+    def _append_index(self, blob):
+        index_path = default_storage.path(f'{settings.AUDIO_COLD_PREFIX}/index.jsonl')
+        os.makedirs(os.path.dirname(index_path), exist_ok=True)
+        entry = {
+            'sha256': blob.sha256,
+            'storage_name': blob.storage_name,
+            'original_name': blob.original_name,
+            'original_size': blob.original_size,
+            'size': blob.size,
+            'codec': blob.codec,
+            'duration': blob.duration,
+            'archived_at': blob.archived_at.isoformat(),
+            'case_submissions': list(blob.case_submissions.values_list('id', flat=True)),
+        }
+        with open(index_path, 'a', encoding='utf-8') as index_file:
+            index_file.write(json.dumps(entry) + '\n')
+
+
+# Singleton instance
+audio_store = AudioStore()
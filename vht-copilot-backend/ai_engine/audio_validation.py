@@ -0,0 +1,290 @@
+"""
+Audio Validation - Rejects bad uploads while they stream in
+The upload handler sniffs the container header and enforces the size
+limit chunk by chunk, so corrupt, oversized or non-audio files never reach
+case_audio/. A one-second probe decode then checks duration and sample
+rate before the file is stored or sent to a speech provider.
+"""
+import logging
+import re
+import struct
+import subprocess
+from typing import Dict, Optional
+from django.conf import settings
+from django.core.files.uploadhandler import FileUploadHandler, SkipFile, TemporaryFileUploadHandler
+from .audio_processing import find_ffmpeg, AudioConversionError
+
+logger = logging.getLogger(__name__)
+
+AUDIO_UPLOAD_FIELDS = ('audio_file',)
+
+# Enough to cover a WAV header with LIST/INFO chunks before 'data'
+HEADER_BYTES = 4096
+
+# Sniffed container -> extensions it may arrive under
+CONTAINER_EXTENSIONS = {
+    'wav': {'wav'},
+    'mp3': {'mp3'},
+    'mp4': {'m4a', 'mp4', 'aac'},
+    'ogg': {'ogg', 'opus'},
+    'webm': {'webm'},
+    'flac': {'flac'},
+    'aac': {'aac'},
+}
+
+
+class AudioValidationError(Exception):
+    """Upload rejected (carries the HTTP status to return)"""
+
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def sniff_container(header: bytes) -> Optional[str]:
+    """
+    Identify the audio container from its first bytes (None if unrecognised)
+    """
+    if len(header) >= 12 and header[:4] == b'RIFF' and header[8:12] == b'WAVE':
+        return 'wav'
+    if header[:4] == b'OggS':
+        return 'ogg'
+    if header[:4] == b'fLaC':
+        return 'flac'
+    if header[:4] == b'\x1a\x45\xdf\xa3':
+        return 'webm'
+    if len(header) >= 8 and header[4:8] == b'ftyp':
+        return 'mp4'
+    if header[:3] == b'ID3':
+        return 'mp3'
+    if len(header) >= 2 and header[0] == 0xFF:
+        if header[1] & 0xF6 == 0xF0:
+            return 'aac'  # ADTS
+        if header[1] & 0xE0 == 0xE0:
+            return 'mp3'  # MPEG audio frame sync
+    return None
+
+
+def parse_wav_header(header: bytes) -> Optional[Dict]:
+    """
+    Read sample rate, channels and duration from a WAV header
+
+    Returns:
+        Dict with sample_rate, channels, bits_per_sample, duration (None if
+        the data chunk is not in the header bytes), or None if malformed
+    """
+    position = 12
+    fmt = None
+    while position + 8 <= len(header):
+        chunk_id = header[position:position + 4]
+        (chunk_size,) = struct.unpack('<I', header[position + 4:position + 8])
+        body = position + 8
+
+        if chunk_id == b'fmt ' and body + 16 <= len(header):
+            _, channels, sample_rate, byte_rate, _, bits = struct.unpack('<HHIIHH', header[body:body + 16])
+            fmt = {
+                'sample_rate': sample_rate,
+                'channels': channels,
+                'bits_per_sample': bits,
+                'byte_rate': byte_rate,
+                'duration': None,
+            }
+        elif chunk_id == b'data':
+            # Streaming recorders leave the size as 0 / 0xFFFFFFFF until they finish
+            if fmt and fmt['byte_rate'] and chunk_size not in (0, 0xFFFFFFFF):
+                fmt['duration'] = chunk_size / float(fmt['byte_rate'])
+            break
+
+        position = body + chunk_size + (chunk_size & 1)
+    return fmt
+
+
+def check_stream_properties(
+    sample_rate: Optional[int],
+    duration: Optional[float],
+    min_duration: Optional[float] = None
+):
+    """
+    Enforce the configured sample-rate and duration limits
+    (min_duration overrides AUDIO_MIN_DURATION_SECONDS, e.g. 0 for live intake segments)
+    """
+    if min_duration is None:
+        min_duration = settings.AUDIO_MIN_DURATION_SECONDS
+    if sample_rate is not None and not (
+        settings.AUDIO_MIN_SAMPLE_RATE <= sample_rate <= settings.AUDIO_MAX_SAMPLE_RATE
+    ):
+        raise AudioValidationError(
+            f'Unsupported sample rate {sample_rate} Hz '
+            f'({settings.AUDIO_MIN_SAMPLE_RATE}-{settings.AUDIO_MAX_SAMPLE_RATE} Hz allowed)'
+        )
+    if duration is not None:
+        if duration > settings.AUDIO_MAX_DURATION_SECONDS:
+            raise AudioValidationError(
+                f'Recording too long ({duration:.0f}s, max {settings.AUDIO_MAX_DURATION_SECONDS}s)', 413
+            )
+        if duration < min_duration:
+            raise AudioValidationError(f'Recording too short ({duration:.1f}s)')
+
+
+def validate_header(header: bytes, filename: str, min_duration: Optional[float] = None) -> str:
+    """
+    Validate an upload's first bytes against its name and the limits
+
+    Returns:
+        Sniffed container name
+    """
+    container = sniff_container(header)
+    if container is None:
+        raise AudioValidationError('File is not a recognised audio format', 415)
+
+    extension = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+    allowed = CONTAINER_EXTENSIONS[container] & set(settings.ALLOWED_AUDIO_FORMATS)
+    if not allowed:
+        raise AudioValidationError(f'Audio format {container} is not accepted', 415)
+    if extension and extension not in CONTAINER_EXTENSIONS[container]:
+        logger.info(f"Upload {filename} is really {container}, accepting by content")
+
+    if container == 'wav':
+        wav = parse_wav_header(header)
+        if wav is None:
+            raise AudioValidationError('Corrupt WAV header')
+        check_stream_properties(wav['sample_rate'], wav['duration'], min_duration)
+    return container
+
+
+class AudioValidationUploadHandler(FileUploadHandler):
+    """
+    Streams audio fields through header and size checks before the next
+    handler writes them; rejected files are skipped (never stored) and the
+    reason is left on request.audio_upload_error
+    """
+
+    def __init__(self, request=None, min_duration: Optional[float] = None):
+        super().__init__(request)
+        self.min_duration = min_duration
+
+    def new_file(self, field_name, file_name, *args, **kwargs):
+        super().new_file(field_name, file_name, *args, **kwargs)
+        self.active = field_name in AUDIO_UPLOAD_FIELDS
+        self.header = b''
+        self.header_checked = False
+        self.received = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        if not self.active:
+            return raw_data
+
+        self.received += len(raw_data)
+        if self.received > settings.MAX_AUDIO_FILE_SIZE:
+            self._reject(AudioValidationError(
+                f'Audio file too large (max {settings.MAX_AUDIO_FILE_SIZE} bytes)', 413
+            ))
+
+        if not self.header_checked:
+            self.header += raw_data[:HEADER_BYTES - len(self.header)]
+            if len(self.header) >= HEADER_BYTES:
+                self._check_header()
+        return raw_data
+
+    def file_complete(self, file_size):
+        if self.active and not self.header_checked:
+            # File smaller than HEADER_BYTES: too late to skip it, but the
+            # recorded error makes the view reject it before it is used
+            self._check_header(skip=False)
+        return None  # Let the next handler build the file
+
+    def _check_header(self, skip: bool = True):
+        self.header_checked = True
+        try:
+            validate_header(self.header, self.file_name or '', self.min_duration)
+        except AudioValidationError as e:
+            self._reject(e, skip)
+
+    def _reject(self, error: AudioValidationError, skip: bool = True):
+        logger.warning(f"Rejected upload {self.file_name}: {error}")
+        self.request.audio_upload_error = error
+        if skip:
+            raise SkipFile()
+
+
+def install_audio_upload_handlers(request, min_duration: Optional[float] = None):
+    """
+    Validate audio while it streams and spool accepted files to a temporary
+    path (needed for the probe decode). Must run before request.data is read.
+    """
+    django_request = getattr(request, '_request', request)
+    django_request.audio_upload_error = None
+    django_request.upload_handlers = [
+        AudioValidationUploadHandler(django_request, min_duration),
+        TemporaryFileUploadHandler(django_request),
+    ]
+
+
+def audio_upload_error(request) -> Optional[AudioValidationError]:
+    """Reason the audio field was rejected during upload, if any (read after request.data)"""
+    return getattr(getattr(request, '_request', request), 'audio_upload_error', None)
+
+
+def probe_audio(path: str) -> Dict:
+    """
+    Decode the first second of the file to check it is playable and read
+    its duration, sample rate and codec from ffmpeg's stream info
+
+    Returns:
+        Dict with duration (None if the container does not say),
+        sample_rate, channels, codec
+    """
+    command = [
+        find_ffmpeg(),
+        '-nostdin', '-hide_banner',
+        '-t', '1', '-i', path,
+        '-f', 'null', '-',
+    ]
+    try:
+        completed = subprocess.run(
+            command,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            timeout=settings.AUDIO_PROBE_TIMEOUT_SECONDS,
+            check=False,
+        )
+    except subprocess.TimeoutExpired:
+        raise AudioValidationError('Audio probe timed out')
+
+    info = completed.stderr.decode('utf-8', errors='replace')
+    stream = re.search(r'Stream #\S+.*?: Audio: (\w+).*?, (\d+) Hz, ([^,]+)', info)
+    if completed.returncode != 0 or not stream:
+        last_line = info.strip().splitlines()[-1] if info.strip() else 'no audio stream'
+        raise AudioValidationError(f'Audio file is corrupt or unreadable: {last_line}')
+
+    duration = None
+    match = re.search(r'Duration: (\d+):(\d+):(\d+(?:\.\d+)?)', info)
+    if match:
+        hours, minutes, seconds = match.groups()
+        duration = int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+    channels = stream.group(3).strip()
+    return {
+        'duration': duration,
+        'sample_rate': int(stream.group(2)),
+        'channels': {'mono': 1, 'stereo': 2}.get(channels, channels),
+        'codec': stream.group(1),
+    }
+
+
+def validate_audio(path: str) -> Dict:
+    """
+    Probe an uploaded file and enforce duration / sample-rate limits
+
+    Returns:
+        Probe result (see probe_audio)
+    """
+    try:
+        probe = probe_audio(path)
+    except AudioConversionError as e:
+        # ffmpeg missing - keep accepting uploads, decoding will report it
+        logger.warning(f"Audio probe skipped: {e}")
+        return {'duration': None, 'sample_rate': None, 'channels': None, 'codec': None}
+
+    check_stream_properties(probe['sample_rate'], probe['duration'])
+    return probe
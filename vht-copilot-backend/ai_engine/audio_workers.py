@@ -0,0 +1,229 @@
+"""
+Audio Workers - Bounded process pool for CPU-bound audio preprocessing
+Decoding, VAD trimming, silence splitting and Opus encoding run in worker
+processes instead of the request thread, so they neither hold a web worker
+thread's share of the GIL nor block I/O-bound endpoints. The pool admits at
+most AUDIO_WORKER_PROCESSES + AUDIO_WORKER_QUEUE_SIZE tasks; callers beyond
+that wait up to AUDIO_WORKER_QUEUE_WAIT_SECONDS and are then turned away.
+
+Each web server process owns one pool, created on first use.
+"""
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FuturesTimeout
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List
+from django.conf import settings
+from .audio_processing import (
+    AudioConversionError, decode_to_pcm, encode_pcm, preprocess_speech, split_on_silence
+)
+
+logger = logging.getLogger(__name__)
+
+# Task name -> function run in the worker process
+TASKS = {
+    'decode': decode_to_pcm,
+    'preprocess': preprocess_speech,
+    'split': split_on_silence,
+    'encode': encode_pcm,
+}
+
+# Recent durations kept per task for the percentiles in get_stats
+DURATION_WINDOW = 200
+
+
+class AudioWorkerBusy(AudioConversionError):
+    """The pool is saturated and no slot freed up in time"""
+
+
+class AudioWorkerTimeout(AudioConversionError):
+    """A task did not finish within AUDIO_WORKER_TIMEOUT_SECONDS"""
+
+
+def _init_worker():
+    """Configure Django in a freshly spawned worker (the tasks read settings)"""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+    import django
+    django.setup()
+
+
+def _run_task(name: str, args: tuple, kwargs: dict):
+    started = time.monotonic()
+    result = TASKS[name](*args, **kwargs)
+    return result, time.monotonic() - started
+
+
+class AudioWorkerPool:
+    """
+    Runs audio tasks in a bounded ProcessPoolExecutor with back-pressure,
+    per-task timeouts and queue / duration metrics
+    """
+
+    def __init__(self):
+        self._pool = None
+        self._slots = None
+        self._pool_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.in_flight = 0
+        self.stats = {
+            'completed': 0,
+            'failed': 0,
+            'timed_out': 0,
+            'rejected': 0,
+            'pool_restarts': 0,
+        }
+        self._durations = {name: deque(maxlen=DURATION_WINDOW) for name in TASKS}
+        self._waits = deque(maxlen=DURATION_WINDOW)
+
+    @property
+    def capacity(self) -> int:
+        return settings.AUDIO_WORKER_PROCESSES + settings.AUDIO_WORKER_QUEUE_SIZE
+
+    def has_capacity(self) -> bool:
+        """False when new audio work would have to wait for a slot (views answer 503)"""
+        if settings.AUDIO_WORKER_PROCESSES <= 0:
+            return True
+        with self._stats_lock:
+            return self.in_flight < self.capacity
+
+    def decode(self, input_path: str) -> bytes:
+        return self.run('decode', input_path)
+
+    def preprocess(self, pcm: bytes) -> Dict:
+        return self.run('preprocess', pcm)
+
+    def split(self, pcm: bytes, max_chunk_seconds: float, min_chunk_seconds: float) -> List[Dict]:
+        return self.run('split', pcm, max_chunk_seconds, min_chunk_seconds)
+
+    def encode(self, pcm: bytes, **kwargs) -> bytes:
+        return self.run('encode', pcm, **kwargs)
+
+    def run(self, name: str, *args, **kwargs):
+        """
+        Run one task in the pool and wait for its result
+
+        With AUDIO_WORKER_PROCESSES=0 the task runs inline (development).
+
+        Raises:
+            AudioWorkerBusy: no slot freed up within AUDIO_WORKER_QUEUE_WAIT_SECONDS
+            AudioWorkerTimeout: the task ran longer than AUDIO_WORKER_TIMEOUT_SECONDS
+            AudioConversionError: raised by the task itself or a crashed worker
+        """
+        if settings.AUDIO_WORKER_PROCESSES <= 0:
+            result, elapsed = _run_task(name, args, kwargs)
+            self._record(name, elapsed, 0.0)
+            return result
+
+        pool, slots = self._get_pool()
+        if not slots.acquire(timeout=settings.AUDIO_WORKER_QUEUE_WAIT_SECONDS):
+            self._count('rejected')
+            raise AudioWorkerBusy(
+                f"Audio processing is saturated ({self.capacity} tasks queued or running)"
+            )
+
+        submitted = time.monotonic()
+        try:
+            future = pool.submit(_run_task, name, args, kwargs)
+        except (BrokenProcessPool, RuntimeError) as e:
+            slots.release()
+            self._reset_pool(pool)
+            raise AudioConversionError(f"Audio worker pool unavailable: {e}")
+
+        with self._stats_lock:
+            self.in_flight += 1
+        # The slot is only freed when the task really ends, so tasks that
+        # outlive their caller's timeout still count against the pool
+        future.add_done_callback(lambda _: self._release(slots))
+
+        try:
+            result, elapsed = future.result(timeout=settings.AUDIO_WORKER_TIMEOUT_SECONDS)
+        except FuturesTimeout:
+            future.cancel()
+            self._count('timed_out')
+            raise AudioWorkerTimeout(
+                f"Audio task '{name}' exceeded {settings.AUDIO_WORKER_TIMEOUT_SECONDS}s"
+            )
+        except BrokenProcessPool as e:
+            self._count('failed')
+            self._reset_pool(pool)
+            raise AudioConversionError(f"Audio worker crashed during '{name}': {e}")
+        except Exception:
+            self._count('failed')
+            raise
+
+        self._record(name, elapsed, time.monotonic() - submitted - elapsed)
+        return result
+
+    def get_stats(self) -> Dict:
+        with self._stats_lock:
+            stats = dict(self.stats)
+            in_flight = self.in_flight
+            durations = {name: sorted(values) for name, values in self._durations.items() if values}
+            waits = sorted(self._waits)
+
+        workers = settings.AUDIO_WORKER_PROCESSES
+        stats.update({
+            'workers': workers,
+            'capacity': self.capacity if workers > 0 else None,
+            'in_flight': in_flight,
+            'queue_depth': max(0, in_flight - workers),
+            'queue_wait_p95_seconds': _percentile(waits, 0.95),
+            'task_seconds': {
+                name: {
+                    'count': len(values),
+                    'mean': round(sum(values) / len(values), 3),
+                    'p95': _percentile(values, 0.95),
+                }
+                for name, values in durations.items()
+            },
+        })
+        return stats
+
+    def _get_pool(self):
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=settings.AUDIO_WORKER_PROCESSES,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_init_worker,
+                )
+                self._slots = threading.BoundedSemaphore(self.capacity)
+                logger.info(f"Started audio worker pool ({settings.AUDIO_WORKER_PROCESSES} processes)")
+            return self._pool, self._slots
+
+    def _reset_pool(self, broken):
+        with self._pool_lock:
+            if self._pool is broken:
+                self._pool = None
+                self._count('pool_restarts')
+                logger.error("Audio worker pool broken, it will be restarted on next use")
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def _release(self, slots):
+        with self._stats_lock:
+            self.in_flight -= 1
+        slots.release()
+
+    def _record(self, name: str, elapsed: float, waited: float):
+        with self._stats_lock:
+            self.stats['completed'] += 1
+            self._durations[name].append(elapsed)
+            self._waits.append(max(0.0, waited))
+
+    def _count(self, key: str):
+        with self._stats_lock:
+            self.stats[key] += 1
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    return round(values[min(len(values) - 1, int(fraction * len(values)))], 3)
+
+
+# Singleton instance
+audio_pool = AudioWorkerPool()
@@ -0,0 +1,226 @@
+"""
+Embedding Service - One shared sentence-transformers model per host
+Runs as a separate process on a Unix socket and batches concurrent
+embedding requests from all gunicorn workers
+
+Usage: python manage.py run_embedding_service
+"""
+import json
+import logging
+import os
+import queue
+import socket
+import socketserver
+import struct
+import threading
+import time
+from typing import List
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+LOCAL_EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+# Wire format: 4-byte big-endian length prefix followed by a JSON body
+HEADER = struct.Struct('>I')
+
+
+def build_local_embeddings():
+    """
+    Load the local HuggingFace sentence-transformers model (in-process)
+    """
+    from langchain_huggingface import HuggingFaceEmbeddings
+    return HuggingFaceEmbeddings(
+        model_name=LOCAL_EMBEDDING_MODEL,
+        model_kwargs={'device': 'cpu'},
+        encode_kwargs={'normalize_embeddings': True}
+    )
+
+
+def send_message(sock: socket.socket, payload: dict):
+    body = json.dumps(payload).encode('utf-8')
+    sock.sendall(HEADER.pack(len(body)) + body)
+
+
+def recv_message(sock: socket.socket) -> dict:
+    header = _recv_exact(sock, HEADER.size)
+    (length,) = HEADER.unpack(header)
+    return json.loads(_recv_exact(sock, length).decode('utf-8'))
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    data = bytearray()
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("Embedding service closed the connection")
+        data.extend(chunk)
+    return bytes(data)
+
+
+class _PendingRequest:
+    """One worker request waiting to be folded into a batch"""
+
+    def __init__(self, texts: List[str]):
+        self.texts = texts
+        self.result = None
+        self.error = None
+        self.done = threading.Event()
+
+
+class EmbeddingBatcher:
+    """
+    Collects requests arriving within a short window and embeds them
+    with a single model call
+    """
+
+    def __init__(self, embeddings, batch_window_ms: int = 10, max_batch_size: int = 64):
+        self.embeddings = embeddings
+        self.batch_window = batch_window_ms / 1000.0
+        self.max_batch_size = max_batch_size
+        self._queue = queue.Queue()
+        self._thread = None
+        self.stats = {
+            'requests': 0,
+            'texts': 0,
+            'batches': 0,
+            'embed_seconds': 0.0,
+        }
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='embedding-batcher', daemon=True)
+        self._thread.start()
+
+    def submit(self, texts: List[str]) -> List[List[float]]:
+        pending = _PendingRequest(texts)
+        self._queue.put(pending)
+        pending.done.wait()
+        if pending.error:
+            raise pending.error
+        return pending.result
+
+    def _collect_batch(self) -> List[_PendingRequest]:
+        batch = [self._queue.get()]
+        text_count = len(batch[0].texts)
+        deadline = time.monotonic() + self.batch_window
+
+        while text_count < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                pending = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(pending)
+            text_count += len(pending.texts)
+
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect_batch()
+            texts = [text for pending in batch for text in pending.texts]
+
+            try:
+                started = time.monotonic()
+                vectors = self.embeddings.embed_documents(texts)
+                self.stats['embed_seconds'] += time.monotonic() - started
+            except Exception as e:
+                logger.error(f"Batch embedding failed: {e}")
+                for pending in batch:
+                    pending.error = e
+                    pending.done.set()
+                continue
+
+            offset = 0
+            for pending in batch:
+                pending.result = vectors[offset:offset + len(pending.texts)]
+                offset += len(pending.texts)
+                pending.done.set()
+
+            self.stats['requests'] += len(batch)
+            self.stats['texts'] += len(texts)
+            self.stats['batches'] += 1
+            logger.debug(f"Embedded batch of {len(texts)} texts from {len(batch)} requests")
+
+
+class _EmbeddingRequestHandler(socketserver.BaseRequestHandler):
+
+    def handle(self):
+        try:
+            message = recv_message(self.request)
+        except (ConnectionError, ValueError) as e:
+            logger.warning(f"Malformed embedding request: {e}")
+            return
+
+        if message.get('ping'):
+            send_message(self.request, {'ok': True, 'stats': self.server.batcher.stats})
+            return
+
+        try:
+            vectors = self.server.batcher.submit(list(message.get('texts', [])))
+            send_message(self.request, {'embeddings': vectors})
+        except Exception as e:
+            send_message(self.request, {'error': str(e)})
+
+
+class EmbeddingServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    Unix socket server holding the single model instance for this host
+    """
+    daemon_threads = True
+    request_queue_size = 128  # Every worker may connect at once under load
+
+    def __init__(self, socket_path: str, batcher: EmbeddingBatcher):
+        if os.path.exists(socket_path):
+            os.remove(socket_path)  # Stale socket from a previous run
+        self.batcher = batcher
+        super().__init__(socket_path, _EmbeddingRequestHandler)
+        os.chmod(socket_path, 0o660)
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.server_address):
+            os.remove(self.server_address)
+
+
+class EmbeddingServiceClient:
+    """
+    Worker-side client for the shared embedding service
+    Implements the LangChain Embeddings interface (embed_documents / embed_query)
+    so it can be passed straight to Chroma
+    """
+
+    def __init__(self, socket_path: str = None, timeout: float = None):
+        self.socket_path = socket_path or settings.EMBEDDING_SERVICE_SOCKET
+        self.timeout = timeout if timeout is not None else settings.EMBEDDING_SERVICE_TIMEOUT
+
+    def _request(self, payload: dict) -> dict:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(self.timeout)
+            sock.connect(self.socket_path)
+            send_message(sock, payload)
+            response = recv_message(sock)
+
+        if 'error' in response:
+            raise RuntimeError(f"Embedding service error: {response['error']}")
+        return response
+
+    def is_available(self) -> bool:
+        """Check the service is listening on the configured socket"""
+        if not self.socket_path or not os.path.exists(self.socket_path):
+            return False
+        try:
+            return bool(self._request({'ping': True}).get('ok'))
+        except Exception as e:
+            logger.warning(f"Embedding service not reachable at {self.socket_path}: {e}")
+            return False
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        return self._request({'texts': list(texts)})['embeddings']
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
@@ -0,0 +1,69 @@
+"""
+First-Aid Instruction Library - Standard spoken instructions for VHTs
+These are the instructions read out most often; `prerender_tts` synthesizes
+them ahead of time into the TTS cache so playback needs no synthesis call.
+Languages without a reviewed translation here (e.g. Luganda) are
+machine-translated by `prerender_tts --translate-missing`.
+"""
+from typing import Dict, Optional
+
+# Instruction id -> {language: text}
+FIRST_AID_INSTRUCTIONS: Dict[str, Dict[str, str]] = {
+    'transport_prep': {
+        'en': 'Keep patient hydrated, monitor vital signs, prepare for transport',
+        'sw': 'Mpe mgonjwa maji ya kutosha, fuatilia dalili muhimu za mwili, jiandae kumsafirisha',
+    },
+    'bleeding': {
+        'en': 'Press firmly on the wound with a clean cloth and keep pressing until the bleeding stops. Raise the injured part if you can.',
+        'sw': 'Bonyeza jeraha kwa nguvu kwa kitambaa safi na endelea kubonyeza hadi damu ikome. Inua sehemu iliyoumia ikiwezekana.',
+    },
+    'burns': {
+        'en': 'Cool the burn under clean running water for twenty minutes. Do not apply butter, oil or toothpaste. Cover it loosely with a clean cloth.',
+        'sw': 'Poza jeraha la moto kwa maji safi yanayotiririka kwa dakika ishirini. Usipake siagi, mafuta wala dawa ya meno. Lifunike kwa kitambaa safi bila kubana.',
+    },
+    'choking': {
+        'en': 'If the person cannot breathe or speak, give five firm back blows between the shoulder blades, then five abdominal thrusts. Repeat until the object comes out.',
+        'sw': 'Kama mtu hawezi kupumua wala kuongea, mpige mara tano kwa nguvu mgongoni katikati ya mabega, kisha msukumo mara tano tumboni. Rudia hadi kitu kitoke.',
+    },
+    'convulsions': {
+        'en': 'Lay the patient on their side on the ground and move hard objects away. Do not put anything in the mouth. Note how long the fit lasts.',
+        'sw': 'Mlaze mgonjwa kwa ubavu chini na uondoe vitu vigumu karibu naye. Usiweke kitu chochote mdomoni. Angalia muda ambao degedege linachukua.',
+    },
+    'dehydration': {
+        'en': 'Give oral rehydration solution in small sips every few minutes. Keep breastfeeding babies. Watch for sunken eyes and little urine.',
+        'sw': 'Mpe mchanganyiko wa ORS kwa mafunda madogo kila baada ya dakika chache. Endelea kunyonyesha watoto. Angalia macho yaliyozama na mkojo kidogo.',
+    },
+    'high_fever': {
+        'en': 'Remove extra clothing and sponge the body with lukewarm water. Give paracetamol if available and keep giving fluids.',
+        'sw': 'Mvue nguo za ziada na mfute mwili kwa maji ya uvuguvugu. Mpe paracetamol ikiwa inapatikana na endelea kumpa vinywaji.',
+    },
+    'snake_bite': {
+        'en': 'Keep the patient calm and still. Keep the bitten limb below the heart and remove rings or tight clothing. Do not cut the wound or suck out the venom.',
+        'sw': 'Mtulize mgonjwa na asitembee. Weka kiungo kilichoumwa chini ya usawa wa moyo na uondoe pete au nguo zinazobana. Usikate jeraha wala kunyonya sumu.',
+    },
+    'fracture': {
+        'en': 'Do not try to straighten the limb. Support it in the position you found it with a splint or folded cloth, and avoid moving the patient more than needed.',
+        'sw': 'Usijaribu kunyoosha kiungo. Kishikilie katika hali uliyokikuta kwa banzi au kitambaa kilichokunjwa, na usimsogeze mgonjwa zaidi ya inavyohitajika.',
+    },
+    'unconscious': {
+        'en': 'Check that the patient is breathing. If breathing, turn them onto their side in the recovery position and stay with them.',
+        'sw': 'Hakikisha mgonjwa anapumua. Akiwa anapumua, mgeuze alale kwa ubavu na ubaki naye.',
+    },
+    'breathing_difficulty': {
+        'en': 'Sit the patient upright and loosen tight clothing. Keep them calm and away from smoke. Refer urgently if the lips turn blue.',
+        'sw': 'Mkalishe mgonjwa wima na ulegeze nguo zinazobana. Mtulize na umweke mbali na moshi. Mpeleke hospitali haraka midomo ikibadilika kuwa ya bluu.',
+    },
+    'newborn_warmth': {
+        'en': 'Dry the baby and keep them skin to skin on the mother\'s chest, covered with a cloth and a hat. Start breastfeeding within one hour.',
+        'sw': 'Mkaushe mtoto na umweke ngozi kwa ngozi kifuani kwa mama, akiwa amefunikwa kwa kitambaa na kofia. Anza kunyonyesha ndani ya saa moja.',
+    },
+    'poisoning': {
+        'en': 'Do not make the patient vomit. Keep the container of what was swallowed and bring it to the health facility.',
+        'sw': 'Usimfanye mgonjwa atapike. Hifadhi chombo cha kitu alichomeza na ukipeleke kwenye kituo cha afya.',
+    },
+}
+
+
+def get_instruction(instruction_id: str, language: str) -> Optional[str]:
+    """Text of an instruction in a language, or None if not in the library"""
+    return FIRST_AID_INSTRUCTIONS.get(instruction_id, {}).get(language)
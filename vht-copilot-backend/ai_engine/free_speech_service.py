@@ -4,9 +4,13 @@ Uses Python SpeechRecognition library with Google's free web API
 NO API KEY REQUIRED - 100% FREE
 """
 import logging
+import time
 import speech_recognition as sr
-from typing import Dict
-import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+from django.conf import settings
+from .audio_processing import SAMPLE_RATE, SAMPLE_WIDTH
+from .audio_workers import audio_pool
 
 logger = logging.getLogger(__name__)
 
@@ -28,7 +32,8 @@ class FreeSpeechService:
     def transcribe_audio(
         self, 
         audio_file_path: str, 
-        language: str = 'en-US'
+        language: str = 'en-US',
+        pcm: bytes = None
     ) -> Dict:
         """
         Transcribe audio file using free Google Web Speech API
@@ -36,32 +41,29 @@ class FreeSpeechService:
         Args:
             audio_file_path: Path to audio file (.wav, .mp3, .m4a)
             language: Language code ('en-US', 'lg-UG', 'sw-UG')
+            pcm: Already-decoded 16 kHz mono PCM (skips decoding the file)
         
         Returns:
             Dict with:
                 - transcription: Transcribed text
                 - language_detected: Language used
-                - confidence: Always 0.8 for this API
+                - confidence: Duration-weighted confidence across chunks
                 - duration_seconds: Audio duration
+                - chunks: Per-chunk transcription, confidence and attempts
                 - success: True if successful
                 - error: Error message if failed
         """
-        converted_file = None
         try:
-            # Check if audio needs conversion to WAV
-            if not audio_file_path.lower().endswith('.wav'):
-                logger.info(f"Converting audio file to WAV format: {audio_file_path}")
-                converted_file = self.convert_audio_format(audio_file_path)
-                audio_file_path = converted_file
+            # Decode to 16 kHz mono PCM in memory (no temporary WAV on disk);
+            # CPU-bound steps run in the audio worker pool, off the request thread
+            if pcm is None:
+                pcm = audio_pool.decode(audio_file_path)
+            duration = len(pcm) / float(SAMPLE_RATE * SAMPLE_WIDTH)
             
-            # Load audio file
-            with sr.AudioFile(audio_file_path) as source:
-                # Adjust for ambient noise
-                self.recognizer.adjust_for_ambient_noise(source, duration=0.5)
-                
-                # Record audio
-                audio_data = self.recognizer.record(source)
-                duration = source.DURATION if hasattr(source, 'DURATION') else 0
+            # Trim silence in one pass (replaces adjust_for_ambient_noise, which
+            # discarded the first 0.5s; recognize_* never read its threshold)
+            if settings.VAD_ENABLED:
+                pcm = audio_pool.preprocess(pcm)['pcm']
             
             # Map language codes
             language_map = {
@@ -75,27 +77,39 @@ class FreeSpeechService:
             
             lang_code = language_map.get(language, 'en-US')
             
-            # Try Google Web Speech API (FREE)
-            try:
-                logger.info(f"Attempting free Google Web Speech API transcription ({lang_code})")
-                text = self.recognizer.recognize_google(
-                    audio_data, 
-                    language=lang_code,
-                    show_all=False
-                )
-                
+            # Split at silence and transcribe the chunks concurrently (FREE)
+            chunks = audio_pool.split(
+                pcm,
+                settings.SPEECH_CHUNK_MAX_SECONDS,
+                settings.SPEECH_CHUNK_MIN_SECONDS
+            )
+            logger.info(
+                f"Attempting free Google Web Speech API transcription ({lang_code}, "
+                f"{len(chunks)} chunk(s))"
+            )
+            results = self._transcribe_chunks(chunks, lang_code)
+            
+            texts = [r['transcription'] for r in results if r['transcription']]
+            if texts:
+                text = ' '.join(texts)
                 logger.info(f"✓ Free transcription successful: {text[:50]}...")
                 
-                return {
+                result = {
                     'success': True,
                     'transcription': text,
                     'original_transcription': text,
                     'language_detected': lang_code,
-                    'confidence': 0.8,  # Google Web API doesn't provide confidence
-                    'duration_seconds': duration
+                    'confidence': self._overall_confidence(results),
+                    'duration_seconds': duration,
+                    'chunks': results
                 }
-                
-            except sr.UnknownValueError:
+                failed = [r['index'] for r in results if r['error']]
+                if failed:
+                    result['note'] = f"Chunks {failed} could not be transcribed"
+                return result
+            
+            request_errors = [r['error'] for r in results if r['error']]
+            if not request_errors:
                 logger.warning("Speech could not be understood")
                 return {
                     'success': False,
@@ -103,37 +117,38 @@ class FreeSpeechService:
                     'transcription': '',
                     'language_detected': lang_code,
                     'confidence': 0.0,
-                    'duration_seconds': duration
+                    'duration_seconds': duration,
+                    'chunks': results
                 }
             
-            except sr.RequestError as e:
-                # Fallback to Sphinx (offline, less accurate but always works)
-                logger.warning(f"Google API failed: {e}, trying offline Sphinx...")
+            # Fallback to Sphinx (offline, less accurate but always works)
+            e = request_errors[0]
+            logger.warning(f"Google API failed: {e}, trying offline Sphinx...")
+            
+            try:
+                text = self.recognizer.recognize_sphinx(sr.AudioData(pcm, SAMPLE_RATE, SAMPLE_WIDTH))
+                logger.info(f"✓ Offline transcription successful: {text[:50]}...")
                 
-                try:
-                    text = self.recognizer.recognize_sphinx(audio_data)
-                    logger.info(f"✓ Offline transcription successful: {text[:50]}...")
-                    
-                    return {
-                        'success': True,
-                        'transcription': text,
-                        'original_transcription': text,
-                        'language_detected': 'en-US',  # Sphinx only supports English
-                        'confidence': 0.6,  # Lower confidence for offline
-                        'duration_seconds': duration,
-                        'note': 'Used offline recognition'
-                    }
-                    
-                except Exception as sphinx_error:
-                    logger.error(f"Sphinx offline recognition also failed: {sphinx_error}")
-                    return {
-                        'success': False,
-                        'error': f'All recognition methods failed: {e}',
-                        'transcription': '',
-                        'language_detected': lang_code,
-                        'confidence': 0.0,
-                        'duration_seconds': duration
-                    }
+                return {
+                    'success': True,
+                    'transcription': text,
+                    'original_transcription': text,
+                    'language_detected': 'en-US',  # Sphinx only supports English
+                    'confidence': 0.6,  # Lower confidence for offline
+                    'duration_seconds': duration,
+                    'note': 'Used offline recognition'
+                }
+                
+            except Exception as sphinx_error:
+                logger.error(f"Sphinx offline recognition also failed: {sphinx_error}")
+                return {
+                    'success': False,
+                    'error': f'All recognition methods failed: {e}',
+                    'transcription': '',
+                    'language_detected': lang_code,
+                    'confidence': 0.0,
+                    'duration_seconds': duration
+                }
         
         except Exception as e:
             logger.error(f"Speech recognition error: {e}")
@@ -145,77 +160,70 @@ class FreeSpeechService:
                 'confidence': 0.0,
                 'duration_seconds': 0
             }
+
+    def _transcribe_chunks(self, chunks: List[Dict], lang_code: str) -> List[Dict]:
+        """
+        Transcribe chunks concurrently, keeping their original order
+        """
+        if len(chunks) <= 1:
+            return [self._transcribe_chunk(index, chunk, lang_code) for index, chunk in enumerate(chunks)]
         
-        finally:
-            # Clean up converted file
-            if converted_file and os.path.exists(converted_file):
-                try:
-                    os.remove(converted_file)
-                    logger.info(f"Cleaned up temporary WAV file: {converted_file}")
-                except:
-                    pass
+        workers = min(settings.SPEECH_CHUNK_WORKERS, len(chunks))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='speech-chunk') as executor:
+            futures = [
+                executor.submit(self._transcribe_chunk, index, chunk, lang_code)
+                for index, chunk in enumerate(chunks)
+            ]
+            return [future.result() for future in futures]
     
-    def convert_audio_format(self, input_path: str, output_path: str = None) -> str:
+    def _transcribe_chunk(self, index: int, chunk: Dict, lang_code: str) -> Dict:
         """
-        Convert audio to WAV format (required for SpeechRecognition)
+        Transcribe one chunk, retrying only this chunk on request errors
+        """
+        audio_data = sr.AudioData(chunk['pcm'], SAMPLE_RATE, SAMPLE_WIDTH)
+        result = {
+            'index': index,
+            'start_seconds': chunk['start_seconds'],
+            'duration_seconds': round(chunk['duration'], 2),
+            'transcription': '',
+            'confidence': 0.0,
+            'attempts': 0,
+            'error': None
+        }
         
-        Args:
-            input_path: Path to input audio file
-            output_path: Optional output path (auto-generated if None)
+        for attempt in range(settings.SPEECH_CHUNK_RETRIES + 1):
+            result['attempts'] = attempt + 1
+            try:
+                response = self.recognizer.recognize_google(
+                    audio_data,
+                    language=lang_code,
+                    show_all=True
+                )
+            except sr.RequestError as e:
+                logger.warning(f"Chunk {index} attempt {attempt + 1} failed: {e}")
+                result['error'] = str(e)
+                if attempt < settings.SPEECH_CHUNK_RETRIES:
+                    time.sleep(0.5 * (2 ** attempt))
+                continue
+            
+            result['error'] = None
+            alternatives = response.get('alternative', []) if isinstance(response, dict) else []
+            if alternatives:
+                best = alternatives[0]
+                result['transcription'] = best.get('transcript', '').strip()
+                # Google only reports confidence for the top alternative, and not always
+                result['confidence'] = round(best.get('confidence', 0.8), 3)
+            return result
         
-        Returns:
-            Path to converted WAV file
-        """
-        try:
-            from pydub import AudioSegment
-            from pydub.utils import which
-            import os
-            
-            # Hardcoded paths for your system
-            ffmpeg_path = r'C:\Users\USER\Downloads\ffmpeg-8.0.1-essentials_build\bin\ffmpeg.exe'
-            ffprobe_path = r'C:\Users\USER\Downloads\ffmpeg-8.0.1-essentials_build\bin\ffprobe.exe'
-            
-            # Verify files exist
-            if not os.path.exists(ffmpeg_path):
-                raise Exception(f"FFmpeg not found at: {ffmpeg_path}")
-            if not os.path.exists(ffprobe_path):
-                raise Exception(f"FFprobe not found at: {ffprobe_path}")
-            
-            # Set environment variables for pydub
-            os.environ["PATH"] += os.pathsep + r"C:\Users\USER\Downloads\ffmpeg-8.0.1-essentials_build\bin"
-            
-            # Configure AudioSegment BEFORE using it
-            AudioSegment.converter = ffmpeg_path
-            AudioSegment.ffmpeg = ffmpeg_path
-            AudioSegment.ffprobe = ffprobe_path
-            
-            logger.info(f"Using ffmpeg: {ffmpeg_path}")
-            logger.info(f"Using ffprobe: {ffprobe_path}")
-            
-            if output_path is None:
-                output_path = input_path.rsplit('.', 1)[0] + '_converted.wav'
-            
-            logger.info(f"Converting {input_path} to WAV format...")
-            
-            # Load audio file (pydub auto-detects format)
-            audio = AudioSegment.from_file(input_path)
-            
-            # Convert to mono 16kHz WAV (optimal for speech recognition)
-            audio = audio.set_frame_rate(16000).set_channels(1)
-            
-            # Export as WAV
-            audio.export(output_path, format='wav')
-            
-            logger.info(f"✓ Converted to: {output_path}")
-            return output_path
-            
-        except ImportError:
-            logger.error("pydub not installed - install with: pip install pydub")
-            raise Exception("Audio conversion failed: pydub not available")
-            
-        except Exception as e:
-            logger.error(f"Audio conversion failed: {e}")
-            raise
+        return result
+    
+    @staticmethod
+    def _overall_confidence(results: List[Dict]) -> float:
+        """Duration-weighted confidence across chunks (failed chunks count as 0)"""
+        total = sum(r['duration_seconds'] for r in results)
+        if not total:
+            return 0.0
+        return round(sum(r['confidence'] * r['duration_seconds'] for r in results) / total, 3)
 
 
 # Singleton instance
@@ -9,6 +9,7 @@ from google.cloud import texttospeech
 from google.cloud import translate_v2 as translate
 import io
 import logging
+from .medical_glossary import medical_glossary
 
 logger = logging.getLogger(__name__)
 
@@ -194,6 +195,15 @@ class GoogleTranslationService:
                 'confidence': float
             }
         """
+        glossary = medical_glossary.translate(text, source_language, target_language)
+        if glossary['covered']:
+            return {
+                'translated_text': glossary['translated_text'],
+                'detected_source_language': source_language,
+                'confidence': 1.0,
+                'service': 'glossary'
+            }
+        
         if not self.is_available:
             raise Exception("Google Translate not available")
         
@@ -232,6 +242,10 @@ class GoogleTranslationService:
         Returns:
             Translated medical term
         """
+        glossary = medical_glossary.translate(term, 'en', target_language)
+        if glossary['covered']:
+            return glossary['translated_text']
+        
         try:
             result = self.translate_text(
                 f"Medical term: {term}",
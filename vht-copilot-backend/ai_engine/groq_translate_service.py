@@ -4,12 +4,29 @@ Uses GROQ LLM for FREE translation (replaces Argos Translate)
 Supports English ↔ Luganda
 """
 import logging
-from typing import Dict
+import re
+from typing import Dict, List
 from django.conf import settings
 import os
+from .medical_glossary import medical_glossary
+from .translation_memory import translation_memory
 
 logger = logging.getLogger(__name__)
 
+# Language codes -> names used in prompts
+LANGUAGE_NAMES = {
+    'en': 'English',
+    'lg': 'Luganda',
+    'sw': 'Swahili'
+}
+
+# "[3] translated line" in batch responses
+BATCH_LINE_PATTERN = re.compile(r'^\s*\[(\d+)\]\s*(.*?)\s*$', re.MULTILINE)
+
+# Line breaks inside an item travel as this tag, so each item stays on its numbered line
+LINE_BREAK_TAG = '<br>'
+LINE_BREAK_PATTERN = re.compile(r'\s*<br\s*/?>\s*', re.IGNORECASE)
+
 
 class GroqTranslateService:
     """
@@ -46,6 +63,9 @@ class GroqTranslateService:
     ) -> Dict:
         """
         Translate text using GROQ LLM
+        Inputs made up of glossary terms are answered locally; known terms in
+        other inputs are passed to the LLM as fixed translations. Earlier LLM
+        translations are reused from the translation memory.
         
         Args:
             text: Text to translate
@@ -60,6 +80,32 @@ class GroqTranslateService:
                 'success': bool
             }
         """
+        local, hints = self.prepare(text, target_language, source_language)
+        if local is not None:
+            return local
+        return self.translate_remote(text, target_language, source_language, hints)
+    
+    def translate_remote(
+        self,
+        text: str,
+        target_language: str = 'lg',
+        source_language: str = 'en',
+        hints: List = ()
+    ) -> Dict:
+        """
+        The LLM step of translate: no glossary or translation memory lookup
+        (callers that already tried them pass the glossary hints they got)
+        
+        Args:
+            text: Text to translate
+            target_language: Target language code
+            source_language: Source language code
+            hints: Glossary hints from prepare(), given to the LLM as fixed translations
+        
+        Returns:
+            Same as translate
+        """
+        model = settings.GROQ_MODEL or "llama-3.3-70b-versatile"
         if not self.is_available:
             return {
                 'translated_text': text,
@@ -79,26 +125,19 @@ class GroqTranslateService:
             }
         
         try:
-            # Map language codes to full names
-            lang_map = {
-                'en': 'English',
-                'lg': 'Luganda',
-                'sw': 'Swahili'
-            }
-            
-            source_lang_name = lang_map.get(source_language, 'English')
-            target_lang_name = lang_map.get(target_language, 'Luganda')
+            source_lang_name = LANGUAGE_NAMES.get(source_language, 'English')
+            target_lang_name = LANGUAGE_NAMES.get(target_language, 'Luganda')
             
             # Use GROQ LLM for translation
             prompt = f"""Translate the following text from {source_lang_name} to {target_lang_name}.
 Return ONLY the translated text, nothing else.
 
-Text to translate: "{text}"
+{medical_glossary.hint_prompt(hints)}Text to translate: "{text}"
 
 Translation:"""
 
             response = self.client.chat.completions.create(
-                model=settings.GROQ_MODEL or "llama-3.3-70b-versatile",
+                model=model,
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.3,
                 max_tokens=500,
@@ -107,16 +146,18 @@ Translation:"""
             translated_text = response.choices[0].message.content.strip()
             
             # Remove quotes if LLM added them
-            if translated_text.startswith('"') and translated_text.endswith('"'):
-                translated_text = translated_text[1:-1]
+            translated_text = _strip_quotes(translated_text)
             
             logger.info(f"✅ GROQ translated: {text[:50]}... → {translated_text[:50]}...")
+            translation_memory.store(text, translated_text, source_language, target_language, model)
             
             return {
                 'translated_text': translated_text,
                 'source_language': source_language,
                 'target_language': target_language,
-                'success': True
+                'success': True,
+                'service': 'groq',
+                'glossary_hints': len(hints)
             }
             
         except Exception as e:
@@ -126,8 +167,219 @@ Translation:"""
                 'source_language': source_language,
                 'target_language': target_language,
                 'success': False,
-                'error': str(e)
+                'error': str(e),
+                'rate_limited': is_rate_limit(e)
             }
+    
+    def translate_locally(self, text: str, target_language: str = 'lg', source_language: str = 'en'):
+        """
+        Answer from the glossary or translation memory only (no LLM call)
+        
+        Returns:
+            Same result as translate, or None if the text needs a translator
+        """
+        return self.prepare(text, target_language, source_language)[0]
+    
+    def prepare(self, text: str, target_language: str = 'lg', source_language: str = 'en'):
+        """
+        The local step of translate (one glossary and one translation memory lookup)
+        
+        Returns:
+            (result or None, glossary hints for translate_remote)
+        """
+        model = settings.GROQ_MODEL or "llama-3.3-70b-versatile"
+        glossary = medical_glossary.translate(text, source_language, target_language)
+        if glossary['covered']:
+            translated_text, service = glossary['translated_text'], 'glossary'
+        else:
+            translated_text = translation_memory.lookup(text, source_language, target_language, model)
+            service = 'translation_memory'
+        if translated_text is None:
+            return None, glossary['hints']
+        return {
+            'translated_text': translated_text,
+            'source_language': source_language,
+            'target_language': target_language,
+            'success': True,
+            'service': service
+        }, glossary['hints']
+
+    def translate_batch(
+        self,
+        texts: List[str],
+        target_language: str = 'lg',
+        source_language: str = 'en'
+    ) -> Dict:
+        """
+        Translate a list of strings with one LLM call
+        Strings the glossary or translation memory can answer never reach the
+        LLM; the rest (identical strings sent once) go out as one numbered
+        prompt, line breaks kept. A response that does not number exactly
+        the lines sent is discarded (lines may have been merged or skipped)
+        and its items are requested again one per call, up to
+        TRANSLATE_BATCH_RETRIES times.
+        
+        Args:
+            texts: Strings to translate
+            target_language: Target language code
+            source_language: Source language code
+        
+        Returns:
+            {
+                'translations': [{'translated_text': str, 'success': bool, 'service': str}, ...]
+                    (same order as texts; failed items keep their original text),
+                'source_language': str,
+                'target_language': str,
+                'success': bool (every item translated),
+                'llm_calls': int,
+                'rate_limited': bool (GROQ answered 429 - daily or per-minute quota used up)
+            }
+        """
+        model = settings.GROQ_MODEL or "llama-3.3-70b-versatile"
+        translations = [None] * len(texts)
+        pending = {}  # text -> {'text', 'indices', 'hints'}
+        
+        for index, text in enumerate(texts):
+            if not isinstance(text, str) or not text.strip():
+                translations[index] = {'translated_text': '', 'success': False, 'error': 'Empty text'}
+                continue
+            
+            glossary = medical_glossary.translate(text, source_language, target_language)
+            if glossary['covered']:
+                translations[index] = {
+                    'translated_text': glossary['translated_text'], 'success': True, 'service': 'glossary'
+                }
+                continue
+            
+            remembered = translation_memory.lookup(text, source_language, target_language, model)
+            if remembered is not None:
+                translations[index] = {
+                    'translated_text': remembered, 'success': True, 'service': 'translation_memory'
+                }
+                continue
+            
+            # Exact text as the key: "Fever" and "fever" keep their own casing
+            item = pending.setdefault(text, {
+                'text': text,
+                'indices': [],
+                'hints': glossary['hints']
+            })
+            item['indices'].append(index)
+        
+        items = list(pending.values())
+        llm_calls = 0
+        rate_limited = False
+        error = None if self.is_available else 'GROQ not available'
+        remaining = list(range(len(items))) if self.is_available else []
+        
+        for attempt in range(1 + settings.TRANSLATE_BATCH_RETRIES):
+            if not remaining:
+                break
+            # Retries go one item per call: a single line cannot be misaligned
+            chunks = self._batch_chunks(remaining, items) if attempt == 0 else [[position] for position in remaining]
+            for chunk in chunks:
+                llm_calls += 1
+                try:
+                    lines = self._request_batch(
+                        [items[position] for position in chunk], source_language, target_language, model
+                    )
+                except Exception as e:
+                    logger.error(f"GROQ batch translation failed: {e}")
+                    error = str(e)
+                    rate_limited = rate_limited or is_rate_limit(e)
+                    continue
+                for number, position in enumerate(chunk, start=1):
+                    if lines.get(number):
+                        items[position]['translation'] = lines[number]
+            remaining = [position for position in remaining if 'translation' not in items[position]]
+            if remaining and attempt < settings.TRANSLATE_BATCH_RETRIES:
+                logger.warning(f"GROQ batch response misaligned for {len(remaining)} lines, requesting them one by one")
+        
+        for item in items:
+            translated_text = item.get('translation')
+            if translated_text is not None:
+                translation_memory.store(item['text'], translated_text, source_language, target_language, model)
+                result = {'translated_text': translated_text, 'success': True, 'service': 'groq'}
+            else:
+                result = {'translated_text': None, 'success': False, 'error': error or 'Missing from LLM response'}
+            for index in item['indices']:
+                translations[index] = dict(result, translated_text=translated_text or texts[index])
+        
+        logger.info(
+            f"✅ GROQ batch: {len(texts)} texts, {len(items)} sent to the LLM in {llm_calls} calls"
+        )
+        return {
+            'translations': translations,
+            'source_language': source_language,
+            'target_language': target_language,
+            'success': all(translation['success'] for translation in translations),
+            'llm_calls': llm_calls,
+            'rate_limited': rate_limited
+        }
+    
+    def _batch_chunks(self, positions: List[int], items: List[Dict]) -> List[List[int]]:
+        """Split pending items into prompts of at most TRANSLATE_BATCH_MAX_CHARS"""
+        chunks, current, size = [], [], 0
+        for position in positions:
+            length = len(items[position]['text'])
+            if current and size + length > settings.TRANSLATE_BATCH_MAX_CHARS:
+                chunks.append(current)
+                current, size = [], 0
+            current.append(position)
+            size += length
+        if current:
+            chunks.append(current)
+        return chunks
+    
+    def _request_batch(self, items: List[Dict], source_language: str, target_language: str, model: str) -> Dict[int, str]:
+        """
+        One LLM call for a numbered list of items
+        
+        Returns:
+            Line number (1-based) -> translation for every item, or {} when
+            the response does not number exactly 1..len(items) once each
+        """
+        hints = list(dict.fromkeys(hint for item in items for hint in item['hints']))
+        numbered = '\n'.join(
+            f"[{number}] {LINE_BREAK_TAG.join(line.strip() for line in item['text'].strip().splitlines())}"
+            for number, item in enumerate(items, start=1)
+        )
+        prompt = f"""Translate each numbered line from {LANGUAGE_NAMES.get(source_language, 'English')} to {LANGUAGE_NAMES.get(target_language, 'Luganda')}.
+Return exactly {len(items)} lines in the same order, each starting with its number in square brackets, e.g. [1] translation.
+Translate every line on its own; do not merge, skip or add lines. Keep every {LINE_BREAK_TAG} tag. Return nothing else.
+
+{medical_glossary.hint_prompt(hints)}Lines:
+{numbered}"""
+
+        total_chars = sum(len(item['text']) for item in items)
+        response = self.client.chat.completions.create(
+            model=model,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=0.3,
+            max_tokens=min(settings.TRANSLATE_BATCH_MAX_TOKENS, 100 + 20 * len(items) + total_chars),
+        )
+        content = response.choices[0].message.content or ''
+        
+        matches = [(int(match.group(1)), match.group(2)) for match in BATCH_LINE_PATTERN.finditer(content)]
+        # Merged, skipped, repeated or extra lines shift translations onto the wrong items
+        if sorted(number for number, _ in matches) != list(range(1, len(items) + 1)):
+            logger.warning(f"GROQ batch response numbered {len(matches)} lines for {len(items)} items, discarded")
+            return {}
+        return {
+            number: LINE_BREAK_PATTERN.sub('\n', _strip_quotes(line)).strip()
+            for number, line in matches
+        }
+
+
+def is_rate_limit(error: Exception) -> bool:
+    """GROQ quota errors (HTTP 429)"""
+    return getattr(error, 'status_code', None) == 429 or 'rate limit' in str(error).lower()
+
+
+def _strip_quotes(text: str) -> str:
+    if len(text) >= 2 and text.startswith('"') and text.endswith('"'):
+        return text[1:-1]
+    return text
 
 
 # Singleton instance
@@ -0,0 +1,262 @@
+"""
+Live Intake - Transcription and symptom extraction while the VHT records
+The app uploads the recording as short segments during the intake. Each
+segment is transcribed on arrival, the keyword symptom pass is re-run over
+the transcript so far and guideline context is re-retrieved whenever the
+symptom set changes, so the final triage call starts as soon as recording stops.
+"""
+import logging
+from datetime import timedelta
+from typing import Dict, List, Optional
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Sum
+from django.utils import timezone
+from .asr_router import asr_router
+from .audio_processing import AudioConversionError
+from .audio_store import audio_store
+from .audio_validation import AudioValidationError, check_stream_properties, probe_audio
+from .models import CaseSubmission, LiveIntakeSegment, LiveIntakeSession
+from .rag_engine import rag_engine
+from .symptom_normalizer import symptom_normalizer
+from .transcription_cache import transcription_cache
+
+logger = logging.getLogger(__name__)
+
+
+class LiveIntakeError(Exception):
+    """Rejected segment or finish request (carries the HTTP status to return)"""
+
+    def __init__(self, message: str, status_code: int = 400, **extra):
+        super().__init__(message)
+        self.status_code = status_code
+        self.extra = extra
+
+
+def is_expired(session: LiveIntakeSession) -> bool:
+    return session.updated_at < timezone.now() - timedelta(hours=settings.LIVE_INTAKE_SESSION_TTL_HOURS)
+
+
+def _check_recording(session: LiveIntakeSession):
+    if session.status == LiveIntakeSession.Status.FINISHED:
+        raise LiveIntakeError(
+            'Intake already finished', 409,
+            submission_id=session.case_submission_id
+        )
+    if session.status == LiveIntakeSession.Status.EXPIRED or is_expired(session):
+        raise LiveIntakeError('Intake session expired, start a new one', 410)
+
+
+def _probe_segment(session: LiveIntakeSession, path: str) -> Dict:
+    """
+    Check a segment decodes and keeps the whole intake within the duration limit
+    (the last segment may be a fraction of a second, so there is no minimum duration)
+    """
+    try:
+        probe = probe_audio(path)
+    except AudioConversionError as e:
+        logger.warning(f"Segment probe skipped: {e}")
+        return {'duration': None}
+
+    duration = probe['duration']
+    check_stream_properties(probe['sample_rate'], duration, min_duration=0)
+    if duration is None:
+        return probe
+
+    if duration > settings.LIVE_INTAKE_SEGMENT_MAX_SECONDS:
+        raise AudioValidationError(
+            f'Segment too long ({duration:.0f}s, max {settings.LIVE_INTAKE_SEGMENT_MAX_SECONDS}s)', 413
+        )
+    recorded = session.segments.aggregate(total=Sum('duration'))['total'] or 0.0
+    if recorded + duration > settings.AUDIO_MAX_DURATION_SECONDS:
+        raise AudioValidationError(
+            f'Recording too long ({recorded + duration:.0f}s, max {settings.AUDIO_MAX_DURATION_SECONDS}s)', 413
+        )
+    return probe
+
+
+def add_segment(session: LiveIntakeSession, index: int, audio_file) -> LiveIntakeSegment:
+    """
+    Validate, transcribe and store one segment
+
+    Args:
+        session: Intake the segment belongs to
+        index: Position of the segment in the recording (0-based)
+        audio_file: Uploaded segment spooled to a temporary file
+
+    Returns:
+        The stored segment (the existing one if this index was already received)
+    """
+    _check_recording(session)
+
+    existing = session.segments.filter(index=index).first()
+    if existing:
+        return existing  # Retried upload
+
+    path = audio_file.temporary_file_path()
+    try:
+        probe = _probe_segment(session, path)
+    except AudioValidationError as e:
+        raise LiveIntakeError(str(e), e.status_code)
+
+    # Retried segments hit the cache; the router picks the fastest provider
+    result = transcription_cache.transcribe(
+        path,
+        session.language,
+        'chunk',
+        lambda pcm: asr_router.transcribe(path, session.language, pcm)
+    )
+
+    segment = LiveIntakeSegment(
+        session=session,
+        index=index,
+        duration=probe.get('duration'),
+        transcription='' if result.get('error') else result.get('transcription', ''),
+        confidence=0.0 if result.get('error') else result.get('confidence', 0.0),
+        provider=result.get('provider', ''),
+        error_message=result.get('error') or ''
+    )
+    blob = audio_store.store(path, audio_file.name)
+    audio_store.attach(segment, blob)
+
+    try:
+        with transaction.atomic():
+            segment.save()
+    except IntegrityError:
+        # A concurrent retry of the same segment was stored first
+        audio_store.discard(blob)
+        return session.segments.get(index=index)
+
+    logger.info(
+        f"Live intake {session.id}: segment {index} transcribed "
+        f"({len(segment.transcription)} chars, {segment.provider or 'no provider'})"
+    )
+    return segment
+
+
+def session_transcript(session: LiveIntakeSession) -> str:
+    """Transcript of the segments received so far, in recording order"""
+    texts = session.segments.order_by('index').values_list('transcription', flat=True)
+    return ' '.join(text.strip() for text in texts if text.strip())
+
+
+def refresh_analysis(session_id) -> LiveIntakeSession:
+    """
+    Re-run the keyword symptom pass over the transcript so far, and
+    re-retrieve guideline context if the normalized symptoms changed
+
+    The keyword pass is a few substring scans, so re-running it over the
+    whole transcript also catches phrases split across segment boundaries.
+    Retrieval runs outside the row lock; its result is dropped if a newer
+    segment changed the symptoms meanwhile (that request retrieves its own).
+    """
+    with transaction.atomic():
+        session = LiveIntakeSession.objects.select_for_update().select_related('patient').get(id=session_id)
+        transcript = session_transcript(session)
+        raw_symptoms = symptom_normalizer.extract_symptom_list(transcript, use_llm=False) if transcript else []
+        normalized = [s['standardized'] for s in symptom_normalizer.normalize(raw_symptoms)]
+
+        session.symptoms_raw = raw_symptoms
+        session.symptoms_normalized = normalized
+        session.save(update_fields=['symptoms_raw', 'symptoms_normalized', 'updated_at'])
+
+    if session.context_symptoms == normalized:
+        return session
+
+    patient = session.patient
+    context = rag_engine.retrieve_relevant_context(normalized, patient.age, patient.gender)
+
+    with transaction.atomic():
+        session = LiveIntakeSession.objects.select_for_update().select_related('patient').get(id=session_id)
+        if session.symptoms_normalized == normalized:
+            session.guideline_context = context
+            session.context_symptoms = normalized
+            session.save(update_fields=['guideline_context', 'context_symptoms', 'updated_at'])
+            logger.info(f"Live intake {session.id}: guideline context refreshed for {normalized}")
+    return session
+
+
+def claim_for_finish(session_id, user, segment_count: int = None) -> LiveIntakeSession:
+    """
+    Close the intake and create its CaseSubmission
+    Done in its own transaction so the row lock is not held during triage
+
+    Args:
+        segment_count: Number of segments the app recorded; finishing is
+            refused (409, with the missing indices) until all have arrived
+    """
+    with transaction.atomic():
+        session = LiveIntakeSession.objects.select_for_update().get(id=session_id)
+        _check_recording(session)
+
+        received = set(session.segments.values_list('index', flat=True))
+        if segment_count is not None:
+            missing = sorted(set(range(segment_count)) - received)
+            if missing:
+                raise LiveIntakeError(
+                    f'{len(missing)} segment(s) not received yet', 409,
+                    missing_segments=missing
+                )
+        if not received:
+            raise LiveIntakeError('No segments received', 400)
+
+        session.case_submission = CaseSubmission.objects.create(
+            patient=session.patient,
+            submitted_by=user,
+            language=session.language,
+            audio_duration=session.segments.aggregate(total=Sum('duration'))['total'],
+            status='PROCESSING'
+        )
+        session.status = LiveIntakeSession.Status.FINISHED
+        session.save(update_fields=['case_submission', 'status', 'updated_at'])
+    return session
+
+
+def transcription_result(session: LiveIntakeSession) -> Dict:
+    """
+    Stitch segment transcriptions into the result shape process_case expects
+    (confidence is weighted by segment duration)
+    """
+    segments: List[LiveIntakeSegment] = list(session.segments.order_by('index'))
+    transcript = session_transcript(session)
+
+    if not transcript:
+        errors = [s.error_message for s in segments if s.error_message]
+        return {
+            'success': False,
+            'error': errors[-1] if errors else 'No speech recognised in the recording',
+            'transcription': '',
+            'language_detected': session.language,
+            'confidence': 0.0,
+        }
+
+    weighted = [(s.confidence, s.duration or 1.0) for s in segments if s.transcription.strip()]
+    total = sum(weight for _, weight in weighted)
+    providers = sorted({s.provider for s in segments if s.provider})
+    return {
+        'success': True,
+        'transcription': transcript,
+        'language_detected': session.language,
+        'confidence': round(sum(c * w for c, w in weighted) / total, 3),
+        'provider': ','.join(providers),
+        'segments': len(segments),
+    }
+
+
+def symptom_analysis(session: LiveIntakeSession) -> Optional[Dict]:
+    """
+    Symptoms and guideline context for process_case, refreshed first if the
+    last segment's retrieval has not landed yet
+
+    Returns:
+        None if the keyword pass found nothing (process_case then runs the
+        full LLM extraction on the transcript)
+    """
+    if session.context_symptoms != session.symptoms_normalized:
+        session = refresh_analysis(session.id)
+    if not session.symptoms_raw:
+        return None
+    return {
+        'symptoms_raw': session.symptoms_raw,
+        'guideline_context': session.guideline_context,
+    }
@@ -0,0 +1,198 @@
+"""
+AI Engine Live Intake Views - Transcribe and analyse while the VHT records
+
+Flow:
+1. POST live-intake/                      -> intake_id
+2. POST live-intake/<id>/segments/        (each recorded segment, index 0, 1, ...)
+   -> transcript and symptoms so far
+3. GET  live-intake/<id>/                 -> current transcript and symptoms
+4. POST live-intake/<id>/finish/          -> CaseSubmission + AI analysis
+"""
+import logging
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes, parser_classes
+from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from .audio_validation import audio_upload_error, install_audio_upload_handlers
+from .live_intake import (
+    LiveIntakeError, add_segment, claim_for_finish, is_expired, refresh_analysis, session_transcript,
+    symptom_analysis, transcription_result
+)
+from .models import LiveIntakeSession
+from .audio_workers import audio_pool
+from .views import audio_busy_response, run_case_submission
+from patients.models import Patient
+
+logger = logging.getLogger(__name__)
+
+
+def _get_session(request, intake_id):
+    return LiveIntakeSession.objects.filter(id=intake_id, created_by=request.user).first()
+
+
+def _session_response(session: LiveIntakeSession) -> dict:
+    return {
+        'intake_id': str(session.id),
+        'status': session.status,
+        'segments_received': sorted(session.segments.values_list('index', flat=True)),
+        'transcription': session_transcript(session),
+        'symptoms': session.symptoms_normalized,
+        'guidelines_ready': session.context_symptoms == session.symptoms_normalized,
+        'expired': is_expired(session),
+        'submission_id': session.case_submission_id,
+    }
+
+
+def _error_response(error: LiveIntakeError) -> Response:
+    return Response({'error': str(error), **error.extra}, status=error.status_code)
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+@parser_classes([JSONParser, FormParser, MultiPartParser])
+def start_live_intake(request):
+    """
+    Start a live intake when the VHT presses record
+
+    Accepts:
+    - patient_id (required)
+    - language (optional, default 'en')
+    """
+    patient_id = request.data.get('patient_id')
+    language = request.data.get('language', 'en')
+    if not patient_id:
+        return Response(
+            {'error': 'patient_id is required'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if not isinstance(language, str) or not 0 < len(language) <= LiveIntakeSession._meta.get_field('language').max_length:
+        return Response({'error': f'Invalid language: {language}'}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        patient = Patient.objects.get(id=patient_id)
+    except Patient.DoesNotExist:
+        return Response(
+            {'error': f'Patient {patient_id} not found'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+
+    session = LiveIntakeSession.objects.create(
+        created_by=request.user,
+        patient=patient,
+        language=language
+    )
+    logger.info(f"Live intake {session.id} started for patient {patient.id}")
+
+    return Response(_session_response(session), status=status.HTTP_201_CREATED)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def live_intake_status(request, intake_id):
+    """Transcript and symptoms extracted so far"""
+    session = _get_session(request, intake_id)
+    if not session:
+        return Response({'error': 'Live intake not found'}, status=status.HTTP_404_NOT_FOUND)
+    return Response(_session_response(session))
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def upload_live_segment(request, intake_id):
+    """
+    Transcribe one recorded segment and update the symptom analysis
+
+    Accepts (multipart):
+    - audio_file (required, a self-contained recording of the segment)
+    - index (required, 0-based position of the segment)
+
+    Re-sending a segment index is safe (the stored result is returned).
+    """
+    session = _get_session(request, intake_id)
+    if not session:
+        return Response({'error': 'Live intake not found'}, status=status.HTTP_404_NOT_FOUND)
+
+    # Audio is checked while it streams in (before request.data is parsed)
+    install_audio_upload_handlers(request, min_duration=0)
+
+    audio_file = request.FILES.get('audio_file')
+    try:
+        index = int(request.data.get('index'))
+    except (TypeError, ValueError):
+        index = None
+
+    upload_error = audio_upload_error(request)
+    if upload_error:
+        return Response({'error': str(upload_error)}, status=upload_error.status_code)
+
+    if audio_file is None or index is None or index < 0:
+        return Response(
+            {'error': 'audio_file and index are required'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    if not audio_pool.has_capacity():
+        return audio_busy_response()
+
+    try:
+        segment = add_segment(session, index, audio_file)
+    except LiveIntakeError as e:
+        return _error_response(e)
+
+    session = refresh_analysis(session.id)
+    return Response({
+        'index': segment.index,
+        'segment_transcription': segment.transcription,
+        'segment_error': segment.error_message or None,
+        **_session_response(session),
+    })
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+@parser_classes([JSONParser, FormParser, MultiPartParser])
+def finish_live_intake(request, intake_id):
+    """
+    Close the intake and run triage on the symptoms and guidelines already
+    extracted during recording
+
+    Accepts:
+    - segment_count (recommended, segments recorded; 409 lists any missing)
+    - transcription (optional, used if no segment could be transcribed)
+    """
+    session = _get_session(request, intake_id)
+    if not session:
+        return Response({'error': 'Live intake not found'}, status=status.HTTP_404_NOT_FOUND)
+
+    segment_count = request.data.get('segment_count')
+    try:
+        segment_count = int(segment_count) if segment_count not in (None, '') else None
+    except (TypeError, ValueError):
+        return Response({'error': 'segment_count must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        session = claim_for_finish(session.id, request.user, segment_count)
+    except LiveIntakeError as e:
+        return _error_response(e)
+
+    try:
+        return run_case_submission(
+            session.case_submission,
+            transcription=request.data.get('transcription'),
+            user=request.user,
+            transcription_result=transcription_result(session),
+            symptom_analysis=symptom_analysis(session)
+        )
+
+    except Exception as e:
+        logger.error(f"Finishing live intake {session.id} failed: {e}", exc_info=True)
+        submission = session.case_submission
+        submission.status = 'FAILED'
+        submission.error_message = str(e)
+        submission.save(update_fields=['status', 'error_message'])
+        return Response(
+            {'error': str(e), 'submission_id': submission.id},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
@@ -0,0 +1,138 @@
+"""
+Local ASR Service - Offline CPU speech recognition (Vosk / Kaldi)
+The model is loaded once and stays resident in the worker process, so
+cases can be transcribed without any network round-trip
+
+Setup: pip install vosk, then unpack a model (e.g. vosk-model-small-en-us-0.15,
+~40 MB) and set VOSK_MODEL_PATH to its directory
+"""
+import json
+import logging
+import os
+import threading
+from typing import Dict
+from django.conf import settings
+from .audio_processing import SAMPLE_RATE, SAMPLE_WIDTH, pcm_duration
+from .audio_workers import audio_pool
+
+logger = logging.getLogger(__name__)
+
+# Bytes fed to the recognizer per call (0.25s of audio)
+FEED_BYTES = SAMPLE_RATE * SAMPLE_WIDTH // 4
+
+
+class LocalASRService:
+    """
+    Offline speech-to-text on CPU
+    - One shared Vosk model per process (recognizers are per request)
+    - Only used for languages the configured model covers (LOCAL_ASR_LANGUAGES)
+    """
+
+    def __init__(self):
+        self.model_path = settings.VOSK_MODEL_PATH
+        self.languages = settings.LOCAL_ASR_LANGUAGES
+        self._model = None
+        self._load_lock = threading.Lock()
+        self._load_error = None
+
+    def supports(self, language: str) -> bool:
+        return (language or 'en').split('-')[0] in self.languages
+
+    def is_available(self) -> bool:
+        """Model configured, present on disk and loadable"""
+        if not self.model_path or not os.path.isdir(self.model_path):
+            return False
+        return self._get_model() is not None
+
+    def _get_model(self):
+        """Load the model on first use and keep it resident"""
+        if self._model is not None or self._load_error is not None:
+            return self._model
+
+        with self._load_lock:
+            if self._model is None and self._load_error is None:
+                try:
+                    from vosk import Model, SetLogLevel
+                    SetLogLevel(-1)
+                    self._model = Model(self.model_path)
+                    logger.info(f"Local ASR model loaded from {self.model_path}")
+                except Exception as e:
+                    self._load_error = str(e)
+                    logger.warning(f"Local ASR unavailable: {e}")
+        return self._model
+
+    def transcribe_audio(
+        self,
+        audio_file_path: str,
+        language: str = 'en',
+        pcm: bytes = None
+    ) -> Dict:
+        """
+        Transcribe audio file on the local CPU
+
+        Args:
+            audio_file_path: Path to audio file (.wav, .mp3, .m4a)
+            language: Language code (must be covered by the model)
+            pcm: Already-decoded 16 kHz mono PCM (skips decoding the file)
+
+        Returns:
+            Dict with transcription, language_detected, confidence
+            (mean word confidence), duration_seconds, success / error
+        """
+        try:
+            model = self._get_model()
+            if model is None:
+                raise RuntimeError(f"Local ASR model not loaded: {self._load_error or 'VOSK_MODEL_PATH not set'}")
+
+            if pcm is None:
+                pcm = audio_pool.decode(audio_file_path)
+            duration = pcm_duration(pcm)
+            if settings.VAD_ENABLED:
+                pcm = audio_pool.preprocess(pcm)['pcm']
+
+            from vosk import KaldiRecognizer
+            recognizer = KaldiRecognizer(model, SAMPLE_RATE)
+            recognizer.SetWords(True)
+
+            words = []
+            for offset in range(0, len(pcm), FEED_BYTES):
+                if recognizer.AcceptWaveform(pcm[offset:offset + FEED_BYTES]):
+                    words.extend(json.loads(recognizer.Result()).get('result', []))
+            words.extend(json.loads(recognizer.FinalResult()).get('result', []))
+
+            text = ' '.join(word['word'] for word in words).strip()
+            if not text:
+                return {
+                    'success': False,
+                    'error': 'Speech not clear enough',
+                    'transcription': '',
+                    'language_detected': language,
+                    'confidence': 0.0,
+                    'duration_seconds': duration
+                }
+
+            confidence = sum(word.get('conf', 0.0) for word in words) / len(words)
+            logger.info(f"✓ Local transcription successful: {text[:50]}...")
+            return {
+                'success': True,
+                'transcription': text,
+                'original_transcription': text,
+                'language_detected': language,
+                'confidence': round(confidence, 3),
+                'duration_seconds': duration
+            }
+
+        except Exception as e:
+            logger.error(f"Local speech recognition error: {e}")
+            return {
+                'success': False,
+                'error': str(e),
+                'transcription': '',
+                'language_detected': language,
+                'confidence': 0.0,
+                'duration_seconds': 0
+            }
+
+
+# Singleton instance
+local_asr_service = LocalASRService()
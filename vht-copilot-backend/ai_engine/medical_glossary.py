@@ -0,0 +1,251 @@
+"""
+Medical Glossary - Local English / Luganda / Swahili term translation
+A bilingual phrase trie per language pair, compiled once from the symptom
+lexicon, the curated terms below and MEDICAL_GLOSSARY_PATH. Inputs made up
+only of glossary phrases (e.g. "fever, cough and vomiting") are translated
+locally; other inputs get the matched phrases as hints for the remote
+translator, so known terms come back consistently.
+"""
+import json
+import logging
+import re
+import threading
+from typing import Dict, List, Optional, Tuple
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+LANGUAGES = ('en', 'lg', 'sw')
+
+# Curated clinical terms (en, lg, sw); these override the lexicon seeds
+CURATED_TERMS = [
+    ('fever', 'omusujja', 'homa'),
+    ('malaria', "omusujja gw'ensiri", 'malaria'),
+    ('cough', 'okukolola', 'kikohozi'),
+    ('diarrhea', 'ekiddukano', 'kuhara'),
+    ('vomiting', 'okusesema', 'kutapika'),
+    ('headache', 'omutwe okulumwa', 'maumivu ya kichwa'),
+    ('abdominal pain', 'olubuto okulumwa', 'maumivu ya tumbo'),
+    ('convulsions', 'ensimbu', 'degedege'),
+    ('seizure', 'ensimbu', 'degedege'),
+    ('chills', 'okukankana', 'kutetemeka'),
+    ('difficulty breathing', 'okussa obubi', 'kupumua kwa shida'),
+    ('bleeding', 'okuvaamu omusaayi', 'kutokwa na damu'),
+    ('blood', 'omusaayi', 'damu'),
+    ('rash', 'obutulututtu', 'vipele'),
+    ('weakness', 'obunafu', 'udhaifu'),
+    ('child', 'omwana', 'mtoto'),
+    ('medicine', 'eddagala', 'dawa'),
+    ('hospital', 'eddwaliro', 'hospitali'),
+    ('health worker', 'omusawo', 'mhudumu wa afya'),
+]
+
+# List separators that may sit between glossary phrases in a fully covered input
+CONJUNCTIONS = {'en': 'and', 'lg': 'ne', 'sw': 'na'}
+LIST_PUNCTUATION = {',', ';', '.', '/'}
+
+TOKEN_PATTERN = re.compile(r"[\w']+|[^\w\s]", re.UNICODE)
+
+# Trie node key holding the target phrase of a complete source phrase
+# (None: never a token, unlike punctuation such as '$')
+_TERMINAL = None
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class MedicalGlossary:
+    """
+    Longest-match phrase lookup over compiled per-pair tries
+    Keeps per-process counters for the health endpoint
+    """
+
+    def __init__(self):
+        self._tries = None
+        self._lock = threading.Lock()
+        self.stats = {
+            'full': 0,
+            'partial': 0,
+            'miss': 0,
+        }
+
+    def translate(self, text: str, source_language: str, target_language: str) -> Dict:
+        """
+        Translate text made up of glossary phrases, or collect hints
+
+        Args:
+            text: Text to translate
+            source_language: en, lg or sw
+            target_language: en, lg or sw
+
+        Returns:
+            {
+                'covered': bool (translated_text is a complete local translation),
+                'translated_text': str or None,
+                'hints': [(source phrase, target phrase), ...],
+                'coverage': float (share of words inside glossary phrases)
+            }
+        """
+        result = {'covered': False, 'translated_text': None, 'hints': [], 'coverage': 0.0}
+        trie = self._get_tries().get((source_language, target_language))
+        if not settings.MEDICAL_GLOSSARY_ENABLED or trie is None or not text or not text.strip():
+            return result
+
+        segments = self._segment(tokenize(text), trie, source_language)
+        words = [segment for segment in segments if segment[0] in ('term', 'word')]
+        terms = [segment for segment in segments if segment[0] == 'term']
+        if not terms:
+            self._count('miss')
+            return result
+
+        covered_words = sum(len(source.split()) for _, source, _ in terms)
+        total_words = sum(len(source.split()) for _, source, _ in words)
+        result['coverage'] = round(covered_words / total_words, 3)
+        result['hints'] = list(dict.fromkeys((source, target) for _, source, target in terms))
+
+        if len(terms) == len(words):
+            result['covered'] = True
+            result['translated_text'] = self._join(segments, text, target_language)
+            self._count('full')
+        else:
+            self._count('partial')
+        return result
+
+    def hint_prompt(self, hints: List[Tuple[str, str]]) -> str:
+        """Prompt lines asking a translator to keep glossary terms"""
+        if not hints:
+            return ''
+        lines = '\n'.join(f'- "{source}" = "{target}"' for source, target in hints)
+        return f"Use these exact translations for medical terms:\n{lines}\n\n"
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self.stats)
+        lookups = stats['full'] + stats['partial'] + stats['miss']
+        stats['local_rate'] = round(stats['full'] / lookups, 3) if lookups else 0.0
+        stats['phrases'] = {
+            f'{source}-{target}': self._count_phrases(trie)
+            for (source, target), trie in self._get_tries().items()
+        }
+        return stats
+
+    def reload(self):
+        """Recompile the tries (after editing MEDICAL_GLOSSARY_PATH)"""
+        with self._lock:
+            self._tries = None
+        self._get_tries()
+
+    def _segment(self, tokens: List[str], trie: Dict, source_language: str) -> List[Tuple[str, str, Optional[str]]]:
+        """Split tokens into ('term', source, target), ('sep', token, None) and ('word', token, None)"""
+        segments = []
+        i = 0
+        while i < len(tokens):
+            node = trie
+            match = None
+            j = i
+            while j < len(tokens) and tokens[j] in node:
+                node = node[tokens[j]]
+                j += 1
+                if _TERMINAL in node:
+                    match = (j, node[_TERMINAL])
+
+            if match is not None:
+                end, target = match
+                segments.append(('term', ' '.join(tokens[i:end]), target))
+                i = end
+                continue
+
+            token = tokens[i]
+            if token in LIST_PUNCTUATION or token == CONJUNCTIONS.get(source_language):
+                segments.append(('sep', token, None))
+            else:
+                segments.append(('word', token, None))
+            i += 1
+        return segments
+
+    def _join(self, segments, original: str, target_language: str) -> str:
+        parts = []
+        for kind, source, target in segments:
+            if kind == 'term':
+                parts.append(target)
+            elif source in LIST_PUNCTUATION:
+                if parts:
+                    parts[-1] += source
+            else:
+                parts.append(CONJUNCTIONS[target_language])
+        translated = ' '.join(parts)
+        if original.strip()[:1].isupper():
+            translated = translated[:1].upper() + translated[1:]
+        return translated
+
+    def _get_tries(self) -> Dict:
+        with self._lock:
+            if self._tries is None:
+                self._tries = self._compile()
+            return self._tries
+
+    def _compile(self) -> Dict:
+        from .symptom_normalizer import SymptomNormalizer
+
+        tries = {
+            (source, target): {}
+            for source in LANGUAGES for target in LANGUAGES if source != target
+        }
+
+        # Seeds: Luganda words the symptom normalizer already understands
+        for keyword in SymptomNormalizer.LUGANDA_KEYWORDS:
+            english = SymptomNormalizer.SYMPTOM_MAP[keyword].replace('_', ' ')
+            self._add(tries, {'en': english, 'lg': keyword})
+
+        for entry in CURATED_TERMS:
+            self._add(tries, dict(zip(LANGUAGES, entry)))
+        for entry in self._load_extra():
+            self._add(tries, entry)
+
+        logger.info(
+            f"Medical glossary compiled: "
+            f"{sum(self._count_phrases(trie) for trie in tries.values())} phrases"
+        )
+        return tries
+
+    def _add(self, tries: Dict, entry: Dict[str, str]):
+        """Insert every direction of one multilingual entry"""
+        for source, source_phrase in entry.items():
+            for target, target_phrase in entry.items():
+                if source == target or (source, target) not in tries:
+                    continue
+                node = tries[(source, target)]
+                for token in tokenize(source_phrase):
+                    node = node.setdefault(token, {})
+                node[_TERMINAL] = target_phrase
+
+    def _load_extra(self) -> List[Dict[str, str]]:
+        """Extra entries from MEDICAL_GLOSSARY_PATH: [{"en": ..., "lg": ..., "sw": ...}, ...]"""
+        path = settings.MEDICAL_GLOSSARY_PATH
+        if not path:
+            return []
+        try:
+            with open(path, encoding='utf-8') as glossary_file:
+                entries = json.load(glossary_file)
+        except (OSError, ValueError) as e:
+            logger.error(f"Could not load medical glossary {path}: {e}")
+            return []
+        return [
+            {language: phrase for language, phrase in entry.items() if language in LANGUAGES and phrase}
+            for entry in entries
+        ]
+
+    def _count_phrases(self, node: Dict) -> int:
+        return sum(
+            1 if key is _TERMINAL else self._count_phrases(child)
+            for key, child in node.items()
+        )
+
+    def _count(self, key: str):
+        with self._lock:
+            self.stats[key] += 1
+
+
+# Singleton instance
+medical_glossary = MedicalGlossary()
@@ -0,0 +1,39 @@
+# Generated by Django 6.0.2 on 2026-10-19 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_engine', '0003_aidecisionoverride'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='casesubmission',
+            name='audio_fingerprint',
+            field=models.CharField(blank=True, db_index=True, help_text='SHA-256 of the decoded PCM (identifies re-submitted recordings)', max_length=64),
+        ),
+        migrations.CreateModel(
+            name='TranscriptionCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fingerprint', models.CharField(help_text='SHA-256 of the decoded 16 kHz mono PCM', max_length=64)),
+                ('language', models.CharField(max_length=5)),
+                ('variant', models.CharField(help_text='Which pipeline produced the result (e.g. case, whisper, whisper+original)', max_length=30)),
+                ('result', models.JSONField(default=dict)),
+                ('audio_duration', models.FloatField(default=0.0, help_text='Seconds')),
+                ('transcription_seconds', models.FloatField(default=0.0, help_text='Time the original transcription took')),
+                ('hit_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_hit_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'db_table': 'transcription_cache',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['created_at'], name='transcripti_created_80ac2f_idx')],
+                'constraints': [models.UniqueConstraint(fields=('fingerprint', 'language', 'variant'), name='unique_transcription_per_audio')],
+            },
+        ),
+    ]
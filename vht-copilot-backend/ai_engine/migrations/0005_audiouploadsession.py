@@ -0,0 +1,40 @@
+# Generated by Django 6.0.2 on 2026-10-19 10:24
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_engine', '0004_transcription_cache'),
+        ('patients', '0002_patient_district'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AudioUploadSession',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('language', models.CharField(default='en', max_length=5)),
+                ('filename', models.CharField(max_length=255)),
+                ('total_size', models.PositiveBigIntegerField(help_text='Bytes announced by the client')),
+                ('received_bytes', models.PositiveBigIntegerField(default=0)),
+                ('checksum', models.CharField(blank=True, help_text='Optional SHA-256 of the whole file', max_length=64)),
+                ('status', models.CharField(choices=[('OPEN', 'Receiving Chunks'), ('COMPLETE', 'All Bytes Received'), ('FINALIZED', 'Finalized'), ('EXPIRED', 'Expired')], default='OPEN', max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('case_submission', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='upload_session', to='ai_engine.casesubmission')),
+                ('created_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='audio_uploads', to=settings.AUTH_USER_MODEL)),
+                ('patient', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='audio_uploads', to='patients.patient')),
+            ],
+            options={
+                'db_table': 'audio_upload_sessions',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'updated_at'], name='audio_uploa_status_c11d9b_idx')],
+            },
+        ),
+    ]
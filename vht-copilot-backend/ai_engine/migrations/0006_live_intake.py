@@ -0,0 +1,66 @@
+# Generated by Django 6.0.2 on 2026-10-19 03:20
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_engine', '0005_audiouploadsession'),
+        ('patients', '0002_patient_district'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LiveIntakeSession',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('language', models.CharField(default='en', max_length=5)),
+                ('status', models.CharField(choices=[('RECORDING', 'Recording'), ('FINISHED', 'Finished'), ('EXPIRED', 'Expired')], default='RECORDING', max_length=20)),
+                ('symptoms_raw', models.JSONField(default=list)),
+                ('symptoms_normalized', models.JSONField(default=list)),
+                ('guideline_context', models.JSONField(default=list)),
+                ('context_symptoms', models.JSONField(blank=True, help_text='Normalized symptoms guideline_context was retrieved for (null until first retrieval)', null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('case_submission', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='live_intake', to='ai_engine.casesubmission')),
+                ('created_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='live_intakes', to=settings.AUTH_USER_MODEL)),
+                ('patient', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='live_intakes', to='patients.patient')),
+            ],
+            options={
+                'db_table': 'live_intake_sessions',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='LiveIntakeSegment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('index', models.PositiveIntegerField(help_text='Position of the segment in the recording')),
+                ('audio_file', models.FileField(blank=True, null=True, upload_to='case_audio/live/')),
+                ('duration', models.FloatField(blank=True, help_text='Seconds', null=True)),
+                ('transcription', models.TextField(blank=True)),
+                ('confidence', models.FloatField(default=0.0)),
+                ('provider', models.CharField(blank=True, max_length=20)),
+                ('error_message', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('session', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='segments', to='ai_engine.liveintakesession')),
+            ],
+            options={
+                'db_table': 'live_intake_segments',
+                'ordering': ['session', 'index'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='liveintakesession',
+            index=models.Index(fields=['status', 'updated_at'], name='live_intake_status_1db4f2_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='liveintakesegment',
+            constraint=models.UniqueConstraint(fields=('session', 'index'), name='unique_live_intake_segment'),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 6.0.2 on 2026-10-19 04:05
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_engine', '0006_live_intake'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AudioBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sha256', models.CharField(help_text='SHA-256 of the uploaded bytes', max_length=64, unique=True)),
+                ('storage_name', models.CharField(help_text='Current path in media storage', max_length=255)),
+                ('original_name', models.CharField(blank=True, max_length=255)),
+                ('original_size', models.PositiveBigIntegerField(help_text='Bytes as uploaded')),
+                ('size', models.PositiveBigIntegerField(help_text='Bytes as currently stored')),
+                ('codec', models.CharField(default='original', max_length=20)),
+                ('tier', models.CharField(choices=[('HOT', 'Hot (original upload)'), ('COLD', 'Cold (archived)')], default='HOT', max_length=10)),
+                ('duration', models.FloatField(blank=True, help_text='Seconds (known once archived)', null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_used_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('archived_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'db_table': 'audio_blobs',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['tier', 'last_used_at'], name='audio_blobs_tier_8e6962_idx')],
+            },
+        ),
+        migrations.AddField(
+            model_name='casesubmission',
+            name='audio_blob',
+            field=models.ForeignKey(blank=True, help_text='Stored recording (audio_file points at its current location)', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='case_submissions', to='ai_engine.audioblob'),
+        ),
+        migrations.AddField(
+            model_name='liveintakesegment',
+            name='audio_blob',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='live_segments', to='ai_engine.audioblob'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 6.0.2 on 2026-10-19 03:25
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_engine', '0007_audio_blobs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TTSCacheEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(help_text='SHA-256 of language, voice and normalized text', max_length=64, unique=True)),
+                ('text', models.TextField()),
+                ('language', models.CharField(max_length=5)),
+                ('voice', models.CharField(max_length=10)),
+                ('instruction', models.CharField(blank=True, help_text='First-aid library instruction id (blank for ad-hoc text)', max_length=50)),
+                ('storage_name', models.CharField(help_text='Path in media storage', max_length=255)),
+                ('size', models.PositiveIntegerField(help_text='Bytes')),
+                ('pinned', models.BooleanField(default=False)),
+                ('hit_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_used_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'db_table': 'tts_cache',
+                'ordering': ['-last_used_at'],
+                'indexes': [models.Index(fields=['pinned', 'last_used_at'], name='tts_cache_pinned_36dfcb_idx'), models.Index(fields=['instruction', 'language', 'voice'], name='tts_cache_instruc_42ae9a_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 6.0.2 on 2026-10-19 03:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_engine', '0008_tts_cache'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TranslationMemory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(help_text='SHA-256 of normalized text, languages and model', max_length=64, unique=True)),
+                ('source_text', models.TextField(help_text='Normalized (whitespace collapsed, lower-cased)')),
+                ('translated_text', models.TextField()),
+                ('source_language', models.CharField(max_length=5)),
+                ('target_language', models.CharField(max_length=5)),
+                ('model', models.CharField(help_text='Model (and TRANSLATION_MEMORY_VERSION) that produced it', max_length=100)),
+                ('hit_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_hit_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'db_table': 'translation_memory',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['created_at'], name='translation_created_64fb4e_idx')],
+            },
+        ),
+    ]
@@ -1,7 +1,9 @@
 """
 AI Engine Models - For tracking AI decisions and case submissions
 """
+import uuid
 from django.db import models
+from django.utils import timezone
 from patients.models import Patient
 from core.models import User
 
@@ -21,7 +23,21 @@ class CaseSubmission(models.Model):
     
     # Audio Input
     audio_file = models.FileField(upload_to='case_audio/', null=True, blank=True)
+    audio_blob = models.ForeignKey(
+        'AudioBlob',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='case_submissions',
+        help_text="Stored recording (audio_file points at its current location)"
+    )
     audio_duration = models.FloatField(null=True, blank=True, help_text="Seconds")
+    audio_fingerprint = models.CharField(
+        max_length=64,
+        blank=True,
+        db_index=True,
+        help_text="SHA-256 of the decoded PCM (identifies re-submitted recordings)"
+    )
     language = models.CharField(max_length=5, default='en')
     
     # Processing Status
@@ -113,3 +129,263 @@ class AIDecisionOverride(models.Model):
     
     def __str__(self):
         return f"{self.get_override_type_display()} by {self.overridden_by} - {self.created_at.strftime('%Y-%m-%d')}"
+
+
+class TranscriptionCache(models.Model):
+    """
+    Transcription results keyed by a hash of the decoded audio, so retried
+    uploads of the same recording are not transcribed (and paid for) twice
+    """
+    fingerprint = models.CharField(max_length=64, help_text="SHA-256 of the decoded 16 kHz mono PCM")
+    language = models.CharField(max_length=5)
+    variant = models.CharField(
+        max_length=30,
+        help_text="Which pipeline produced the result (e.g. case, whisper, whisper+original)"
+    )
+    result = models.JSONField(default=dict)
+    audio_duration = models.FloatField(default=0.0, help_text="Seconds")
+    transcription_seconds = models.FloatField(default=0.0, help_text="Time the original transcription took")
+    
+    hit_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_hit_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        db_table = 'transcription_cache'
+        ordering = ['-created_at']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['fingerprint', 'language', 'variant'],
+                name='unique_transcription_per_audio'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['created_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.fingerprint[:12]} ({self.language}, {self.variant}) - {self.hit_count} hits"
+
+
+class AudioUploadSession(models.Model):
+    """
+    Resumable chunked audio upload for slow / unreliable connections
+    Chunks are appended at their offset to a part file on disk; the
+    finished recording is finalized into a CaseSubmission
+    """
+    class Status(models.TextChoices):
+        OPEN = 'OPEN', 'Receiving Chunks'
+        COMPLETE = 'COMPLETE', 'All Bytes Received'
+        FINALIZED = 'FINALIZED', 'Finalized'
+        EXPIRED = 'EXPIRED', 'Expired'
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    created_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='audio_uploads')
+    patient = models.ForeignKey(Patient, on_delete=models.CASCADE, related_name='audio_uploads')
+    language = models.CharField(max_length=5, default='en')
+    
+    # Upload progress
+    filename = models.CharField(max_length=255)
+    total_size = models.PositiveBigIntegerField(help_text="Bytes announced by the client")
+    received_bytes = models.PositiveBigIntegerField(default=0)
+    checksum = models.CharField(max_length=64, blank=True, help_text="Optional SHA-256 of the whole file")
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.OPEN)
+    
+    case_submission = models.OneToOneField(
+        CaseSubmission,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='upload_session'
+    )
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'audio_upload_sessions'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'updated_at']),
+        ]
+    
+    def __str__(self):
+        return f"Upload {self.id} - {self.received_bytes}/{self.total_size} bytes - {self.status}"
+
+
+class LiveIntakeSession(models.Model):
+    """
+    Voice intake streamed as segments while the VHT is still recording
+    Each segment is transcribed on arrival and the symptom / guideline
+    analysis is refreshed, so triage can start as soon as recording stops
+    """
+    class Status(models.TextChoices):
+        RECORDING = 'RECORDING', 'Recording'
+        FINISHED = 'FINISHED', 'Finished'
+        EXPIRED = 'EXPIRED', 'Expired'
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    created_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='live_intakes')
+    patient = models.ForeignKey(Patient, on_delete=models.CASCADE, related_name='live_intakes')
+    language = models.CharField(max_length=5, default='en')
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.RECORDING)
+    
+    # Running analysis of the transcript received so far
+    symptoms_raw = models.JSONField(default=list)
+    symptoms_normalized = models.JSONField(default=list)
+    guideline_context = models.JSONField(default=list)
+    context_symptoms = models.JSONField(
+        null=True,
+        blank=True,
+        help_text="Normalized symptoms guideline_context was retrieved for (null until first retrieval)"
+    )
+    
+    case_submission = models.OneToOneField(
+        CaseSubmission,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='live_intake'
+    )
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'live_intake_sessions'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'updated_at']),
+        ]
+    
+    def __str__(self):
+        return f"Live intake {self.id} - {self.patient.full_name} - {self.status}"
+
+
+class LiveIntakeSegment(models.Model):
+    """
+    One recorded segment of a live intake and its transcription
+    """
+    session = models.ForeignKey(LiveIntakeSession, on_delete=models.CASCADE, related_name='segments')
+    index = models.PositiveIntegerField(help_text="Position of the segment in the recording")
+    audio_file = models.FileField(upload_to='case_audio/live/', null=True, blank=True)
+    audio_blob = models.ForeignKey(
+        'AudioBlob',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='live_segments'
+    )
+    duration = models.FloatField(null=True, blank=True, help_text="Seconds")
+    
+    transcription = models.TextField(blank=True)
+    confidence = models.FloatField(default=0.0)
+    provider = models.CharField(max_length=20, blank=True)
+    error_message = models.TextField(blank=True)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'live_intake_segments'
+        ordering = ['session', 'index']
+        constraints = [
+            models.UniqueConstraint(fields=['session', 'index'], name='unique_live_intake_segment'),
+        ]
+    
+    def __str__(self):
+        return f"Segment {self.index} of {self.session_id}"
+
+
+class AudioBlob(models.Model):
+    """
+    One stored recording, addressed by the SHA-256 of its bytes
+    Identical uploads share a blob; after AUDIO_ARCHIVE_AFTER_DAYS without
+    use it is transcoded to Opus and moved to the cold tier
+    """
+    class Tier(models.TextChoices):
+        HOT = 'HOT', 'Hot (original upload)'
+        COLD = 'COLD', 'Cold (archived)'
+    
+    sha256 = models.CharField(max_length=64, unique=True, help_text="SHA-256 of the uploaded bytes")
+    storage_name = models.CharField(max_length=255, help_text="Current path in media storage")
+    original_name = models.CharField(max_length=255, blank=True)
+    original_size = models.PositiveBigIntegerField(help_text="Bytes as uploaded")
+    size = models.PositiveBigIntegerField(help_text="Bytes as currently stored")
+    codec = models.CharField(max_length=20, default='original')
+    tier = models.CharField(max_length=10, choices=Tier.choices, default=Tier.HOT)
+    duration = models.FloatField(null=True, blank=True, help_text="Seconds (known once archived)")
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(default=timezone.now)
+    archived_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        db_table = 'audio_blobs'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['tier', 'last_used_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.sha256[:12]} - {self.tier} - {self.size} bytes"
+
+
+class TTSCacheEntry(models.Model):
+    """
+    Synthesized speech for one (text, language, voice), stored once on disk
+    Pinned entries (the pre-rendered first-aid library) are never evicted;
+    the rest are evicted least-recently-used beyond TTS_CACHE_MAX_BYTES
+    """
+    key = models.CharField(max_length=64, unique=True, help_text="SHA-256 of language, voice and normalized text")
+    text = models.TextField()
+    language = models.CharField(max_length=5)
+    voice = models.CharField(max_length=10)
+    instruction = models.CharField(
+        max_length=50, blank=True,
+        help_text="First-aid library instruction id (blank for ad-hoc text)"
+    )
+    storage_name = models.CharField(max_length=255, help_text="Path in media storage")
+    size = models.PositiveIntegerField(help_text="Bytes")
+    pinned = models.BooleanField(default=False)
+    
+    hit_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        db_table = 'tts_cache'
+        ordering = ['-last_used_at']
+        indexes = [
+            models.Index(fields=['pinned', 'last_used_at']),
+            models.Index(fields=['instruction', 'language', 'voice']),
+        ]
+    
+    def __str__(self):
+        return f"{self.key[:12]} ({self.language}, {self.voice}) - {self.hit_count} hits"
+
+
+class TranslationMemory(models.Model):
+    """
+    Remote (GROQ) translations keyed by the normalized source text, so
+    repeated UI phrases and sentences are not sent to the LLM again
+    """
+    key = models.CharField(max_length=64, unique=True, help_text="SHA-256 of normalized text, languages and model")
+    source_text = models.TextField(help_text="Normalized (whitespace collapsed, lower-cased)")
+    translated_text = models.TextField()
+    source_language = models.CharField(max_length=5)
+    target_language = models.CharField(max_length=5)
+    model = models.CharField(max_length=100, help_text="Model (and TRANSLATION_MEMORY_VERSION) that produced it")
+    
+    hit_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_hit_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        db_table = 'translation_memory'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.source_language}->{self.target_language}: {self.source_text[:40]} - {self.hit_count} hits"
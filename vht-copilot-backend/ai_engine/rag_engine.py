@@ -19,9 +19,17 @@ class RAGEngine:
     Grounds AI responses in Uganda Ministry of Health Clinical Guidelines
     """
     
-    def __init__(self):
-        self.collection_name = settings.CHROMA_COLLECTION_NAME
-        self.persist_directory = settings.CHROMA_PERSIST_DIRECTORY
+    def __init__(
+        self,
+        collection_name: str = None,
+        persist_directory: str = None,
+        embeddings=None,
+        top_k: int = 3
+    ):
+        self.collection_name = collection_name or settings.CHROMA_COLLECTION_NAME
+        self.persist_directory = persist_directory or settings.CHROMA_PERSIST_DIRECTORY
+        self.embeddings = embeddings  # None = choose from settings on initialize()
+        self.top_k = top_k
         self.vectorstore = None
         self.retriever = None
         self.is_initialized = False
@@ -38,23 +46,7 @@ class RAGEngine:
             
             from langchain_chroma import Chroma
             
-            # Choose embedding model based on settings
-            if settings.USE_LOCAL_EMBEDDINGS:
-                from langchain_huggingface import HuggingFaceEmbeddings
-                logger.info("RAG Engine initialization with LOCAL embeddings (FREE)...")
-                embeddings = HuggingFaceEmbeddings(
-                    model_name="sentence-transformers/all-MiniLM-L6-v2",
-                    model_kwargs={'device': 'cpu'},
-                    encode_kwargs={'normalize_embeddings': True}
-                )
-                logger.info("Using HuggingFace sentence-transformers (free, offline)")
-            else:
-                from langchain_openai import OpenAIEmbeddings
-                logger.info("RAG Engine initialization with OpenAI embeddings...")
-                embeddings = OpenAIEmbeddings(
-                    openai_api_key=settings.OPENAI_API_KEY
-                )
-                logger.info("Using OpenAI embeddings (requires API credits)")
+            embeddings = self.embeddings or self._build_embeddings()
             
             # Load existing ChromaDB or create new one
             self.vectorstore = Chroma(
@@ -64,7 +56,7 @@ class RAGEngine:
             )
             
             self.retriever = self.vectorstore.as_retriever(
-                search_kwargs={"k": 3}  # Top 3 most relevant chunks
+                search_kwargs={"k": self.top_k}  # Top 3 most relevant chunks by default
             )
             
             self.is_initialized = True
@@ -74,6 +66,35 @@ class RAGEngine:
             logger.error(f"Failed to initialize RAG Engine: {e}")
             self.is_initialized = False
     
+    def _build_embeddings(self):
+        """
+        Choose embedding model based on settings
+        Local embeddings come from the shared embedding service when it is
+        running, otherwise the model is loaded inside this worker
+        """
+        if settings.USE_LOCAL_EMBEDDINGS:
+            from .embedding_service import EmbeddingServiceClient, build_local_embeddings
+            
+            if settings.EMBEDDING_SERVICE_SOCKET:
+                client = EmbeddingServiceClient()
+                if client.is_available():
+                    logger.info(f"Using shared embedding service at {client.socket_path}")
+                    return client
+                logger.warning("Shared embedding service unavailable, loading model in this worker")
+            
+            logger.info("RAG Engine initialization with LOCAL embeddings (FREE)...")
+            embeddings = build_local_embeddings()
+            logger.info("Using HuggingFace sentence-transformers (free, offline)")
+            return embeddings
+        
+        from langchain_openai import OpenAIEmbeddings
+        logger.info("RAG Engine initialization with OpenAI embeddings...")
+        embeddings = OpenAIEmbeddings(
+            openai_api_key=settings.OPENAI_API_KEY
+        )
+        logger.info("Using OpenAI embeddings (requires API credits)")
+        return embeddings
+    
     def ingest_guidelines(self, pdf_path: str):
         """
         Ingest Uganda MoH Clinical Guidelines PDF
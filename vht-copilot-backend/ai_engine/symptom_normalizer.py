@@ -74,7 +74,13 @@ class SymptomNormalizer:
         'convulsions', 'respiratory_distress', 'chest_pain', 'hemorrhage',
         'ensimbu', 'okukankana'
     ]
-    
+
+    # Luganda entries of SYMPTOM_MAP (seed the translation glossary)
+    LUGANDA_KEYWORDS = [
+        'omusujja', 'ensimbu', 'eddagala', 'okukohola', 'omutwe guguma',
+        'okukankana', 'okusesema'
+    ]
+
     def __init__(self):
         pass
     
@@ -120,15 +126,23 @@ class SymptomNormalizer:
         logger.info(f"Normalized {len(raw_symptoms)} symptoms")
         return normalized
     
-    def extract_symptom_list(self, text: str) -> List[str]:
+    def extract_symptom_list(self, text: str, use_llm: bool = True) -> List[str]:
         """
         Extract symptom mentions from free-form text using GROQ AI
         This replaces keyword matching with intelligent AI extraction
+        
+        Args:
+            text: Free-form symptom description
+            use_llm: False for the keyword pass only (no network round-trip,
+                used to re-analyse live intake transcripts on every segment)
         """
         if not text or not text.strip():
             logger.warning("No text provided for symptom extraction")
             return []
         
+        if not use_llm:
+            return self._fallback_keyword_extraction(text)
+        
         try:
             from groq import Groq
             from django.conf import settings
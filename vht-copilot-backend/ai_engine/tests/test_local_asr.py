@@ -0,0 +1,119 @@
+"""
+Local ASR tests - offline Vosk transcription and the router fallback
+The transcription tests need vosk and a model at VOSK_MODEL_PATH (the small
+English model is enough) and are skipped otherwise:
+
+    VOSK_MODEL_PATH=/opt/models/vosk-model-small-en-us-0.15 python manage.py test ai_engine
+
+fixtures/fever_en.wav is 16 kHz mono speech (espeak-ng, en-us):
+"the child has a high fever and is vomiting"
+"""
+import importlib.util
+import os
+from unittest import mock, skipUnless
+from django.conf import settings
+from django.test import SimpleTestCase, override_settings
+from ai_engine.asr_router import ASRRouter
+from ai_engine.audio_processing import SAMPLE_RATE, SAMPLE_WIDTH, decode_to_pcm, pcm_duration
+from ai_engine.local_asr_service import LocalASRService
+
+FIXTURE_CLIP = os.path.join(os.path.dirname(__file__), 'fixtures', 'fever_en.wav')
+
+MODEL_AVAILABLE = (
+    importlib.util.find_spec('vosk') is not None
+    and bool(settings.VOSK_MODEL_PATH) and os.path.isdir(settings.VOSK_MODEL_PATH)
+)
+
+
+class NextProvider:
+    """Stands in for the network provider after local in the routing order"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def transcribe_audio(self, audio_file_path, language='en', pcm=None):
+        self.calls += 1
+        return {
+            'success': True,
+            'transcription': 'child has fever',
+            'language_detected': language,
+            'confidence': 0.9,
+            'duration_seconds': pcm_duration(pcm) if pcm else 0
+        }
+
+
+def route(local, language='en', pcm=None):
+    """Transcribe through a fresh router with local first and NextProvider behind it"""
+    router = ASRRouter()
+    following = NextProvider()
+    with mock.patch.object(router, '_providers', return_value={'local': local, 'google': following}):
+        result = router.transcribe(FIXTURE_CLIP, language=language, pcm=pcm)
+    return result, following
+
+
+@override_settings(ASR_PROVIDERS=['local', 'google'], ASR_ROUTING='fixed')
+class LocalASRFallbackTests(SimpleTestCase):
+    """Without a model the local provider stays out of the way"""
+
+    def setUp(self):
+        self.pcm = decode_to_pcm(FIXTURE_CLIP)
+
+    @override_settings(VOSK_MODEL_PATH='/nonexistent/vosk-model')
+    def test_missing_model_is_unavailable(self):
+        service = LocalASRService()
+        self.assertFalse(service.is_available())
+
+        result = service.transcribe_audio(FIXTURE_CLIP, language='en', pcm=self.pcm)
+        self.assertFalse(result['success'])
+        self.assertTrue(result['error'])
+        self.assertEqual(result['transcription'], '')
+
+    @override_settings(VOSK_MODEL_PATH='/nonexistent/vosk-model')
+    def test_missing_model_routes_to_next_provider(self):
+        result, following = route(LocalASRService(), pcm=self.pcm)
+        self.assertEqual(result['provider'], 'google')
+        self.assertEqual([attempt['provider'] for attempt in result['provider_attempts']], ['google'])
+        self.assertEqual(following.calls, 1)
+
+    def test_unsupported_language_routes_to_next_provider(self):
+        result, following = route(LocalASRService(), language='lg', pcm=self.pcm)
+        self.assertEqual(result['provider'], 'google')
+        self.assertEqual(following.calls, 1)
+
+
+@skipUnless(MODEL_AVAILABLE, 'vosk and a model at VOSK_MODEL_PATH are required')
+@override_settings(ASR_PROVIDERS=['local', 'google'], ASR_ROUTING='fixed', ASR_MIN_CONFIDENCE=0.0)
+class LocalASRTranscriptionTests(SimpleTestCase):
+    """Transcribes the fixture clip with the configured model"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.service = LocalASRService()
+        cls.pcm = decode_to_pcm(FIXTURE_CLIP)
+
+    def test_transcribes_fixture_clip(self):
+        result = self.service.transcribe_audio(FIXTURE_CLIP, language='en')
+        self.assertTrue(result['success'], result.get('error'))
+        self.assertIn('fever', result['transcription'].lower().split())
+        self.assertGreater(result['confidence'], 0.0)
+        self.assertAlmostEqual(result['duration_seconds'], pcm_duration(self.pcm), places=1)
+
+    def test_router_keeps_local_result(self):
+        result, following = route(self.service, pcm=self.pcm)
+        self.assertEqual(result['provider'], 'local')
+        self.assertIn('fever', result['transcription'].lower().split())
+        self.assertEqual(following.calls, 0)
+
+    def test_silence_falls_through_to_next_provider(self):
+        silence = b'\x00' * (SAMPLE_RATE * SAMPLE_WIDTH)
+        local = self.service.transcribe_audio(FIXTURE_CLIP, language='en', pcm=silence)
+        self.assertFalse(local['success'])
+
+        result, following = route(self.service, pcm=silence)
+        self.assertEqual(result['provider'], 'google')
+        self.assertEqual(
+            [(attempt['provider'], attempt['success']) for attempt in result['provider_attempts']],
+            [('local', False), ('google', True)]
+        )
+        self.assertEqual(following.calls, 1)
@@ -0,0 +1,34 @@
+"""
+Medical glossary tests - phrase lookup over the compiled tries
+"""
+from django.test import SimpleTestCase, override_settings
+from ai_engine.medical_glossary import MedicalGlossary
+
+
+@override_settings(MEDICAL_GLOSSARY_ENABLED=True, MEDICAL_GLOSSARY_PATH='')
+class MedicalGlossaryTests(SimpleTestCase):
+
+    def setUp(self):
+        self.glossary = MedicalGlossary()
+
+    def test_fully_covered_list(self):
+        result = self.glossary.translate('Child, blood and rash', 'en', 'lg')
+        self.assertTrue(result['covered'])
+        self.assertEqual(result['translated_text'], 'Omwana, omusaayi ne obutulututtu')
+
+    def test_partial_input_gives_hints(self):
+        result = self.glossary.translate('the child needs medicine today', 'en', 'sw')
+        self.assertFalse(result['covered'])
+        self.assertIn(('child', 'mtoto'), result['hints'])
+        self.assertIn(('medicine', 'dawa'), result['hints'])
+
+    def test_punctuation_heavy_input(self):
+        for text in ('fever $ m', '$ $ $', 'blood $', '$blood$', '!!! ?? rash ... $$ % & * ( ) [ ] { }'):
+            with self.subTest(text=text):
+                result = self.glossary.translate(text, 'en', 'lg')
+                self.assertIsInstance(result['coverage'], float)
+                self.assertFalse(result['covered'])
+
+    def test_phrase_count_ignores_punctuation_keys(self):
+        phrases = self.glossary.get_stats()['phrases']
+        self.assertGreater(phrases['en-lg'], 0)
@@ -3,11 +3,11 @@ AI Tools - Autonomous actions (referral, alert, logging)
 """
 import logging
 from typing import Dict
+from django.conf import settings
 from django.utils import timezone
 from core.models import Hospital, AuditLog
 from referrals.models import Referral, EmergencyAlert
 from patients.models import Patient, PatientHistory
-from geopy.distance import geodesic
 
 logger = logging.getLogger(__name__)
 
@@ -128,18 +128,44 @@ Prepare for arrival.
         Returns:
             Referral details
         """
+        # Surge mode: urgent referrals are gathered and assigned together (referrals/surge.py)
+        from referrals.surge import surge_assigner
+        if surge_assigner.applies_to(urgency_level):
+            return surge_assigner.submit(
+                patient=patient,
+                condition=condition,
+                specialty=specialty,
+                urgency_level=urgency_level,
+                triage_score=triage_score,
+                confidence_score=confidence_score,
+                symptoms_summary=symptoms_summary,
+                first_aid_instructions=first_aid_instructions,
+                ai_reasoning=ai_reasoning,
+                guideline_citation=guideline_citation,
+                user=user
+            )
+        
         try:
             # Get patient's district (from patient record or VHT user)
             patient_district = patient.district or (user.district if hasattr(user, 'district') else None)
             
             logger.info(f"Patient: {patient.full_name}, Village: {patient.village}, District: {patient_district}")
             
+            # Patients registered at a village carry its GPS: start from its precomputed candidates
+            from core.village_candidates import village_candidates
+            village = village_candidates.resolve_village(patient.village, patient_district)
+            at_village = village and (
+                not patient.latitude or
+                (abs(patient.latitude - village[1]) < 1e-6 and abs(patient.longitude - village[2]) < 1e-6)
+            )
+            
             # Find best hospital (prioritizes district-based matching)
             hospital = AITools._find_best_hospital(
                 patient_location=(patient.latitude, patient.longitude) if patient.latitude else None,
                 specialty=specialty,
                 urgency_level=urgency_level,
-                patient_district=patient_district
+                patient_district=patient_district,
+                village_id=village[0] if at_village else None
             )
             
             if not hospital:
@@ -148,7 +174,7 @@ Prepare for arrival.
                     'error': 'No available hospitals found'
                 }
             
-            # Calculate travel time (placeholder - needs real routing API)
+            # Calculate travel time (offline road network, straight-line estimate without it)
             travel_time = AITools._estimate_travel_time(patient, hospital)
             
             # Create referral
@@ -169,9 +195,7 @@ Prepare for arrival.
                 status='PENDING'
             )
             
-            # Update hospital capacity
-            hospital.current_active_referrals += 1
-            hospital.save()
+            # Hospital capacity is counted by the referral signals (referrals/capacity.py)
             
             # Trigger alert if emergency
             if urgency_level == 'URGENT':
@@ -204,161 +228,155 @@ Prepare for arrival.
         patient_location: tuple,
         specialty: str,
         urgency_level: str,
-        patient_district: str = None
+        patient_district: str = None,
+        village_id: int = None
     ) -> Hospital:
         """
         Find nearest hospital in patient's district
         PRIORITY: District-based matching (village's district)
         FALLBACK: GPS-based if no district or no hospitals in district
+        Patients located at their village start from its precomputed
+        candidates; otherwise candidates come from the in-memory hospital
+        index. With the road network loaded, the nearest candidates are
+        ranked by travel time. The chosen hospital is built from the index
+        snapshot, so matching itself reads no hospital rows.
         """
         try:
-            from core.uganda_locations import find_nearest_hospitals
+            import numpy as np
+            from core.geo import distances_km
+            from core.spatial_index import TRIAGE_FACILITY_TYPES, hospital_index
+            from core.village_candidates import tier_for, village_candidates
+            
+            has_location = bool(patient_location and all(patient_location))
+            
+            # Map urgency level to triage level for location search
+            triage_level_map = {
+                'URGENT': 'URGENT',
+                'HIGH_RISK': 'HIGH_RISK',
+                'MODERATE': 'MODERATE',
+                'STABLE': 'LOW_RISK'
+            }
+            triage_level = triage_level_map.get(urgency_level, 'MODERATE')
+            
+            # PRIORITY 0: Precomputed nearest hospitals of the patient's village
+            if village_id:
+                if patient_district:
+                    rows = village_candidates.candidates(village_id, 'ANY', district=patient_district, limit=1)
+                else:
+                    rows = village_candidates.candidates(village_id, tier_for(triage_level), limit=1)
+                if rows:
+                    logger.info(
+                        f"[OK] Village candidate: {rows[0].hospital.name} "
+                        f"({rows[0].distance_km:.1f} km, ~{rows[0].travel_minutes or '?'} min away)"
+                    )
+                    return rows[0].hospital.to_model()
             
             # PRIORITY 1: If patient has district, find hospitals in that district
             if patient_district:
                 logger.info(f"Finding hospitals in patient's district: {patient_district}")
                 
-                # Filter hospitals by district first
-                district_hospitals = Hospital.objects.filter(
-                    district=patient_district,
-                    is_operational=True
-                ).exclude(
-                    emergency_capacity_status=Hospital.CapacityStatus.FULL
-                )
-                
-                # If patient has GPS, sort by distance within district
-                if patient_location and all(patient_location):
-                    from geopy.distance import geodesic
+                # If patient has GPS, take the nearest within district
+                if has_location:
                     latitude, longitude = patient_location
-                    
-                    scored_hospitals = []
-                    for hospital in district_hospitals:
-                        if hospital.latitude and hospital.longitude:
-                            distance = geodesic(
-                                (latitude, longitude),
-                                (hospital.latitude, hospital.longitude)
-                            ).kilometers
-                            scored_hospitals.append((hospital, distance))
-                    
-                    # Sort by distance
-                    scored_hospitals.sort(key=lambda x: x[1])
-                    
-                    if scored_hospitals:
-                        nearest = scored_hospitals[0]
-                        logger.info(f"[OK] Found hospital in {patient_district}: {nearest[0].name} ({nearest[1]:.1f} km away)")
-                        return nearest[0]
+                    nearest = hospital_index.nearest(
+                        latitude, longitude, k=settings.ROUTING_CANDIDATES, district=patient_district
+                    )
+                    if nearest:
+                        point, distance = AITools._quickest(latitude, longitude, nearest)
+                        logger.info(f"[OK] Found hospital in {patient_district}: {point.name} ({distance:.1f} km away)")
+                        return point.to_model()
                 
-                # If no GPS or no hospitals with GPS, just pick least busy in district
-                hospital = district_hospitals.order_by('current_active_referrals').first()
-                if hospital:
-                    logger.info(f"[OK] Found hospital in {patient_district}: {hospital.name} (least busy)")
-                    return hospital
+                # If no GPS, just pick least busy in district
+                district_hospitals = hospital_index.hospitals(district=patient_district)
+                if district_hospitals:
+                    point = min(district_hospitals, key=lambda p: p.current_active_referrals)
+                    logger.info(f"[OK] Found hospital in {patient_district}: {point.name} (least busy)")
+                    return point.to_model()
                 
                 logger.warning(f"[WARNING] No available hospitals found in district: {patient_district}")
             
             # FALLBACK: GPS-based global search if no district or no hospitals in district
-            if patient_location and all(patient_location):
+            if has_location:
                 latitude, longitude = patient_location
                 
-                # Map urgency level to triage level for location search
-                triage_level_map = {
-                    'URGENT': 'URGENT',
-                    'HIGH_RISK': 'HIGH_RISK',
-                    'MODERATE': 'MODERATE',
-                    'STABLE': 'LOW_RISK'
-                }
-                triage_level = triage_level_map.get(urgency_level, 'MODERATE')
-                
-                # Get 3 nearest hospitals from Uganda locations data
-                nearest_hospitals = find_nearest_hospitals(
-                    latitude, longitude, triage_level, max_results=3
+                nearest = hospital_index.nearest(
+                    latitude, longitude, k=settings.ROUTING_CANDIDATES,
+                    facility_types=TRIAGE_FACILITY_TYPES.get(triage_level)
                 )
-                
-                # Try to find matching hospital in database by name and location
-                for hospital_data in nearest_hospitals:
-                    hospital = Hospital.objects.filter(
-                        name__iexact=hospital_data['name'],
-                        is_operational=True
-                    ).exclude(
-                        emergency_capacity_status=Hospital.CapacityStatus.FULL
-                    ).first()
-                    
-                    if hospital:
-                        logger.info(f"Matched nearest hospital: {hospital.name} ({hospital_data['distance_km']} km away)")
-                        return hospital
-                
-                # Fallback: find by similarity if exact match not found
-                for hospital_data in nearest_hospitals:
-                    hospital = Hospital.objects.filter(
-                        district=hospital_data['district'],
-                        is_operational=True
-                    ).exclude(
-                        emergency_capacity_status=Hospital.CapacityStatus.FULL
-                    ).order_by('current_active_referrals').first()
-                    
-                    if hospital:
-                        logger.warning(f"Using fallback hospital in same district: {hospital.name}")
-                        return hospital
+                if nearest:
+                    point, distance = AITools._quickest(latitude, longitude, nearest)
+                    logger.info(f"Matched nearest hospital: {point.name} ({distance:.1f} km away)")
+                    return point.to_model()
             
             # Fallback to original logic if no GPS or no match found
-            hospitals = Hospital.objects.filter(
-                is_operational=True,
-                specialties__icontains=specialty
-            ).exclude(
-                emergency_capacity_status=Hospital.CapacityStatus.FULL
-            )
-            
-            if not hospitals.exists():
+            candidates = hospital_index.hospitals(specialty=specialty)
+            if not candidates:
                 # Fallback to any available hospital
-                hospitals = Hospital.objects.filter(
-                    is_operational=True
-                ).exclude(
-                    emergency_capacity_status=Hospital.CapacityStatus.FULL
-                )
+                specialty = None
+                candidates = hospital_index.hospitals()
             
-            if not hospitals.exists():
+            if not candidates:
                 logger.error("No operational hospitals available")
                 return None
             
             # If no patient location, return hospital with lowest load
-            if not patient_location or not all(patient_location):
-                return hospitals.order_by('current_active_referrals').first()
-            
-            # Calculate scores based on distance and load
-            scored_hospitals = []
-            for hospital in hospitals:
-                hospital_location = (hospital.latitude, hospital.longitude)
-                distance = geodesic(patient_location, hospital_location).kilometers
-                
-                # Score: lower is better
-                # Factor in distance and current load
-                score = distance + (hospital.current_active_referrals * 2)
-                
-                scored_hospitals.append((score, hospital))
+            if not has_location:
+                point = min(candidates, key=lambda p: p.current_active_referrals)
+                return point.to_model()
             
-            # Sort and return best
-            scored_hospitals.sort(key=lambda x: x[0])
-            return scored_hospitals[0][1]
+            # Calculate scores based on distance and load (all candidates in one array operation)
+            distances = distances_km(
+                patient_location[0], patient_location[1],
+                [point.latitude for point in candidates],
+                [point.longitude for point in candidates]
+            )
+            
+            # Score: lower is better
+            # Factor in distance and current load
+            scores = distances + np.array([point.current_active_referrals * 2 for point in candidates])
+            
+            # Return best
+            return candidates[int(scores.argmin())].to_model()
             
         except Exception as e:
             logger.error(f"Hospital matching failed: {e}", exc_info=True)
             # Final fallback: any operational hospital
             return Hospital.objects.filter(is_operational=True).first()
     
+    @staticmethod
+    def _quickest(latitude: float, longitude: float, nearest: list) -> tuple:
+        """
+        Pick the quickest by road of the nearest [(point, distance_km)]
+        (the nearest one when there is no road network)
+        """
+        from core.routing import estimate_route_minutes, road_network
+        
+        if len(nearest) == 1 or not road_network.available:
+            return nearest[0]
+        
+        minutes = estimate_route_minutes(
+            latitude, longitude, [(point.latitude, point.longitude) for point, _ in nearest]
+        )
+        # Unreachable by road (None) last; ties (e.g. both at the minimum) go to the nearer hospital
+        best = min(range(len(nearest)), key=lambda i: (minutes[i] is None, minutes[i] or 0, nearest[i][1]))
+        return nearest[best]
+    
     @staticmethod
     def _estimate_travel_time(patient: Patient, hospital: Hospital) -> int:
         """
         Estimate travel time in minutes
-        TODO: Integrate with Google Maps API or similar
+        By road over the offline road network (core/routing.py) when it is
+        built and reaches the hospital, otherwise 30 km/h in a straight line;
+        minimum 15 minutes
         """
         if patient.latitude and patient.longitude:
-            patient_loc = (patient.latitude, patient.longitude)
-            hospital_loc = (hospital.latitude, hospital.longitude)
-            distance_km = geodesic(patient_loc, hospital_loc).kilometers
+            from core.routing import estimate_route_minutes, straight_line_minutes
             
-            # Rough estimate: 30 km/h average speed
-            time_minutes = int((distance_km / 30) * 60)
-            return max(15, time_minutes)  # Minimum 15 minutes
+            destination = [(hospital.latitude, hospital.longitude)]
+            minutes = estimate_route_minutes(patient.latitude, patient.longitude, destination)[0]
+            if minutes is None:
+                minutes = straight_line_minutes(patient.latitude, patient.longitude, destination)[0]
+            return minutes
         
         return 30  # Default estimate
     
@@ -0,0 +1,181 @@
+"""
+Transcription Cache - Deduplicates re-submitted recordings
+The mobile app retries submit-case / transcribe-only on flaky connections;
+results are cached under a SHA-256 of the decoded PCM so a retry returns the
+stored transcript instead of paying for the same Whisper minutes again
+"""
+import hashlib
+import logging
+import threading
+import time
+from datetime import timedelta
+from typing import Callable, Dict, Optional
+from django.conf import settings
+from django.db import IntegrityError
+from django.db.models import F
+from django.utils import timezone
+from .audio_processing import AudioConversionError, pcm_duration
+from .audio_workers import AudioWorkerBusy, audio_pool
+
+logger = logging.getLogger(__name__)
+
+
+def audio_fingerprint(pcm: bytes) -> str:
+    """SHA-256 of decoded PCM (stable across container/codec re-encodes of the same upload)"""
+    return hashlib.sha256(pcm).hexdigest()
+
+
+class TranscriptionCacheService:
+    """
+    Looks up and stores transcription results by audio fingerprint
+    Keeps per-process hit/miss counters for the health endpoint
+    """
+
+    def __init__(self):
+        self._stats_lock = threading.Lock()
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'stores': 0,
+            'audio_seconds_saved': 0.0,
+            'transcription_seconds_saved': 0.0,
+        }
+
+    def transcribe(
+        self,
+        audio_file_path: str,
+        language: str,
+        variant: str,
+        transcribe: Callable[[Optional[bytes]], Dict]
+    ) -> Dict:
+        """
+        Return a cached transcription for this recording, or run and cache one
+
+        Args:
+            audio_file_path: Path to the uploaded audio
+            language: Language hint the result depends on
+            variant: Pipeline producing the result (separate cache entries)
+            transcribe: Called with the decoded PCM (or None if decoding
+                failed) on a cache miss
+
+        Returns:
+            Transcription result with cache_hit and audio_fingerprint added
+        """
+        if not settings.TRANSCRIPTION_CACHE_ENABLED:
+            return transcribe(None)
+
+        try:
+            pcm = audio_pool.decode(audio_file_path)
+        except AudioWorkerBusy:
+            raise  # Decoding again inside the providers would only queue up more work
+        except AudioConversionError as e:
+            logger.warning(f"Skipping transcription cache, audio could not be decoded: {e}")
+            return transcribe(None)
+
+        fingerprint = audio_fingerprint(pcm)
+        cached = self.lookup(fingerprint, language, variant)
+        if cached is not None:
+            return cached
+
+        self._count('misses')
+        started = time.monotonic()
+        result = transcribe(pcm)
+        elapsed = time.monotonic() - started
+
+        if not result.get('error') and result.get('transcription'):
+            self.store(fingerprint, language, variant, result, pcm_duration(pcm), elapsed)
+
+        result['cache_hit'] = False
+        result['audio_fingerprint'] = fingerprint
+        return result
+
+    def lookup(self, fingerprint: str, language: str, variant: str, record_hit: bool = True) -> Optional[Dict]:
+        """Return the cached result (and record the hit), or None"""
+        from .models import TranscriptionCache
+
+        entry = TranscriptionCache.objects.filter(
+            fingerprint=fingerprint, language=language, variant=variant
+        ).first()
+        if entry is None:
+            return None
+        if not record_hit:
+            return dict(entry.result)
+
+        TranscriptionCache.objects.filter(pk=entry.pk).update(
+            hit_count=F('hit_count') + 1,
+            last_hit_at=timezone.now()
+        )
+        with self._stats_lock:
+            self.stats['hits'] += 1
+            self.stats['audio_seconds_saved'] = round(
+                self.stats['audio_seconds_saved'] + entry.audio_duration, 2
+            )
+            self.stats['transcription_seconds_saved'] = round(
+                self.stats['transcription_seconds_saved'] + entry.transcription_seconds, 2
+            )
+
+        logger.info(f"Transcription cache hit for {fingerprint[:12]} ({language}, {variant})")
+        result = dict(entry.result)
+        result['cache_hit'] = True
+        result['audio_fingerprint'] = fingerprint
+        return result
+
+    def store(
+        self,
+        fingerprint: str,
+        language: str,
+        variant: str,
+        result: Dict,
+        audio_duration: float,
+        transcription_seconds: float
+    ):
+        from .models import TranscriptionCache
+
+        try:
+            TranscriptionCache.objects.create(
+                fingerprint=fingerprint,
+                language=language,
+                variant=variant,
+                result=result,
+                audio_duration=round(audio_duration, 2),
+                transcription_seconds=round(transcription_seconds, 3)
+            )
+            self._count('stores')
+        except IntegrityError:
+            # A concurrent retry of the same recording stored it first
+            logger.info(f"Transcription for {fingerprint[:12]} already cached")
+
+    def get_stats(self) -> Dict:
+        with self._stats_lock:
+            stats = dict(self.stats)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 3) if lookups else 0.0
+        return stats
+
+    def prune(self, retention_days: int = None) -> int:
+        """
+        Delete entries not created or hit within the retention period
+
+        Returns:
+            Number of entries deleted
+        """
+        from django.db.models import Q
+        from .models import TranscriptionCache
+
+        if retention_days is None:
+            retention_days = settings.TRANSCRIPTION_CACHE_RETENTION_DAYS
+        cutoff = timezone.now() - timedelta(days=retention_days)
+
+        deleted, _ = TranscriptionCache.objects.filter(
+            Q(last_hit_at__lt=cutoff) | Q(last_hit_at__isnull=True),
+            created_at__lt=cutoff
+        ).delete()
+        return deleted
+
+    def _count(self, key: str):
+        with self._stats_lock:
+            self.stats[key] += 1
+
+
+# Singleton instance
+transcription_cache = TranscriptionCacheService()
@@ -2,10 +2,17 @@
 Free Translation Service - Using Argos Translate (100% Free, Offline)
 NO API KEY NEEDED - Runs locally
 
-Alternative to Google Translate that works with prepaid cards
+The offline engine behind GROQ: language packages are installed at build
+time (`python manage.py install_translation_packages`), never from the
+request path, and each worker process loads its models once (at startup
+when ARGOS_PRELOAD is on) and shares them across its threads. Lists of
+strings are translated in one batched CTranslate2 call.
 """
 import logging
-from typing import Dict
+import threading
+import time
+from typing import Dict, List, Tuple
+from django.conf import settings
 
 logger = logging.getLogger(__name__)
 
@@ -15,12 +22,22 @@ class FreeTranslateService:
     Free translation service using Argos Translate
     - 100% free and offline
     - No API key or credit card needed
-    - Supports English ↔ Luganda and other languages
+    - Pairs installed from ARGOS_TRANSLATION_PAIRS (e.g. en-sw, or custom en-lg models)
     """
-    
+
     def __init__(self):
         self.available = False
         self.packages_installed = False
+        self._translations = {}  # (source, target) -> argos translation
+        self._load_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.load_seconds = None
+        self.stats = {
+            'calls': 0,
+            'texts': 0,
+            'failures': 0,
+            'seconds': 0.0,
+        }
         try:
             import argostranslate.package
             import argostranslate.translate
@@ -31,57 +48,85 @@ class FreeTranslateService:
         except ImportError:
             logger.warning("Argos Translate not installed. Run: pip install argostranslate")
             self.available = False
-    
-    def ensure_language_packages(self):
+
+    def ensure_language_packages(self, package_files: List[str] = None) -> List[Tuple[str, str]]:
         """
-        Download required language packages if not already installed
-        Only needs to be done once
+        Install the ARGOS_TRANSLATION_PAIRS packages (build time only - this
+        downloads the package index unless every pair comes from package_files)
+
+        Args:
+            package_files: Local .argosmodel files to install first
+                (e.g. custom-trained Luganda models)
+
+        Returns:
+            Pairs that are installed afterwards
         """
         if not self.available:
-            return False
-        
-        try:
-            # Update package index
+            return []
+
+        for path in package_files or []:
+            logger.info(f"Installing {path}...")
+            self.argos_package.install_from_path(path)
+
+        installed_codes = self._installed_pairs()
+        missing = [pair for pair in settings.ARGOS_TRANSLATION_PAIRS if pair not in installed_codes]
+        if missing:
             self.argos_package.update_package_index()
             available_packages = self.argos_package.get_available_packages()
-            
-            # Languages we need
-            languages_needed = [
-                ('en', 'lg'),  # English to Luganda
-                ('lg', 'en'),  # Luganda to English
-            ]
-            
-            installed_packages = self.argos_package.get_installed_packages()
-            installed_codes = [(pkg.from_code, pkg.to_code) for pkg in installed_packages]
-            
-            packages_to_install = []
-            for from_code, to_code in languages_needed:
-                if (from_code, to_code) not in installed_codes:
-                    # Find package
-                    pkg = next(
-                        (p for p in available_packages 
-                         if p.from_code == from_code and p.to_code == to_code),
-                        None
-                    )
-                    if pkg:
-                        packages_to_install.append(pkg)
-                        logger.info(f"Found package: {from_code} → {to_code}")
-            
-            # Install packages
-            for package in packages_to_install:
+            for from_code, to_code in missing:
+                package = next(
+                    (p for p in available_packages
+                     if p.from_code == from_code and p.to_code == to_code),
+                    None
+                )
+                if package is None:
+                    logger.warning(f"No Argos package for {from_code} → {to_code}")
+                    continue
                 logger.info(f"Downloading {package.from_name} → {package.to_name}...")
-                download_path = package.download()
-                self.argos_package.install_from_path(download_path)
-                logger.info(f"Installed {package.from_name} → {package.to_name}")
-            
-            self.packages_installed = True
-            logger.info("All language packages ready")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Failed to setup language packages: {e}")
-            return False
-    
+                self.argos_package.install_from_path(package.download())
+
+        self.packages_installed = True
+        return [pair for pair in settings.ARGOS_TRANSLATION_PAIRS if pair in self._installed_pairs()]
+
+    def load(self) -> List[Tuple[str, str]]:
+        """
+        Load the installed ARGOS_TRANSLATION_PAIRS models into this process
+        (once; later calls return immediately). No network access.
+
+        Returns:
+            Loaded (source, target) pairs
+        """
+        if not self.available:
+            return []
+
+        with self._load_lock:
+            if self.load_seconds is None:
+                started = time.monotonic()
+                languages = {lang.code: lang for lang in self.argos_translate.get_installed_languages()}
+                for from_code, to_code in settings.ARGOS_TRANSLATION_PAIRS:
+                    if from_code not in languages or to_code not in languages:
+                        continue
+                    translation = languages[from_code].get_translation(languages[to_code])
+                    if translation is None:
+                        continue
+                    try:
+                        translation.translate('Hello')  # Loads the CTranslate2 model
+                    except Exception as e:
+                        logger.error(f"Argos model {from_code} → {to_code} failed to load: {e}")
+                        continue
+                    self._translations[(from_code, to_code)] = translation
+                self.load_seconds = round(time.monotonic() - started, 2)
+                self.packages_installed = bool(self._translations)
+                logger.info(
+                    f"Argos models loaded in {self.load_seconds}s: "
+                    f"{', '.join(f'{s}→{t}' for s, t in self._translations) or 'none installed'}"
+                )
+        return list(self._translations)
+
+    def supports(self, source_language: str, target_language: str) -> bool:
+        """Pair installed and loadable in this process"""
+        return (source_language, target_language) in self.load()
+
     def translate_text(
         self,
         text: str,
@@ -90,67 +135,148 @@ class FreeTranslateService:
     ) -> Dict:
         """
         Translate text between languages
-        
+
         Args:
             text: Text to translate
             target_language: Target language code (default: 'lg' for Luganda)
             source_language: Source language code (default: 'en' for English)
-        
+
         Returns:
             Dict with translated text and metadata
         """
-        if not self.available:
+        result = self.translate_batch([text], target_language, source_language)
+        translation = result['translations'][0]
+        return {
+            'success': translation['success'],
+            'translated_text': translation['translated_text'],
+            'original_text': text,
+            'source_language': source_language,
+            'target_language': target_language,
+            'service': 'argos_translate',
+            'cost': 0.0,  # FREE!
+            **({'error': translation['error']} if 'error' in translation else {})
+        }
+
+    def translate_batch(
+        self,
+        texts: List[str],
+        target_language: str = 'lg',
+        source_language: str = 'en'
+    ) -> Dict:
+        """
+        Translate a list of strings in one batched model call
+
+        Returns:
+            {
+                'translations': [{'translated_text': str, 'success': bool, 'service': str}, ...]
+                    (same order as texts; failed items keep their original text),
+                'success': bool,
+                'seconds': float
+            }
+        """
+        def failed(error: str) -> Dict:
             return {
+                'translations': [
+                    {'translated_text': text, 'success': False, 'error': error} for text in texts
+                ],
                 'success': False,
-                'error': 'Argos Translate not installed',
-                'translated_text': text,  # Return original if translation fails
-                'source_language': source_language,
-                'target_language': target_language
+                'seconds': 0.0
             }
-        
+
+        if not self.available:
+            return failed('Argos Translate not installed')
+
+        if not self.supports(source_language, target_language):
+            return failed(f"Language pair not installed: {source_language}->{target_language}")
+        translation = self._translations[(source_language, target_language)]
+
+        started = time.monotonic()
         try:
-            # Ensure packages are installed
-            if not self.packages_installed:
-                self.ensure_language_packages()
-            
-            # Get installed languages
-            installed_languages = self.argos_package.get_installed_languages()
-            
-            # Find translation path
-            from_lang = next((lang for lang in installed_languages if lang.code == source_language), None)
-            to_lang = next((lang for lang in installed_languages if lang.code == target_language), None)
-            
-            if not from_lang or not to_lang:
-                raise Exception(f"Language pair not installed: {source_language}->{target_language}")
-            
-            # Get translation
-            translation = from_lang.get_translation(to_lang)
-            if not translation:
-                raise Exception(f"No translation available for {source_language}->{target_language}")
-            
-            translated = translation.translate(text)
-            
-            logger.info(f"Translated ({source_language}→{target_language}): {text[:50]}...")
-            
-            return {
-                'success': True,
-                'translated_text': translated,
-                'original_text': text,
-                'source_language': source_language,
-                'target_language': target_language,
-                'service': 'argos_translate',
-                'cost': 0.0  # FREE!
-            }
-            
+            outputs = self._translate_all(translation, [text or '' for text in texts])
         except Exception as e:
             logger.error(f"Translation failed: {e}")
-            return {
-                'success': False,
-                'error': str(e),
-                'translated_text': text,  # Fallback to original
-                'source_language': source_language,
-                'target_language': target_language
-            }
+            self._record(len(texts), time.monotonic() - started, failed=True)
+            return failed(str(e))
+        elapsed = time.monotonic() - started
+        self._record(len(texts), elapsed)
+
+        logger.info(f"Translated {len(texts)} texts ({source_language}→{target_language}) in {elapsed:.2f}s")
+        return {
+            'translations': [
+                {'translated_text': output, 'success': True, 'service': 'argos_translate'}
+                for output in outputs
+            ],
+            'success': True,
+            'seconds': round(elapsed, 3)
+        }
+
+    def get_stats(self) -> Dict:
+        with self._stats_lock:
+            stats = dict(self.stats)
+        stats['seconds'] = round(stats['seconds'], 3)
+        stats['mean_seconds_per_text'] = round(stats['seconds'] / stats['texts'], 3) if stats['texts'] else None
+        stats['loaded_pairs'] = [f'{s}-{t}' for s, t in self._translations]
+        stats['load_seconds'] = self.load_seconds
+        return stats
+
+    def _translate_all(self, translation, texts: List[str]) -> List[str]:
+        """
+        Translate every sentence of every text in a single CTranslate2
+        translate_batch call (Argos itself issues one call per paragraph)
+        """
+        package_translation = getattr(translation, 'underlying', translation)
+        if not all(hasattr(package_translation, name) for name in ('pkg', 'sentencizer', 'translator')):
+            # Pivot / composite translations have no single model to batch on
+            return [translation.translate(text) for text in texts]
+
+        from argostranslate import settings as argos_settings
+
+        pkg = package_translation.pkg
+        sentences = []
+        layout = []  # per text: per paragraph (first sentence index, sentence count)
+        for text in texts:
+            paragraphs = []
+            for paragraph in text.split('\n'):
+                split = package_translation.sentencizer.split_sentences(paragraph) if paragraph.strip() else []
+                paragraphs.append((len(sentences), len(split)))
+                sentences.extend(split)
+            layout.append(paragraphs)
+
+        decoded = []
+        if sentences:
+            tokenized = [pkg.tokenizer.encode(sentence) for sentence in sentences]
+            target_prefix = [[pkg.target_prefix]] * len(tokenized) if pkg.target_prefix else None
+            results = package_translation.translator.translate_batch(
+                tokenized,
+                target_prefix=target_prefix,
+                replace_unknowns=True,
+                max_batch_size=argos_settings.batch_size,
+                batch_type='tokens',
+                beam_size=argos_settings.beam_size,
+                num_hypotheses=1,
+                length_penalty=0.2,
+            )
+            for result in results:
+                value = pkg.tokenizer.decode(result.hypotheses[0])
+                if pkg.target_prefix and value.startswith(pkg.target_prefix):
+                    value = value[len(pkg.target_prefix):]
+                decoded.append(value.strip())
+
+        return [
+            '\n'.join(' '.join(decoded[start:start + count]) for start, count in paragraphs)
+            for paragraphs in layout
+        ]
+
+    def _installed_pairs(self) -> List[Tuple[str, str]]:
+        return [(pkg.from_code, pkg.to_code) for pkg in self.argos_package.get_installed_packages()]
+
+    def _record(self, texts: int, elapsed: float, failed: bool = False):
+        with self._stats_lock:
+            self.stats['calls'] += 1
+            self.stats['texts'] += texts
+            self.stats['seconds'] += elapsed
+            if failed:
+                self.stats['failures'] += 1
 
 
 # Singleton instance
@@ -0,0 +1,155 @@
+"""
+Translation Memory - Remembers remote translations
+The mobile app calls translate/ over and over while a VHT records, mostly
+with the same UI phrases and sentences. Translations from GROQ are kept in
+the translation_memory table, keyed by the normalized source text, the
+language pair and the model, with an in-process LRU in front so repeated
+phrases are answered without a database query or a GROQ request.
+"""
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from datetime import timedelta
+from typing import Dict, Optional
+from django.conf import settings
+from django.db import IntegrityError
+from django.db.models import F
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_source(text: str) -> str:
+    """Collapse whitespace and case so near-identical requests share an entry"""
+    return ' '.join(text.split()).casefold()
+
+
+def model_version(model: str) -> str:
+    """Model name plus TRANSLATION_MEMORY_VERSION (bump it to drop old translations)"""
+    return f'{model}@{settings.TRANSLATION_MEMORY_VERSION}'
+
+
+def memory_key(text: str, source_language: str, target_language: str, model: str) -> str:
+    normalized = normalize_source(text)
+    return hashlib.sha256(
+        f'{source_language}|{target_language}|{model_version(model)}|{normalized}'.encode('utf-8')
+    ).hexdigest()
+
+
+class TranslationMemoryService:
+    """
+    LRU-fronted lookup and store of translations
+    Keeps per-process hit/miss counters for the health endpoint
+    """
+
+    def __init__(self):
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {
+            'memory_hits': 0,
+            'db_hits': 0,
+            'misses': 0,
+            'stores': 0,
+        }
+
+    def lookup(self, text: str, source_language: str, target_language: str, model: str) -> Optional[str]:
+        """Remembered translation, or None"""
+        from .models import TranslationMemory
+
+        if not settings.TRANSLATION_MEMORY_ENABLED or not self._cacheable(text):
+            return None
+
+        key = memory_key(text, source_language, target_language, model)
+        with self._lock:
+            translated = self._lru.get(key)
+            if translated is not None:
+                self._lru.move_to_end(key)
+                self.stats['memory_hits'] += 1
+                return translated
+
+        entry = TranslationMemory.objects.filter(key=key).only('translated_text').first()
+        if entry is None:
+            self._count('misses')
+            return None
+
+        TranslationMemory.objects.filter(pk=entry.pk).update(
+            hit_count=F('hit_count') + 1,
+            last_hit_at=timezone.now()
+        )
+        self._remember(key, entry.translated_text)
+        self._count('db_hits')
+        return entry.translated_text
+
+    def store(self, text: str, translated_text: str, source_language: str, target_language: str, model: str):
+        from .models import TranslationMemory
+
+        if not settings.TRANSLATION_MEMORY_ENABLED or not self._cacheable(text) or not translated_text:
+            return
+
+        key = memory_key(text, source_language, target_language, model)
+        try:
+            TranslationMemory.objects.create(
+                key=key,
+                source_text=normalize_source(text),
+                translated_text=translated_text,
+                source_language=source_language,
+                target_language=target_language,
+                model=model_version(model)
+            )
+            self._count('stores')
+        except IntegrityError:
+            # A concurrent request translated the same text first
+            pass
+        self._remember(key, translated_text)
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self.stats)
+            stats['lru_entries'] = len(self._lru)
+        hits = stats['memory_hits'] + stats['db_hits']
+        lookups = hits + stats['misses']
+        stats['hit_rate'] = round(hits / lookups, 3) if lookups else 0.0
+        stats['requests_saved'] = hits
+        return stats
+
+    def prune(self, retention_days: int = None) -> int:
+        """
+        Delete entries not created or hit within the retention period
+
+        Returns:
+            Number of entries deleted
+        """
+        from django.db.models import Q
+        from .models import TranslationMemory
+
+        if retention_days is None:
+            retention_days = settings.TRANSLATION_MEMORY_RETENTION_DAYS
+        cutoff = timezone.now() - timedelta(days=retention_days)
+
+        deleted, _ = TranslationMemory.objects.filter(
+            Q(last_hit_at__lt=cutoff) | Q(last_hit_at__isnull=True),
+            created_at__lt=cutoff
+        ).delete()
+        with self._lock:
+            self._lru.clear()
+        return deleted
+
+    def _cacheable(self, text: str) -> bool:
+        # Long free text rarely repeats; keep it out of the table
+        return bool(text) and len(text) <= settings.TRANSLATION_MEMORY_MAX_CHARS
+
+    def _remember(self, key: str, translated_text: str):
+        with self._lock:
+            self._lru[key] = translated_text
+            self._lru.move_to_end(key)
+            while len(self._lru) > settings.TRANSLATION_MEMORY_LRU_SIZE:
+                self._lru.popitem(last=False)
+
+    def _count(self, key: str):
+        with self._lock:
+            self.stats[key] += 1
+
+
+# Singleton instance
+translation_memory = TranslationMemoryService()
@@ -0,0 +1,263 @@
+"""
+Translation Router - Chooses between GROQ and the offline Argos engine
+GROQ is used while it is reachable, within its daily budget and fast
+enough; otherwise requests go to the Argos models loaded in this worker.
+Latency of both engines is recorded so they can be compared on the
+health endpoint.
+
+Engines:
+- groq: GROQ LLM (glossary and translation memory in front)
+- argos: Argos Translate / CTranslate2 models resident in this worker (no network)
+
+Reasons for choosing argos:
+- groq_unavailable: no GROQ client (missing key or package)
+- rate_limited: GROQ answered 429 within GROQ_RATE_LIMIT_COOLDOWN_SECONDS
+- budget_exhausted: GROQ_TRANSLATE_DAILY_BUDGET calls made today
+- slow: GROQ EWMA latency above TRANSLATE_GROQ_MAX_LATENCY_SECONDS (GROQ
+  is probed again every TRANSLATE_LATENCY_PROBE_SECONDS to notice recovery)
+- groq_failed: GROQ was tried and failed
+"""
+import logging
+import threading
+import time
+from collections import deque
+from datetime import date
+from typing import Dict, List, Tuple
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+ENGINES = ('groq', 'argos')
+
+# Latency samples kept per engine for percentiles
+LATENCY_WINDOW = 200
+
+
+class TranslationRouter:
+    """
+    Budget-, rate-limit- and latency-aware engine selection
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._latencies = {name: deque(maxlen=LATENCY_WINDOW) for name in ENGINES}
+        self.stats = {
+            name: {
+                'calls': 0,
+                'texts': 0,
+                'failures': 0,
+                'latency_seconds': None,  # EWMA per call
+            }
+            for name in ENGINES
+        }
+        self.reasons = {}
+        self._rate_limited_until = 0.0
+        self._last_groq_probe = 0.0
+
+    def choose(self, source_language: str, target_language: str) -> Tuple[str, str]:
+        """
+        Pick the engine for one request
+
+        Returns:
+            (engine, reason) - reason is None when GROQ is chosen normally
+        """
+        from .groq_translate_service import groq_translate_service
+        from .translate_service import free_translate_service
+
+        if not free_translate_service.supports(source_language, target_language):
+            return 'groq', None
+        if not groq_translate_service.is_available:
+            return 'argos', 'groq_unavailable'
+
+        now = time.monotonic()
+        with self._lock:
+            rate_limited = self._rate_limited_until > now
+            latency = self.stats['groq']['latency_seconds']
+            probe_due = now - self._last_groq_probe >= settings.TRANSLATE_LATENCY_PROBE_SECONDS
+
+        if rate_limited:
+            return 'argos', 'rate_limited'
+        if self._budget_used() >= settings.GROQ_TRANSLATE_DAILY_BUDGET:
+            return 'argos', 'budget_exhausted'
+        if latency is not None and latency > settings.TRANSLATE_GROQ_MAX_LATENCY_SECONDS:
+            if not probe_due:
+                return 'argos', 'slow'
+            with self._lock:
+                self._last_groq_probe = now
+        return 'groq', None
+
+    def translate(self, text: str, target_language: str = 'lg', source_language: str = 'en') -> Dict:
+        """
+        Translate one text with the chosen engine, falling back to Argos
+        when GROQ fails
+
+        Returns:
+            Result of the engine that answered, with engine (and
+            engine_reason when Argos was used) added
+        """
+        from .groq_translate_service import groq_translate_service
+        from .translate_service import free_translate_service
+
+        local, hints = groq_translate_service.prepare(text, target_language, source_language)
+        if local is not None:
+            return dict(local, engine='local')
+
+        engine, reason = self.choose(source_language, target_language)
+        if engine == 'groq':
+            started = time.monotonic()
+            # Glossary and memory were just tried: only the LLM step is left
+            result = groq_translate_service.translate_remote(text, target_language, source_language, hints)
+            self._record_groq(result['success'], time.monotonic() - started, 1, result.get('rate_limited'))
+            if result['success'] or not free_translate_service.supports(source_language, target_language):
+                return dict(result, engine='groq')
+            reason = 'groq_failed'
+
+        started = time.monotonic()
+        result = free_translate_service.translate_text(text, target_language, source_language)
+        self._record('argos', result['success'], time.monotonic() - started, 1, reason)
+        return dict(result, engine='argos', engine_reason=reason)
+
+    def translate_batch(self, texts: List[str], target_language: str = 'lg', source_language: str = 'en') -> Dict:
+        """
+        Translate a list of strings; items GROQ could not translate are
+        retried in one Argos batch (glossary and translation memory answers
+        are used by both engines)
+
+        Returns:
+            Same shape as GroqTranslateService.translate_batch, with engine
+            (and engine_reason when Argos was used) added
+        """
+        from .groq_translate_service import groq_translate_service
+        from .translate_service import free_translate_service
+
+        engine, reason = self.choose(source_language, target_language)
+        if engine == 'argos':
+            translations = [
+                groq_translate_service.translate_locally(text, target_language, source_language)
+                if isinstance(text, str) and text.strip() else
+                {'translated_text': '', 'success': False, 'error': 'Empty text'}
+                for text in texts
+            ]
+            pending = [index for index, translation in enumerate(translations) if translation is None]
+            if pending:
+                started = time.monotonic()
+                result = free_translate_service.translate_batch(
+                    [texts[index] for index in pending], target_language, source_language
+                )
+                self._record('argos', result['success'], time.monotonic() - started, len(pending), reason)
+                for index, translation in zip(pending, result['translations']):
+                    translations[index] = translation
+            return {
+                'translations': [
+                    {key: value for key, value in translation.items()
+                     if key not in ('source_language', 'target_language')}
+                    for translation in translations
+                ],
+                'source_language': source_language,
+                'target_language': target_language,
+                'success': all(translation['success'] for translation in translations),
+                'llm_calls': 0,
+                'engine': 'argos',
+                'engine_reason': reason
+            }
+
+        started = time.monotonic()
+        result = groq_translate_service.translate_batch(texts, target_language, source_language)
+        if result['llm_calls']:
+            self._record_groq(
+                result['success'], time.monotonic() - started, len(texts),
+                result.get('rate_limited'), calls=result['llm_calls']
+            )
+        result['engine'] = 'groq'
+
+        failed = [
+            index for index, translation in enumerate(result['translations'])
+            if not translation['success'] and translation.get('error') != 'Empty text'
+        ]
+        if not failed or not free_translate_service.supports(source_language, target_language):
+            return result
+
+        started = time.monotonic()
+        fallback = free_translate_service.translate_batch(
+            [texts[index] for index in failed], target_language, source_language
+        )
+        self._record('argos', fallback['success'], time.monotonic() - started, len(failed), 'groq_failed')
+        for index, translation in zip(failed, fallback['translations']):
+            if translation['success']:
+                result['translations'][index] = translation
+        result['success'] = all(translation['success'] for translation in result['translations'])
+        result['engine_reason'] = 'groq_failed'
+        return result
+
+    def get_stats(self) -> Dict:
+        now = time.monotonic()
+        with self._lock:
+            stats = {}
+            for name in ENGINES:
+                samples = sorted(self._latencies[name])
+                stats[name] = {
+                    **self.stats[name],
+                    'p50_seconds': _percentile(samples, 0.5),
+                    'p95_seconds': _percentile(samples, 0.95),
+                }
+            stats['argos_reasons'] = dict(self.reasons)
+            stats['rate_limit_remaining_seconds'] = round(max(0.0, self._rate_limited_until - now), 1)
+        stats['groq_budget_used_today'] = self._budget_used()
+        stats['groq_daily_budget'] = settings.GROQ_TRANSLATE_DAILY_BUDGET
+        return stats
+
+    def _budget_key(self) -> str:
+        return f'groq_translate_calls:{date.today().isoformat()}'
+
+    def _budget_used(self) -> int:
+        return cache.get(self._budget_key(), 0)
+
+    def _record_groq(self, succeeded: bool, elapsed: float, texts: int, rate_limited: bool, calls: int = 1):
+        """Count GROQ requests against today's budget and start the 429 cooldown"""
+        key = self._budget_key()
+        cache.add(key, 0, timeout=2 * 24 * 3600)
+        try:
+            cache.incr(key, calls)
+        except ValueError:
+            # Expired between add and incr
+            cache.set(key, calls, timeout=2 * 24 * 3600)
+
+        with self._lock:
+            # Every GROQ request is a fresh latency sample; wait a full probe interval after it
+            self._last_groq_probe = time.monotonic()
+        if rate_limited:
+            with self._lock:
+                self._rate_limited_until = time.monotonic() + settings.GROQ_RATE_LIMIT_COOLDOWN_SECONDS
+            logger.warning(
+                f"GROQ translation rate limited, using Argos for {settings.GROQ_RATE_LIMIT_COOLDOWN_SECONDS}s"
+            )
+        self._record('groq', succeeded, elapsed, texts)
+
+    def _record(self, name: str, succeeded: bool, elapsed: float, texts: int, reason: str = None):
+        """Update call counts and latency (EWMA and percentile window) for one call"""
+        with self._lock:
+            stats = self.stats[name]
+            stats['calls'] += 1
+            stats['texts'] += texts
+            if reason:
+                self.reasons[reason] = self.reasons.get(reason, 0) + 1
+            if not succeeded:
+                stats['failures'] += 1
+                return
+            self._latencies[name].append(elapsed)
+            previous = stats['latency_seconds']
+            alpha = settings.TRANSLATE_LATENCY_EWMA_ALPHA
+            stats['latency_seconds'] = round(
+                elapsed if previous is None else alpha * elapsed + (1 - alpha) * previous, 4
+            )
+
+
+def _percentile(samples: List[float], fraction: float):
+    if not samples:
+        return None
+    return round(samples[min(len(samples) - 1, int(fraction * len(samples)))], 4)
+
+
+# Singleton instance
+translation_router = TranslationRouter()
@@ -0,0 +1,263 @@
+"""
+TTS Cache - Synthesized speech stored once per (text, language, voice)
+First-aid instructions are read out in the same words many times a day;
+the MP3 from Google Text-to-Speech is kept under
+TTS_CACHE_PREFIX/<language>/<key>.mp3 and served through tts/<key>.mp3
+with immutable cache headers, so a repeated instruction costs no synthesis
+call. Entries beyond TTS_CACHE_MAX_BYTES are evicted least-recently-used;
+the pre-rendered library (pinned) is kept.
+"""
+import hashlib
+import logging
+import threading
+from typing import Dict
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import IntegrityError
+from django.db.models import F, Sum
+from django.urls import reverse
+from django.utils import timezone
+from .first_aid_library import get_instruction
+
+logger = logging.getLogger(__name__)
+
+# Short language codes used across the app -> Google TTS voices
+TTS_LANGUAGE_CODES = {
+    'en': 'en-US',
+    'lg': 'lg-UG',
+    'sw': 'sw-KE',
+}
+
+VOICES = ('FEMALE', 'MALE', 'NEUTRAL')
+
+
+class TTSError(Exception):
+    """Speech could not be synthesized"""
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace so trivially different copies share an entry"""
+    return ' '.join(text.split())
+
+
+def cache_key(text: str, language: str, voice: str) -> str:
+    """SHA-256 identifying the audio for this text, language and voice"""
+    return hashlib.sha256(f'{language}|{voice}|{normalize_text(text)}'.encode('utf-8')).hexdigest()
+
+
+class TTSCacheService:
+    """
+    Returns cached speech or synthesizes and stores it
+    Keeps per-process hit/miss counters for the health endpoint
+    """
+
+    def __init__(self):
+        self._stats_lock = threading.Lock()
+        self._evict_lock = threading.Lock()
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'characters_synthesized': 0,
+            'evictions': 0,
+            'bytes_evicted': 0,
+        }
+
+    def get_or_render(
+        self,
+        text: str,
+        language: str = 'en',
+        voice: str = None,
+        instruction: str = '',
+        pinned: bool = False
+    ):
+        """
+        Return the cache entry for this text, synthesizing it on a miss
+
+        Args:
+            text: Text to speak
+            language: App language code (en, lg, sw)
+            voice: FEMALE, MALE or NEUTRAL (default TTS_DEFAULT_VOICE)
+            instruction: First-aid library id the text belongs to
+            pinned: Keep the entry out of LRU eviction (pre-rendered library)
+
+        Returns:
+            (TTSCacheEntry, cache_hit)
+
+        Raises:
+            TTSError: synthesis failed or the language has no voice
+        """
+        from .models import TTSCacheEntry
+
+        voice = voice or settings.TTS_DEFAULT_VOICE
+        text = normalize_text(text)
+        key = cache_key(text, language, voice)
+
+        entry = TTSCacheEntry.objects.filter(key=key).first()
+        if entry is not None and default_storage.exists(entry.storage_name):
+            self._touch(entry, instruction, pinned)
+            if pinned and instruction:
+                self._unpin_replaced(entry, instruction)
+            return entry, True
+
+        self._count('misses')
+        audio = self._synthesize(text, language, voice)
+        name = f'{settings.TTS_CACHE_PREFIX}/{language}/{key}.mp3'
+        if default_storage.exists(name):
+            # A concurrent miss saved the same speech first; a row may already
+            # point at it and clients cache its URL, so keep that file
+            size = default_storage.size(name)
+        else:
+            name = default_storage.save(name, ContentFile(audio))
+            size = len(audio)
+
+        if entry is not None:
+            # The row survived but its file was removed - re-point it
+            entry.storage_name = name
+            entry.size = size
+            entry.save(update_fields=['storage_name', 'size'])
+            self._touch(entry, instruction, pinned, record_hit=False)
+        else:
+            try:
+                entry = TTSCacheEntry.objects.create(
+                    key=key,
+                    text=text,
+                    language=language,
+                    voice=voice,
+                    instruction=instruction,
+                    storage_name=name,
+                    size=size,
+                    pinned=pinned
+                )
+            except IntegrityError:
+                # A concurrent request rendered the same text first
+                entry = TTSCacheEntry.objects.get(key=key)
+                if entry.storage_name != name:
+                    default_storage.delete(name)
+                self._touch(entry, instruction, pinned, record_hit=False)
+
+        logger.info(f"Synthesized {len(text)} chars of {language} speech into {name}")
+        if pinned and instruction:
+            self._unpin_replaced(entry, instruction)
+        self.evict()
+        return entry, False
+
+    def lookup_instruction(self, instruction: str, language: str, voice: str = None, record_hit: bool = True):
+        """
+        Pre-rendered entry for a library instruction, or None
+        Found by the key of the instruction's current library text, so an
+        edited instruction misses and is rendered again; instructions without
+        library text in the language (machine-translated) use the pinned
+        entry for the id
+        """
+        from .models import TTSCacheEntry
+
+        voice = voice or settings.TTS_DEFAULT_VOICE
+        text = get_instruction(instruction, language)
+        if text is not None:
+            entry = TTSCacheEntry.objects.filter(key=cache_key(text, language, voice)).first()
+        else:
+            entry = TTSCacheEntry.objects.filter(
+                instruction=instruction,
+                language=language,
+                voice=voice
+            ).order_by('-pinned', '-last_used_at').first()
+        if entry is None or not default_storage.exists(entry.storage_name):
+            return None
+        if record_hit:
+            self._touch(entry)
+        return entry
+
+    def audio_url(self, entry, request=None) -> str:
+        """Long-lived URL of an entry's audio (the key changes with the content)"""
+        url = reverse('tts-audio', kwargs={'key': entry.key})
+        return request.build_absolute_uri(url) if request is not None else url
+
+    def evict(self, max_bytes: int = None) -> int:
+        """
+        Delete least-recently-used unpinned entries until the cache fits
+
+        Returns:
+            Number of entries evicted
+        """
+        from .models import TTSCacheEntry
+
+        if max_bytes is None:
+            max_bytes = settings.TTS_CACHE_MAX_BYTES
+
+        with self._evict_lock:
+            total = TTSCacheEntry.objects.aggregate(total=Sum('size'))['total'] or 0
+            if total <= max_bytes:
+                return 0
+
+            evicted = freed = 0
+            candidates = TTSCacheEntry.objects.filter(pinned=False).order_by('last_used_at')
+            for entry in candidates.iterator():
+                if total - freed <= max_bytes:
+                    break
+                default_storage.delete(entry.storage_name)
+                entry.delete()
+                evicted += 1
+                freed += entry.size
+
+        with self._stats_lock:
+            self.stats['evictions'] += evicted
+            self.stats['bytes_evicted'] += freed
+        if evicted:
+            logger.info(f"Evicted {evicted} TTS cache entries ({freed} bytes)")
+        return evicted
+
+    def get_stats(self) -> Dict:
+        from .models import TTSCacheEntry
+
+        with self._stats_lock:
+            stats = dict(self.stats)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 3) if lookups else 0.0
+        stats['bytes_stored'] = TTSCacheEntry.objects.aggregate(total=Sum('size'))['total'] or 0
+        stats['max_bytes'] = settings.TTS_CACHE_MAX_BYTES
+        return stats
+
+    def _synthesize(self, text: str, language: str, voice: str) -> bytes:
+        language_code = TTS_LANGUAGE_CODES.get(language)
+        if language_code is None:
+            raise TTSError(f"No text-to-speech voice for language '{language}'")
+
+        try:
+            from .google_speech_service import google_tts_service
+            audio = google_tts_service.synthesize_speech(text, language_code, voice)
+        except Exception as e:
+            raise TTSError(f"Speech synthesis failed: {e}")
+
+        with self._stats_lock:
+            self.stats['characters_synthesized'] += len(text)
+        return audio
+
+    def _touch(self, entry, instruction: str = '', pinned: bool = False, record_hit: bool = True):
+        from .models import TTSCacheEntry
+
+        updates = {'last_used_at': timezone.now()}
+        if record_hit:
+            updates['hit_count'] = F('hit_count') + 1
+            self._count('hits')
+        if instruction and not entry.instruction:
+            updates['instruction'] = entry.instruction = instruction
+        if pinned and not entry.pinned:
+            updates['pinned'] = entry.pinned = True
+        TTSCacheEntry.objects.filter(pk=entry.pk).update(**updates)
+
+    def _unpin_replaced(self, entry, instruction: str):
+        """Leave an edited instruction's old audio to normal LRU eviction"""
+        from .models import TTSCacheEntry
+
+        TTSCacheEntry.objects.filter(
+            instruction=instruction, language=entry.language, voice=entry.voice, pinned=True
+        ).exclude(pk=entry.pk).update(pinned=False)
+
+    def _count(self, key: str):
+        with self._stats_lock:
+            self.stats[key] += 1
+
+
+# Singleton instance
+tts_cache = TTSCacheService()
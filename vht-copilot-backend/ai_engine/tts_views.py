@@ -0,0 +1,117 @@
+"""
+AI Engine Text-to-Speech Views - Spoken first-aid instructions
+
+Flow:
+1. POST tts/              (instruction id or text) -> audio URL
+2. GET  tts/<key>.mp3     -> MP3, cacheable for a year by the app and any proxy
+"""
+import logging
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.http import FileResponse, Http404, HttpResponseNotModified
+from django.views.decorators.http import require_GET
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from .first_aid_library import get_instruction
+from .models import TTSCacheEntry
+from .tts_cache import TTS_LANGUAGE_CODES, VOICES, TTSError, tts_cache
+
+logger = logging.getLogger(__name__)
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def synthesize_speech(request):
+    """
+    Get spoken audio for a first-aid instruction or short text
+
+    Accepts:
+    - instruction (first-aid library id, e.g. 'bleeding') or text
+    - language (optional, default 'en')
+    - voice (optional, FEMALE / MALE / NEUTRAL)
+    """
+    instruction = request.data.get('instruction') or ''
+    text = (request.data.get('text') or '').strip()
+    language = request.data.get('language', 'en')
+    voice = (request.data.get('voice') or settings.TTS_DEFAULT_VOICE).upper()
+
+    if not instruction and not text:
+        return Response(
+            {'error': 'instruction or text is required'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if language not in TTS_LANGUAGE_CODES:
+        return Response(
+            {'error': f'language must be one of {", ".join(TTS_LANGUAGE_CODES)}'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if voice not in VOICES:
+        return Response(
+            {'error': f'voice must be one of {", ".join(VOICES)}'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if len(text) > settings.TTS_MAX_TEXT_CHARS:
+        return Response(
+            {'error': f'text is limited to {settings.TTS_MAX_TEXT_CHARS} characters'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    cache_hit = True
+    if instruction:
+        entry = tts_cache.lookup_instruction(instruction, language, voice)
+        if entry is None:
+            text = get_instruction(instruction, language)
+            if text is None:
+                return Response(
+                    {'error': f"Instruction '{instruction}' is not available in '{language}'"},
+                    status=status.HTTP_404_NOT_FOUND
+                )
+    else:
+        entry = None
+
+    if entry is None:
+        try:
+            entry, cache_hit = tts_cache.get_or_render(
+                text, language, voice, instruction=instruction, pinned=bool(instruction)
+            )
+        except TTSError as e:
+            logger.error(f"TTS for {instruction or 'text'} ({language}) failed: {e}")
+            return Response({'error': str(e)}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+    return Response({
+        'audio_url': tts_cache.audio_url(entry, request),
+        'key': entry.key,
+        'text': entry.text,
+        'language': entry.language,
+        'voice': entry.voice,
+        'instruction': entry.instruction or None,
+        'size': entry.size,
+        'cache_hit': cache_hit,
+    })
+
+
+@require_GET
+def tts_audio(request, key):
+    """
+    Serve cached speech; the content behind a key never changes, so clients
+    and proxies may keep it for TTS_AUDIO_MAX_AGE_SECONDS without revalidating
+
+    A plain Django view: audio players fetch the URL without the JWT (the key
+    is a content hash) and send Accept headers DRF would reject.
+    """
+    entry = TTSCacheEntry.objects.filter(key=key).first()
+    if entry is None or not default_storage.exists(entry.storage_name):
+        raise Http404('Audio not found')
+
+    etag = f'"{entry.key}"'
+    cache_control = f'public, max-age={settings.TTS_AUDIO_MAX_AGE_SECONDS}, immutable'
+    if request.headers.get('If-None-Match') == etag:
+        response = HttpResponseNotModified()
+    else:
+        response = FileResponse(default_storage.open(entry.storage_name, 'rb'), content_type='audio/mpeg')
+    response['ETag'] = etag
+    response['Cache-Control'] = cache_control
+    return response
@@ -0,0 +1,397 @@
+"""
+Upload Sessions - Resumable chunked audio uploads
+Chunks are appended at their byte offset to a part file, so a recording
+interrupted on a 2G/3G link resumes from the last acknowledged byte instead
+of restarting. While chunks arrive, complete silence-bounded speech chunks
+are transcribed in the background and cached by their PCM hash, so
+finalizing only has to transcribe the tail of the recording.
+"""
+import hashlib
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import Dict, List, Optional
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+from .audio_processing import AudioConversionError, frame_energy, pcm_duration
+from .audio_store import audio_store
+from .audio_validation import HEADER_BYTES, AudioValidationError, validate_audio, validate_header
+from .audio_workers import audio_pool
+from .models import AudioUploadSession, CaseSubmission
+from .transcription_cache import audio_fingerprint, transcription_cache
+
+logger = logging.getLogger(__name__)
+
+# Containers that can be decoded before the whole file has arrived
+# (MP4/M4A usually keep their index at the end of the file)
+STREAMABLE_FORMATS = {'wav', 'mp3', 'ogg', 'opus', 'webm', 'flac', 'aac'}
+
+HASH_BLOCK_SIZE = 64 * 1024
+
+
+class UploadSessionError(Exception):
+    """Rejected chunk or finalize request (carries the HTTP status to return)"""
+
+    def __init__(self, message: str, status_code: int = 400, **extra):
+        super().__init__(message)
+        self.status_code = status_code
+        self.extra = extra
+
+
+def part_path(session: AudioUploadSession) -> str:
+    """Where received bytes for a session are kept until finalize"""
+    return os.path.join(settings.UPLOAD_SESSION_DIR, f'{session.id}.part')
+
+
+def is_expired(session: AudioUploadSession) -> bool:
+    return session.updated_at < timezone.now() - timedelta(hours=settings.UPLOAD_SESSION_TTL_HOURS)
+
+
+def _hash_range(path: str, offset: int, size: int) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as part_file:
+        part_file.seek(offset)
+        remaining = size
+        while remaining > 0:
+            block = part_file.read(min(HASH_BLOCK_SIZE, remaining))
+            if not block:
+                break
+            digest.update(block)
+            remaining -= len(block)
+    return digest.hexdigest()
+
+
+def append_chunk(session_id, offset: int, chunk, checksum: str = '') -> Dict:
+    """
+    Append one uploaded chunk at its offset
+
+    Chunks must arrive in order: a chunk starting past the received bytes
+    is rejected with the offset to resume from, and a re-sent chunk that
+    was already stored (lost acknowledgement) is accepted as a no-op.
+
+    Args:
+        session_id: Upload session id
+        offset: Byte offset of the chunk in the file
+        chunk: Django UploadedFile holding the chunk bytes
+        checksum: SHA-256 hex digest of the chunk (verified when given)
+
+    Returns:
+        Dict with received_bytes, total_size, status and duplicate
+    """
+    with transaction.atomic():
+        session = AudioUploadSession.objects.select_for_update().get(id=session_id)
+
+        if session.status in (AudioUploadSession.Status.FINALIZED, AudioUploadSession.Status.EXPIRED):
+            raise UploadSessionError(f'Upload session is {session.status.lower()}', 410)
+        if is_expired(session):
+            # prune_upload_sessions marks it EXPIRED and removes the part file
+            raise UploadSessionError('Upload session expired, start a new one', 410)
+        if chunk.size > settings.UPLOAD_CHUNK_MAX_BYTES:
+            raise UploadSessionError(
+                f'Chunk larger than {settings.UPLOAD_CHUNK_MAX_BYTES} bytes', 413
+            )
+        if offset < 0 or offset + chunk.size > session.total_size:
+            raise UploadSessionError('Chunk extends past the announced file size')
+
+        path = part_path(session)
+        checksum = (checksum or '').lower()
+
+        # Re-sent chunk whose acknowledgement was lost
+        if offset + chunk.size <= session.received_bytes:
+            if checksum and _hash_range(path, offset, chunk.size) != checksum:
+                raise UploadSessionError(
+                    'Chunk differs from bytes already received at this offset', 409,
+                    received_bytes=session.received_bytes
+                )
+            return _progress(session, duplicate=True)
+
+        if offset != session.received_bytes:
+            raise UploadSessionError(
+                f'Expected chunk at offset {session.received_bytes}', 409,
+                received_bytes=session.received_bytes
+            )
+
+        os.makedirs(settings.UPLOAD_SESSION_DIR, exist_ok=True)
+        digest = hashlib.sha256()
+        with open(path, 'r+b' if os.path.exists(path) else 'w+b') as part_file:
+            # Drop bytes from a write that failed before it was acknowledged
+            part_file.truncate(offset)
+            part_file.seek(offset)
+            for block in chunk.chunks():
+                digest.update(block)
+                part_file.write(block)
+
+            if checksum and digest.hexdigest() != checksum:
+                part_file.truncate(offset)
+                raise UploadSessionError(
+                    'Chunk checksum mismatch', 400,
+                    received_bytes=session.received_bytes
+                )
+            
+            # Reject non-audio / out-of-limits files on their first chunk
+            if offset == 0:
+                part_file.seek(0)
+                try:
+                    validate_header(part_file.read(HEADER_BYTES), session.filename)
+                except AudioValidationError as e:
+                    part_file.truncate(0)
+                    raise UploadSessionError(str(e), e.status_code, received_bytes=0)
+
+        session.received_bytes = offset + chunk.size
+        if session.received_bytes == session.total_size:
+            session.status = AudioUploadSession.Status.COMPLETE
+        session.save(update_fields=['received_bytes', 'status', 'updated_at'])
+
+    if settings.UPLOAD_EARLY_TRANSCRIPTION and session.status == AudioUploadSession.Status.OPEN:
+        schedule_early_transcription(session)
+
+    return _progress(session, duplicate=False)
+
+
+def _progress(session: AudioUploadSession, duplicate: bool) -> Dict:
+    return {
+        'upload_id': str(session.id),
+        'received_bytes': session.received_bytes,
+        'total_size': session.total_size,
+        'status': session.status,
+        'duplicate': duplicate,
+    }
+
+
+def claim_for_finalize(session_id, user) -> AudioUploadSession:
+    """
+    Mark a complete session as finalized and create its CaseSubmission
+    (or reuse the one of an attempt that was released after failing)
+    Done in its own transaction so the row lock is not held during processing
+    """
+    with transaction.atomic():
+        session = AudioUploadSession.objects.select_for_update().get(id=session_id)
+
+        if session.status == AudioUploadSession.Status.FINALIZED:
+            raise UploadSessionError(
+                'Upload already finalized', 409,
+                submission_id=session.case_submission_id
+            )
+        if session.status != AudioUploadSession.Status.COMPLETE:
+            raise UploadSessionError(
+                f'Upload incomplete: {session.received_bytes}/{session.total_size} bytes received', 409,
+                received_bytes=session.received_bytes
+            )
+
+        path = part_path(session)
+        if session.checksum and _hash_range(path, 0, session.total_size) != session.checksum.lower():
+            raise UploadSessionError('File checksum mismatch, upload again', 400)
+
+        try:
+            probe = validate_audio(path)
+        except AudioValidationError as e:
+            raise UploadSessionError(str(e), e.status_code)
+
+        if session.case_submission is not None:
+            submission = session.case_submission
+            submission.status = 'PROCESSING'
+            submission.error_message = ''
+            submission.save(update_fields=['status', 'error_message'])
+        else:
+            session.case_submission = CaseSubmission.objects.create(
+                patient=session.patient,
+                submitted_by=user,
+                language=session.language,
+                audio_duration=probe['duration'],
+                status='PROCESSING'
+            )
+        session.status = AudioUploadSession.Status.FINALIZED
+        session.save(update_fields=['case_submission', 'status', 'updated_at'])
+    return session
+
+
+def release_claim(session: AudioUploadSession) -> bool:
+    """
+    Reopen a session whose finalize failed before the recording was stored,
+    so finalizing again can claim it (its CaseSubmission is reused)
+
+    Returns:
+        True if the session can be finalized again
+    """
+    if not os.path.exists(part_path(session)):
+        return False  # Already in the audio store and attached to the submission
+    AudioUploadSession.objects.filter(
+        id=session.id, status=AudioUploadSession.Status.FINALIZED
+    ).update(status=AudioUploadSession.Status.COMPLETE, updated_at=timezone.now())
+    return True
+
+
+def store_recording(session: AudioUploadSession) -> str:
+    """
+    Move the assembled part file into the audio store (streamed, not read
+    into memory; a recording uploaded before is not stored twice)
+
+    Returns:
+        Local filesystem path of the stored recording
+    """
+    path = part_path(session)
+    blob = audio_store.store(path, session.filename)
+    os.remove(path)
+
+    audio_store.attach(session.case_submission, blob, update_fields=[])
+    return default_storage.path(blob.storage_name)
+
+
+# Early transcription runs on a small per-process thread pool
+
+_early_executor = None
+_early_lock = threading.Lock()
+_early_pending = {}  # session id -> True if more bytes arrived while a pass was running
+
+
+def schedule_early_transcription(session: AudioUploadSession):
+    """Queue a background pass over the bytes received so far (one at a time per session)"""
+    global _early_executor
+
+    extension = os.path.splitext(session.filename)[1].lstrip('.').lower()
+    if extension not in STREAMABLE_FORMATS:
+        return
+
+    with _early_lock:
+        if session.id in _early_pending:
+            _early_pending[session.id] = True
+            return
+        _early_pending[session.id] = False
+        if _early_executor is None:
+            _early_executor = ThreadPoolExecutor(
+                max_workers=settings.UPLOAD_EARLY_TRANSCRIPTION_WORKERS,
+                thread_name_prefix='upload-transcribe'
+            )
+    _early_executor.submit(_early_transcription_loop, session.id, part_path(session), session.language)
+
+
+def _early_transcription_loop(session_id, path: str, language: str):
+    while True:
+        try:
+            transcribe_received(path, language)
+        except Exception as e:
+            logger.warning(f"Early transcription for upload {session_id} failed: {e}")
+        with _early_lock:
+            if _early_pending.get(session_id):
+                _early_pending[session_id] = False
+                continue
+            _early_pending.pop(session_id, None)
+            return
+
+
+def transcribe_received(path: str, language: str) -> int:
+    """
+    Transcribe the speech chunks of a partial upload that can no longer change
+
+    split_on_silence places each cut using only audio up to the next
+    SPEECH_CHUNK_MAX_SECONDS, so every chunk but the last one of a prefix is
+    identical in the finished recording and its cached result is reused.
+
+    Returns:
+        Number of chunks newly transcribed
+    """
+    if not os.path.exists(path):
+        return 0
+    try:
+        pcm = audio_pool.decode(path)
+    except AudioConversionError:
+        return 0  # Not decodable yet (e.g. header still missing), or the pool is busy
+
+    chunks = _split(pcm)[:-1]
+    transcribed = 0
+    for chunk in chunks:
+        if _is_silent(chunk['pcm']):
+            continue
+        fingerprint = audio_fingerprint(chunk['pcm'])
+        if transcription_cache.lookup(fingerprint, language, 'chunk', record_hit=False) is None:
+            _transcribe_chunk(chunk['pcm'], fingerprint, language)
+            transcribed += 1
+    if transcribed:
+        logger.info(f"Early-transcribed {transcribed} chunk(s) of {os.path.basename(path)}")
+    return transcribed
+
+
+def transcribe_recording(audio_path: str, language: str) -> Optional[Dict]:
+    """
+    Stitch a transcript for the finished recording from per-chunk results,
+    reusing chunks transcribed while the upload was in progress
+
+    Returns:
+        Transcription result in the usual ASR shape, or None if any speech
+        chunk could not be transcribed (caller falls back to the full pipeline)
+    """
+    try:
+        pcm = audio_pool.decode(audio_path)
+    except AudioConversionError as e:
+        logger.warning(f"Cannot stitch transcript, audio not decodable: {e}")
+        return None
+
+    chunks = [chunk for chunk in _split(pcm) if not _is_silent(chunk['pcm'])]
+    if not chunks:
+        return None
+
+    def resolve(chunk):
+        fingerprint = audio_fingerprint(chunk['pcm'])
+        cached = transcription_cache.lookup(fingerprint, language, 'chunk')
+        if cached is not None:
+            return cached, True
+        return _transcribe_chunk(chunk['pcm'], fingerprint, language), False
+
+    workers = min(settings.SPEECH_CHUNK_WORKERS, len(chunks))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='upload-stitch') as executor:
+        resolved = list(executor.map(resolve, chunks))
+
+    parts = []
+    for chunk, (result, reused) in zip(chunks, resolved):
+        if result.get('error') or not result.get('transcription'):
+            logger.warning(f"Chunk at {chunk['start_seconds']}s not transcribed, using full pipeline")
+            return None
+        parts.append({
+            'start_seconds': chunk['start_seconds'],
+            'duration_seconds': round(chunk['duration'], 2),
+            'transcription': result['transcription'],
+            'confidence': result.get('confidence', 0.0),
+            'provider': result.get('provider'),
+            'reused': reused,  # Transcribed while uploading (or by an earlier upload)
+        })
+
+    total = sum(part['duration_seconds'] for part in parts) or 1.0
+    text = ' '.join(part['transcription'] for part in parts)
+    stitched = {
+        'success': True,
+        'transcription': text,
+        'original_transcription': text,
+        'language_detected': resolved[0][0].get('language_detected', language),
+        'confidence': round(sum(p['confidence'] * p['duration_seconds'] for p in parts) / total, 3),
+        'duration_seconds': pcm_duration(pcm),
+        'provider': 'chunked',
+        'chunks': parts,
+        'audio_fingerprint': audio_fingerprint(pcm),
+        'cache_hit': False,
+    }
+    # A later submit-case retry of the same recording hits the case cache
+    transcription_cache.store(stitched['audio_fingerprint'], language, 'case', stitched, pcm_duration(pcm), 0.0)
+    return stitched
+
+
+def _split(pcm: bytes) -> List[Dict]:
+    return audio_pool.split(pcm, settings.SPEECH_CHUNK_MAX_SECONDS, settings.SPEECH_CHUNK_MIN_SECONDS)
+
+
+def _is_silent(pcm: bytes) -> bool:
+    """No frame reaches the minimum speech energy"""
+    _, energy = frame_energy(pcm)
+    return len(energy) == 0 or float(energy.max()) < settings.VAD_MIN_ENERGY
+
+
+def _transcribe_chunk(pcm: bytes, fingerprint: str, language: str) -> Dict:
+    from .asr_router import asr_router
+
+    result = asr_router.transcribe(None, language, pcm)
+    if not result.get('error') and result.get('transcription'):
+        transcription_cache.store(fingerprint, language, 'chunk', result, pcm_duration(pcm), 0.0)
+    return result
@@ -0,0 +1,218 @@
+"""
+AI Engine Upload Views - Resumable chunked audio upload API
+
+Flow:
+1. POST   upload-sessions/                 -> upload_id
+2. PUT    upload-sessions/<id>/chunk/      (offset + checksum per chunk)
+3. GET    upload-sessions/<id>/            -> received_bytes to resume from
+4. POST   upload-sessions/<id>/finalize/   -> CaseSubmission + AI analysis
+"""
+import os
+import logging
+from django.conf import settings
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes, parser_classes
+from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from .models import AudioUploadSession
+from .upload_sessions import (
+    UploadSessionError, append_chunk, claim_for_finalize, is_expired, release_claim,
+    store_recording, transcribe_recording
+)
+from .audio_workers import audio_pool
+from .views import audio_busy_response, run_case_submission
+from patients.models import Patient
+
+logger = logging.getLogger(__name__)
+
+
+def _get_session(request, upload_id):
+    return AudioUploadSession.objects.filter(id=upload_id, created_by=request.user).first()
+
+
+def _session_response(session: AudioUploadSession) -> dict:
+    return {
+        'upload_id': str(session.id),
+        'status': session.status,
+        'received_bytes': session.received_bytes,
+        'total_size': session.total_size,
+        'chunk_max_bytes': settings.UPLOAD_CHUNK_MAX_BYTES,
+        'expired': is_expired(session),
+        'submission_id': session.case_submission_id,
+    }
+
+
+def _error_response(error: UploadSessionError) -> Response:
+    return Response({'error': str(error), **error.extra}, status=error.status_code)
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+@parser_classes([JSONParser, FormParser, MultiPartParser])
+def create_upload_session(request):
+    """
+    Start a resumable audio upload
+
+    Accepts:
+    - patient_id (required)
+    - filename (required, .wav/.mp3/.m4a/.ogg)
+    - total_size (required, bytes)
+    - language (optional, default 'en')
+    - checksum (optional, SHA-256 of the whole file)
+    """
+    patient_id = request.data.get('patient_id')
+    filename = os.path.basename(str(request.data.get('filename', '')))
+    language = request.data.get('language', 'en')
+    checksum = request.data.get('checksum', '')
+
+    try:
+        total_size = int(request.data.get('total_size', 0))
+    except (TypeError, ValueError):
+        total_size = 0
+
+    if not patient_id or not filename or total_size <= 0:
+        return Response(
+            {'error': 'patient_id, filename and total_size are required'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    if not isinstance(language, str) or not 0 < len(language) <= AudioUploadSession._meta.get_field('language').max_length:
+        return Response({'error': f'Invalid language: {language}'}, status=status.HTTP_400_BAD_REQUEST)
+    if not isinstance(checksum, str) or len(checksum) > AudioUploadSession._meta.get_field('checksum').max_length:
+        return Response({'error': 'checksum must be a SHA-256 hex digest'}, status=status.HTTP_400_BAD_REQUEST)
+
+    extension = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+    if extension not in settings.ALLOWED_AUDIO_FORMATS:
+        return Response(
+            {'error': f'Unsupported audio format: {extension or filename}'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    if total_size > settings.MAX_AUDIO_FILE_SIZE:
+        return Response(
+            {'error': f'Audio file too large (max {settings.MAX_AUDIO_FILE_SIZE} bytes)'},
+            status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+        )
+
+    try:
+        patient = Patient.objects.get(id=patient_id)
+    except Patient.DoesNotExist:
+        return Response(
+            {'error': f'Patient {patient_id} not found'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+
+    session = AudioUploadSession.objects.create(
+        created_by=request.user,
+        patient=patient,
+        language=language,
+        filename=filename,
+        total_size=total_size,
+        checksum=checksum.lower()
+    )
+    logger.info(f"Upload session {session.id} started ({total_size} bytes, {filename})")
+
+    return Response(_session_response(session), status=status.HTTP_201_CREATED)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def upload_session_status(request, upload_id):
+    """Resume point for an interrupted upload (received_bytes)"""
+    session = _get_session(request, upload_id)
+    if not session:
+        return Response({'error': 'Upload session not found'}, status=status.HTTP_404_NOT_FOUND)
+    return Response(_session_response(session))
+
+
+@api_view(['PUT', 'POST'])
+@permission_classes([IsAuthenticated])
+@parser_classes([MultiPartParser, FormParser])
+def upload_chunk(request, upload_id):
+    """
+    Append one chunk
+
+    Accepts (multipart):
+    - chunk (required, file part with the bytes)
+    - offset (required, byte offset of the chunk)
+    - checksum (recommended, SHA-256 hex of the chunk)
+
+    409 responses include received_bytes - resume from there.
+    """
+    session = _get_session(request, upload_id)
+    if not session:
+        return Response({'error': 'Upload session not found'}, status=status.HTTP_404_NOT_FOUND)
+
+    chunk = request.FILES.get('chunk')
+    try:
+        offset = int(request.data.get('offset'))
+    except (TypeError, ValueError):
+        offset = None
+
+    if chunk is None or offset is None:
+        return Response(
+            {'error': 'chunk and offset are required'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    try:
+        progress = append_chunk(session.id, offset, chunk, request.data.get('checksum', ''))
+    except UploadSessionError as e:
+        return _error_response(e)
+
+    return Response(progress)
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+@parser_classes([JSONParser, FormParser, MultiPartParser])
+def finalize_upload(request, upload_id):
+    """
+    Assemble the recording into a CaseSubmission and run the AI pipeline
+    Speech chunks transcribed during the upload are reused
+
+    Accepts:
+    - transcription (optional, used if audio transcription fails)
+    """
+    session = _get_session(request, upload_id)
+    if not session:
+        return Response({'error': 'Upload session not found'}, status=status.HTTP_404_NOT_FOUND)
+
+    # Checked before claiming, so the session can simply be finalized again later
+    if not audio_pool.has_capacity():
+        return audio_busy_response()
+
+    try:
+        session = claim_for_finalize(session.id, request.user)
+    except UploadSessionError as e:
+        return _error_response(e)
+
+    try:
+        audio_path = store_recording(session)
+
+        transcription_result = None
+        if settings.UPLOAD_EARLY_TRANSCRIPTION:
+            transcription_result = transcribe_recording(audio_path, session.language)
+
+        return run_case_submission(
+            session.case_submission,
+            audio_path=audio_path,
+            transcription=request.data.get('transcription'),
+            user=request.user,
+            transcription_result=transcription_result
+        )
+
+    except Exception as e:
+        logger.error(f"Finalizing upload {session.id} failed: {e}", exc_info=True)
+        submission = session.case_submission
+        submission.status = 'FAILED'
+        submission.error_message = str(e)
+        submission.save(update_fields=['status', 'error_message'])
+        # Recording not stored yet: let the client finalize again
+        retryable = release_claim(session)
+        return Response(
+            {'error': str(e), 'submission_id': submission.id, 'retryable': retryable},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
@@ -4,9 +4,12 @@ AI Engine URL Configuration
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import (
-    CaseSubmissionViewSet, submit_case, transcribe_only, health_check, translate_text,
+    CaseSubmissionViewSet, submit_case, transcribe_only, health_check, translate_text, translate_batch,
     override_triage_score, override_referral_hospital, flag_incorrect_decision, my_overrides
 )
+from .upload_views import create_upload_session, upload_session_status, upload_chunk, finalize_upload
+from .live_intake_views import start_live_intake, live_intake_status, upload_live_segment, finish_live_intake
+from .tts_views import synthesize_speech, tts_audio
 
 router = DefaultRouter()
 router.register(r'submissions', CaseSubmissionViewSet, basename='case-submission')
@@ -16,7 +19,21 @@ urlpatterns = [
     path('submit-case/', submit_case, name='submit-case'),
     path('transcribe/', transcribe_only, name='transcribe-only'),
     path('translate/', translate_text, name='translate-text'),
+    path('translate/batch/', translate_batch, name='translate-batch'),
     path('health/', health_check, name='ai-health-check'),
+    # Resumable chunked audio upload
+    path('upload-sessions/', create_upload_session, name='upload-session-create'),
+    path('upload-sessions/<uuid:upload_id>/', upload_session_status, name='upload-session-status'),
+    path('upload-sessions/<uuid:upload_id>/chunk/', upload_chunk, name='upload-session-chunk'),
+    path('upload-sessions/<uuid:upload_id>/finalize/', finalize_upload, name='upload-session-finalize'),
+    # Live intake (transcription and symptom extraction during recording)
+    path('live-intake/', start_live_intake, name='live-intake-start'),
+    path('live-intake/<uuid:intake_id>/', live_intake_status, name='live-intake-status'),
+    path('live-intake/<uuid:intake_id>/segments/', upload_live_segment, name='live-intake-segment'),
+    path('live-intake/<uuid:intake_id>/finish/', finish_live_intake, name='live-intake-finish'),
+    # Spoken first-aid instructions (cached text-to-speech)
+    path('tts/', synthesize_speech, name='tts-synthesize'),
+    path('tts/<str:key>.mp3', tts_audio, name='tts-audio'),
     # Override endpoints
     path('override/triage/', override_triage_score, name='override-triage'),
     path('override/hospital/', override_referral_hospital, name='override-hospital'),
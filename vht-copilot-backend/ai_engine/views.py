@@ -6,6 +6,7 @@ from rest_framework.decorators import api_view, permission_classes, parser_class
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
+from django.conf import settings
 from django.core.files.storage import default_storage
 from django.utils import timezone
 import os
@@ -13,6 +14,11 @@ import os
 from .models import CaseSubmission, AIDecisionOverride
 from .serializers import CaseSubmissionSerializer, AIDecisionOverrideSerializer
 from .agent_runner import agent_runner
+from .audio_store import audio_store
+from .audio_workers import audio_pool
+from .audio_validation import (
+    AudioValidationError, audio_upload_error, install_audio_upload_handlers, validate_audio
+)
 from patients.models import Patient
 
 import logging
@@ -39,6 +45,75 @@ class CaseSubmissionViewSet(viewsets.ReadOnlyModelViewSet):
         return queryset
 
 
+def audio_busy_response() -> Response:
+    """503 for audio uploads while the audio worker pool is saturated"""
+    return Response(
+        {'error': 'Audio processing is busy, please retry shortly'},
+        status=status.HTTP_503_SERVICE_UNAVAILABLE,
+        headers={'Retry-After': str(max(1, round(settings.AUDIO_WORKER_QUEUE_WAIT_SECONDS)))}
+    )
+
+
+def run_case_submission(
+    submission: CaseSubmission,
+    audio_path: str = None,
+    transcription: str = None,
+    user=None,
+    transcription_result: dict = None,
+    symptom_analysis: dict = None
+) -> Response:
+    """
+    Run a saved submission through the AI agent and record the outcome
+    Shared by submit_case, the resumable upload finalize endpoint and
+    the live intake finish endpoint
+    """
+    # Process through AI agent
+    logger.info(f"Processing case submission {submission.id}")
+    result = agent_runner.process_case(
+        audio_file_path=audio_path,
+        transcription_text=transcription,
+        patient=submission.patient,
+        user=user,
+        language=submission.language,
+        transcription_result=transcription_result,
+        symptom_analysis=symptom_analysis
+    )
+    
+    # Update submission
+    submission.audio_fingerprint = result.get('audio_fingerprint') or submission.audio_fingerprint
+    if result['success']:
+        submission.status = 'COMPLETED'
+        submission.transcription = result.get('transcription', '')
+        submission.translation_confidence = result.get('translation_confidence', 0.0)
+        submission.triage_result = {
+            'triage_score': result.get('triage_score'),
+            'confidence_score': result.get('confidence_score'),
+            'condition_detected': result.get('condition_detected'),
+            'is_emergency': result.get('emergency'),
+            'recommended_specialty': result.get('recommended_specialty'),
+            'first_aid_steps': result.get('first_aid_steps'),
+            'reasoning_summary': result.get('reasoning_summary'),
+        }
+        submission.validation_result = result.get('validation', {})
+        submission.completed_at = timezone.now()
+    else:
+        submission.status = 'FAILED'
+        submission.error_message = result.get('error', 'Unknown error')
+    
+    submission.save()
+    
+    # Clean up audio file if needed (optional - keep for audit)
+    # if audio_path and os.path.exists(audio_path):
+    #     os.remove(audio_path)
+    
+    # Return result
+    return Response({
+        'success': result['success'],
+        'submission_id': submission.id,
+        'result': result
+    }, status=status.HTTP_200_OK if result['success'] else status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 @parser_classes([MultiPartParser, FormParser, JSONParser])
@@ -56,12 +131,19 @@ def submit_case(request):
     - Complete AI analysis with referral decision
     """
     try:
+        # Audio is checked while it streams in (before request.data is parsed)
+        install_audio_upload_handlers(request)
+        
         # Extract data
         patient_id = request.data.get('patient_id')
         audio_file = request.FILES.get('audio_file')
         transcription = request.data.get('transcription')
         language = request.data.get('language', 'en')
         
+        upload_error = audio_upload_error(request)
+        if upload_error:
+            return Response({'error': str(upload_error)}, status=upload_error.status_code)
+        
         # Validate
         if not patient_id:
             return Response(
@@ -84,66 +166,41 @@ def submit_case(request):
                 status=status.HTTP_404_NOT_FOUND
             )
         
+        # Turn audio away early instead of queueing it behind a saturated pool
+        if audio_file and not audio_pool.has_capacity():
+            return audio_busy_response()
+        
+        # Probe decode before anything is stored or sent to a speech provider
+        audio_probe = {}
+        if audio_file:
+            try:
+                audio_probe = validate_audio(audio_file.temporary_file_path())
+            except AudioValidationError as e:
+                return Response({'error': str(e)}, status=e.status_code)
+        
         # Create submission record
         submission = CaseSubmission.objects.create(
             patient=patient,
             submitted_by=request.user,
             language=language,
+            audio_duration=audio_probe.get('duration'),
             status='PROCESSING'
         )
         
-        # Save audio file if provided
+        # Save audio file if provided (identical re-submissions share one stored copy)
         audio_path = None
         if audio_file:
-            filename = f"case_{submission.id}_{audio_file.name}"
-            audio_path = default_storage.save(f'case_audio/{filename}', audio_file)
-            submission.audio_file = audio_path
-            submission.save()
-            audio_path = default_storage.path(audio_path)
-        
-        # Process through AI agent
-        logger.info(f"Processing case submission {submission.id}")
-        result = agent_runner.process_case(
-            audio_file_path=audio_path,
-            transcription_text=transcription,
-            patient=patient,
-            user=request.user,
-            language=language
+            blob = audio_store.store(audio_file.temporary_file_path(), audio_file.name)
+            audio_store.attach(submission, blob, update_fields=[])
+            audio_path = default_storage.path(blob.storage_name)
+        
+        return run_case_submission(
+            submission,
+            audio_path=audio_path,
+            transcription=transcription,
+            user=request.user
         )
         
-        # Update submission
-        if result['success']:
-            submission.status = 'COMPLETED'
-            submission.transcription = result.get('transcription', '')
-            submission.translation_confidence = result.get('translation_confidence', 0.0)
-            submission.triage_result = {
-                'triage_score': result.get('triage_score'),
-                'confidence_score': result.get('confidence_score'),
-                'condition_detected': result.get('condition_detected'),
-                'is_emergency': result.get('emergency'),
-                'recommended_specialty': result.get('recommended_specialty'),
-                'first_aid_steps': result.get('first_aid_steps'),
-                'reasoning_summary': result.get('reasoning_summary'),
-            }
-            submission.validation_result = result.get('validation', {})
-            submission.completed_at = timezone.now()
-        else:
-            submission.status = 'FAILED'
-            submission.error_message = result.get('error', 'Unknown error')
-        
-        submission.save()
-        
-        # Clean up audio file if needed (optional - keep for audit)
-        # if audio_path and os.path.exists(audio_path):
-        #     os.remove(audio_path)
-        
-        # Return result
-        return Response({
-            'success': result['success'],
-            'submission_id': submission.id,
-            'result': result
-        }, status=status.HTTP_200_OK if result['success'] else status.HTTP_500_INTERNAL_SERVER_ERROR)
-        
     except Exception as e:
         logger.error(f"Case submission failed: {e}", exc_info=True)
         return Response(
@@ -159,8 +216,15 @@ def transcribe_only(request):
     Endpoint for audio transcription only (no triage)
     """
     try:
+        install_audio_upload_handlers(request)
+        
         audio_file = request.FILES.get('audio_file')
         language = request.data.get('language', 'en')
+        include_original = str(request.data.get('include_original', '')).lower() == 'true'
+        
+        upload_error = audio_upload_error(request)
+        if upload_error:
+            return Response({'error': str(upload_error)}, status=upload_error.status_code)
         
         if not audio_file:
             return Response(
@@ -168,18 +232,28 @@ def transcribe_only(request):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Save temporarily
-        filename = f"temp_{audio_file.name}"
-        audio_path = default_storage.save(f'temp_audio/{filename}', audio_file)
-        audio_path = default_storage.path(audio_path)
+        if not audio_pool.has_capacity():
+            return audio_busy_response()
         
-        # Transcribe
-        from .whisper_service import whisper_service
-        result = whisper_service.transcribe_audio(audio_path, language)
+        # Transcribe straight from the upload's temporary file (removed after the request)
+        audio_path = audio_file.temporary_file_path()
+        try:
+            validate_audio(audio_path)
+        except AudioValidationError as e:
+            return Response({'error': str(e)}, status=e.status_code)
         
-        # Clean up
-        if os.path.exists(audio_path):
-            os.remove(audio_path)
+        # Transcribe (retries of the same recording are served from the cache)
+        from .whisper_service import whisper_service
+        from .transcription_cache import transcription_cache
+        need_original = include_original or settings.WHISPER_KEEP_ORIGINAL_TRANSCRIPT
+        result = transcription_cache.transcribe(
+            audio_path,
+            language,
+            'whisper+original' if need_original else 'whisper',
+            lambda pcm: whisper_service.transcribe_audio(
+                audio_path, language, need_original=need_original, pcm=pcm
+            )
+        )
         
         return Response(result)
         
@@ -196,20 +270,60 @@ def transcribe_only(request):
 def health_check(request):
     """Check AI engine health"""
     from .rag_engine import rag_engine
+    from .transcription_cache import transcription_cache
+    from .asr_router import asr_router
+    from .tts_cache import tts_cache
+    from .medical_glossary import medical_glossary
+    from .translation_memory import translation_memory
+    from .translate_service import free_translate_service
+    from .translation_router import translation_router
+    from core.routing import road_network
+    from referrals.capacity import capacity_ledger
+    from referrals.surge import surge_assigner
+    from core.spatial_index import hospital_index
+    from core.village_candidates import village_candidates
     
     return Response({
         'status': 'healthy',
         'rag_initialized': rag_engine.is_initialized,
-        'openai_configured': bool(agent_runner.whisper.api_key)
+        'openai_configured': bool(agent_runner.whisper.api_key),
+        'whisper_upload_stats': agent_runner.whisper.stats,
+        'transcription_cache_stats': transcription_cache.get_stats(),
+        'asr_provider_stats': asr_router.get_stats(),
+        'audio_worker_stats': audio_pool.get_stats(),
+        'tts_cache_stats': tts_cache.get_stats(),
+        'medical_glossary_stats': medical_glossary.get_stats(),
+        'translation_memory_stats': translation_memory.get_stats(),
+        'argos_translate_stats': free_translate_service.get_stats(),
+        'translation_router_stats': translation_router.get_stats(),
+        'hospital_index_stats': hospital_index.get_stats(),
+        'village_candidate_stats': village_candidates.get_stats(),
+        'road_network_stats': road_network.get_stats(),
+        'capacity_ledger_stats': capacity_ledger.get_stats(),
+        'surge_assignment_stats': surge_assigner.get_stats()
     })
 
 
+def _invalid_languages(source_language, target_language):
+    """400 response unless both codes are translation languages (en, lg, sw)"""
+    from .groq_translate_service import LANGUAGE_NAMES
+    
+    for field, code in (('source_language', source_language), ('target_language', target_language)):
+        if not isinstance(code, str) or code not in LANGUAGE_NAMES:
+            return Response(
+                {'error': f'{field} must be one of {", ".join(LANGUAGE_NAMES)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+    return None
+
+
 @api_view(['POST'])
 @permission_classes([AllowAny])  # Allow unauthenticated for real-time translation during recording
 def translate_text(request):
     """
     Real-time English ↔ Luganda translation endpoint
-    Uses GROQ LLM (100% FREE, 7k requests/day)
+    Uses GROQ LLM (100% FREE, 7k requests/day), or the offline Argos models
+    when GROQ is over budget, rate limited or slow
     """
     try:
         text = request.data.get('text')
@@ -221,13 +335,16 @@ def translate_text(request):
                 {'error': 'text is required'},
                 status=status.HTTP_400_BAD_REQUEST
             )
+        language_error = _invalid_languages(source_language, target_language)
+        if language_error:
+            return language_error
         
-        # Use GROQ LLM for translation (FREE, 7k requests/day)
+        # GROQ LLM (FREE, 7k requests/day), offline Argos when over budget, rate limited or slow
         try:
-            from .groq_translate_service import groq_translate_service
+            from .translation_router import translation_router
             
-            logger.info(f"Translating with GROQ: '{text[:50]}...' ({source_language} to {target_language})")
-            result = groq_translate_service.translate(
+            logger.info(f"Translating: '{text[:50]}...' ({source_language} to {target_language})")
+            result = translation_router.translate(
                 text=text,
                 target_language=target_language,
                 source_language=source_language
@@ -254,6 +371,47 @@ def translate_text(request):
         )
 
 
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def translate_batch(request):
+    """
+    Translate a list of strings (first-aid steps, summaries, notifications)
+    in one GROQ call instead of one request per string (one batched Argos
+    call when GROQ is over budget, rate limited or slow)
+    
+    Body:
+    - texts (required, list of strings)
+    - target_language (optional, default 'lg')
+    - source_language (optional, default 'en')
+    """
+    texts = request.data.get('texts')
+    target_language = request.data.get('target_language', 'lg')
+    source_language = request.data.get('source_language', 'en')
+    
+    if not isinstance(texts, list) or not texts:
+        return Response(
+            {'error': 'texts must be a non-empty list'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if len(texts) > settings.TRANSLATE_BATCH_MAX_ITEMS:
+        return Response(
+            {'error': f'At most {settings.TRANSLATE_BATCH_MAX_ITEMS} texts per batch'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    language_error = _invalid_languages(source_language, target_language)
+    if language_error:
+        return language_error
+    
+    from .translation_router import translation_router
+    
+    result = translation_router.translate_batch(
+        texts,
+        target_language=target_language,
+        source_language=source_language
+    )
+    return Response(result)
+
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def override_triage_score(request):
@@ -6,8 +6,14 @@ INTEGRATION NEEDED:
 - OpenAI API Key in settings
 """
 import logging
-from typing import Dict
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
 from django.conf import settings
+from .audio_processing import AudioConversionError
+from .audio_workers import audio_pool
 
 logger = logging.getLogger(__name__)
 
@@ -16,30 +22,46 @@ class WhisperService:
     """
     OpenAI Whisper API service for audio transcription
     Supports multilingual transcription and translation
+    
+    Upload modes (WHISPER_UPLOAD_MODE):
+    - 'single': decide up front which output is needed and upload once;
+      both requests run concurrently only when the original-language
+      transcript is really required
+    - 'legacy': transcribe, then upload again to translate non-English audio
     """
     
     def __init__(self):
         self.api_key = settings.OPENAI_API_KEY
         self.model = settings.WHISPER_MODEL
+        self.upload_mode = settings.WHISPER_UPLOAD_MODE
+        self._stats_lock = threading.Lock()
+        self.stats = {}
     
     def transcribe_audio(
         self, 
         audio_file_path: str, 
-        language: str = None
+        language: str = None,
+        need_original: bool = None,
+        pcm: bytes = None
     ) -> Dict:
         """
-Transcribe audio file using OpenAI Whisper API
+        Transcribe audio file using OpenAI Whisper API
         
         Args:
-            audio_file_path: Path to audio file (.wav, .mp3, .m4a)
+            audio_file_path: Path to audio file (.wav, .mp3, .m4a), or None with pcm
             language: Optional language hint ('en', 'lg', 'sw')
+            need_original: Also return the original-language transcript for
+                non-English audio (default: WHISPER_KEEP_ORIGINAL_TRANSCRIPT)
+            pcm: Already-decoded 16 kHz mono PCM (skips decoding the file)
         
         Returns:
             Dict with:
-                - transcription: Transcribed text
+                - transcription: English text (translated if needed)
+                - original_transcription: Original-language text (if requested)
                 - language_detected: Detected language code
                 - confidence: Translation confidence (0-1)
-                - duration: Audio duration in seconds
+                - duration_seconds: Audio duration in seconds
+                - upload_mode / uploads / upload_bytes / latency_seconds
         """
         try:
             if not self.api_key:
@@ -52,49 +74,42 @@ Transcribe audio file using OpenAI Whisper API
                     'error': 'OpenAI API key not configured'
                 }
             
+            if need_original is None:
+                need_original = settings.WHISPER_KEEP_ORIGINAL_TRANSCRIPT
+            
             # OpenAI Whisper API - NOW ACTIVE
             from openai import OpenAI
             client = OpenAI(api_key=self.api_key)
             
             logger.info(f"Processing audio file with Whisper: {audio_file_path}")
             
-            with open(audio_file_path, 'rb') as audio_file:
-                # Transcribe
-                transcription_response = client.audio.transcriptions.create(
-                    model=self.model,
-                    file=audio_file,
-                    language=language,
-                    response_format="verbose_json"
-                )
-            
-            detected_language = transcription_response.language
-            transcription_text = transcription_response.text
-            duration = transcription_response.duration
-            
-            # Calculate confidence (Whisper doesn't provide this directly)
-            # Use heuristic based on language match
-            confidence = 0.9 if detected_language == language else 0.7
+            upload = self._prepare_upload(audio_file_path, pcm)
+            audio_bytes = upload[1]
             
-            # If not English, translate to English
-            translation = transcription_text
-            if detected_language != 'en':
-                with open(audio_file_path, 'rb') as audio_file:
-                    translation_response = client.audio.translations.create(
-                        model=self.model,
-                        file=audio_file
-                    )
-                    translation = translation_response.text
-                    confidence = 0.75  # Lower confidence for translation
+            started = time.monotonic()
+            if self.upload_mode == 'legacy':
+                mode = 'legacy'
+                result, uploads = self._transcribe_legacy(client, upload, language)
+            else:
+                requests = self._plan_requests(language, need_original)
+                mode = '+'.join(requests)
+                result = self._run_requests(client, upload, language, requests)
+                uploads = len(requests)
+            latency = time.monotonic() - started
             
-            logger.info(f"Transcription complete: {transcription_text[:50]}...")
+            result.update({
+                'upload_mode': mode,
+                'uploads': uploads,
+                'upload_bytes': uploads * len(audio_bytes),
+                'latency_seconds': round(latency, 3),
+            })
+            self._record(mode, uploads, uploads * len(audio_bytes), latency)
             
-            return {
-                'transcription': translation if detected_language != 'en' else transcription_text,
-                'original_transcription': transcription_text,
-                'language_detected': detected_language,
-                'confidence': confidence,
-                'duration_seconds': duration
-            }
+            logger.info(
+                f"Transcription complete ({mode}, {uploads} upload(s), "
+                f"{uploads * len(audio_bytes)} bytes, {latency:.2f}s): {result['transcription'][:50]}..."
+            )
+            return result
             
         except Exception as e:
             logger.error(f"Whisper transcription failed: {e}")
@@ -106,11 +121,157 @@ Transcribe audio file using OpenAI Whisper API
                 'error': str(e)
             }
     
+    def _prepare_upload(self, audio_file_path: str, pcm: bytes = None):
+        """
+        Build the (filename, bytes) upload, preferring the VAD-trimmed audio
+        re-encoded as Ogg/Opus when that is smaller than the original file
+        
+        audio_file_path may be None when only PCM is available (e.g. one
+        chunk of a resumable upload); the PCM is then always encoded
+        """
+        if audio_file_path is None:
+            if settings.VAD_ENABLED:
+                pcm = audio_pool.preprocess(pcm)['pcm']
+            return ('audio.ogg', audio_pool.encode(pcm, bitrate=settings.WHISPER_UPLOAD_BITRATE))
+        
+        with open(audio_file_path, 'rb') as audio_file:
+            original = (os.path.basename(audio_file_path), audio_file.read())
+        
+        if not settings.VAD_ENABLED:
+            return original
+        
+        try:
+            if pcm is None:
+                pcm = audio_pool.decode(audio_file_path)
+            speech = audio_pool.preprocess(pcm)
+            trimmed = audio_pool.encode(speech['pcm'], bitrate=settings.WHISPER_UPLOAD_BITRATE)
+        except (AudioConversionError, ImportError) as e:
+            logger.warning(f"Uploading original audio, preprocessing failed: {e}")
+            return original
+        
+        if len(trimmed) >= len(original[1]):
+            return original
+        
+        stem = os.path.splitext(original[0])[0]
+        logger.info(f"Uploading trimmed audio: {len(original[1])} -> {len(trimmed)} bytes")
+        return (f"{stem}.ogg", trimmed)
+    
+    @staticmethod
+    def _plan_requests(language: str, need_original: bool) -> List[str]:
+        """
+        Decide up front which Whisper endpoints are needed
+        The translations endpoint returns English for English audio too, so a
+        single translation upload covers any language when only English is needed
+        """
+        if language == 'en':
+            return ['transcription']
+        if need_original:
+            return ['transcription', 'translation']
+        return ['translation']
+    
+    def _run_requests(self, client, upload, language: str, requests: List[str]) -> Dict:
+        calls = {
+            'transcription': lambda: client.audio.transcriptions.create(
+                model=self.model,
+                file=upload,
+                language=language,
+                response_format="verbose_json"
+            ),
+            'translation': lambda: client.audio.translations.create(
+                model=self.model,
+                file=upload,
+                response_format="verbose_json"
+            ),
+        }
+        
+        if len(requests) == 1:
+            responses = {requests[0]: calls[requests[0]]()}
+        else:
+            # Both outputs required: upload in parallel instead of back to back
+            with ThreadPoolExecutor(max_workers=len(requests)) as executor:
+                futures = {name: executor.submit(calls[name]) for name in requests}
+                responses = {name: future.result() for name, future in futures.items()}
+        
+        transcription_response = responses.get('transcription')
+        translation_response = responses.get('translation')
+        
+        if transcription_response is not None:
+            detected_language = transcription_response.language
+            original_text = transcription_response.text
+            duration = transcription_response.duration
+        else:
+            detected_language = language or 'unknown'
+            original_text = None
+            duration = getattr(translation_response, 'duration', None)
+        
+        if translation_response is not None and detected_language not in ('en', 'english'):
+            text = translation_response.text
+            confidence = 0.75  # Lower confidence for translation
+        else:
+            text = original_text
+            # Whisper doesn't provide confidence; use heuristic based on language match
+            confidence = 0.9 if detected_language == language else 0.7
+        
+        return {
+            'transcription': text,
+            'original_transcription': original_text,
+            'language_detected': detected_language,
+            'confidence': confidence,
+            'duration_seconds': duration
+        }
+    
+    def _transcribe_legacy(self, client, upload, language: str):
+        """Original flow: transcribe, then upload again to translate non-English audio"""
+        transcription_response = client.audio.transcriptions.create(
+            model=self.model,
+            file=upload,
+            language=language,
+            response_format="verbose_json"
+        )
+        
+        detected_language = transcription_response.language
+        transcription_text = transcription_response.text
+        confidence = 0.9 if detected_language == language else 0.7
+        uploads = 1
+        
+        translation = transcription_text
+        if detected_language != 'en':
+            translation_response = client.audio.translations.create(
+                model=self.model,
+                file=upload
+            )
+            translation = translation_response.text
+            confidence = 0.75
+            uploads = 2
+        
+        return {
+            'transcription': translation,
+            'original_transcription': transcription_text,
+            'language_detected': detected_language,
+            'confidence': confidence,
+            'duration_seconds': transcription_response.duration
+        }, uploads
+    
+    def _record(self, mode: str, uploads: int, upload_bytes: int, latency: float):
+        """Accumulate upload bytes and latency per mode"""
+        with self._stats_lock:
+            stats = self.stats.setdefault(mode, {
+                'calls': 0,
+                'uploads': 0,
+                'upload_bytes': 0,
+                'latency_seconds': 0.0,
+            })
+            stats['calls'] += 1
+            stats['uploads'] += uploads
+            stats['upload_bytes'] += upload_bytes
+            stats['latency_seconds'] = round(stats['latency_seconds'] + latency, 3)
+    
     def validate_audio_file(self, file_path: str) -> bool:
         """
-        Validate audio file format and size
+        Validate audio file format, size, duration and sample rate
+        (uploads are already checked while streaming, see audio_validation)
         """
-        import os
+        from .audio_validation import HEADER_BYTES, AudioValidationError, validate_audio, validate_header
         
         if not os.path.exists(file_path):
             return False
@@ -120,13 +281,15 @@ Transcribe audio file using OpenAI Whisper API
             logger.error(f"Audio file too large: {file_size} bytes")
             return False
         
-        extension = file_path.split('.')[-1].lower()
-        if extension not in settings.ALLOWED_AUDIO_FORMATS:
-            logger.error(f"Invalid audio format: {extension}")
+        try:
+            with open(file_path, 'rb') as audio_file:
+                validate_header(audio_file.read(HEADER_BYTES), os.path.basename(file_path))
+            validate_audio(file_path)
+        except AudioValidationError as e:
+            logger.error(f"Invalid audio file {file_path}: {e}")
             return False
         
         return True
 
-
 # Singleton instance
 whisper_service = WhisperService()
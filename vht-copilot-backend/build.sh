@@ -5,6 +5,18 @@ set -o errexit
 # Install dependencies
 pip install -r requirements.txt
 
+# Offline translation fallback: Argos Translate and its language packages
+if [ "${SKIP_OFFLINE_TRANSLATION:-false}" = "true" ]; then
+  echo "WARNING: SKIP_OFFLINE_TRANSLATION=true - no Argos fallback, translation depends on GROQ alone"
+else
+  pip install -r requirements-translation.txt
+fi
+if python -c "import argostranslate" 2>/dev/null; then
+  python manage.py install_translation_packages
+else
+  echo "WARNING: argostranslate is not installed - the offline translation fallback is disabled"
+fi
+
 # Collect static files
 python manage.py collectstatic --no-input
 
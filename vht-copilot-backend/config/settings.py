@@ -200,6 +200,10 @@ OPENAI_API_KEY = os.getenv('OPENAI_API_KEY', '')
 OPENAI_MODEL = os.getenv('OPENAI_MODEL', 'gpt-4o-mini')
 OPENAI_TEMPERATURE = float(os.getenv('OPENAI_TEMPERATURE', '0.2'))
 WHISPER_MODEL = os.getenv('WHISPER_MODEL', 'whisper-1')
+# 'single' uploads each recording once (two concurrent requests only when the
+# original-language transcript is needed); 'legacy' transcribes then re-uploads to translate
+WHISPER_UPLOAD_MODE = os.getenv('WHISPER_UPLOAD_MODE', 'single')
+WHISPER_KEEP_ORIGINAL_TRANSCRIPT = os.getenv('WHISPER_KEEP_ORIGINAL_TRANSCRIPT', 'false').lower() == 'true'
 
 # Groq Configuration (Free tier alternative for testing)
 GROQ_API_KEY = os.getenv('GROQ_API_KEY', '')
@@ -210,6 +214,12 @@ GROQ_TEMPERATURE = float(os.getenv('GROQ_TEMPERATURE', '0.2'))
 USE_LOCAL_EMBEDDINGS = os.getenv('USE_LOCAL_EMBEDDINGS', 'false').lower() == 'true'
 USE_GROQ_LLM = os.getenv('USE_GROQ_LLM', 'false').lower() == 'true'
 
+# Shared Embedding Service (one local model per host, see run_embedding_service)
+EMBEDDING_SERVICE_SOCKET = os.getenv('EMBEDDING_SERVICE_SOCKET', '')
+EMBEDDING_BATCH_WINDOW_MS = int(os.getenv('EMBEDDING_BATCH_WINDOW_MS', '10'))
+EMBEDDING_MAX_BATCH_SIZE = int(os.getenv('EMBEDDING_MAX_BATCH_SIZE', '64'))
+EMBEDDING_SERVICE_TIMEOUT = float(os.getenv('EMBEDDING_SERVICE_TIMEOUT', '10'))
+
 # ChromaDB Configuration
 CHROMA_PERSIST_DIRECTORY = os.getenv('CHROMA_PERSIST_DIRECTORY', str(BASE_DIR / 'chroma_data'))
 CHROMA_COLLECTION_NAME = os.getenv('CHROMA_COLLECTION_NAME', 'uganda_moh_guidelines')
@@ -222,6 +232,142 @@ EMERGENCY_CONFIDENCE_THRESHOLD = float(os.getenv('EMERGENCY_CONFIDENCE_THRESHOLD
 MAX_AUDIO_FILE_SIZE = int(os.getenv('MAX_AUDIO_FILE_SIZE', '10485760'))  # 10MB
 ALLOWED_AUDIO_FORMATS = os.getenv('ALLOWED_AUDIO_FORMATS', 'wav,mp3,m4a,ogg').split(',')
 
+# Audio Decoding (ffmpeg from PATH unless FFMPEG_BINARY is set)
+FFMPEG_BINARY = os.getenv('FFMPEG_BINARY', '')
+FFMPEG_TIMEOUT_SECONDS = int(os.getenv('FFMPEG_TIMEOUT_SECONDS', '60'))
+
+# Process pool for CPU-bound audio work (per web server process; 0 = run in the request thread)
+AUDIO_WORKER_PROCESSES = int(os.getenv('AUDIO_WORKER_PROCESSES', '2'))
+AUDIO_WORKER_QUEUE_SIZE = int(os.getenv('AUDIO_WORKER_QUEUE_SIZE', '8'))  # Tasks waiting beyond the running ones
+AUDIO_WORKER_QUEUE_WAIT_SECONDS = float(os.getenv('AUDIO_WORKER_QUEUE_WAIT_SECONDS', '5'))
+AUDIO_WORKER_TIMEOUT_SECONDS = int(os.getenv('AUDIO_WORKER_TIMEOUT_SECONDS', '120'))
+
+# Upload validation (checked while the file streams in, before it is stored)
+AUDIO_MAX_DURATION_SECONDS = int(os.getenv('AUDIO_MAX_DURATION_SECONDS', '600'))  # 10 minutes
+AUDIO_MIN_DURATION_SECONDS = float(os.getenv('AUDIO_MIN_DURATION_SECONDS', '0.5'))
+AUDIO_MIN_SAMPLE_RATE = int(os.getenv('AUDIO_MIN_SAMPLE_RATE', '8000'))
+AUDIO_MAX_SAMPLE_RATE = int(os.getenv('AUDIO_MAX_SAMPLE_RATE', '48000'))
+AUDIO_PROBE_TIMEOUT_SECONDS = int(os.getenv('AUDIO_PROBE_TIMEOUT_SECONDS', '10'))
+
+# Voice Activity Trimming (runs before every speech recognition provider)
+VAD_ENABLED = os.getenv('VAD_ENABLED', 'true').lower() == 'true'
+VAD_FRAME_MS = int(os.getenv('VAD_FRAME_MS', '30'))
+VAD_THRESHOLD_RATIO = float(os.getenv('VAD_THRESHOLD_RATIO', '3.0'))  # Speech = energy above noise floor x ratio
+VAD_MIN_ENERGY = float(os.getenv('VAD_MIN_ENERGY', '150'))
+VAD_PADDING_MS = int(os.getenv('VAD_PADDING_MS', '200'))
+VAD_MAX_PAUSE_MS = int(os.getenv('VAD_MAX_PAUSE_MS', '700'))
+WHISPER_UPLOAD_BITRATE = os.getenv('WHISPER_UPLOAD_BITRATE', '24k')  # Opus bitrate for trimmed uploads
+
+# Chunked transcription for long recordings (free Google Web Speech API)
+SPEECH_CHUNK_MAX_SECONDS = float(os.getenv('SPEECH_CHUNK_MAX_SECONDS', '15'))
+SPEECH_CHUNK_MIN_SECONDS = float(os.getenv('SPEECH_CHUNK_MIN_SECONDS', '5'))
+SPEECH_CHUNK_WORKERS = int(os.getenv('SPEECH_CHUNK_WORKERS', '6'))
+SPEECH_CHUNK_RETRIES = int(os.getenv('SPEECH_CHUNK_RETRIES', '2'))  # Extra attempts per failed chunk
+
+# Transcription cache (dedupes retried uploads by decoded-audio fingerprint)
+TRANSCRIPTION_CACHE_ENABLED = os.getenv('TRANSCRIPTION_CACHE_ENABLED', 'true').lower() == 'true'
+TRANSCRIPTION_CACHE_RETENTION_DAYS = int(os.getenv('TRANSCRIPTION_CACHE_RETENTION_DAYS', '30'))
+
+# Speech recognition provider routing (local, google, whisper)
+ASR_PROVIDERS = [p.strip() for p in os.getenv('ASR_PROVIDERS', 'local,google,whisper').split(',') if p.strip()]
+ASR_ROUTING = os.getenv('ASR_ROUTING', 'latency')  # 'latency' (fastest measured first) or 'fixed' (ASR_PROVIDERS order)
+ASR_MIN_CONFIDENCE = float(os.getenv('ASR_MIN_CONFIDENCE', '0.6'))  # Below this, try the next provider
+ASR_LATENCY_EWMA_ALPHA = float(os.getenv('ASR_LATENCY_EWMA_ALPHA', '0.3'))
+ASR_FAILURE_THRESHOLD = int(os.getenv('ASR_FAILURE_THRESHOLD', '2'))  # Consecutive failures before cooldown
+ASR_COOLDOWN_SECONDS = int(os.getenv('ASR_COOLDOWN_SECONDS', '120'))
+
+# Offline CPU speech recognition (Vosk model directory, e.g. vosk-model-small-en-us-0.15)
+VOSK_MODEL_PATH = os.getenv('VOSK_MODEL_PATH', '')
+LOCAL_ASR_LANGUAGES = [l.strip() for l in os.getenv('LOCAL_ASR_LANGUAGES', 'en').split(',') if l.strip()]
+
+# Resumable chunked audio uploads
+UPLOAD_SESSION_DIR = os.getenv('UPLOAD_SESSION_DIR', str(MEDIA_ROOT / 'upload_sessions'))
+UPLOAD_CHUNK_MAX_BYTES = int(os.getenv('UPLOAD_CHUNK_MAX_BYTES', '1048576'))  # 1MB
+UPLOAD_SESSION_TTL_HOURS = int(os.getenv('UPLOAD_SESSION_TTL_HOURS', '24'))
+UPLOAD_EARLY_TRANSCRIPTION = os.getenv('UPLOAD_EARLY_TRANSCRIPTION', 'true').lower() == 'true'
+UPLOAD_EARLY_TRANSCRIPTION_WORKERS = int(os.getenv('UPLOAD_EARLY_TRANSCRIPTION_WORKERS', '2'))
+
+# Content-addressed audio storage (paths relative to MEDIA_ROOT; mount a
+# cheaper disk at the cold prefix to keep archived audio off the main volume)
+AUDIO_STORE_PREFIX = os.getenv('AUDIO_STORE_PREFIX', 'case_audio/blobs')
+AUDIO_COLD_PREFIX = os.getenv('AUDIO_COLD_PREFIX', 'cold_audio')
+AUDIO_ARCHIVE_AFTER_DAYS = int(os.getenv('AUDIO_ARCHIVE_AFTER_DAYS', '30'))
+AUDIO_ARCHIVE_BITRATE = os.getenv('AUDIO_ARCHIVE_BITRATE', '16k')  # Opus, 16 kHz mono speech
+
+# Local medical glossary for translation (JSON list of {"en": ..., "lg": ..., "sw": ...} extends the built-in terms)
+MEDICAL_GLOSSARY_ENABLED = os.getenv('MEDICAL_GLOSSARY_ENABLED', 'true').lower() == 'true'
+MEDICAL_GLOSSARY_PATH = os.getenv('MEDICAL_GLOSSARY_PATH', '')
+
+# Translation memory (GROQ translations reused for repeated phrases)
+TRANSLATION_MEMORY_ENABLED = os.getenv('TRANSLATION_MEMORY_ENABLED', 'true').lower() == 'true'
+TRANSLATION_MEMORY_LRU_SIZE = int(os.getenv('TRANSLATION_MEMORY_LRU_SIZE', '2000'))  # Entries per process
+TRANSLATION_MEMORY_MAX_CHARS = int(os.getenv('TRANSLATION_MEMORY_MAX_CHARS', '500'))  # Longer text is not remembered
+TRANSLATION_MEMORY_RETENTION_DAYS = int(os.getenv('TRANSLATION_MEMORY_RETENTION_DAYS', '90'))
+TRANSLATION_MEMORY_VERSION = os.getenv('TRANSLATION_MEMORY_VERSION', '1')  # Bump to stop reusing older translations
+
+# Batch translation (one GROQ call per list of strings)
+TRANSLATE_BATCH_MAX_ITEMS = int(os.getenv('TRANSLATE_BATCH_MAX_ITEMS', '50'))
+TRANSLATE_BATCH_MAX_CHARS = int(os.getenv('TRANSLATE_BATCH_MAX_CHARS', '6000'))  # Per LLM call; larger batches are split
+TRANSLATE_BATCH_MAX_TOKENS = int(os.getenv('TRANSLATE_BATCH_MAX_TOKENS', '4000'))
+TRANSLATE_BATCH_RETRIES = int(os.getenv('TRANSLATE_BATCH_RETRIES', '1'))  # Re-requests for lines missing from the response
+
+# In-memory hospital spatial index (nearest-facility matching)
+HOSPITAL_INDEX_CELL_DEGREES = float(os.getenv('HOSPITAL_INDEX_CELL_DEGREES', '0.1'))  # Grid cell size (~11 km)
+HOSPITAL_INDEX_MAX_AGE_SECONDS = int(os.getenv('HOSPITAL_INDEX_MAX_AGE_SECONDS', '300'))  # Rebuild to see other workers' changes
+VILLAGE_CANDIDATES_PER_TIER = int(os.getenv('VILLAGE_CANDIDATES_PER_TIER', '10'))  # Stored nearest hospitals per village and tier
+
+# Offline road routing (graph compiled from an OSM extract by build_road_network;
+# without the file travel times fall back to the straight-line estimate)
+ROAD_NETWORK_PATH = os.getenv('ROAD_NETWORK_PATH', str(BASE_DIR / 'data' / 'road_network.npz'))
+ROAD_SPEED_OVERRIDES = {  # e.g. "track=20,ferry=10" (km/h per OSM highway class)
+    road_class.strip(): float(speed)
+    for road_class, speed in (
+        item.split('=', 1) for item in os.getenv('ROAD_SPEED_OVERRIDES', '').split(',') if '=' in item
+    )
+}
+ROAD_ACCESS_SPEED_KMH = float(os.getenv('ROAD_ACCESS_SPEED_KMH', '10'))  # From a point to its nearest road node
+ROUTING_MAX_SNAP_KM = float(os.getenv('ROUTING_MAX_SNAP_KM', '10'))  # Further from any road counts as unreachable
+ROUTING_MAX_MINUTES = float(os.getenv('ROUTING_MAX_MINUTES', '360'))  # Search cutoff
+ROUTING_CANDIDATES = int(os.getenv('ROUTING_CANDIDATES', '5'))  # Nearest hospitals the matcher re-ranks by road time
+
+# Surge mode: urgent referrals gathered over a short window and assigned together
+# (also switched on for a while from POST /api/referrals/surge/, stored in the database).
+# Batches are gathered per worker process: needs threaded workers (gunicorn --threads)
+SURGE_MODE = os.getenv('SURGE_MODE', 'false').lower() == 'true'
+SURGE_URGENCY_LEVELS = [level.strip() for level in os.getenv('SURGE_URGENCY_LEVELS', 'URGENT,HIGH_RISK').split(',')]
+SURGE_BATCH_WINDOW_SECONDS = float(os.getenv('SURGE_BATCH_WINDOW_SECONDS', '5'))
+SURGE_BATCH_MAX_SIZE = int(os.getenv('SURGE_BATCH_MAX_SIZE', '200'))  # Assign at once when this many are waiting
+SURGE_CANDIDATES = int(os.getenv('SURGE_CANDIDATES', '10'))  # Quickest hospitals considered per case (widened if all full)
+SURGE_SPECIALTY_PENALTY_MINUTES = float(os.getenv('SURGE_SPECIALTY_PENALTY_MINUTES', '60'))  # Hospital lacks the specialty
+SURGE_LOAD_PENALTY_MINUTES = float(os.getenv('SURGE_LOAD_PENALTY_MINUTES', '30'))  # Cost of a hospital's last free place
+
+# Offline Argos translation (packages installed at build time by install_translation_packages;
+# there are no published Luganda packages - install custom .argosmodel files for en-lg / lg-en)
+ARGOS_TRANSLATION_PAIRS = [
+    tuple(pair.strip().split('-', 1))
+    for pair in os.getenv('ARGOS_TRANSLATION_PAIRS', 'en-lg,lg-en,en-sw,sw-en').split(',')
+    if '-' in pair
+]
+ARGOS_PRELOAD = os.getenv('ARGOS_PRELOAD', 'true').lower() == 'true'  # Load models when each worker starts
+
+# GROQ / Argos routing (counter uses the default cache: per process unless CACHES is shared)
+GROQ_TRANSLATE_DAILY_BUDGET = int(os.getenv('GROQ_TRANSLATE_DAILY_BUDGET', '6000'))  # Free tier allows 7k requests/day
+GROQ_RATE_LIMIT_COOLDOWN_SECONDS = int(os.getenv('GROQ_RATE_LIMIT_COOLDOWN_SECONDS', '60'))  # Argos only after a 429
+TRANSLATE_GROQ_MAX_LATENCY_SECONDS = float(os.getenv('TRANSLATE_GROQ_MAX_LATENCY_SECONDS', '3'))  # Slower GROQ -> Argos
+TRANSLATE_LATENCY_PROBE_SECONDS = int(os.getenv('TRANSLATE_LATENCY_PROBE_SECONDS', '60'))  # Re-try a slow GROQ this often
+TRANSLATE_LATENCY_EWMA_ALPHA = float(os.getenv('TRANSLATE_LATENCY_EWMA_ALPHA', '0.3'))
+
+# Text-to-speech cache for spoken first-aid instructions (paths relative to MEDIA_ROOT)
+TTS_CACHE_PREFIX = os.getenv('TTS_CACHE_PREFIX', 'tts_cache')
+TTS_CACHE_MAX_BYTES = int(os.getenv('TTS_CACHE_MAX_BYTES', str(200 * 1024 * 1024)))  # Unpinned entries evicted LRU beyond this
+TTS_DEFAULT_VOICE = os.getenv('TTS_DEFAULT_VOICE', 'FEMALE')
+TTS_MAX_TEXT_CHARS = int(os.getenv('TTS_MAX_TEXT_CHARS', '1000'))
+TTS_AUDIO_MAX_AGE_SECONDS = int(os.getenv('TTS_AUDIO_MAX_AGE_SECONDS', str(365 * 24 * 3600)))
+
+# Live intake (segments transcribed and analysed while the VHT records)
+LIVE_INTAKE_SEGMENT_MAX_SECONDS = int(os.getenv('LIVE_INTAKE_SEGMENT_MAX_SECONDS', '30'))
+LIVE_INTAKE_SESSION_TTL_HOURS = int(os.getenv('LIVE_INTAKE_SESSION_TTL_HOURS', '2'))
+
 # Celery Configuration
 CELERY_BROKER_URL = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
 CELERY_RESULT_BACKEND = 'django-db'
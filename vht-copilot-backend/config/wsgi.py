@@ -8,3 +8,19 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
 application = get_wsgi_application()
+
+# Load the offline translation models as each worker starts, so the first
+# request does not pay for it; the models are shared by the worker's threads
+# (gunicorn --threads). Do not run gunicorn with --preload: CTranslate2
+# thread pools do not survive fork.
+from django.conf import settings  # noqa: E402
+
+if settings.ARGOS_PRELOAD:
+    from ai_engine.translate_service import free_translate_service  # noqa: E402
+
+    free_translate_service.load()
+
+# Likewise load the road network (when built) before the first referral
+from core.routing import road_network  # noqa: E402
+
+road_network.load()
@@ -8,3 +8,6 @@ class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
     verbose_name = 'Core System'
+    
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,81 @@
+"""
+Geo - Great-circle distance kernels
+Haversine distance on a sphere of radius 6371 km, for one pair of points
+(haversine_km) or as a single NumPy array operation for one point against
+many (distances_km) or many against many (distance_matrix_km).
+
+Accuracy against the WGS-84 geodesic (geopy.distance.geodesic) for points
+inside Uganda (latitude -1.5..4.3, longitude 29.5..35.1), 3,000 random pairs:
+- relative error -0.12% .. +0.57% (mean +0.23%); sign depends on bearing,
+  north-south distances read long and east-west ones short
+- absolute error at most 0.11 km on pairs up to 25 km apart and 3.5 km on
+  the longest (~820 km) pairs
+This is well inside the error of straight-line travel estimates, and the
+ranking of nearby facilities is unchanged in practice.
+
+`python manage.py benchmark_geo` re-measures accuracy and speed.
+"""
+from math import asin, cos, radians, sin, sqrt
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0
+
+# Straight-line travel estimate
+AVERAGE_SPEED_KMH = 30
+MIN_TRAVEL_MINUTES = 15
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Distance in km between two points (plain floats, no NumPy overhead)"""
+    lat1, lon1, lat2, lon2 = map(radians, (lat1, lon1, lat2, lon2))
+    a = sin((lat2 - lat1) / 2) ** 2 + cos(lat1) * cos(lat2) * sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * asin(min(1.0, sqrt(a)))
+
+
+def distances_km(latitude: float, longitude: float, latitudes, longitudes) -> np.ndarray:
+    """
+    Distance in km from one point to each of many
+
+    Args:
+        latitude, longitude: The single point (e.g. the patient)
+        latitudes, longitudes: Sequences or arrays of the other points
+
+    Returns:
+        Array with one distance per point
+    """
+    return _haversine(
+        np.radians(latitude), np.radians(longitude),
+        np.radians(np.asarray(latitudes, dtype=np.float64)),
+        np.radians(np.asarray(longitudes, dtype=np.float64))
+    )
+
+
+def distance_matrix_km(latitudes1, longitudes1, latitudes2, longitudes2) -> np.ndarray:
+    """
+    Distance in km between every pair of two point sets
+
+    Returns:
+        Array of shape (len(latitudes1), len(latitudes2))
+    """
+    lat1 = np.radians(np.asarray(latitudes1, dtype=np.float64))[:, np.newaxis]
+    lon1 = np.radians(np.asarray(longitudes1, dtype=np.float64))[:, np.newaxis]
+    lat2 = np.radians(np.asarray(latitudes2, dtype=np.float64))[np.newaxis, :]
+    lon2 = np.radians(np.asarray(longitudes2, dtype=np.float64))[np.newaxis, :]
+    return _haversine(lat1, lon1, lat2, lon2)
+
+
+def estimate_travel_minutes(distance_km):
+    """
+    Rough travel time for a straight-line distance (30 km/h average, at
+    least 15 minutes); accepts a float or an array
+    """
+    minutes = np.maximum(
+        MIN_TRAVEL_MINUTES, (np.asarray(distance_km, dtype=np.float64) / AVERAGE_SPEED_KMH * 60).astype(int)
+    )
+    return int(minutes) if minutes.ndim == 0 else minutes
+
+
+def _haversine(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """Broadcasting haversine on coordinates already in radians"""
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
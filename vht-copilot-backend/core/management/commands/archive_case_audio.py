@@ -0,0 +1,77 @@
+"""
+Django management command to apply the case audio retention tiers
+Moves recordings stored before content addressing into the audio store
+(deduplicating them), then transcodes recordings unused for
+AUDIO_ARCHIVE_AFTER_DAYS to Opus in the cold directory
+
+Usage: python manage.py archive_case_audio [--days 30] [--dry-run] [--skip-adopt]
+"""
+from django.core.management.base import BaseCommand
+from django.conf import settings
+from django.db.models import Count, Sum
+from ai_engine.audio_store import audio_store
+from ai_engine.models import AudioBlob, CaseSubmission, LiveIntakeSegment
+
+
+class Command(BaseCommand):
+    help = 'Deduplicate legacy case audio and archive recordings older than AUDIO_ARCHIVE_AFTER_DAYS to Opus'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=settings.AUDIO_ARCHIVE_AFTER_DAYS,
+            help='Archive recordings not used within this many days'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report what would be adopted and archived'
+        )
+        parser.add_argument(
+            '--skip-adopt',
+            action='store_true',
+            help='Do not move legacy case_audio/ files into the audio store'
+        )
+
+    def handle(self, *args, **options):
+        days = options['days']
+        legacy = [
+            CaseSubmission.objects.filter(audio_blob__isnull=True).exclude(audio_file='').exclude(audio_file__isnull=True),
+            LiveIntakeSegment.objects.filter(audio_blob__isnull=True).exclude(audio_file='').exclude(audio_file__isnull=True),
+        ]
+
+        if not options['skip_adopt']:
+            if options['dry_run']:
+                self.stdout.write(self.style.WARNING(
+                    f'Would adopt {sum(queryset.count() for queryset in legacy)} legacy recordings'
+                ))
+            else:
+                adopted = missing = freed = 0
+                for queryset in legacy:
+                    for instance in queryset.iterator():
+                        result = audio_store.adopt(instance)
+                        if result is None:
+                            missing += 1
+                        else:
+                            adopted += 1
+                            freed += result
+                self.stdout.write(
+                    f'📥 Adopted {adopted} legacy recordings ({missing} missing on disk), '
+                    f'freed {freed / 1024 / 1024:.1f} MB of duplicates'
+                )
+
+        summary = audio_store.archive_stale(days, dry_run=options['dry_run'])
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING(
+                f'Would archive {summary["archived"]} recordings unused for {days} days '
+                f'({summary["bytes_saved"] / 1024 / 1024:.1f} MB before transcoding)'
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f'✅ Archived {summary["archived"]} recordings to {settings.AUDIO_COLD_PREFIX}/ '
+                f'({summary["failed"]} failed), saved {summary["bytes_saved"] / 1024 / 1024:.1f} MB'
+            ))
+
+        for tier in AudioBlob.objects.values('tier').annotate(count=Count('id'), bytes=Sum('size')).order_by('tier'):
+            self.stdout.write(f'📦 {tier["tier"]}: {tier["count"]} recordings, {tier["bytes"] / 1024 / 1024:.1f} MB')
@@ -0,0 +1,72 @@
+"""
+Django management command to compare speech recognition providers
+Transcribes each file with every requested provider and reports latency,
+real-time factor, confidence and the transcript
+
+Usage: python manage.py benchmark_asr recording.wav [more.m4a] [--providers local,google,whisper]
+"""
+import os
+import time
+from django.core.management.base import BaseCommand, CommandError
+from ai_engine.asr_router import PRIOR_LATENCY, asr_router
+from ai_engine.audio_processing import AudioConversionError, decode_to_pcm, pcm_duration
+
+
+class Command(BaseCommand):
+    help = 'Benchmark speech recognition providers (latency, real-time factor, confidence)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('audio_files', nargs='+', type=str, help='Audio files to transcribe')
+        parser.add_argument(
+            '--providers',
+            type=str,
+            default='local',
+            help=f'Comma-separated providers: {", ".join(PRIOR_LATENCY)} (default: local, no network)'
+        )
+        parser.add_argument('--language', type=str, default='en', help='Language code')
+        parser.add_argument('--repeat', type=int, default=1, help='Runs per provider and file')
+
+    def handle(self, *args, **options):
+        names = [name.strip() for name in options['providers'].split(',') if name.strip()]
+        unknown = [name for name in names if name not in PRIOR_LATENCY]
+        if unknown:
+            raise CommandError(f'Unknown provider(s): {", ".join(unknown)}')
+
+        providers = asr_router._providers()
+        language = options['language']
+
+        for path in options['audio_files']:
+            if not os.path.exists(path):
+                raise CommandError(f'File not found: {path}')
+            try:
+                started = time.perf_counter()
+                pcm = decode_to_pcm(path)
+                decode_seconds = time.perf_counter() - started
+            except AudioConversionError as e:
+                raise CommandError(str(e))
+
+            duration = pcm_duration(pcm)
+            self.stdout.write(f'\n🎙️  {path} ({duration:.1f}s audio, decoded in {decode_seconds:.2f}s)')
+
+            for name in names:
+                service = providers[name]
+                if not asr_router._is_eligible(name, service, language):
+                    self.stdout.write(self.style.WARNING(f'   {name}: not available for {language}'))
+                    continue
+
+                for _ in range(max(1, options['repeat'])):
+                    started = time.perf_counter()
+                    if name == 'whisper':
+                        result = service.transcribe_audio(path, language, pcm=pcm)
+                    else:
+                        result = service.transcribe_audio(path, language=language, pcm=pcm)
+                    elapsed = time.perf_counter() - started
+
+                    if result.get('error'):
+                        self.stdout.write(self.style.ERROR(f'   {name}: ❌ {result["error"]} ({elapsed:.2f}s)'))
+                        continue
+                    self.stdout.write(
+                        f'   {name}: {elapsed:.2f}s (RTF {elapsed / duration if duration else 0:.2f}), '
+                        f'confidence {result.get("confidence", 0):.2f}'
+                    )
+                    self.stdout.write(f'      "{result["transcription"][:120]}"')
@@ -0,0 +1,93 @@
+"""
+Django management command to benchmark the distance kernels
+Times one patient against every hospital and many patients against every
+hospital with geopy's geodesic, the scalar haversine and the vectorized
+kernels in core/geo.py, and reports the haversine error against geodesic.
+
+Uses the Hospital table, or random points inside Uganda with --synthetic
+(or when the table is empty).
+
+Usage: python manage.py benchmark_geo [--patients 100] [--synthetic 6000] [--repeat 3]
+"""
+import time
+import numpy as np
+from django.core.management.base import BaseCommand
+from core.geo import distance_matrix_km, distances_km, haversine_km
+from core.models import Hospital
+
+# Uganda bounding box (latitude, longitude)
+UGANDA_MIN = (-1.5, 29.5)
+UGANDA_MAX = (4.3, 35.1)
+
+
+class Command(BaseCommand):
+    help = 'Benchmark geodesic vs scalar vs vectorized haversine distance scoring'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--patients', type=int, default=100, help='Patients for the many-to-many case')
+        parser.add_argument('--synthetic', type=int, default=0, help='Use this many random hospitals instead of the table')
+        parser.add_argument('--repeat', type=int, default=3, help='Runs per kernel (best is reported)')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        from geopy.distance import geodesic
+
+        rng = np.random.default_rng(options['seed'])
+        hospitals = [] if options['synthetic'] else list(Hospital.objects.values_list('latitude', 'longitude'))
+        if hospitals:
+            hospitals = np.array(hospitals, dtype=np.float64)
+            source = 'Hospital table'
+        else:
+            hospitals = rng.uniform(UGANDA_MIN, UGANDA_MAX, (options['synthetic'] or 6000, 2))
+            source = 'random points'
+        patients = rng.uniform(UGANDA_MIN, UGANDA_MAX, (max(1, options['patients']), 2))
+        h_lat, h_lon = hospitals[:, 0], hospitals[:, 1]
+        p_lat, p_lon = patients[0]
+
+        self.stdout.write(f'\n📍 {len(hospitals)} hospitals ({source}), {len(patients)} patients')
+
+        def best(run):
+            times = []
+            for _ in range(max(1, options['repeat'])):
+                started = time.perf_counter()
+                run()
+                times.append(time.perf_counter() - started)
+            return min(times)
+
+        # One patient against every hospital
+        geodesic_seconds = best(lambda: [geodesic((p_lat, p_lon), (lat, lon)).km for lat, lon in hospitals])
+        scalar_seconds = best(lambda: [haversine_km(p_lat, p_lon, lat, lon) for lat, lon in hospitals.tolist()])
+        vector_seconds = best(lambda: distances_km(p_lat, p_lon, h_lat, h_lon))
+        self.stdout.write('\n   1 patient × all hospitals')
+        self._row('geodesic (loop)', geodesic_seconds, geodesic_seconds)
+        self._row('haversine (loop)', scalar_seconds, geodesic_seconds)
+        self._row('haversine (vectorized)', vector_seconds, geodesic_seconds)
+
+        # Many patients against every hospital (geodesic extrapolated from the single-patient run)
+        scalar_seconds = best(lambda: [
+            [haversine_km(lat1, lon1, lat2, lon2) for lat2, lon2 in hospitals.tolist()]
+            for lat1, lon1 in patients.tolist()
+        ])
+        matrix_seconds = best(lambda: distance_matrix_km(patients[:, 0], patients[:, 1], h_lat, h_lon))
+        geodesic_seconds *= len(patients)
+        self.stdout.write(f'\n   {len(patients)} patients × all hospitals')
+        self._row('geodesic (loop, estimated)', geodesic_seconds, geodesic_seconds)
+        self._row('haversine (loop)', scalar_seconds, geodesic_seconds)
+        self._row('haversine (matrix)', matrix_seconds, geodesic_seconds)
+
+        # Accuracy against the WGS-84 geodesic
+        sample = min(len(hospitals), 2000)
+        exact = np.array([geodesic((p_lat, p_lon), (lat, lon)).km for lat, lon in hospitals[:sample]])
+        approx = distances_km(p_lat, p_lon, h_lat[:sample], h_lon[:sample])
+        mask = exact > 0
+        relative = (approx[mask] - exact[mask]) / exact[mask] * 100
+        self.stdout.write(
+            f'\n   haversine vs geodesic ({sample} pairs): relative error '
+            f'{relative.min():+.3f}% .. {relative.max():+.3f}% (mean {relative.mean():+.3f}%), '
+            f'max absolute {np.abs(approx - exact).max():.3f} km'
+        )
+
+    def _row(self, label: str, seconds: float, baseline: float):
+        self.stdout.write(
+            f'      {label:<28} {seconds * 1000:10.3f} ms   {baseline / seconds if seconds else 0:8.1f}x'
+        )
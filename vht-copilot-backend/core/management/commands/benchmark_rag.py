@@ -0,0 +1,263 @@
+"""
+Django management command to benchmark RAG retrieval quality and latency
+Runs every case in the fixture set against each embeddings backend and
+writes the results as JSON so runs can be compared across commits
+
+Usage: python manage.py benchmark_rag [--backends local,service] [--k 3]
+       python manage.py benchmark_rag --compare benchmark_results/rag_<commit>.json
+"""
+import json
+import os
+import subprocess
+import tempfile
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.conf import settings
+from django.utils import timezone
+from ai_engine.rag_engine import RAGEngine
+
+FIXTURE_DIR = os.path.join(settings.BASE_DIR, 'fixtures', 'rag_benchmark')
+BACKENDS = ['local', 'service', 'openai']
+
+
+def _rss_mb() -> float:
+    """Resident set size of this process in MB (Linux), 0 if unavailable"""
+    try:
+        with open('/proc/self/status') as status_file:
+            for line in status_file:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024.0
+    except OSError:
+        pass
+    return 0.0
+
+
+def _percentile(values, percentile):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(percentile / 100.0 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=settings.BASE_DIR,
+            stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return 'unknown'
+
+
+class Command(BaseCommand):
+    help = 'Benchmark RAG retrieval (recall@k, MRR, latency, memory, index build time) per embeddings backend'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--cases',
+            type=str,
+            default=os.path.join(FIXTURE_DIR, 'retrieval_cases.json'),
+            help='Fixture set of (symptoms, age, gender) -> expected guideline pages'
+        )
+        parser.add_argument(
+            '--pdf',
+            type=str,
+            default=os.path.join(FIXTURE_DIR, 'guidelines_fixture.pdf'),
+            help='Guideline PDF to index for the benchmark'
+        )
+        parser.add_argument(
+            '--backends',
+            type=str,
+            default=None,
+            help=f'Comma-separated embeddings backends: {", ".join(BACKENDS)} '
+                 '(default: local, plus service when EMBEDDING_SERVICE_SOCKET is set)'
+        )
+        parser.add_argument('--k', type=int, default=3, help='Number of chunks retrieved per query')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed repetitions per case')
+        parser.add_argument(
+            '--output',
+            type=str,
+            default=None,
+            help='Result JSON path (default: benchmark_results/rag_<commit>_<timestamp>.json)'
+        )
+        parser.add_argument(
+            '--compare',
+            type=str,
+            default=None,
+            help='Previous result JSON to print deltas against'
+        )
+        parser.add_argument(
+            '--allow-network',
+            action='store_true',
+            help='Allow model downloads / remote embeddings (offline by default)'
+        )
+
+    def handle(self, *args, **options):
+        if options['backends']:
+            backends = [b.strip() for b in options['backends'].split(',') if b.strip()]
+        else:
+            backends = ['local'] + (['service'] if settings.EMBEDDING_SERVICE_SOCKET else [])
+        unknown = [b for b in backends if b not in BACKENDS]
+        if unknown:
+            raise CommandError(f'Unknown backend(s): {", ".join(unknown)}')
+
+        if not options['allow_network']:
+            if 'openai' in backends:
+                raise CommandError('The openai backend needs --allow-network')
+            os.environ['HF_HUB_OFFLINE'] = '1'
+            os.environ['TRANSFORMERS_OFFLINE'] = '1'
+
+        for path in (options['cases'], options['pdf']):
+            if not os.path.exists(path):
+                raise CommandError(f'File not found: {path}')
+
+        with open(options['cases'], 'r', encoding='utf-8') as cases_file:
+            cases = json.load(cases_file)['cases']
+
+        self.stdout.write(f'\n{"="*70}')
+        self.stdout.write('📊 RAG RETRIEVAL BENCHMARK')
+        self.stdout.write(f'{"="*70}')
+        self.stdout.write(f'Cases: {len(cases)}  k: {options["k"]}  repeat: {options["repeat"]}')
+        self.stdout.write(f'PDF: {options["pdf"]}')
+        self.stdout.write(f'{"="*70}\n')
+
+        commit = _git_commit()
+        report = {
+            'git_commit': commit,
+            'created_at': timezone.now().isoformat(),
+            'k': options['k'],
+            'repeat': options['repeat'],
+            'case_count': len(cases),
+            'pdf': os.path.basename(options['pdf']),
+            'backends': {},
+        }
+
+        for backend in backends:
+            self.stdout.write(f'🔧 Backend: {backend}')
+            try:
+                report['backends'][backend] = self._run_backend(backend, cases, options)
+            except Exception as e:
+                self.stdout.write(self.style.ERROR(f'   ❌ {backend} failed: {e}'))
+                report['backends'][backend] = {'error': str(e)}
+                continue
+            self._print_summary(report['backends'][backend])
+
+        output = options['output']
+        if not output:
+            stamp = timezone.now().strftime('%Y%m%d%H%M%S')
+            output = os.path.join(settings.BASE_DIR, 'benchmark_results', f'rag_{commit}_{stamp}.json')
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        with open(output, 'w', encoding='utf-8') as output_file:
+            json.dump(report, output_file, indent=2)
+        self.stdout.write(self.style.SUCCESS(f'\n✅ Results written to {output}'))
+
+        if options['compare']:
+            self._print_comparison(report, options['compare'])
+
+    def _make_embeddings(self, backend):
+        from ai_engine.embedding_service import EmbeddingServiceClient, build_local_embeddings
+
+        if backend == 'local':
+            return build_local_embeddings()
+        if backend == 'service':
+            client = EmbeddingServiceClient()
+            if not client.is_available():
+                raise CommandError('Embedding service not running (see run_embedding_service)')
+            return client
+
+        from langchain_openai import OpenAIEmbeddings
+        return OpenAIEmbeddings(openai_api_key=settings.OPENAI_API_KEY)
+
+    def _run_backend(self, backend, cases, options):
+        rss_before = _rss_mb()
+
+        started = time.perf_counter()
+        embeddings = self._make_embeddings(backend)
+        model_load_seconds = time.perf_counter() - started
+
+        with tempfile.TemporaryDirectory(prefix=f'rag_bench_{backend}_') as persist_directory:
+            engine = RAGEngine(
+                collection_name=f'benchmark_{backend}',
+                persist_directory=persist_directory,
+                embeddings=embeddings,
+                top_k=options['k']
+            )
+            engine.initialize()
+            if not engine.is_initialized:
+                raise CommandError('RAG Engine failed to initialize (check logs)')
+
+            started = time.perf_counter()
+            if not engine.ingest_guidelines(options['pdf']):
+                raise CommandError('Failed to ingest fixture PDF (check logs)')
+            index_build_seconds = time.perf_counter() - started
+
+            latencies = []
+            per_case = []
+            recall_total = 0.0
+            reciprocal_rank_total = 0.0
+
+            for case in cases:
+                context = []
+                for _ in range(max(1, options['repeat'])):
+                    started = time.perf_counter()
+                    context = engine.retrieve_relevant_context(case['symptoms'], case['age'], case['gender'])
+                    latencies.append((time.perf_counter() - started) * 1000.0)
+
+                retrieved = [chunk.get('page_number') for chunk in context]
+                expected = set(case['expected_pages'])
+                hits = expected.intersection(retrieved)
+                recall = len(hits) / len(expected) if expected else 0.0
+                first_rank = next(
+                    (rank for rank, page in enumerate(retrieved, 1) if page in expected),
+                    None
+                )
+                reciprocal_rank = 1.0 / first_rank if first_rank else 0.0
+
+                recall_total += recall
+                reciprocal_rank_total += reciprocal_rank
+                per_case.append({
+                    'id': case.get('id'),
+                    'retrieved_pages': retrieved,
+                    'expected_pages': case['expected_pages'],
+                    'recall': round(recall, 4),
+                    'reciprocal_rank': round(reciprocal_rank, 4),
+                })
+
+        return {
+            f'recall_at_{options["k"]}': round(recall_total / len(cases), 4) if cases else 0.0,
+            'mrr': round(reciprocal_rank_total / len(cases), 4) if cases else 0.0,
+            'latency_ms_p50': round(_percentile(latencies, 50), 2),
+            'latency_ms_p95': round(_percentile(latencies, 95), 2),
+            'model_load_seconds': round(model_load_seconds, 3),
+            'index_build_seconds': round(index_build_seconds, 3),
+            # Service backend memory lives in the embedding service process
+            'rss_delta_mb': round(_rss_mb() - rss_before, 1),
+            'per_case': per_case,
+        }
+
+    def _print_summary(self, result):
+        for key, value in result.items():
+            if key != 'per_case':
+                self.stdout.write(f'   {key}: {value}')
+        misses = [case['id'] for case in result['per_case'] if case['recall'] == 0]
+        if misses:
+            self.stdout.write(self.style.WARNING(f'   Missed cases: {", ".join(misses)}'))
+        self.stdout.write('')
+
+    def _print_comparison(self, report, previous_path):
+        with open(previous_path, 'r', encoding='utf-8') as previous_file:
+            previous = json.load(previous_file)
+
+        self.stdout.write(f'\n📈 Compared with {previous.get("git_commit", "?")} ({previous_path})')
+        for backend, result in report['backends'].items():
+            before = previous.get('backends', {}).get(backend)
+            if not before or 'error' in result or 'error' in before:
+                continue
+            self.stdout.write(f'   {backend}:')
+            for key, value in result.items():
+                if key == 'per_case' or key not in before:
+                    continue
+                delta = value - before[key]
+                self.stdout.write(f'      {key}: {before[key]} → {value} ({delta:+.4g})')
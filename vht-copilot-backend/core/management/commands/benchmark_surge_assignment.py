@@ -0,0 +1,148 @@
+"""
+Django management command to benchmark surge batch assignment
+Places a cluster of urgent cases (a mass-casualty event) on hospitals with
+little free capacity three ways and compares travel time, capacity overruns,
+specialty mismatches and solve time:
+- nearest: each case to its quickest suitable hospital (the normal matcher)
+- greedy: one case at a time, in arrival order, to the cheapest hospital
+  (at any distance) that still has room
+- batch: the surge min-cost assignment (referrals/surge.py)
+
+Uses random hospitals around the incident (default), or the Hospital table
+with --table. Nothing is written to the database.
+
+Usage: python manage.py benchmark_surge_assignment [--cases 120] [--hospitals 500] [--free 0-4]
+"""
+import random
+import time
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from core.spatial_index import HospitalPoint, hospital_index
+from referrals.surge import SurgeCase, surge_assigner
+
+SPECIALTIES = ['general', 'surgery', 'pediatrics', 'maternity', 'trauma']
+FACILITY_TYPES = ['REFERRAL', 'HOSPITAL', 'HOSPITAL', 'HCIV', 'HCIV', 'HCIII']
+
+
+class Command(BaseCommand):
+    help = 'Compare nearest-first, greedy and batch min-cost assignment for a surge of urgent cases'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--cases', type=int, default=120)
+        parser.add_argument('--hospitals', type=int, default=500, help='Random hospitals (ignored with --table)')
+        parser.add_argument('--table', action='store_true', help='Use the Hospital table and its real capacity')
+        parser.add_argument('--incident', default='0.35,32.6', help='Incident location (latitude,longitude)')
+        parser.add_argument('--spread-km', type=float, default=25, help='Cases within about this distance')
+        parser.add_argument('--free', default='0-4', help='Random free places per hospital (min-max)')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        try:
+            incident = tuple(float(value) for value in options['incident'].split(','))
+            free_min, free_max = (int(value) for value in options['free'].split('-'))
+        except ValueError:
+            raise CommandError('--incident is "latitude,longitude" and --free is "min-max"')
+
+        hospitals = hospital_index.hospitals() if options['table'] else self._hospitals(
+            rng, options['hospitals'], incident, free_min, free_max
+        )
+        if not hospitals:
+            raise CommandError('No hospitals to assign to')
+        spread = options['spread_km']
+        cases = [
+            SurgeCase(
+                incident[0] + rng.gauss(0, spread / 111 / 2),
+                incident[1] + rng.gauss(0, spread / 111 / 2),
+                None,
+                rng.choice(SPECIALTIES),
+                'URGENT' if rng.random() < 0.7 else 'HIGH_RISK',
+            )
+            for _ in range(options['cases'])
+        ]
+        by_id = {point.id: point for point in hospitals}
+        free = sum(max(0, point.max_capacity - point.current_active_referrals) for point in hospitals)
+        self.stdout.write(
+            f'\n🚑 {len(cases)} cases around {incident}, {len(hospitals)} hospitals with {free} free places'
+        )
+
+        started = time.perf_counter()
+        nearest = [
+            (min(travel, key=travel.get), min(travel.values())) if travel else (None, None)
+            for _, travel in surge_assigner.candidate_options(cases, hospitals, settings.SURGE_CANDIDATES)
+        ]
+        nearest_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        greedy, used = [], {}
+        for costs, travel in surge_assigner.candidate_options(cases, hospitals, len(hospitals)):
+            open_places = [
+                hospital_id for hospital_id in costs
+                if used.get(hospital_id, 0) < by_id[hospital_id].max_capacity - by_id[hospital_id].current_active_referrals
+            ]
+            choice = min(open_places or costs, key=costs.get) if costs else None
+            if choice is not None:
+                used[choice] = used.get(choice, 0) + 1
+            greedy.append((choice, travel.get(choice)))
+        greedy_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        batch = [
+            (placement.hospital.id if placement.hospital else None, placement.travel_minutes)
+            for placement in surge_assigner.plan(cases, hospitals)
+        ]
+        batch_seconds = time.perf_counter() - started
+
+        self.stdout.write(
+            f'\n   {"strategy":<10} {"mean min":>9} {"p95 min":>8} {"max min":>8} '
+            f'{"over cap":>9} {"no spec":>8} {"time ms":>9}'
+        )
+        for label, assignment, seconds in (
+            ('nearest', nearest, nearest_seconds),
+            ('greedy', greedy, greedy_seconds),
+            ('batch', batch, batch_seconds),
+        ):
+            self._report(label, assignment, seconds, cases, by_id)
+
+    def _report(self, label, assignment, seconds, cases, by_id):
+        minutes, over, mismatched, used = [], 0, 0, {}
+        for case, (hospital_id, travel_minutes) in zip(cases, assignment):
+            if hospital_id is None:
+                continue
+            point = by_id[hospital_id]
+            used[hospital_id] = used.get(hospital_id, 0) + 1
+            if point.current_active_referrals + used[hospital_id] > point.max_capacity:
+                over += 1
+            if case.specialty != 'general' and case.specialty not in point.specialties:
+                mismatched += 1
+            minutes.append(travel_minutes)
+        minutes = np.array(minutes or [0])
+        self.stdout.write(
+            f'   {label:<10} {minutes.mean():9.1f} {np.percentile(minutes, 95):8.1f} {minutes.max():8.0f} '
+            f'{over:9d} {mismatched:8d} {seconds * 1000:9.1f}'
+        )
+
+    def _hospitals(self, rng, count, incident, free_min, free_max):
+        """Random hospitals within ~1.5 degrees of the incident, nearly full"""
+        points = []
+        for i in range(count):
+            max_capacity = rng.randint(20, 80)
+            points.append(HospitalPoint(
+                id=i + 1,
+                name=f'Hospital {i + 1}',
+                facility_type=rng.choice(FACILITY_TYPES),
+                district='',
+                sub_county=None,
+                address='',
+                latitude=incident[0] + rng.uniform(-1.5, 1.5),
+                longitude=incident[1] + rng.uniform(-1.5, 1.5),
+                phone_number='',
+                email='',
+                specialties=','.join(['general'] + rng.sample(SPECIALTIES[1:], rng.randint(0, 3))),
+                emergency_capacity_status='AVAILABLE',
+                current_active_referrals=max_capacity - rng.randint(free_min, free_max),
+                max_capacity=max_capacity,
+                operating_hours='24/7',
+            ))
+        return points
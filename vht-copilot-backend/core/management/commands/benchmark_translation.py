@@ -0,0 +1,96 @@
+"""
+Django management command to compare the GROQ and offline Argos translators
+Translates the first-aid instruction library with each engine, one string
+per request and as one batch, and reports latency and the translations.
+Use --no-memory to measure GROQ itself rather than the translation memory.
+
+Usage: python manage.py benchmark_translation [--engines groq,argos] [--source en] [--target lg] [--repeat 3] [--no-memory]
+"""
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+from ai_engine.first_aid_library import FIRST_AID_INSTRUCTIONS
+from ai_engine.groq_translate_service import groq_translate_service
+from ai_engine.translate_service import free_translate_service
+from ai_engine.translation_router import ENGINES
+
+
+class Command(BaseCommand):
+    help = 'Benchmark GROQ and offline Argos translation latency on the first-aid library'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--engines',
+            type=str,
+            default='argos',
+            help=f'Comma-separated engines: {", ".join(ENGINES)} (default: argos, no network)'
+        )
+        parser.add_argument('--source', type=str, default='en', help='Source language code')
+        parser.add_argument('--target', type=str, default='lg', help='Target language code')
+        parser.add_argument('--repeat', type=int, default=1, help='Runs per engine')
+        parser.add_argument(
+            '--no-memory',
+            action='store_true',
+            help='Bypass the glossary and translation memory for GROQ'
+        )
+
+    def handle(self, *args, **options):
+        names = [name.strip() for name in options['engines'].split(',') if name.strip()]
+        unknown = [name for name in names if name not in ENGINES]
+        if unknown:
+            raise CommandError(f'Unknown engine(s): {", ".join(unknown)}')
+
+        source, target = options['source'], options['target']
+        texts = [
+            languages[source] for languages in FIRST_AID_INSTRUCTIONS.values() if languages.get(source)
+        ]
+        if not texts:
+            raise CommandError(f'No first-aid instructions in {source}')
+        self.stdout.write(f'\n🌍 {len(texts)} instructions, {source} → {target}')
+
+        if 'argos' in names:
+            started = time.perf_counter()
+            loaded = free_translate_service.load()
+            self.stdout.write(f'   argos models loaded in {time.perf_counter() - started:.2f}s: {loaded}')
+
+        overrides = {'MEDICAL_GLOSSARY_ENABLED': False, 'TRANSLATION_MEMORY_ENABLED': False} \
+            if options['no_memory'] else {}
+        with override_settings(**overrides):
+            for name in names:
+                if name == 'argos' and not free_translate_service.supports(source, target):
+                    self.stdout.write(self.style.WARNING(f'   argos: {source} → {target} not installed'))
+                    continue
+                if name == 'groq' and not groq_translate_service.is_available:
+                    self.stdout.write(self.style.WARNING('   groq: not available (GROQ_API_KEY)'))
+                    continue
+                for _ in range(max(1, options['repeat'])):
+                    self._run(name, texts, source, target)
+
+    def _run(self, name: str, texts, source: str, target: str):
+        single = []
+        failures = 0
+        for text in texts:
+            started = time.perf_counter()
+            if name == 'groq':
+                result = groq_translate_service.translate(text, target, source)
+            else:
+                result = free_translate_service.translate_text(text, target, source)
+            single.append(time.perf_counter() - started)
+            failures += not result['success']
+
+        started = time.perf_counter()
+        if name == 'groq':
+            batch = groq_translate_service.translate_batch(texts, target, source)
+        else:
+            batch = free_translate_service.translate_batch(texts, target, source)
+        batch_seconds = time.perf_counter() - started
+
+        single.sort()
+        self.stdout.write(
+            f'   {name}: per text p50 {single[len(single) // 2]:.2f}s, max {single[-1]:.2f}s, '
+            f'total {sum(single):.2f}s ({failures} failed); batch {batch_seconds:.2f}s'
+        )
+        if not batch['success']:
+            self.stdout.write(self.style.ERROR('      batch incomplete'))
+        for text, translation in zip(texts, batch['translations']):
+            self.stdout.write(f'      "{text[:50]}" → "{translation["translated_text"][:70]}"')
@@ -0,0 +1,164 @@
+"""
+Django management command to compile an OpenStreetMap extract into the
+offline road network used for referral travel times (core/routing.py)
+
+Reads the ways whose highway class has a speed (ROAD_SPEEDS_KMH plus
+ROAD_SPEED_OVERRIDES) and ferry routes. .osm.pbf extracts need pyosmium
+(pip install osmium); .osm XML (optionally .bz2/.gz) is read with the
+standard library in two passes.
+
+Download: https://download.geofabrik.de/africa/uganda-latest.osm.pbf
+
+Usage: python manage.py build_road_network uganda-latest.osm.pbf [--output data/road_network.npz]
+"""
+import bz2
+import gzip
+import os
+import random
+import time
+import xml.etree.ElementTree as ET
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from core.routing import compile_road_network, road_network, road_speeds, save_road_network
+
+ONEWAY_YES = ('yes', 'true', '1')
+ONEWAY_REVERSE = ('-1', 'reverse')
+NO_ACCESS = ('no', 'private')
+
+
+def way_class(tags, speeds):
+    """Road class of a way (None when it is not routable)"""
+    if tags.get('route') == 'ferry':
+        return 'ferry' if 'ferry' in speeds else None
+    highway = tags.get('highway')
+    if highway not in speeds or tags.get('access') in NO_ACCESS or tags.get('area') == 'yes':
+        return None
+    return highway
+
+
+def way_direction(tags, road_class):
+    """1 = one-way along the node order, -1 = against it, 0 = both ways"""
+    oneway = tags.get('oneway', '')
+    if oneway in ONEWAY_YES:
+        return 1
+    if oneway in ONEWAY_REVERSE:
+        return -1
+    if oneway != 'no' and (road_class == 'motorway' or tags.get('junction') == 'roundabout'):
+        return 1
+    return 0
+
+
+class Command(BaseCommand):
+    help = 'Compile an OSM road extract into the offline routing graph'
+
+    def add_arguments(self, parser):
+        parser.add_argument('extract', help='.osm.pbf (needs pyosmium) or .osm / .osm.bz2 / .osm.gz')
+        parser.add_argument('--output', default=settings.ROAD_NETWORK_PATH, help='Graph file to write')
+        parser.add_argument(
+            '--max-segment-km', type=float, default=1.0,
+            help='Keep a node at least this often along roads (closer snapping, larger graph)'
+        )
+        parser.add_argument('--sample-queries', type=int, default=50, help='Timed random queries after the build')
+
+    def handle(self, *args, **options):
+        path = options['extract']
+        if not os.path.exists(path):
+            raise CommandError(f'Extract not found: {path}')
+
+        speeds = road_speeds()
+        started = time.perf_counter()
+        self.stdout.write(f'\n🗺️  Reading {path}...')
+        if path.endswith('.pbf'):
+            ways, coordinates = self._read_pbf(path, speeds)
+        else:
+            ways, coordinates = self._read_xml(path, speeds)
+        self.stdout.write(f'   {len(ways)} routable ways, {len(coordinates)} nodes ({time.perf_counter() - started:.0f}s)')
+
+        try:
+            network = compile_road_network(ways, coordinates, options['max_segment_km'])
+        except ValueError as e:
+            raise CommandError(str(e))
+        save_road_network(options['output'], network, source=os.path.basename(path))
+
+        nodes, edges = len(network['latitudes']), len(network['targets'])
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ {nodes} nodes, {edges} edges → {options["output"]} '
+            f'({os.path.getsize(options["output"]) / 1e6:.1f} MB, {time.perf_counter() - started:.0f}s)'
+        ))
+
+        if options['sample_queries'] and road_network.load(options['output']):
+            self._sample(network, options['sample_queries'])
+        self.stdout.write('   Run build_village_candidates to refresh village travel times.')
+
+    def _read_pbf(self, path, speeds):
+        try:
+            import osmium
+        except ImportError:
+            raise CommandError('Reading .pbf needs pyosmium (pip install osmium), or pass an .osm XML extract')
+
+        ways, coordinates = [], {}
+
+        class RoadHandler(osmium.SimpleHandler):
+            def way(self, way):
+                road_class = way_class(way.tags, speeds)
+                if road_class is None:
+                    return
+                refs = []
+                for node in way.nodes:
+                    if node.location.valid():
+                        coordinates[node.ref] = (node.location.lat, node.location.lon)
+                        refs.append(node.ref)
+                ways.append((refs, road_class, way_direction(way.tags, road_class)))
+
+        RoadHandler().apply_file(path, locations=True)
+        return ways, coordinates
+
+    def _read_xml(self, path, speeds):
+        opener = bz2.open if path.endswith('.bz2') else gzip.open if path.endswith('.gz') else open
+
+        # Pass 1: routable ways (nodes precede ways, so their coordinates need a second pass)
+        ways, needed = [], set()
+        with opener(path, 'rb') as handle:
+            for _, element in ET.iterparse(handle):
+                if element.tag == 'way':
+                    tags = {tag.get('k'): tag.get('v') for tag in element.iter('tag')}
+                    road_class = way_class(tags, speeds)
+                    if road_class is not None:
+                        refs = [int(nd.get('ref')) for nd in element.iter('nd')]
+                        ways.append((refs, road_class, way_direction(tags, road_class)))
+                        needed.update(refs)
+                if element.tag in ('node', 'way', 'relation'):
+                    element.clear()
+
+        # Pass 2: coordinates of the nodes those ways use
+        coordinates = {}
+        with opener(path, 'rb') as handle:
+            for _, element in ET.iterparse(handle):
+                if element.tag == 'node':
+                    ref = int(element.get('id'))
+                    if ref in needed:
+                        coordinates[ref] = (float(element.get('lat')), float(element.get('lon')))
+                if element.tag in ('node', 'way', 'relation'):
+                    element.clear()
+        return ways, coordinates
+
+    def _sample(self, network, count):
+        """Time queries from random road nodes to 5 other road nodes up to ~20 km away"""
+        rng = random.Random(0)
+        latitudes, longitudes = network['latitudes'], network['longitudes']
+        timings, unreachable = [], 0
+        for _ in range(count):
+            origin = rng.randrange(len(latitudes))
+            nearby = ((abs(latitudes - latitudes[origin]) < 0.2) & (abs(longitudes - longitudes[origin]) < 0.2)).nonzero()[0]
+            destinations = [(latitudes[i], longitudes[i]) for i in rng.sample(list(nearby), min(5, len(nearby)))]
+            started = time.perf_counter()
+            minutes = road_network.travel_minutes(latitudes[origin], longitudes[origin], destinations)
+            timings.append(time.perf_counter() - started)
+            unreachable += sum(m is None for m in minutes)
+
+        timings.sort()
+        self.stdout.write(
+            f'   {count} sample queries (5 destinations each): '
+            f'p50 {timings[len(timings) // 2] * 1000:.1f} ms, p95 {timings[int(len(timings) * 0.95)] * 1000:.1f} ms, '
+            f'{unreachable} unreachable destinations'
+        )
@@ -5,6 +5,7 @@ Also imports village GPS coordinates for patient location tracking.
 import csv
 from django.core.management.base import BaseCommand
 from core.models import Hospital
+from core.village_candidates import village_candidates
 
 
 class Command(BaseCommand):
@@ -15,6 +16,11 @@ class Command(BaseCommand):
         parser.add_argument('--clear', action='store_true', help='Clear existing hospitals before import')
     
     def handle(self, *args, **options):
+        # Refresh village → hospital candidates once at the end, not per facility
+        with village_candidates.paused():
+            self._import(options)
+    
+    def _import(self, options):
         csv_path = options['csv_path']
         clear_existing = options.get('clear', False)
         
@@ -0,0 +1,43 @@
+"""
+Django management command to install the offline Argos translation packages
+Run at build time (build.sh): installs any local .argosmodel files given,
+then downloads the remaining ARGOS_TRANSLATION_PAIRS from the Argos package
+index. Workers only load what is installed and never touch the network.
+
+Usage: python manage.py install_translation_packages [models/en_lg.argosmodel ...]
+"""
+import os
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from ai_engine.translate_service import free_translate_service
+
+
+class Command(BaseCommand):
+    help = 'Install Argos translation packages for ARGOS_TRANSLATION_PAIRS (build time)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'package_files',
+            nargs='*',
+            type=str,
+            help='Local .argosmodel files to install (e.g. custom Luganda models)'
+        )
+
+    def handle(self, *args, **options):
+        if not free_translate_service.available:
+            raise CommandError('Argos Translate not installed. Run: pip install argostranslate')
+
+        for path in options['package_files']:
+            if not os.path.exists(path):
+                raise CommandError(f'File not found: {path}')
+
+        try:
+            installed = free_translate_service.ensure_language_packages(options['package_files'])
+        except Exception as e:
+            raise CommandError(f'Package installation failed: {e}')
+
+        for from_code, to_code in settings.ARGOS_TRANSLATION_PAIRS:
+            if (from_code, to_code) in installed:
+                self.stdout.write(self.style.SUCCESS(f'   ✅ {from_code} → {to_code}'))
+            else:
+                self.stdout.write(self.style.WARNING(f'   ⚠️  {from_code} → {to_code}: no package installed'))
@@ -3,6 +3,7 @@ Management command to populate Districts and Villages from uganda_locations.py
 """
 from django.core.management.base import BaseCommand
 from core.models import District, Village
+from core.village_candidates import village_candidates
 from core.uganda_locations import UGANDA_LOCATIONS
 from core.uganda_villages import UGANDA_VILLAGES
 
@@ -11,6 +12,11 @@ class Command(BaseCommand):
     help = 'Populate Districts and Villages from uganda_locations.py'
 
     def handle(self, *args, **options):
+        # Refresh village → hospital candidates once at the end, not per village
+        with village_candidates.paused():
+            self._populate()
+
+    def _populate(self):
         self.stdout.write("Populating Districts and Villages...")
         
         districts_created = 0
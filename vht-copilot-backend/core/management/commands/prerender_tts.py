@@ -0,0 +1,105 @@
+"""
+Django management command to pre-render the first-aid instruction library
+Synthesizes every instruction in each language into the TTS cache (pinned,
+so it is never evicted); instructions already rendered with their current
+text are skipped, and an edited one replaces its old audio.
+Languages without a library translation are machine-translated from English
+with --translate-missing.
+
+Usage: python manage.py prerender_tts [--languages en,lg,sw] [--voice FEMALE] [--translate-missing] [--force] [--dry-run]
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.conf import settings
+from ai_engine.first_aid_library import FIRST_AID_INSTRUCTIONS, get_instruction
+from ai_engine.tts_cache import TTS_LANGUAGE_CODES, VOICES, TTSError, tts_cache
+
+
+class Command(BaseCommand):
+    help = 'Pre-render the first-aid instruction library into the TTS cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--languages',
+            default=','.join(TTS_LANGUAGE_CODES),
+            help='Comma-separated language codes (default: all with a TTS voice)'
+        )
+        parser.add_argument(
+            '--voice',
+            default=settings.TTS_DEFAULT_VOICE,
+            help='FEMALE, MALE or NEUTRAL'
+        )
+        parser.add_argument(
+            '--translate-missing',
+            action='store_true',
+            help='Translate instructions from English where the library has no text for a language'
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Render again even if the instruction is already cached'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report what would be rendered'
+        )
+
+    def handle(self, *args, **options):
+        voice = options['voice'].upper()
+        if voice not in VOICES:
+            raise CommandError(f'--voice must be one of {", ".join(VOICES)}')
+        languages = [code.strip() for code in options['languages'].split(',') if code.strip()]
+
+        rendered = cached = skipped = failed = 0
+        for language in languages:
+            for instruction in FIRST_AID_INSTRUCTIONS:
+                if not options['force'] and tts_cache.lookup_instruction(instruction, language, voice, record_hit=False):
+                    cached += 1
+                    continue
+
+                text = get_instruction(instruction, language)
+                if text is None and not options['translate_missing']:
+                    skipped += 1
+                    continue
+
+                if options['dry_run']:
+                    action = 'render' if text else 'translate and render'
+                    self.stdout.write(f'Would {action} {instruction} ({language})')
+                    rendered += 1
+                    continue
+
+                if text is None:
+                    text = self._translate(instruction, language)
+                    if text is None:
+                        skipped += 1
+                        continue
+
+                try:
+                    # Replaces (unpins) the audio of an edited instruction
+                    tts_cache.get_or_render(text, language, voice, instruction=instruction, pinned=True)
+                except TTSError as e:
+                    self.stdout.write(self.style.ERROR(f'❌ {instruction} ({language}): {e}'))
+                    failed += 1
+                    continue
+                rendered += 1
+
+        summary = (
+            f'{rendered} instructions {"to render" if options["dry_run"] else "rendered"}, '
+            f'{cached} already cached, {skipped} without text, {failed} failed'
+        )
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING(summary))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'✅ {summary}'))
+
+    def _translate(self, instruction: str, language: str):
+        from ai_engine.groq_translate_service import groq_translate_service
+
+        english = get_instruction(instruction, 'en')
+        result = groq_translate_service.translate(english, target_language=language, source_language='en')
+        if not result.get('success') or not result.get('translated_text'):
+            self.stdout.write(self.style.WARNING(
+                f'⚠️  Could not translate {instruction} to {language}: {result.get("error")}'
+            ))
+            return None
+        return result['translated_text']
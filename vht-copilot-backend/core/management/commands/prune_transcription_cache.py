@@ -0,0 +1,65 @@
+"""
+Django management command to apply the transcription cache retention policy
+Deletes cached transcripts not created or hit within the retention period,
+and translation memory entries unused for TRANSLATION_MEMORY_RETENTION_DAYS
+
+Usage: python manage.py prune_transcription_cache [--days 30] [--dry-run]
+"""
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.conf import settings
+from django.db.models import Q, Sum
+from django.utils import timezone
+from ai_engine.models import TranscriptionCache, TranslationMemory
+from ai_engine.transcription_cache import transcription_cache
+from ai_engine.translation_memory import translation_memory
+
+
+class Command(BaseCommand):
+    help = 'Delete cached transcriptions older than TRANSCRIPTION_CACHE_RETENTION_DAYS'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=settings.TRANSCRIPTION_CACHE_RETENTION_DAYS,
+            help='Keep entries created or hit within this many days'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report what would be deleted'
+        )
+
+    def handle(self, *args, **options):
+        days = options['days']
+        totals = TranscriptionCache.objects.aggregate(hits=Sum('hit_count'))
+        self.stdout.write(
+            f'📦 Transcription cache: {TranscriptionCache.objects.count()} entries, '
+            f'{totals["hits"] or 0} hits served'
+        )
+
+        memory_days = settings.TRANSLATION_MEMORY_RETENTION_DAYS
+        if options['dry_run']:
+            memory_cutoff = timezone.now() - timedelta(days=memory_days)
+            stale_memory = TranslationMemory.objects.filter(
+                Q(last_hit_at__lt=memory_cutoff) | Q(last_hit_at__isnull=True),
+                created_at__lt=memory_cutoff
+            ).count()
+            self.stdout.write(self.style.WARNING(
+                f'Would delete {stale_memory} translation memory entries older than {memory_days} days'
+            ))
+            cutoff = timezone.now() - timedelta(days=days)
+            stale = TranscriptionCache.objects.filter(
+                Q(last_hit_at__lt=cutoff) | Q(last_hit_at__isnull=True),
+                created_at__lt=cutoff
+            ).count()
+            self.stdout.write(self.style.WARNING(f'Would delete {stale} entries older than {days} days'))
+            return
+
+        memory_deleted = translation_memory.prune(memory_days)
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Deleted {memory_deleted} translation memory entries older than {memory_days} days'
+        ))
+        deleted = transcription_cache.prune(days)
+        self.stdout.write(self.style.SUCCESS(f'✅ Deleted {deleted} entries older than {days} days'))
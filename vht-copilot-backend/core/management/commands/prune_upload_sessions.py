@@ -0,0 +1,67 @@
+"""
+Django management command to expire abandoned resumable uploads
+Marks sessions idle longer than UPLOAD_SESSION_TTL_HOURS as EXPIRED and
+deletes their part files; live intakes left recording longer than
+LIVE_INTAKE_SESSION_TTL_HOURS are expired and their segment audio released
+
+Usage: python manage.py prune_upload_sessions [--hours 24]
+"""
+import os
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.conf import settings
+from django.utils import timezone
+from ai_engine.models import AudioUploadSession, LiveIntakeSegment, LiveIntakeSession
+from ai_engine.audio_store import audio_store
+from ai_engine.upload_sessions import part_path
+
+
+class Command(BaseCommand):
+    help = 'Expire upload sessions idle longer than UPLOAD_SESSION_TTL_HOURS and delete their part files'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--hours',
+            type=int,
+            default=settings.UPLOAD_SESSION_TTL_HOURS,
+            help='Expire sessions not updated within this many hours'
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(hours=options['hours'])
+        stale = AudioUploadSession.objects.filter(
+            status__in=[AudioUploadSession.Status.OPEN, AudioUploadSession.Status.COMPLETE],
+            updated_at__lt=cutoff
+        )
+
+        freed = 0
+        count = 0
+        for session in stale:
+            path = part_path(session)
+            if os.path.exists(path):
+                freed += os.path.getsize(path)
+                os.remove(path)
+            count += 1
+
+        stale.update(status=AudioUploadSession.Status.EXPIRED)
+
+        live_cutoff = timezone.now() - timedelta(hours=settings.LIVE_INTAKE_SESSION_TTL_HOURS)
+        abandoned = LiveIntakeSession.objects.filter(
+            status=LiveIntakeSession.Status.RECORDING,
+            updated_at__lt=live_cutoff
+        )
+        segments = LiveIntakeSegment.objects.filter(session__in=abandoned, audio_blob__isnull=False)
+        for segment in segments.select_related('audio_blob'):
+            blob = segment.audio_blob
+            segment.audio_blob = None
+            segment.audio_file = None
+            segment.save(update_fields=['audio_blob', 'audio_file'])
+            # Kept if the same recording also belongs to a submitted case
+            if audio_store.discard(blob):
+                freed += blob.size
+        live_count = abandoned.update(status=LiveIntakeSession.Status.EXPIRED)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Expired {count} upload sessions and {live_count} live intakes, '
+            f'freed {freed / 1024 / 1024:.1f} MB'
+        ))
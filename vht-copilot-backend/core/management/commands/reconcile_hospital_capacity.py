@@ -0,0 +1,29 @@
+"""
+Django management command to reconcile hospital capacity counters
+Resets Hospital.current_active_referrals to the real number of referrals in
+an active status (PENDING, CONFIRMED, IN_TRANSIT, ARRIVED) wherever the
+ledger has drifted. Schedule it periodically (e.g. every 15 minutes from cron).
+
+Usage: python manage.py reconcile_hospital_capacity [--hospital 12 ...] [--dry-run]
+"""
+from django.core.management.base import BaseCommand
+from core.models import Hospital
+from referrals.capacity import capacity_ledger
+
+
+class Command(BaseCommand):
+    help = 'Reset hospital active referral counters to the real active referral count'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hospital', type=int, action='append', help='Only this hospital id (repeatable)')
+        parser.add_argument('--dry-run', action='store_true', help='Report drift without correcting it')
+
+    def handle(self, *args, **options):
+        drift = capacity_ledger.reconcile(options['hospital'], dry_run=options['dry_run'])
+
+        names = dict(Hospital.objects.filter(pk__in=list(drift)).values_list('id', 'name'))
+        for hospital_id, (counter, actual) in sorted(drift.items()):
+            self.stdout.write(f'   {names.get(hospital_id, hospital_id)}: counter {counter}, active referrals {actual}')
+
+        verb = 'would be corrected' if options['dry_run'] else 'corrected'
+        self.stdout.write(self.style.SUCCESS(f'✅ {len(drift)} hospital counters {verb}'))
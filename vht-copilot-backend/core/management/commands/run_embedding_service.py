@@ -0,0 +1,63 @@
+"""
+Django management command to run the shared embedding service
+Holds a single sentence-transformers model for every worker on this host
+Usage: python manage.py run_embedding_service [--socket /run/vht/embeddings.sock]
+"""
+from django.core.management.base import BaseCommand
+from django.conf import settings
+from ai_engine.embedding_service import EmbeddingBatcher, EmbeddingServer, build_local_embeddings
+
+
+class Command(BaseCommand):
+    help = 'Run the local embedding service on a Unix socket (batches requests from all workers)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--socket',
+            type=str,
+            default=None,
+            help='Unix socket path (default: EMBEDDING_SERVICE_SOCKET)'
+        )
+        parser.add_argument(
+            '--batch-window-ms',
+            type=int,
+            default=None,
+            help='How long to wait for more requests before embedding a batch'
+        )
+        parser.add_argument(
+            '--max-batch-size',
+            type=int,
+            default=None,
+            help='Maximum number of texts embedded in one model call'
+        )
+
+    def handle(self, *args, **options):
+        socket_path = options['socket'] or settings.EMBEDDING_SERVICE_SOCKET
+        if not socket_path:
+            self.stdout.write(self.style.ERROR('❌ No socket path: pass --socket or set EMBEDDING_SERVICE_SOCKET'))
+            return
+
+        batch_window_ms = options['batch_window_ms']
+        if batch_window_ms is None:
+            batch_window_ms = settings.EMBEDDING_BATCH_WINDOW_MS
+        max_batch_size = options['max_batch_size'] or settings.EMBEDDING_MAX_BATCH_SIZE
+
+        self.stdout.write('🔧 Loading sentence-transformers model...')
+        batcher = EmbeddingBatcher(
+            build_local_embeddings(),
+            batch_window_ms=batch_window_ms,
+            max_batch_size=max_batch_size
+        )
+        batcher.start()
+
+        server = EmbeddingServer(socket_path, batcher)
+        self.stdout.write(self.style.SUCCESS(f'✅ Embedding service listening on {socket_path}'))
+        self.stdout.write(f'   Batch window: {batch_window_ms} ms, max batch: {max_batch_size} texts')
+
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            self.stdout.write('')
+            self.stdout.write(self.style.WARNING('Shutting down embedding service'))
+        finally:
+            server.server_close()
@@ -0,0 +1,32 @@
+# Generated by Django 6.0.2 on 2026-10-19 03:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_notification'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VillageHospitalCandidate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tier', models.CharField(choices=[('ANY', 'Any Facility'), ('HIGH_RISK', 'HC IV and Hospitals'), ('URGENT', 'Hospitals')], max_length=20)),
+                ('rank', models.PositiveSmallIntegerField(help_text='1 = nearest')),
+                ('distance_km', models.FloatField()),
+                ('travel_minutes', models.IntegerField(help_text='Null when the road network cannot reach it', null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('hospital', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='village_candidates', to='core.hospital')),
+                ('village', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='hospital_candidates', to='core.village')),
+            ],
+            options={
+                'db_table': 'village_hospital_candidates',
+                'ordering': ['village', 'tier', 'rank'],
+                'unique_together': {('village', 'tier', 'rank')},
+            },
+        ),
+    ]
@@ -106,6 +106,16 @@ class Hospital(models.Model):
     def __str__(self):
         return f"{self.name} ({self.get_facility_type_display()})"
     
+    def save(self, *args, **kwargs):
+        # current_active_referrals is owned by the capacity ledger (atomic F() updates,
+        # referrals/capacity.py): saving a loaded instance must not write back a stale count
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'current_active_referrals'
+            ]
+        super().save(*args, **kwargs)
+    
     def get_specialties_list(self):
         """Return specialties as a list"""
         return [s.strip() for s in self.specialties.split(',') if s.strip()]
@@ -167,6 +177,34 @@ class Village(models.Model):
         return f"{self.name}, {self.district.name}"
 
 
+class VillageHospitalCandidate(models.Model):
+    """
+    Precomputed nearest hospitals for a village, per facility tier
+    Rebuilt by build_village_candidates and kept current by the Hospital and
+    Village signals (core/village_candidates.py); capacity is checked when read
+    """
+    class Tier(models.TextChoices):
+        ANY = 'ANY', _('Any Facility')
+        HIGH_RISK = 'HIGH_RISK', _('HC IV and Hospitals')
+        URGENT = 'URGENT', _('Hospitals')
+    
+    village = models.ForeignKey(Village, on_delete=models.CASCADE, related_name='hospital_candidates')
+    hospital = models.ForeignKey(Hospital, on_delete=models.CASCADE, related_name='village_candidates')
+    tier = models.CharField(max_length=20, choices=Tier.choices)
+    rank = models.PositiveSmallIntegerField(help_text="1 = nearest")
+    distance_km = models.FloatField()
+    travel_minutes = models.IntegerField(null=True, help_text="Null when the road network cannot reach it")
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'village_hospital_candidates'
+        ordering = ['village', 'tier', 'rank']
+        unique_together = [['village', 'tier', 'rank']]
+    
+    def __str__(self):
+        return f"{self.village.name} → {self.hospital.name} ({self.tier} #{self.rank})"
+
+
 class AuditLog(models.Model):
     """
     Comprehensive audit logging for compliance and analytics
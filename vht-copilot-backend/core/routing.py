@@ -0,0 +1,438 @@
+"""
+Road Routing - Offline travel times over an OpenStreetMap road network
+`python manage.py build_road_network uganda-latest.osm.pbf` compiles the
+drivable ways of an OSM extract into a compact graph file
+(ROAD_NETWORK_PATH): road nodes are contracted to junctions (plus a node
+about every kilometre so points along long rural roads snap close by),
+only the largest connected network is kept, and each edge stores its length
+and road class. Speeds per road class (ROAD_SPEEDS_KMH, overridden by the
+ROAD_SPEED_OVERRIDES setting) are applied when the graph is loaded, so they
+can be tuned without rebuilding.
+
+A query snaps the patient and the hospitals to their nearest road nodes
+(the gap is covered at ROAD_ACCESS_SPEED_KMH) and runs one Dijkstra search
+outward from the patient that stops as soon as every hospital is reached.
+Village → hospital times are precomputed into the village candidate table.
+Without a graph file every caller keeps the straight-line estimate in
+core/geo.py; with one, destinations it cannot reach rank after the routed
+ones.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from heapq import heappop, heappush
+from math import floor
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+from django.conf import settings
+from .geo import MIN_TRAVEL_MINUTES, distances_km, estimate_travel_minutes, haversine_km
+
+logger = logging.getLogger(__name__)
+
+# Typical speeds per OSM highway class (km/h), allowing for surface and traffic
+ROAD_SPEEDS_KMH = {
+    'motorway': 80,
+    'motorway_link': 50,
+    'trunk': 70,
+    'trunk_link': 45,
+    'primary': 60,
+    'primary_link': 40,
+    'secondary': 50,
+    'secondary_link': 35,
+    'tertiary': 40,
+    'tertiary_link': 30,
+    'unclassified': 30,
+    'residential': 25,
+    'living_street': 15,
+    'service': 15,
+    'track': 15,
+    'ferry': 12,  # route=ferry ways (Lake Victoria islands)
+}
+
+# Degrees per snapping grid cell (~2 km)
+SNAP_CELL_DEGREES = 0.02
+
+# Road nodes the patient is snapped to (searched together, each with its own access time)
+SNAP_NODES = 3
+
+# Destinations this close (at the access speed) may be reached without roads
+DIRECT_MAX_MINUTES = 30
+
+
+def road_speeds() -> Dict[str, float]:
+    """Per-class speeds with the ROAD_SPEED_OVERRIDES setting applied"""
+    speeds = dict(ROAD_SPEEDS_KMH)
+    speeds.update(getattr(settings, 'ROAD_SPEED_OVERRIDES', {}))
+    return speeds
+
+
+def compile_road_network(
+    ways: Iterable[Tuple[Sequence[int], str, int]],
+    coordinates: Dict[int, Tuple[float, float]],
+    max_segment_km: float = 1.0
+) -> Dict[str, np.ndarray]:
+    """
+    Contract OSM ways into a routing graph
+
+    Args:
+        ways: (node ids, road class, direction) per way; direction 1 for
+            one-way along the node order, -1 against it, 0 for both ways
+        coordinates: OSM node id -> (latitude, longitude)
+        max_segment_km: Keep an intermediate node at least this often
+
+    Returns:
+        Arrays for save_road_network: node coordinates, CSR adjacency
+        (indptr, targets) and per-edge length (metres) and road class index
+    """
+    ways = [
+        ([ref for ref in refs if ref in coordinates], road_class, direction)
+        for refs, road_class, direction in ways
+    ]
+    ways = [way for way in ways if len(way[0]) > 1]
+
+    # Junctions: way ends and nodes shared by several ways (or visited twice by one)
+    uses = {}
+    for refs, _, _ in ways:
+        for ref in refs:
+            uses[ref] = uses.get(ref, 0) + 1
+    junctions = {refs[0] for refs, _, _ in ways} | {refs[-1] for refs, _, _ in ways}
+    junctions.update(ref for ref, count in uses.items() if count > 1)
+
+    classes = sorted({road_class for _, road_class, _ in ways})
+    class_index = {road_class: index for index, road_class in enumerate(classes)}
+    node_index = {}
+    edges = []  # (from, to, metres, class)
+
+    def node(ref):
+        if ref not in node_index:
+            node_index[ref] = len(node_index)
+        return node_index[ref]
+
+    for refs, road_class, direction in ways:
+        start, length = refs[0], 0.0
+        for previous, ref in zip(refs, refs[1:]):
+            length += haversine_km(*coordinates[previous], *coordinates[ref])
+            if ref in junctions or length >= max_segment_km or ref == refs[-1]:
+                if start != ref:
+                    a, b, metres = node(start), node(ref), length * 1000
+                    if direction >= 0:
+                        edges.append((a, b, metres, class_index[road_class]))
+                    if direction <= 0:
+                        edges.append((b, a, metres, class_index[road_class]))
+                start, length = ref, 0.0
+
+    # Keep the largest connected network (disconnected fragments strand snapped points)
+    parent = list(range(len(node_index)))
+
+    def root(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for a, b, _, _ in edges:
+        ra, rb = root(a), root(b)
+        if ra != rb:
+            parent[ra] = rb
+    roots = np.array([root(i) for i in range(len(node_index))], dtype=np.int64)
+    if not len(roots):
+        raise ValueError('No drivable ways with coordinates in the extract')
+    keep = roots == np.bincount(roots).argmax()
+    new_index = np.cumsum(keep) - 1
+
+    edge_array = np.array(edges, dtype=np.float64).reshape(-1, 4)
+    sources, targets = edge_array[:, 0].astype(np.int64), edge_array[:, 1].astype(np.int64)
+    kept_edges = keep[sources]
+    sources, targets = new_index[sources[kept_edges]], new_index[targets[kept_edges]]
+    lengths, road_classes = edge_array[kept_edges, 2], edge_array[kept_edges, 3]
+
+    latlon = np.empty((len(node_index), 2), dtype=np.float64)
+    for ref, index in node_index.items():
+        latlon[index] = coordinates[ref]
+    latlon = latlon[keep]
+
+    order = np.argsort(sources, kind='stable')
+    indptr = np.zeros(len(latlon) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sources, minlength=len(latlon)), out=indptr[1:])
+    return {
+        'latitudes': latlon[:, 0],
+        'longitudes': latlon[:, 1],
+        'indptr': indptr,
+        'targets': targets[order].astype(np.int32),
+        'lengths': lengths[order].astype(np.float32),
+        'classes': road_classes[order].astype(np.uint8),
+        'class_names': np.array(classes),
+    }
+
+
+def save_road_network(path: str, network: Dict[str, np.ndarray], source: str = ''):
+    """Write a compiled network (compressed .npz)"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    meta = json.dumps({'source': source, 'built_at': time.strftime('%Y-%m-%dT%H:%M:%S')})
+    with open(path, 'wb') as handle:
+        np.savez_compressed(handle, meta=np.array(meta), **network)
+
+
+class RoadNetwork:
+    """
+    Road graph loaded once per process, with one-to-many travel-time queries
+    Keeps per-process query counters for the health endpoint
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._graph = None
+        self._snap_cache = {}  # Destination coordinates -> [(node, metres to it)]
+        self.stats = {
+            'queries': 0,
+            'routes': 0,
+            'unreachable': 0,
+            'settled_nodes': 0,
+            'query_seconds': 0.0,
+        }
+
+    @property
+    def available(self) -> bool:
+        """A road network file is configured and loaded"""
+        self._ensure_loaded()
+        return self._graph is not None
+
+    def load(self, path: str = None) -> bool:
+        """
+        Load (or reload) the graph file and apply the current road speeds
+
+        Returns:
+            True when a network is loaded
+        """
+        path = path or settings.ROAD_NETWORK_PATH
+        with self._lock:
+            self._loaded = True
+            self._graph, self._snap_cache = None, {}
+            if not path or not os.path.exists(path):
+                logger.info(f"No road network at {path!r}; travel times use straight-line estimates")
+                return False
+
+            started = time.perf_counter()
+            with np.load(path) as data:
+                arrays = {key: data[key] for key in data.files}
+            speeds = road_speeds()
+            class_names = [str(name) for name in arrays['class_names']]
+            unknown = [name for name in class_names if name not in speeds]
+            if unknown:
+                logger.warning(f"No speed for road classes {unknown}; using the unclassified speed")
+            class_mps = np.array(
+                [speeds.get(name, speeds['unclassified']) / 3.6 for name in class_names], dtype=np.float64
+            )
+            seconds = arrays['lengths'].astype(np.float64) / class_mps[arrays['classes']]
+
+            latitudes, longitudes = arrays['latitudes'], arrays['longitudes']
+            cells = (
+                np.floor(latitudes / SNAP_CELL_DEGREES).astype(np.int64) * 100000 +
+                np.floor(longitudes / SNAP_CELL_DEGREES).astype(np.int64)
+            )
+            order = np.argsort(cells, kind='stable')
+            keys, starts, counts = np.unique(cells[order], return_index=True, return_counts=True)
+
+            self._graph = {
+                'latitudes': latitudes,
+                'longitudes': longitudes,
+                # Python lists: the search reads them one element at a time
+                'indptr': arrays['indptr'].tolist(),
+                'targets': arrays['targets'].tolist(),
+                'seconds': seconds.tolist(),
+                'cells': {
+                    key: order[start:start + count]
+                    for key, start, count in zip(keys.tolist(), starts.tolist(), counts.tolist())
+                },
+                'meta': json.loads(str(arrays['meta'])) if 'meta' in arrays else {},
+                'path': path,
+            }
+        logger.info(
+            f"Road network loaded: {len(latitudes)} nodes, {len(seconds)} edges "
+            f"({time.perf_counter() - started:.2f}s)"
+        )
+        return True
+
+    def travel_minutes(
+        self,
+        latitude: float,
+        longitude: float,
+        destinations: Sequence[Tuple[float, float]],
+        max_minutes: float = None
+    ) -> List[Optional[float]]:
+        """
+        Road travel time from one point to each destination
+
+        Args:
+            latitude, longitude: Origin (e.g. the patient or village)
+            destinations: [(latitude, longitude), ...] (e.g. candidate hospitals)
+            max_minutes: Stop searching beyond this (default ROUTING_MAX_MINUTES)
+
+        Returns:
+            Minutes per destination; None when there is no network, a point
+            is too far from any road or the destination is out of reach
+        """
+        if not destinations:
+            return []
+        if not self.available:
+            return [None] * len(destinations)
+
+        started = time.perf_counter()
+        graph = self._graph
+        access_speed = settings.ROAD_ACCESS_SPEED_KMH / 3.6
+        max_seconds = (max_minutes or settings.ROUTING_MAX_MINUTES) * 60
+
+        origin = {}
+        for node, metres in self._snap(latitude, longitude, SNAP_NODES):
+            origin[node] = min(origin.get(node, float('inf')), metres / access_speed)
+
+        # Destination node -> [(destination index, access seconds)]
+        wanted = {}
+        for index, (lat, lon) in enumerate(destinations):
+            key = (round(lat, 6), round(lon, 6))
+            snapped = self._snap_cache.get(key)
+            if snapped is None:
+                snapped = self._snap(lat, lon, 1)
+                with self._lock:
+                    self._snap_cache[key] = snapped
+            for node, metres in snapped:
+                wanted.setdefault(node, []).append((index, metres / access_speed))
+
+        results = [None] * len(destinations)
+        settled = 0
+        if origin and wanted:
+            reached, settled = self._search(graph, origin, set(wanted), max_seconds)
+            for node, seconds in reached.items():
+                for index, access_seconds in wanted[node]:
+                    results[index] = (seconds + access_seconds) / 60
+
+        # Very close destinations: going straight there can beat the roads
+        direct = distances_km(
+            latitude, longitude, [lat for lat, _ in destinations], [lon for _, lon in destinations]
+        ) * 1000 / access_speed / 60
+        for index, minutes in enumerate(results):
+            if direct[index] <= DIRECT_MAX_MINUTES and (minutes is None or direct[index] < minutes):
+                results[index] = float(direct[index])
+
+        with self._lock:
+            self.stats['queries'] += 1
+            self.stats['routes'] += len(destinations)
+            self.stats['unreachable'] += sum(minutes is None for minutes in results)
+            self.stats['settled_nodes'] += settled
+            self.stats['query_seconds'] += time.perf_counter() - started
+        return results
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self.stats)
+            graph = self._graph
+        stats['loaded'] = graph is not None
+        if graph is not None:
+            stats['nodes'] = len(graph['latitudes'])
+            stats['edges'] = len(graph['targets'])
+            stats['built_at'] = graph['meta'].get('built_at')
+        queries = stats['queries']
+        stats['mean_query_ms'] = round(stats['query_seconds'] / queries * 1000, 2) if queries else None
+        stats['mean_settled_nodes'] = round(stats['settled_nodes'] / queries) if queries else None
+        del stats['query_seconds'], stats['settled_nodes']
+        return stats
+
+    def _ensure_loaded(self):
+        if not self._loaded:
+            self.load()
+
+    def _snap(self, latitude: float, longitude: float, k: int) -> List[Tuple[int, float]]:
+        """Up to k nearest road nodes within ROUTING_MAX_SNAP_KM as [(node, metres)]"""
+        graph = self._graph
+        max_km = settings.ROUTING_MAX_SNAP_KM
+        row, col = floor(latitude / SNAP_CELL_DEGREES), floor(longitude / SNAP_CELL_DEGREES)
+        last_ring = int(max_km / (SNAP_CELL_DEGREES * 111.0)) + 1
+
+        found, first_hit = [], None
+        for ring in range(last_ring + 1):
+            for r in range(row - ring, row + ring + 1):
+                for c in range(col - ring, col + ring + 1):
+                    if max(abs(r - row), abs(c - col)) == ring:
+                        members = graph['cells'].get(r * 100000 + c)
+                        if members is not None:
+                            found.append(members)
+            if found and first_hit is None:
+                first_hit = ring
+            # Nodes beyond the ring after the first hit are further than that hit
+            if first_hit is not None and ring > first_hit and sum(len(m) for m in found) >= k:
+                break
+        if not found:
+            return []
+
+        nodes = np.concatenate(found)
+        distances = distances_km(latitude, longitude, graph['latitudes'][nodes], graph['longitudes'][nodes])
+        nearest = distances.argsort(kind='stable')[:k]
+        return [
+            (int(nodes[i]), float(distances[i]) * 1000)
+            for i in nearest if distances[i] <= max_km
+        ]
+
+    @staticmethod
+    def _search(graph: Dict, origin: Dict[int, float], wanted: set, max_seconds: float) -> Tuple[Dict, int]:
+        """Dijkstra from the origin nodes until every wanted node is settled"""
+        indptr, targets, seconds = graph['indptr'], graph['targets'], graph['seconds']
+        heap = [(cost, node) for node, cost in origin.items()]
+        heap.sort()
+        done = {}
+        reached = {}
+        remaining = len(wanted)
+
+        while heap and remaining:
+            cost, node = heappop(heap)
+            if node in done:
+                continue
+            if cost > max_seconds:
+                break
+            done[node] = cost
+            if node in wanted:
+                reached[node] = cost
+                remaining -= 1
+            for edge in range(indptr[node], indptr[node + 1]):
+                neighbour = targets[edge]
+                if neighbour not in done:
+                    heappush(heap, (cost + seconds[edge], neighbour))
+        return reached, len(done)
+
+
+# Singleton instance
+road_network = RoadNetwork()
+
+
+def estimate_route_minutes(
+    latitude: float, longitude: float, destinations: Sequence[Tuple[float, float]]
+) -> List[Optional[int]]:
+    """
+    Whole minutes from one point to each destination (at least
+    MIN_TRAVEL_MINUTES)
+    By road when the network is loaded, with None for destinations it cannot
+    reach (off the roads or beyond ROUTING_MAX_MINUTES) so callers rank them
+    after every routed one; the straight-line estimate only without a network
+    """
+    if not destinations:
+        return []
+    if not road_network.available:
+        return straight_line_minutes(latitude, longitude, destinations)
+    return [
+        max(MIN_TRAVEL_MINUTES, int(round(minutes))) if minutes is not None else None
+        for minutes in road_network.travel_minutes(latitude, longitude, destinations)
+    ]
+
+
+def straight_line_minutes(latitude: float, longitude: float, destinations: Sequence[Tuple[float, float]]) -> List[int]:
+    """Straight-line travel estimate (core/geo.py) from one point to each destination"""
+    if not destinations:
+        return []
+    estimates = estimate_travel_minutes(distances_km(
+        latitude, longitude, [lat for lat, _ in destinations], [lon for _, lon in destinations]
+    ))
+    return [int(estimate) for estimate in estimates]
@@ -0,0 +1,56 @@
+"""
+Core Signals - Keep in-memory hospital data and the village candidate table
+in step with the Hospital and Village tables
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from .models import Hospital, Village, VillageHospitalCandidate
+from .spatial_index import hospital_index
+from .village_candidates import CANDIDATE_FIELDS, village_candidates
+
+
+@receiver(post_save, sender=Hospital)
+def update_hospital_index(sender, instance, **kwargs):
+    # After commit, so a rolled-back save never reaches the index
+    transaction.on_commit(lambda: hospital_index.update(instance))
+
+
+@receiver(post_delete, sender=Hospital)
+def remove_from_hospital_index(sender, instance, **kwargs):
+    hospital_id = instance.pk
+    transaction.on_commit(lambda: hospital_index.remove(hospital_id))
+
+
+@receiver(pre_save, sender=Hospital)
+def check_hospital_candidate_fields(sender, instance, raw=False, **kwargs):
+    """Only location, type and operational changes move village candidates"""
+    if raw or instance.pk is None:
+        instance._candidates_stale = True
+        return
+    previous = Hospital.objects.filter(pk=instance.pk).values_list(*CANDIDATE_FIELDS).first()
+    instance._candidates_stale = previous != tuple(getattr(instance, field) for field in CANDIDATE_FIELDS)
+
+
+@receiver(post_save, sender=Hospital)
+def refresh_hospital_candidates(sender, instance, raw=False, **kwargs):
+    if raw or not getattr(instance, '_candidates_stale', True):
+        return
+    transaction.on_commit(lambda: village_candidates.hospital_changed(instance))
+
+
+@receiver(pre_delete, sender=Hospital)
+def refresh_candidates_without_hospital(sender, instance, **kwargs):
+    village_ids = list(
+        VillageHospitalCandidate.objects.filter(hospital_id=instance.pk).values_list('village_id', flat=True).distinct()
+    )
+    if village_ids:
+        transaction.on_commit(lambda: village_candidates.villages_changed(village_ids))
+
+
+@receiver(post_save, sender=Village)
+def refresh_village_candidates(sender, instance, created=False, raw=False, update_fields=None, **kwargs):
+    if raw or (update_fields and not {'latitude', 'longitude'} & set(update_fields)):
+        return
+    village_id = instance.pk
+    transaction.on_commit(lambda: village_candidates.villages_changed([village_id]))
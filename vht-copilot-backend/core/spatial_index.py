@@ -0,0 +1,369 @@
+"""
+Hospital Spatial Index - Nearest-facility lookup without scanning the table
+Operational hospitals are bucketed into a latitude/longitude grid held in
+memory by each process. A k-nearest query scans grid rings outward from the
+patient until no unvisited cell can hold anything closer, so a query touches
+a few dozen facilities instead of every row.
+
+The index is built from the Hospital table on first use, patched in place by
+the Hospital save/delete signals (core/signals.py) and the capacity ledger's
+referral counts (referrals/capacity.py), and rebuilt after
+HOSPITAL_INDEX_MAX_AGE_SECONDS so changes made by other processes (or by
+bulk updates that send no signals) are picked up.
+
+It is also the hospital snapshot for reads: the matcher, the hospital list
+and village candidates take hospitals from here (HospitalPoint.to_model()
+when a model instance is needed) instead of querying. Every change bumps
+`version`; memo() keeps values derived from the snapshot until it changes.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from math import asin, cos, floor, radians, sin
+from datetime import datetime
+from typing import Callable, Dict, Hashable, Iterable, List, NamedTuple, Optional, Tuple
+from django.conf import settings
+from .geo import EARTH_RADIUS_KM, haversine_km
+
+logger = logging.getLogger(__name__)
+
+# Facility types suitable for each triage level (None = any facility)
+TRIAGE_FACILITY_TYPES = {
+    'URGENT': ('REFERRAL', 'HOSPITAL'),
+    'CRITICAL': ('REFERRAL', 'HOSPITAL'),
+    'HIGH_RISK': ('REFERRAL', 'HOSPITAL', 'HCIV'),
+}
+
+# Values memo() keeps per snapshot version (least recently used dropped first)
+MEMO_MAX_ENTRIES = 64
+
+
+class HospitalPoint(NamedTuple):
+    """Index entry: the Hospital fields matching and listing need"""
+    id: int
+    name: str
+    facility_type: str
+    district: str
+    sub_county: Optional[str]
+    address: str
+    latitude: float
+    longitude: float
+    phone_number: str
+    email: str
+    specialties: str
+    emergency_capacity_status: str
+    current_active_referrals: int
+    max_capacity: int
+    operating_hours: str
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+    @property
+    def is_available(self) -> bool:
+        """Accepting referrals (same rule as the matcher: not FULL)"""
+        return self.emergency_capacity_status != 'FULL'
+
+    def as_dict(self, distance_km: float = None) -> Dict:
+        data = self._asdict()
+        if distance_km is not None:
+            data['distance_km'] = round(distance_km, 2)
+        return data
+
+    def to_model(self):
+        """Hospital instance from the snapshot, without a query (the index only holds operational hospitals)"""
+        from django.db.models import DEFERRED
+        from .models import Hospital
+
+        values = dict(self._asdict(), is_operational=True)
+        names = [field.attname for field in Hospital._meta.concrete_fields]
+        return Hospital.from_db(None, names, tuple(values.get(name, DEFERRED) for name in names))
+
+
+POINT_FIELDS = HospitalPoint._fields
+
+
+class HospitalSpatialIndex:
+    """
+    Grid-bucketed k-nearest-neighbour search over operational hospitals
+    Keeps per-process query counters for the health endpoint
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._points = {}  # id -> HospitalPoint
+        self._cells = {}  # (row, col) -> [id, ...]
+        self._bounds = None  # (min row, max row, min col, max col)
+        self._built_at = None
+        self._version = 0
+        self._memo, self._memo_version = OrderedDict(), None
+        self.stats = {
+            'queries': 0,
+            'rebuilds': 0,
+            'updates': 0,
+            'memo_hits': 0,
+            'query_seconds': 0.0,
+        }
+
+    def nearest(
+        self,
+        latitude: float,
+        longitude: float,
+        k: int = 3,
+        facility_types: Iterable[str] = None,
+        specialty: str = None,
+        district: str = None,
+        available_only: bool = True,
+        max_km: float = None
+    ) -> List[Tuple[HospitalPoint, float]]:
+        """
+        k nearest operational hospitals matching the filters
+
+        Args:
+            latitude, longitude: Patient location
+            k: Number of hospitals to return
+            facility_types: Allowed facility types (e.g. TRIAGE_FACILITY_TYPES['URGENT'])
+            specialty: Required specialty (substring of the specialties list)
+            district: District name (case-insensitive)
+            available_only: Skip hospitals whose capacity status is FULL
+            max_km: Ignore hospitals further than this
+
+        Returns:
+            [(HospitalPoint, distance_km), ...] nearest first
+        """
+        started = time.perf_counter()
+        self._ensure_fresh()
+        accept = self._matcher(facility_types, specialty, district, available_only)
+        cell_size = settings.HOSPITAL_INDEX_CELL_DEGREES
+        found = []
+
+        with self._lock:
+            if self._bounds is not None and k > 0:
+                row, col = self._cell(latitude, longitude)
+                min_row, max_row, min_col, max_col = self._bounds
+                last_ring = max(row - min_row, max_row - row, col - min_col, max_col - col)
+
+                for ring in range(max(0, last_ring) + 1):
+                    for cell in self._ring(row, col, ring):
+                        for hospital_id in self._cells.get(cell, ()):
+                            point = self._points[hospital_id]
+                            if not accept(point):
+                                continue
+                            distance = haversine_km(latitude, longitude, point.latitude, point.longitude)
+                            if max_km is None or distance <= max_km:
+                                found.append((point, distance))
+
+                    # Anything in an unvisited ring is at least ring * cell_size degrees of
+                    # latitude or longitude away (longitude measured at the band's widest latitude)
+                    reach = EARTH_RADIUS_KM * asin(min(1.0, sin(radians(ring * cell_size)) * cos(
+                        radians(min(89.0, abs(latitude) + (ring + 1) * cell_size))
+                    )))
+                    if max_km is not None and reach > max_km:
+                        break
+                    if len(found) >= k:
+                        found.sort(key=lambda item: item[1])
+                        del found[k:]
+                        if found[-1][1] <= reach:
+                            break
+
+        found.sort(key=lambda item: item[1])
+        self._record(time.perf_counter() - started)
+        return found[:k]
+
+    def hospitals(
+        self,
+        facility_types: Iterable[str] = None,
+        specialty: str = None,
+        district: str = None,
+        available_only: bool = True
+    ) -> List[HospitalPoint]:
+        """Every operational hospital matching the filters (no location)"""
+        self._ensure_fresh()
+        accept = self._matcher(facility_types, specialty, district, available_only)
+        with self._lock:
+            return [point for point in self._points.values() if accept(point)]
+
+    def point(self, hospital_id: int) -> Optional[HospitalPoint]:
+        """One operational hospital by id (None when unknown or not operational)"""
+        self._ensure_fresh()
+        with self._lock:
+            return self._points.get(hospital_id)
+
+    @property
+    def version(self) -> int:
+        """Bumped by every change to the snapshot"""
+        with self._lock:
+            return self._version
+
+    def memo(self, key: Hashable, compute: Callable):
+        """
+        Value derived from the snapshot (e.g. a serialized hospital list),
+        computed once per snapshot version; at most MEMO_MAX_ENTRIES are kept
+
+        Args:
+            key: Identifies the value among others memoized
+            compute: Called without arguments on a miss
+        """
+        self._ensure_fresh()
+        with self._lock:
+            if self._memo_version != self._version:
+                self._memo, self._memo_version = OrderedDict(), self._version
+            if key in self._memo:
+                self._memo.move_to_end(key)
+                self.stats['memo_hits'] += 1
+                return self._memo[key]
+            version = self._version
+        value = compute()
+        with self._lock:
+            # Dropped if the snapshot changed while computing
+            if self._memo_version == version == self._version:
+                self._memo[key] = value
+                if len(self._memo) > MEMO_MAX_ENTRIES:
+                    self._memo.popitem(last=False)
+        return value
+
+    def update(self, hospital):
+        """Add, move or drop one hospital after it was saved"""
+        with self._lock:
+            if self._built_at is None:
+                return  # Not built in this process yet; the first query loads it
+            previous = self._points.get(hospital.pk)
+            self._discard(hospital.pk)
+            if hospital.is_operational and hospital.latitude is not None and hospital.longitude is not None:
+                point = HospitalPoint(*(getattr(hospital, field) for field in POINT_FIELDS))
+                if previous is not None:
+                    # Saves do not write the counter (capacity ledger); keep the ledger's value
+                    point = point._replace(current_active_referrals=previous.current_active_referrals)
+                self._insert(point)
+            self._version += 1
+            self.stats['updates'] += 1
+
+    def adjust_load(self, hospital_id: int, delta: int):
+        """Apply a capacity ledger change to one hospital's active referral count"""
+        with self._lock:
+            point = self._points.get(hospital_id)
+            if point is not None:
+                self._points[hospital_id] = point._replace(
+                    current_active_referrals=max(0, point.current_active_referrals + delta)
+                )
+                self._version += 1
+
+    def remove(self, hospital_id: int):
+        with self._lock:
+            self._discard(hospital_id)
+            self._version += 1
+
+    def rebuild(self):
+        """Reload every operational hospital from the database"""
+        from .models import Hospital
+
+        started = time.perf_counter()
+        rows = Hospital.objects.filter(
+            is_operational=True,
+            latitude__isnull=False,
+            longitude__isnull=False
+        ).values_list(*POINT_FIELDS)
+
+        with self._lock:
+            self._points, self._cells, self._bounds = {}, {}, None
+            for row in rows:
+                self._insert(HospitalPoint(*row))
+            self._built_at = time.monotonic()
+            self._version += 1
+            self.stats['rebuilds'] += 1
+        logger.info(
+            f"Hospital index built: {len(self._points)} hospitals in {len(self._cells)} cells "
+            f"({time.perf_counter() - started:.2f}s)"
+        )
+
+    def invalidate(self):
+        """Rebuild on the next query"""
+        with self._lock:
+            self._built_at = None
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self.stats)
+            stats['version'] = self._version
+            stats['hospitals'] = len(self._points)
+            stats['cells'] = len(self._cells)
+            stats['age_seconds'] = (
+                round(time.monotonic() - self._built_at, 1) if self._built_at is not None else None
+            )
+        stats['mean_query_microseconds'] = (
+            round(stats['query_seconds'] / stats['queries'] * 1e6, 1) if stats['queries'] else None
+        )
+        del stats['query_seconds']
+        return stats
+
+    def _ensure_fresh(self):
+        with self._lock:
+            stale = (
+                self._built_at is None or
+                time.monotonic() - self._built_at > settings.HOSPITAL_INDEX_MAX_AGE_SECONDS
+            )
+            if stale:
+                self.rebuild()
+
+    def _matcher(self, facility_types, specialty, district, available_only):
+        facility_types = set(facility_types) if facility_types else None
+        specialty = specialty.lower() if specialty else None
+        district = district.lower() if district else None
+
+        def accept(point: HospitalPoint) -> bool:
+            return (
+                (not available_only or point.is_available) and
+                (facility_types is None or point.facility_type in facility_types) and
+                (district is None or point.district.lower() == district) and
+                (specialty is None or specialty in point.specialties.lower())
+            )
+        return accept
+
+    def _cell(self, latitude: float, longitude: float) -> Tuple[int, int]:
+        cell_size = settings.HOSPITAL_INDEX_CELL_DEGREES
+        return floor(latitude / cell_size), floor(longitude / cell_size)
+
+    def _ring(self, row: int, col: int, ring: int):
+        """Cells exactly `ring` steps (Chebyshev) from (row, col)"""
+        if ring == 0:
+            yield row, col
+            return
+        for c in range(col - ring, col + ring + 1):
+            yield row - ring, c
+            yield row + ring, c
+        for r in range(row - ring + 1, row + ring):
+            yield r, col - ring
+            yield r, col + ring
+
+    def _insert(self, point: HospitalPoint):
+        cell = self._cell(point.latitude, point.longitude)
+        self._points[point.id] = point
+        self._cells.setdefault(cell, []).append(point.id)
+        if self._bounds is None:
+            self._bounds = (cell[0], cell[0], cell[1], cell[1])
+        else:
+            min_row, max_row, min_col, max_col = self._bounds
+            self._bounds = (
+                min(min_row, cell[0]), max(max_row, cell[0]),
+                min(min_col, cell[1]), max(max_col, cell[1])
+            )
+
+    def _discard(self, hospital_id: int):
+        point = self._points.pop(hospital_id, None)
+        if point is None:
+            return
+        cell = self._cell(point.latitude, point.longitude)
+        members = self._cells.get(cell, [])
+        if hospital_id in members:
+            members.remove(hospital_id)
+        if not members:
+            self._cells.pop(cell, None)
+
+    def _record(self, elapsed: float):
+        with self._lock:
+            self.stats['queries'] += 1
+            self.stats['query_seconds'] += elapsed
+
+
+# Singleton instance
+hospital_index = HospitalSpatialIndex()
@@ -435,24 +435,18 @@ def calculate_distance(lat1, lon1, lat2, lon2):
     Calculate distance between two GPS coordinates using Haversine formula
     Returns distance in kilometers
     """
-    from math import radians, sin, cos, sqrt, atan2
+    from .geo import haversine_km
     
-    R = 6371  # Earth's radius in kilometers
-    
-    lat1, lon1, lat2, lon2 = map(radians, [lat1, lon1, lat2, lon2])
-    dlat = lat2 - lat1
-    dlon = lon2 - lon1
-    
-    a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
-    c = 2 * atan2(sqrt(a), sqrt(1-a))
-    distance = R * c
-    
-    return distance
+    return haversine_km(lat1, lon1, lat2, lon2)
 
 
 def find_nearest_hospitals(latitude, longitude, triage_level="MODERATE", max_results=3):
     """
     Find nearest hospitals based on location and triage level
+    Searches the in-memory index of the Hospital table; the built-in
+    UGANDA_HOSPITALS list is only scanned while the table is empty. With
+    the offline road network loaded, the nearest hospitals are ordered by
+    travel time (estimated_travel_minutes is None for those it cannot reach).
     
     Args:
         latitude: Patient's latitude
@@ -461,31 +455,51 @@ def find_nearest_hospitals(latitude, longitude, triage_level="MODERATE", max_res
         max_results: Maximum number of hospitals to return
     
     Returns:
-        List of hospitals sorted by distance
+        List of hospitals sorted by travel time (distance without a road network)
     """
+    from django.conf import settings
+    from .routing import estimate_route_minutes, road_network
+    from .spatial_index import TRIAGE_FACILITY_TYPES, hospital_index
+    
     # Filter hospitals by facility type based on triage level
-    if triage_level in ["URGENT", "CRITICAL"]:
-        # For urgent cases, prioritize referral hospitals
-        suitable_hospitals = [h for h in UGANDA_HOSPITALS if h["facility_type"] in ["REFERRAL", "HOSPITAL"]]
-    elif triage_level == "HIGH_RISK":
-        # High risk can go to hospitals or HC IV
-        suitable_hospitals = [h for h in UGANDA_HOSPITALS if h["facility_type"] in ["REFERRAL", "HOSPITAL", "HCIV"]]
-    else:
-        # Moderate and low risk can go to any facility
-        suitable_hospitals = UGANDA_HOSPITALS.copy()
+    # (urgent: referral hospitals; high risk: hospitals or HC IV; otherwise any facility)
+    facility_types = TRIAGE_FACILITY_TYPES.get(triage_level)
     
-    # Calculate distances
-    hospitals_with_distance = []
-    for hospital in suitable_hospitals:
-        distance = calculate_distance(
-            latitude, longitude,
-            hospital["latitude"], hospital["longitude"]
+    by_road = road_network.available
+    nearest = hospital_index.nearest(
+        latitude, longitude, k=max(max_results, settings.ROUTING_CANDIDATES) if by_road else max_results,
+        facility_types=facility_types, available_only=False
+    )
+    if nearest or hospital_index.get_stats()['hospitals']:
+        minutes = estimate_route_minutes(
+            latitude, longitude, [(point.latitude, point.longitude) for point, _ in nearest]
         )
-        hospital_data = hospital.copy()
-        hospital_data["distance_km"] = round(distance, 2)
-        hospitals_with_distance.append(hospital_data)
+        hospitals = [
+            dict(point.as_dict(distance), estimated_travel_minutes=travel_minutes)
+            for (point, distance), travel_minutes in zip(nearest, minutes)
+        ]
+        if by_road:
+            # Hospitals the roads do not reach (None) after every routed one
+            hospitals.sort(key=lambda h: (
+                h['estimated_travel_minutes'] is None, h['estimated_travel_minutes'] or 0, h['distance_km']
+            ))
+        return hospitals[:max_results]
+    
+    from .geo import distances_km
     
-    # Sort by distance
-    hospitals_with_distance.sort(key=lambda x: x["distance_km"])
+    suitable_hospitals = [
+        h for h in UGANDA_HOSPITALS if facility_types is None or h["facility_type"] in facility_types
+    ]
+    if not suitable_hospitals:
+        return []
     
-    return hospitals_with_distance[:max_results]
+    # Calculate distances (one array operation) and keep the nearest
+    distances = distances_km(
+        latitude, longitude,
+        [h["latitude"] for h in suitable_hospitals],
+        [h["longitude"] for h in suitable_hospitals]
+    )
+    return [
+        dict(suitable_hospitals[i], distance_km=round(float(distances[i]), 2))
+        for i in distances.argsort(kind='stable')[:max_results]
+    ]
@@ -50,6 +50,27 @@ class HospitalViewSet(viewsets.ModelViewSet):
             )
         
         return queryset
+    
+    def list(self, request, *args, **kwargs):
+        """
+        Served from the in-memory hospital snapshot (core/spatial_index.py)
+        and serialized once per snapshot version, so listing reads no rows
+        """
+        from .spatial_index import hospital_index
+        
+        # Normalized as the matcher compares them, so variants share one memo entry
+        specialty = request.query_params.get('specialty', '').strip().lower() or None
+        district = request.query_params.get('district', '').strip().lower() or None
+        available_only = request.query_params.get('available_only') == 'true'
+        
+        def serialize():
+            points = hospital_index.hospitals(
+                specialty=specialty, district=district, available_only=available_only
+            )
+            points.sort(key=lambda point: point.name)
+            return self.get_serializer([point.to_model() for point in points], many=True).data
+        
+        return Response(hospital_index.memo(('hospital-list', specialty, district, available_only), serialize))
 
 
 class AuditLogViewSet(viewsets.ReadOnlyModelViewSet):
@@ -226,25 +247,66 @@ def find_nearest_hospitals_api(request):
     """
     Find nearest hospitals based on location and triage level
     POST body: { latitude, longitude, triage_level, max_results }
+    or { village, district (optional), triage_level, max_results } to read
+    the village's precomputed candidates
     """
+    from .models import Village
     from .uganda_locations import find_nearest_hospitals
+    from .village_candidates import tier_for, village_candidates
     
     latitude = request.data.get('latitude')
     longitude = request.data.get('longitude')
+    village = request.data.get('village')
     triage_level = request.data.get('triage_level', 'MODERATE')
     max_results = request.data.get('max_results', 3)
     
+    try:
+        max_results = int(max_results)
+    except (TypeError, ValueError):
+        return Response(
+            {'error': 'Invalid max_results'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    district = request.data.get('district')
+    name_max_length = Village._meta.get_field('name').max_length
+    for field, value in (('village', village), ('district', district)):
+        if value is not None and (not isinstance(value, str) or len(value) > name_max_length):
+            return Response(
+                {'error': f'{field} must be text of at most {name_max_length} characters'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+    
+    if village:
+        resolved = village_candidates.resolve_village(village, district)
+        if resolved:
+            rows = village_candidates.candidates(
+                resolved[0], tier_for(triage_level), available_only=False, limit=max_results
+            )
+            if rows:
+                hospitals = [
+                    dict(row.hospital.as_dict(row.distance_km), estimated_travel_minutes=row.travel_minutes)
+                    for row in rows
+                ]
+                return Response({'hospitals': hospitals, 'village_id': resolved[0]})
+            # Table not built yet: search from the village's coordinates
+            latitude, longitude = resolved[1], resolved[2]
+        elif latitude is None or longitude is None:
+            return Response(
+                {'error': f'Village not found: {village}'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+    
     if latitude is None or longitude is None:
         return Response(
-            {'error': 'latitude and longitude required'},
+            {'error': 'latitude and longitude (or village) required'},
             status=status.HTTP_400_BAD_REQUEST
         )
     
     try:
         latitude = float(latitude)
         longitude = float(longitude)
-        max_results = int(max_results)
-    except ValueError:
+    except (TypeError, ValueError):
         return Response(
             {'error': 'Invalid coordinate format'},
             status=status.HTTP_400_BAD_REQUEST
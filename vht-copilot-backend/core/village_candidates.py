@@ -0,0 +1,356 @@
+"""
+Village Candidates - Materialized nearest hospitals per village
+Patients are registered against a village and take its GPS, and a village's
+nearest hospitals rarely change, so the top VILLAGE_CANDIDATES_PER_TIER
+operational hospitals of each facility tier are stored per village
+(VillageHospitalCandidate) with distance and travel time (by road when the
+road network is built, see core/routing.py; hospitals it cannot reach have
+no time and sort last). Matching then starts from one indexed lookup
+instead of a geometric search, taking the quickest candidate.
+
+`python manage.py build_village_candidates` fills the table; afterwards the
+Hospital and Village signals recompute only the villages a change can
+affect (bulk imports run inside `village_candidates.paused()` and refresh
+once at the end). Capacity is not part of the table - it is checked when read,
+against the in-memory hospital snapshot (core/spatial_index.py). Villages
+and their candidate lists are kept in memory once read, until the next
+refresh or HOSPITAL_INDEX_MAX_AGE_SECONDS, so the lookup makes no queries.
+"""
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from .geo import distance_matrix_km, distances_km
+from .routing import estimate_route_minutes
+from .spatial_index import TRIAGE_FACILITY_TYPES, HospitalPoint, hospital_index
+
+logger = logging.getLogger(__name__)
+
+# Facility types per tier (None = any facility)
+CANDIDATE_TIERS = {
+    'ANY': None,
+    'HIGH_RISK': TRIAGE_FACILITY_TYPES['HIGH_RISK'],
+    'URGENT': TRIAGE_FACILITY_TYPES['URGENT'],
+}
+
+# Hospital fields that change which villages a hospital is a candidate for
+CANDIDATE_FIELDS = ('latitude', 'longitude', 'facility_type', 'is_operational')
+
+# Villages per distance-matrix block during a build
+BUILD_CHUNK_VILLAGES = 500
+
+
+class VillageCandidate(NamedTuple):
+    """One stored candidate with its hospital from the snapshot"""
+    hospital: HospitalPoint
+    distance_km: float
+    travel_minutes: Optional[int]  # None: the road network cannot reach it
+
+
+def tier_for(triage_level: str) -> str:
+    """Candidate tier for a triage level (URGENT, HIGH_RISK, MODERATE, LOW_RISK)"""
+    if triage_level in ('URGENT', 'CRITICAL'):
+        return 'URGENT'
+    if triage_level == 'HIGH_RISK':
+        return 'HIGH_RISK'
+    return 'ANY'
+
+
+class VillageCandidateService:
+    """
+    Build, incremental refresh and lookup of the village → hospital table
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._paused = 0
+        self._dirty_villages = set()
+        self._dirty_hospitals = set()
+        self._villages = {}  # (name, district) -> (id, latitude, longitude); misses are not kept
+        self._rows = {}  # village id -> {tier: [(hospital id, distance_km, travel_minutes), ...]}
+        self._loaded_at = time.monotonic()
+        self.stats = {
+            'lookups': 0,
+            'hits': 0,
+            'cache_misses': 0,
+            'villages_refreshed': 0,
+        }
+
+    def resolve_village(self, name: str, district: str = None) -> Optional[Tuple[int, float, float]]:
+        """
+        (village id, latitude, longitude) for a village name, or None
+        Found villages are kept in memory; unknown names are not, so arbitrary
+        input cannot grow the cache past the village table
+        """
+        from .models import Village
+
+        if not name or not name.strip():
+            return None
+        district = (district or '').strip()
+        key = (name.strip().lower(), district.lower())
+        with self._lock:
+            self._expire()
+            village = self._villages.get(key)
+        if village is not None:
+            return village
+        villages = Village.objects.filter(name__iexact=name.strip())
+        if district:
+            villages = villages.filter(district__name__iexact=district)
+        village = villages.values_list('id', 'latitude', 'longitude').first()
+        if village is not None:
+            with self._lock:
+                self._villages[key] = village
+        return village
+
+    def candidates(
+        self,
+        village_id: int,
+        tier: str = 'ANY',
+        district: str = None,
+        available_only: bool = True,
+        limit: int = None
+    ) -> List[VillageCandidate]:
+        """
+        Stored candidates for a village, quickest first; hospitals and their
+        capacity come from the hospital snapshot, so only a village's first
+        lookup reads the table
+
+        Args:
+            village_id: Village primary key
+            tier: ANY, HIGH_RISK or URGENT
+            district: Only hospitals in this district
+            available_only: Skip FULL hospitals (non-operational ones are never returned)
+            limit: Maximum candidates to return
+
+        Returns:
+            VillageCandidate list
+        """
+        from .models import VillageHospitalCandidate
+
+        with self._lock:
+            self._expire()
+            by_tier = self._rows.get(village_id)
+        if by_tier is None:
+            by_tier = {}
+            for row in VillageHospitalCandidate.objects.filter(village_id=village_id).order_by(
+                'tier', F('travel_minutes').asc(nulls_last=True), 'rank'
+            ).values_list('tier', 'hospital_id', 'distance_km', 'travel_minutes'):
+                by_tier.setdefault(row[0], []).append(row[1:])
+            with self._lock:
+                self._rows[village_id] = by_tier
+                self.stats['cache_misses'] += 1
+
+        district = district.lower() if district else None
+        rows = []
+        for hospital_id, distance_km, travel_minutes in by_tier.get(tier, ()):
+            point = hospital_index.point(hospital_id)
+            if point is None or (available_only and not point.is_available):
+                continue
+            if district and point.district.lower() != district:
+                continue
+            rows.append(VillageCandidate(point, distance_km, travel_minutes))
+            if limit and len(rows) >= limit:
+                break
+
+        with self._lock:
+            self.stats['lookups'] += 1
+            self.stats['hits'] += bool(rows)
+        return rows
+
+    def build(self, village_ids: Iterable[int] = None) -> int:
+        """
+        Recompute the candidates of some villages (all when village_ids is None)
+
+        Returns:
+            Number of villages written
+        """
+        from .models import Hospital, Village, VillageHospitalCandidate
+
+        hospitals = list(
+            Hospital.objects.filter(is_operational=True).order_by('id').values_list(
+                'id', 'latitude', 'longitude', 'facility_type'
+            )
+        )
+        villages = Village.objects.order_by('id')
+        if village_ids is not None:
+            village_ids = list(village_ids)
+            if not village_ids:
+                return 0
+            villages = villages.filter(id__in=village_ids)
+        villages = list(villages.values_list('id', 'latitude', 'longitude'))
+
+        hospital_ids = np.array([row[0] for row in hospitals], dtype=np.int64)
+        hospital_lats = np.array([row[1] for row in hospitals], dtype=np.float64)
+        hospital_lons = np.array([row[2] for row in hospitals], dtype=np.float64)
+        facility_types = np.array([row[3] for row in hospitals], dtype=object)
+        tier_columns = {
+            tier: np.arange(len(hospitals)) if types is None else np.flatnonzero(np.isin(facility_types, types))
+            for tier, types in CANDIDATE_TIERS.items()
+        }
+        per_tier = settings.VILLAGE_CANDIDATES_PER_TIER
+
+        for start in range(0, len(villages), BUILD_CHUNK_VILLAGES):
+            chunk = villages[start:start + BUILD_CHUNK_VILLAGES]
+            matrix = distance_matrix_km(
+                [row[1] for row in chunk], [row[2] for row in chunk], hospital_lats, hospital_lons
+            ) if len(hospitals) else None
+
+            nearest_by_tier = {}
+            for tier, columns in tier_columns.items():
+                k = min(per_tier, len(columns))
+                if not k:
+                    continue
+                distances = matrix[:, columns]
+                nearest = np.argpartition(distances, k - 1, axis=1)[:, :k]
+                nearest = np.take_along_axis(
+                    nearest, np.take_along_axis(distances, nearest, axis=1).argsort(axis=1), axis=1
+                )
+                nearest_by_tier[tier] = (
+                    hospital_ids[columns][nearest], np.take_along_axis(distances, nearest, axis=1)
+                )
+
+            rows = []
+            for row_index, (village_id, latitude, longitude) in enumerate(chunk):
+                # One route search per village covers its candidates in every tier
+                positions = sorted({
+                    int(position) for ids, _ in nearest_by_tier.values()
+                    for position in np.searchsorted(hospital_ids, ids[row_index])
+                })
+                minutes = dict(zip(
+                    (int(hospital_ids[position]) for position in positions),
+                    estimate_route_minutes(
+                        latitude, longitude,
+                        [(hospital_lats[position], hospital_lons[position]) for position in positions]
+                    )
+                ))
+                for tier, (ids, kms) in nearest_by_tier.items():
+                    for rank, (hospital_id, km) in enumerate(zip(ids[row_index].tolist(), kms[row_index].tolist())):
+                        rows.append(VillageHospitalCandidate(
+                            village_id=village_id,
+                            hospital_id=hospital_id,
+                            tier=tier,
+                            rank=rank + 1,
+                            distance_km=round(km, 3),
+                            travel_minutes=minutes[hospital_id]
+                        ))
+
+            with transaction.atomic():
+                VillageHospitalCandidate.objects.filter(village_id__in=[row[0] for row in chunk]).delete()
+                VillageHospitalCandidate.objects.bulk_create(rows, batch_size=2000)
+
+        with self._lock:
+            self.stats['villages_refreshed'] += len(villages)
+            self._villages.clear()
+            for village_id, _, _ in villages:
+                self._rows.pop(village_id, None)
+        return len(villages)
+
+    def villages_affected_by(self, hospital) -> List[int]:
+        """
+        Villages whose candidates can change when this hospital was added,
+        moved, retyped or taken in/out of operation: those listing it now,
+        plus those it is nearer to than their current last candidate
+        """
+        from .models import Village, VillageHospitalCandidate
+
+        affected = set(
+            VillageHospitalCandidate.objects.filter(hospital_id=hospital.pk).values_list('village_id', flat=True)
+        )
+        if not hospital.is_operational:
+            return sorted(affected)
+
+        villages = list(Village.objects.values_list('id', 'latitude', 'longitude'))
+        if not villages:
+            return sorted(affected)
+        village_ids = np.array([row[0] for row in villages], dtype=np.int64)
+        distances = distances_km(
+            hospital.latitude, hospital.longitude,
+            [row[1] for row in villages], [row[2] for row in villages]
+        )
+
+        for tier, types in CANDIDATE_TIERS.items():
+            if types is not None and hospital.facility_type not in types:
+                continue
+            last = dict(
+                VillageHospitalCandidate.objects.filter(
+                    tier=tier, rank=settings.VILLAGE_CANDIDATES_PER_TIER
+                ).values_list('village_id', 'distance_km')
+            )
+            # Villages without a full list take any new hospital of the tier
+            limits = np.array([last.get(int(village_id), np.inf) for village_id in village_ids])
+            affected.update(int(village_id) for village_id in village_ids[distances < limits])
+        return sorted(affected)
+
+    def hospital_changed(self, hospital):
+        """Signal handler body: refresh the villages a hospital change affects"""
+        with self._lock:
+            if self._paused:
+                self._dirty_hospitals.add(hospital.pk)
+                return
+        if self._is_built():
+            self.build(self.villages_affected_by(hospital))
+
+    def villages_changed(self, village_ids: Iterable[int]):
+        """Signal handler body: refresh villages that were added, moved or lost a hospital"""
+        village_ids = list(village_ids)
+        with self._lock:
+            self._villages.clear()  # Names or coordinates may have changed
+            if self._paused:
+                self._dirty_villages.update(village_ids)
+                return
+        if self._is_built():
+            self.build(village_ids)
+
+    @contextmanager
+    def paused(self):
+        """
+        Collect changes instead of refreshing per row (bulk imports); the
+        affected villages are rebuilt once on exit
+        """
+        from .models import Hospital
+
+        with self._lock:
+            self._paused += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._paused -= 1
+                resume = not self._paused
+                if resume:
+                    village_ids, hospital_ids = self._dirty_villages, self._dirty_hospitals
+                    self._dirty_villages, self._dirty_hospitals = set(), set()
+            if resume and (village_ids or hospital_ids) and self._is_built():
+                if len(hospital_ids) > 50:
+                    self.build()
+                else:
+                    for hospital in Hospital.objects.filter(pk__in=hospital_ids):
+                        village_ids.update(self.villages_affected_by(hospital))
+                    self.build(village_ids)
+
+    def _expire(self):
+        """Forget cached villages and candidates after HOSPITAL_INDEX_MAX_AGE_SECONDS (call with the lock held)"""
+        if time.monotonic() - self._loaded_at > settings.HOSPITAL_INDEX_MAX_AGE_SECONDS:
+            self._villages, self._rows = {}, {}
+            self._loaded_at = time.monotonic()
+
+    def _is_built(self) -> bool:
+        """Incremental refresh starts once build_village_candidates has run"""
+        from .models import VillageHospitalCandidate
+
+        return VillageHospitalCandidate.objects.exists()
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self.stats)
+            stats['cached_villages'] = len(self._rows)
+        return stats
+
+
+# Singleton instance
+village_candidates = VillageCandidateService()
@@ -0,0 +1,155 @@
+"""
+Generate the small guideline PDF used by `manage.py benchmark_rag`
+Standard library only, so the fixture can be rebuilt on any machine:
+
+    python fixtures/rag_benchmark/make_fixture_pdf.py
+"""
+import os
+
+# One condition per page; page indexes match `expected_pages` in retrieval_cases.json
+PAGES = [
+    ("Malaria", [
+        "Malaria is the leading cause of fever in Uganda.",
+        "Uncomplicated malaria presents with fever, chills, sweating, headache,",
+        "body pain, joint pain, nausea and vomiting.",
+        "Severe malaria danger signs: convulsions, loss of consciousness,",
+        "inability to drink or breastfeed, repeated vomiting, difficulty breathing,",
+        "severe anaemia and passing dark urine.",
+        "Children under five with fever and any danger sign must be referred urgently.",
+        "First aid: give the first dose of rectal artesunate and keep the child cool.",
+    ]),
+    ("Pneumonia", [
+        "Pneumonia is an infection of the lungs common in children.",
+        "Signs: cough, fast breathing, difficulty breathing, chest indrawing,",
+        "grunting, nasal flaring and fever.",
+        "Severe pneumonia: chest indrawing, oxygen saturation below 90 percent,",
+        "inability to feed, lethargy or unconsciousness.",
+        "Give the first dose of amoxicillin and refer severe pneumonia immediately.",
+        "Adults may report chest pain that worsens when breathing or coughing.",
+    ]),
+    ("Diarrhoea and Dehydration", [
+        "Acute diarrhoea is the passage of three or more loose or watery stools a day.",
+        "Assess dehydration: sunken eyes, restlessness, skin pinch goes back slowly,",
+        "thirst, reduced urine.",
+        "Treat with oral rehydration salts (ORS) and zinc for ten days.",
+        "Bloody stool (dysentery) needs ciprofloxacin and review within two days.",
+        "Severe dehydration with vomiting everything requires urgent referral for",
+        "intravenous fluids.",
+    ]),
+    ("Convulsions and Loss of Consciousness", [
+        "A seizure or convulsion is an emergency in any age group.",
+        "Protect the patient from injury, place in recovery position,",
+        "do not put anything in the mouth.",
+        "Convulsions with fever in children suggest severe malaria or meningitis.",
+        "Check blood glucose; give diazepam if the seizure lasts more than five minutes.",
+        "Any unconscious patient must be referred to hospital immediately.",
+    ]),
+    ("Danger Signs in Pregnancy", [
+        "Pregnant women with any danger sign must go to a health facility at once.",
+        "Danger signs: vaginal bleeding, severe headache, blurred vision,",
+        "convulsions (eclampsia), swelling of face and hands, high blood pressure,",
+        "severe abdominal pain, fever, and reduced fetal movements.",
+        "Pre-eclampsia: headache with blurred vision and swelling after 20 weeks.",
+        "Give magnesium sulphate loading dose where trained, then refer urgently.",
+    ]),
+    ("Severe Acute Malnutrition", [
+        "Screen every child aged 6 to 59 months with a MUAC tape.",
+        "Severe acute malnutrition: MUAC below 11.5 cm, bilateral pitting oedema,",
+        "or visible severe wasting.",
+        "Complicated cases have poor appetite, fever, vomiting, diarrhoea or",
+        "lethargy and need inpatient therapeutic care.",
+        "Give ready-to-use therapeutic food for uncomplicated cases.",
+    ]),
+    ("Measles", [
+        "Measles presents with fever, generalised red rash, cough,",
+        "runny nose and red eyes (conjunctivitis).",
+        "Complications: pneumonia, diarrhoea, mouth ulcers, eye damage and",
+        "malnutrition.",
+        "Give vitamin A on day one and day two. Isolate the patient.",
+        "Refer if the child has difficulty breathing, convulsions or cannot drink.",
+    ]),
+    ("Bleeding, Wounds and Snakebite", [
+        "Severe bleeding (haemorrhage) is life threatening.",
+        "Apply firm direct pressure over the wound and elevate the limb.",
+        "Snakebite: keep the patient calm and still, immobilise the bitten limb,",
+        "remove rings, do not cut or suck the wound and do not use a tourniquet.",
+        "Watch for swelling, bleeding gums, drooping eyelids and difficulty breathing.",
+        "Refer all snakebites to a facility with antivenom.",
+    ]),
+    ("Asthma", [
+        "Asthma causes recurrent wheezing, cough, chest tightness and shortness",
+        "of breath, often worse at night.",
+        "Acute attack: give salbutamol inhaler with spacer, 2 to 10 puffs.",
+        "Severe attack: patient cannot complete sentences, uses accessory muscles,",
+        "is drowsy or has a silent chest. Give oxygen and refer urgently.",
+    ]),
+    ("Urinary Tract Infection", [
+        "Urinary tract infection presents with pain on passing urine,",
+        "frequent urination, lower abdominal pain and sometimes fever.",
+        "Loin pain with fever and vomiting suggests pyelonephritis.",
+        "Women are more commonly affected. Pregnant women need urgent treatment.",
+        "Give nitrofurantoin for uncomplicated cystitis.",
+    ]),
+]
+
+
+def _escape(text):
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def _page_stream(title, lines):
+    parts = ['BT', '/F1 16 Tf', '72 740 Td', f'({_escape(title)}) Tj', '/F1 11 Tf', '0 -28 Td']
+    for line in lines:
+        parts.append(f'({_escape(line)}) Tj')
+        parts.append('0 -16 Td')
+    parts.append('ET')
+    return '\n'.join(parts).encode('latin-1')
+
+
+def build_pdf(pages):
+    objects = []  # index 0 -> object 1
+
+    def add(body):
+        objects.append(body)
+        return len(objects)
+
+    catalog_id = add(None)
+    pages_id = add(None)
+    font_id = add(b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>')
+
+    page_ids = []
+    for title, lines in pages:
+        stream = _page_stream(title, lines)
+        content_id = add(b'<< /Length %d >>\nstream\n' % len(stream) + stream + b'\nendstream')
+        page_ids.append(add(
+            b'<< /Type /Page /Parent %d 0 R /MediaBox [0 0 612 792] '
+            b'/Resources << /Font << /F1 %d 0 R >> >> /Contents %d 0 R >>'
+            % (pages_id, font_id, content_id)
+        ))
+
+    objects[catalog_id - 1] = b'<< /Type /Catalog /Pages %d 0 R >>' % pages_id
+    kids = b' '.join(b'%d 0 R' % page_id for page_id in page_ids)
+    objects[pages_id - 1] = b'<< /Type /Pages /Kids [%s] /Count %d >>' % (kids, len(page_ids))
+
+    output = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(output))
+        output += b'%d 0 obj\n' % number + body + b'\nendobj\n'
+
+    xref_offset = len(output)
+    output += b'xref\n0 %d\n' % (len(objects) + 1)
+    output += b'0000000000 65535 f \n'
+    for offset in offsets:
+        output += b'%010d 00000 n \n' % offset
+    output += b'trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (
+        len(objects) + 1, catalog_id, xref_offset
+    )
+    return bytes(output)
+
+
+if __name__ == '__main__':
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'guidelines_fixture.pdf')
+    with open(path, 'wb') as pdf_file:
+        pdf_file.write(build_pdf(PAGES))
+    print(f'Wrote {path} ({len(PAGES)} pages)')
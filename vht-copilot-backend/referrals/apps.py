@@ -8,3 +8,6 @@ class ReferralsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'referrals'
     verbose_name = 'Referral Management'
+    
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,117 @@
+"""
+Hospital Capacity Ledger - Active referral counts without read-modify-write
+Hospital.current_active_referrals is changed only here, by single atomic
+UPDATE ... SET current_active_referrals = current_active_referrals ± 1
+statements issued by the Referral signals (referrals/signals.py) whenever a
+referral enters or leaves an active status or moves hospital. Concurrent
+referrals to one hospital no longer lose counts or rewrite the whole row,
+and the in-memory hospital index is patched after commit so matching reads
+the count without a query.
+
+Two saves of the same referral racing between the same statuses can still
+count twice; `python manage.py reconcile_hospital_capacity` (run it from
+cron) resets every counter to the real number of active referrals.
+"""
+import logging
+import threading
+from typing import Dict, Iterable, Tuple
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+from core.models import Hospital
+from core.spatial_index import hospital_index
+from .models import Referral
+
+logger = logging.getLogger(__name__)
+
+
+class HospitalCapacityLedger:
+    """
+    Atomic adjustments and reconciliation of hospital active referral counts
+    Keeps per-process counters for the health endpoint
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stats = {
+            'increments': 0,
+            'decrements': 0,
+            'reconciliations': 0,
+            'corrected_hospitals': 0,
+        }
+
+    def adjust(self, hospital_id: int, delta: int):
+        """Add delta to one hospital's counter in a single UPDATE (never below zero)"""
+        Hospital.objects.filter(pk=hospital_id).update(
+            current_active_referrals=Greatest(F('current_active_referrals') + delta, Value(0))
+        )
+        transaction.on_commit(lambda: hospital_index.adjust_load(hospital_id, delta))
+        with self._lock:
+            self.stats['increments' if delta > 0 else 'decrements'] += 1
+
+    def referral_saved(self, referral: Referral, previous: Tuple[str, int] = None):
+        """
+        Count a referral status or hospital change
+
+        Args:
+            referral: The saved referral
+            previous: (status, hospital_id) before the save, None for a new referral
+        """
+        was_active = previous is not None and previous[0] in Referral.ACTIVE_STATUSES
+        is_active = referral.status in Referral.ACTIVE_STATUSES
+        moved = previous is not None and previous[1] != referral.hospital_id
+
+        if was_active and (moved or not is_active):
+            self.adjust(previous[1], -1)
+        if is_active and (moved or not was_active):
+            self.adjust(referral.hospital_id, 1)
+
+    def referral_deleted(self, referral: Referral):
+        if referral.status in Referral.ACTIVE_STATUSES:
+            self.adjust(referral.hospital_id, -1)
+
+    def reconcile(self, hospital_ids: Iterable[int] = None, dry_run: bool = False) -> Dict[int, Tuple[int, int]]:
+        """
+        Reset counters that drifted from the real number of active referrals
+
+        Args:
+            hospital_ids: Only these hospitals (default all)
+            dry_run: Report without correcting
+
+        Returns:
+            {hospital_id: (counter, actual)} for each hospital that was off
+        """
+        hospitals = Hospital.objects.annotate(
+            actual=Count('referrals', filter=Q(referrals__status__in=Referral.ACTIVE_STATUSES))
+        )
+        if hospital_ids is not None:
+            hospitals = hospitals.filter(pk__in=list(hospital_ids))
+        drift = {
+            hospital_id: (counter, actual)
+            for hospital_id, counter, actual in hospitals.values_list('id', 'current_active_referrals', 'actual')
+            if counter != actual
+        }
+
+        if drift and not dry_run:
+            # Recount inside the UPDATE so referrals created since the read are included
+            active = Referral.objects.filter(
+                hospital=OuterRef('pk'), status__in=Referral.ACTIVE_STATUSES
+            ).order_by().values('hospital').annotate(total=Count('pk')).values('total')
+            Hospital.objects.filter(pk__in=list(drift)).update(
+                current_active_referrals=Coalesce(Subquery(active), Value(0))
+            )
+            transaction.on_commit(hospital_index.invalidate)
+            logger.warning(f"Capacity ledger corrected {len(drift)} hospital counters")
+
+        with self._lock:
+            self.stats['reconciliations'] += 1
+            self.stats['corrected_hospitals'] += 0 if dry_run else len(drift)
+        return drift
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return dict(self.stats)
+
+
+# Singleton instance
+capacity_ledger = HospitalCapacityLedger()
@@ -19,6 +19,9 @@ class Referral(models.Model):
         COMPLETED = 'COMPLETED', _('Completed')
         CANCELLED = 'CANCELLED', _('Cancelled')
     
+    # Statuses that hold a place in the hospital's capacity (current_active_referrals)
+    ACTIVE_STATUSES = (Status.PENDING, Status.CONFIRMED, Status.IN_TRANSIT, Status.ARRIVED)
+    
     class UrgencyLevel(models.TextChoices):
         STABLE = 'STABLE', _('Stable')
         MODERATE = 'MODERATE', _('Moderate')
@@ -105,9 +108,13 @@ class Referral(models.Model):
     def save(self, *args, **kwargs):
         # Auto-generate referral code
         if not self.referral_code:
-            import uuid
-            self.referral_code = f"REF-{uuid.uuid4().hex[:8].upper()}"
+            self.referral_code = self.generate_referral_code()
         super().save(*args, **kwargs)
+    
+    @staticmethod
+    def generate_referral_code():
+        import uuid
+        return f"REF-{uuid.uuid4().hex[:8].upper()}"
 
 
 class EmergencyAlert(models.Model):
@@ -156,3 +163,20 @@ class EmergencyAlert(models.Model):
     
     def __str__(self):
         return f"{self.alert_type} Alert to {self.recipient_name}"
+
+
+class SurgeMode(models.Model):
+    """
+    Surge mode switched on for a while from the referrals API
+    A single row shared by every worker process (SURGE_MODE keeps surge
+    mode on for the whole deployment instead)
+    """
+    active_until = models.DateTimeField(null=True, blank=True)
+    updated_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'surge_mode'
+    
+    def __str__(self):
+        return f"Surge mode until {self.active_until}" if self.active_until else "Surge mode off"
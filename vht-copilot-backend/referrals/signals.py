@@ -0,0 +1,28 @@
+"""
+Referral Signals - Keep hospital capacity counters in step with referral statuses
+"""
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from .capacity import capacity_ledger
+from .models import Referral
+
+
+@receiver(pre_save, sender=Referral)
+def remember_referral_status(sender, instance, raw=False, **kwargs):
+    """Status and hospital as stored, so post_save can tell what changed"""
+    if raw or instance.pk is None:
+        instance._capacity_previous = None
+        return
+    instance._capacity_previous = Referral.objects.filter(pk=instance.pk).values_list('status', 'hospital_id').first()
+
+
+@receiver(post_save, sender=Referral)
+def count_referral_capacity(sender, instance, raw=False, **kwargs):
+    # Same transaction as the referral save: a rollback undoes the count too
+    if not raw:
+        capacity_ledger.referral_saved(instance, getattr(instance, '_capacity_previous', None))
+
+
+@receiver(post_delete, sender=Referral)
+def release_referral_capacity(sender, instance, **kwargs):
+    capacity_ledger.referral_deleted(instance)
@@ -0,0 +1,472 @@
+"""
+Surge Assignment - Capacity-aware batch matching for mass-casualty events
+Normally each referral goes to its own best hospital, one at a time, so in a
+surge the nearest hospital takes every case until it is full. In surge mode
+urgent referrals are gathered for SURGE_BATCH_WINDOW_SECONDS and assigned
+together: a min-cost flow over travel time, specialty fit and remaining
+capacity (each further place at a hospital costs more as it fills up), so
+cases spread to the next-quickest hospitals with room. All referrals of a
+batch are created in one transaction.
+
+Surge mode is switched on per deployment (SURGE_MODE) or for a while from the
+referrals API (POST /api/referrals/surge/), stored in the database so every
+worker process sees it. Batches are gathered in memory per worker process:
+run threaded workers (gunicorn --threads, as in render.yaml) so concurrent
+referrals share a process; a sync worker handles one request at a time and
+would only ever gather a batch of one.
+
+`python manage.py benchmark_surge_assignment` compares it with nearest-first.
+"""
+import logging
+import threading
+import time
+from collections import Counter
+from datetime import timedelta
+from heapq import heappop, heappush
+from typing import Dict, List, NamedTuple, Optional, Sequence
+import numpy as np
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+from core.geo import distances_km
+from core.routing import estimate_route_minutes, straight_line_minutes
+from core.spatial_index import TRIAGE_FACILITY_TYPES, HospitalPoint, hospital_index
+from .capacity import capacity_ledger
+from .models import Referral, SurgeMode
+
+logger = logging.getLogger(__name__)
+
+# Cost of leaving a case without a free place among its candidates (minutes)
+OVERFLOW_COST_MINUTES = 1000
+
+# Rounds of widening the candidate list for cases that found no free place
+CANDIDATE_EXPANSIONS = 2
+
+
+class SurgeCase(NamedTuple):
+    """What the assignment needs to know about one referral"""
+    latitude: Optional[float]
+    longitude: Optional[float]
+    district: Optional[str]
+    specialty: Optional[str]
+    urgency_level: str
+
+
+class Placement(NamedTuple):
+    """Assignment of one case; over_capacity when no candidate had a free place"""
+    hospital: Optional[HospitalPoint]
+    travel_minutes: Optional[int]
+    over_capacity: bool
+
+
+def solve_assignment(
+    costs: Sequence[Dict[int, float]],
+    places: Dict[int, List[float]],
+    overflow_cost: float = OVERFLOW_COST_MINUTES
+) -> List[Optional[int]]:
+    """
+    Capacity-constrained minimum-cost assignment (min-cost flow by successive
+    shortest paths with potentials)
+
+    Args:
+        costs: Per case, {hospital id: cost} of sending it there
+        places: Per hospital, the extra cost of each free place in the order
+            they fill (non-decreasing); the list length is the free places
+        overflow_cost: Cost of leaving a case unplaced
+
+    Returns:
+        Hospital id per case, None where no free place was worth less than
+        overflow_cost
+    """
+    n = len(costs)
+    demand = Counter(hospital_id for options in costs for hospital_id in options)
+    hospitals = sorted(hospital_id for hospital_id in demand if places.get(hospital_id))
+    node_of = {hospital_id: n + 1 + i for i, hospital_id in enumerate(hospitals)}
+    source, overflow, sink = 0, n + len(hospitals) + 1, n + len(hospitals) + 2
+    size = sink + 1
+
+    # Arc e and its residual e ^ 1; costs in hundredths of a minute so sums stay exact
+    graph = [[] for _ in range(size)]
+    head, capacity, weight = [], [], []
+
+    def arc(u, v, cap, cost):
+        cost = int(round(cost * 100))
+        graph[u].append(len(head))
+        head.append(v), capacity.append(cap), weight.append(cost)
+        graph[v].append(len(head))
+        head.append(u), capacity.append(0), weight.append(-cost)
+
+    for case, options in enumerate(costs):
+        arc(source, case + 1, 1, 0)
+        for hospital_id, cost in options.items():
+            if hospital_id in node_of:
+                arc(case + 1, node_of[hospital_id], 1, cost)
+        arc(case + 1, overflow, 1, overflow_cost)
+    for hospital_id in hospitals:
+        # A hospital can never take more than the cases listing it
+        for cost in places[hospital_id][:demand[hospital_id]]:
+            arc(node_of[hospital_id], sink, 1, cost)
+    arc(overflow, sink, n, 0)
+
+    potential = [0] * size
+    for _ in range(n):
+        distance = [None] * size
+        distance[source] = 0
+        via = [-1] * size
+        settled = [False] * size
+        heap = [(0, source)]
+        while heap:
+            d, u = heappop(heap)
+            if settled[u]:
+                continue
+            settled[u] = True
+            if u == sink:
+                break
+            for e in graph[u]:
+                if capacity[e] > 0:
+                    v = head[e]
+                    nd = d + weight[e] + potential[u] - potential[v]
+                    if distance[v] is None or nd < distance[v]:
+                        distance[v] = nd
+                        via[v] = e
+                        heappush(heap, (nd, v))
+        if distance[sink] is None:
+            break
+
+        # Nodes not settled before the sink move by the sink's distance (keeps reduced costs >= 0)
+        limit = distance[sink]
+        for v in range(size):
+            potential[v] += limit if distance[v] is None else min(distance[v], limit)
+        v = sink
+        while v != source:
+            e = via[v]
+            capacity[e] -= 1
+            capacity[e ^ 1] += 1
+            v = head[e ^ 1]
+
+    hospital_at = {node: hospital_id for hospital_id, node in node_of.items()}
+    assignment = []
+    for case in range(n):
+        chosen = None
+        for e in graph[case + 1]:
+            if e % 2 == 0 and capacity[e] == 0 and head[e] in hospital_at:
+                chosen = hospital_at[head[e]]
+        assignment.append(chosen)
+    return assignment
+
+
+class SurgeAssigner:
+    """
+    Surge mode switch, batch planning and the per-process gathering window
+    Keeps per-process counters for the health endpoint
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = []
+        self._timer = None
+        self.stats = {
+            'batches': 0,
+            'cases': 0,
+            'over_capacity': 0,
+            'solve_seconds': 0.0,
+        }
+
+    # Surge mode
+
+    def is_active(self) -> bool:
+        if settings.SURGE_MODE:
+            return True
+        return self._active_until() is not None
+
+    def activate(self, minutes: int, user=None) -> float:
+        """Switch surge mode on for a while; returns when it ends (epoch seconds)"""
+        until = timezone.now() + timedelta(minutes=minutes)
+        SurgeMode.objects.update_or_create(pk=1, defaults={'active_until': until, 'updated_by': user})
+        logger.warning(f"Surge mode on for {minutes} minutes")
+        return until.timestamp()
+
+    def deactivate(self, user=None):
+        SurgeMode.objects.update_or_create(pk=1, defaults={'active_until': None, 'updated_by': user})
+        logger.warning("Surge mode off")
+
+    def status(self) -> Dict:
+        until = self._active_until()
+        return {
+            'active': settings.SURGE_MODE or until is not None,
+            'always_on': settings.SURGE_MODE,
+            'until': until.timestamp() if until else None,
+            'window_seconds': settings.SURGE_BATCH_WINDOW_SECONDS,
+            'urgency_levels': list(settings.SURGE_URGENCY_LEVELS),
+        }
+
+    def applies_to(self, urgency_level: str) -> bool:
+        return urgency_level in settings.SURGE_URGENCY_LEVELS and self.is_active()
+
+    def _active_until(self):
+        """End of the surge switched on from the API, or None when it is off"""
+        return SurgeMode.objects.filter(
+            pk=1, active_until__gt=timezone.now()
+        ).values_list('active_until', flat=True).first()
+
+    # Planning
+
+    def plan(self, cases: Sequence[SurgeCase], hospitals: Sequence[HospitalPoint] = None) -> List[Placement]:
+        """
+        Assign cases to hospitals together, respecting remaining capacity
+
+        Args:
+            cases: Cases to place
+            hospitals: Available hospitals (default: the hospital index)
+
+        Returns:
+            One Placement per case (hospital None when no suitable hospital exists)
+        """
+        started = time.perf_counter()
+        if hospitals is None:
+            hospitals = hospital_index.hospitals()
+        hospitals = [point for point in hospitals if point.is_available]
+        by_id = {point.id: point for point in hospitals}
+
+        k = settings.SURGE_CANDIDATES
+        options = self.candidate_options(cases, hospitals, k)
+        assignment = solve_assignment([costs for costs, _ in options], self.free_places(by_id, options))
+
+        # Cases left without a place may just have had too few candidates: widen and re-solve
+        for _ in range(CANDIDATE_EXPANSIONS):
+            stuck = [i for i, hospital_id in enumerate(assignment) if hospital_id is None and options[i][0]]
+            if not stuck or all(len(options[i][0]) >= len(hospitals) for i in stuck):
+                break
+            k *= 4
+            for i, widened in zip(stuck, self.candidate_options([cases[i] for i in stuck], hospitals, k)):
+                options[i] = widened
+            assignment = solve_assignment([costs for costs, _ in options], self.free_places(by_id, options))
+
+        placements = []
+        for (costs, minutes), hospital_id in zip(options, assignment):
+            over_capacity = hospital_id is None and bool(costs)
+            if over_capacity:
+                # No free place anywhere suitable: the quickest candidate still takes the case
+                hospital_id = min(costs, key=costs.get)
+            placements.append(Placement(
+                by_id.get(hospital_id), minutes.get(hospital_id), over_capacity
+            ))
+
+        with self._lock:
+            self.stats['batches'] += 1
+            self.stats['cases'] += len(cases)
+            self.stats['over_capacity'] += sum(placement.over_capacity for placement in placements)
+            self.stats['solve_seconds'] += time.perf_counter() - started
+        return placements
+
+    def free_places(self, by_id: Dict[int, HospitalPoint], options: Sequence) -> Dict[int, List[float]]:
+        """
+        Free places of the candidate hospitals, each costing more as the
+        hospital fills (SURGE_LOAD_PENALTY_MINUTES at full capacity)
+        """
+        demand = Counter(hospital_id for costs, _ in options for hospital_id in costs)
+        penalty = settings.SURGE_LOAD_PENALTY_MINUTES
+        places = {}
+        for hospital_id, wanted in demand.items():
+            point = by_id[hospital_id]
+            free = min(wanted, max(0, point.max_capacity - point.current_active_referrals))
+            places[hospital_id] = [
+                penalty * (point.current_active_referrals + slot + 1) / max(1, point.max_capacity)
+                for slot in range(free)
+            ]
+        return places
+
+    def candidate_options(self, cases: Sequence[SurgeCase], hospitals: Sequence[HospitalPoint], k: int) -> List:
+        """
+        Per case, ({hospital id: cost}, {hospital id: travel minutes}) for its
+        k nearest suitable hospitals; cost is travel time plus
+        SURGE_SPECIALTY_PENALTY_MINUTES where the specialty is missing, plus
+        ROUTING_MAX_MINUTES where the road network cannot reach the hospital
+        """
+        latitudes = np.array([point.latitude for point in hospitals], dtype=np.float64)
+        longitudes = np.array([point.longitude for point in hospitals], dtype=np.float64)
+        facility_types = np.array([point.facility_type for point in hospitals], dtype=object)
+        return [self._options(case, hospitals, latitudes, longitudes, facility_types, k) for case in cases]
+
+    def _options(self, case, hospitals, latitudes, longitudes, facility_types, k):
+        allowed = TRIAGE_FACILITY_TYPES.get(case.urgency_level)
+        columns = np.flatnonzero(np.isin(facility_types, allowed)) if allowed else np.arange(len(hospitals))
+        if not len(columns):
+            return {}, {}
+
+        if case.latitude and case.longitude:
+            distances = distances_km(case.latitude, case.longitude, latitudes[columns], longitudes[columns])
+            if len(columns) > k:
+                nearest = np.argpartition(distances, k - 1)[:k]
+                columns = columns[nearest]
+            chosen = [hospitals[i] for i in columns.tolist()]
+            minutes = estimate_route_minutes(
+                case.latitude, case.longitude, [(point.latitude, point.longitude) for point in chosen]
+            )
+        else:
+            # No GPS: the district's hospitals at the default estimate; with none
+            # there, any suitable hospital, least busy first (as the single matcher)
+            district = (case.district or '').lower()
+            chosen = [hospitals[i] for i in columns.tolist() if hospitals[i].district.lower() == district][:k]
+            if not chosen:
+                chosen = sorted(
+                    (hospitals[i] for i in columns.tolist()), key=lambda point: point.current_active_referrals
+                )[:k]
+            minutes = [30] * len(chosen)
+
+        specialty = (case.specialty or '').lower()
+        penalty = settings.SURGE_SPECIALTY_PENALTY_MINUTES
+        costs, travel = {}, {}
+        unreachable = None
+        for index, (point, travel_minutes) in enumerate(zip(chosen, minutes)):
+            mismatch = specialty and specialty != 'general' and specialty not in point.specialties.lower()
+            cost = penalty if mismatch else 0
+            if travel_minutes is None:
+                # Off the road network: straight-line time, costed past every routed hospital
+                if unreachable is None:
+                    unreachable = straight_line_minutes(
+                        case.latitude, case.longitude, [(other.latitude, other.longitude) for other in chosen]
+                    )
+                travel_minutes = unreachable[index]
+                cost += settings.ROUTING_MAX_MINUTES
+            costs[point.id] = travel_minutes + cost
+            travel[point.id] = travel_minutes
+        return costs, travel
+
+    # Committing
+
+    def assign(self, requests: Sequence[Dict]) -> List[Dict]:
+        """
+        Plan and create the referrals of a batch in one transaction
+
+        Args:
+            requests: assign_e_referral keyword arguments, one dict per referral
+
+        Returns:
+            assign_e_referral-style result per request
+        """
+        from ai_engine.tools import AITools
+
+        cases = [
+            SurgeCase(
+                request['patient'].latitude,
+                request['patient'].longitude,
+                request['patient'].district or getattr(request['user'], 'district', None),
+                request.get('specialty'),
+                request['urgency_level'],
+            )
+            for request in requests
+        ]
+        placements = self.plan(cases)
+
+        results, referrals = [None] * len(requests), []
+        with transaction.atomic():
+            for index, (request, placement) in enumerate(zip(requests, placements)):
+                if placement.hospital is None:
+                    results[index] = {'success': False, 'error': 'No available hospitals found'}
+                    continue
+                referral = Referral(
+                    patient=request['patient'],
+                    hospital_id=placement.hospital.id,
+                    referred_by=request['user'],
+                    urgency_level=request['urgency_level'],
+                    triage_score=request['triage_score'],
+                    confidence_score=request['confidence_score'],
+                    estimated_travel_time=placement.travel_minutes or 30,
+                    primary_condition=request['condition'],
+                    symptoms_summary=request['symptoms_summary'],
+                    recommended_specialty=request.get('specialty') or '',
+                    first_aid_instructions=request['first_aid_instructions'],
+                    ai_reasoning=request['ai_reasoning'],
+                    guideline_citation=request.get('guideline_citation') or '',
+                    status=Referral.Status.PENDING
+                )
+                referral.referral_code = Referral.generate_referral_code()
+                referrals.append((index, referral, placement))
+
+            Referral.objects.bulk_create([referral for _, referral, _ in referrals])
+            # bulk_create sends no signals: count the new referrals per hospital here
+            for hospital_id, count in Counter(placement.hospital.id for _, _, placement in referrals).items():
+                capacity_ledger.adjust(hospital_id, count)
+
+        for index, referral, placement in referrals:
+            referral.hospital = placement.hospital.to_model()
+            if referral.urgency_level == 'URGENT':
+                AITools.trigger_emergency_alert(referral, referral.triage_score, referral.symptoms_summary)
+                referral.alert_sent = True
+                referral.alert_sent_at = timezone.now()
+                referral.save(update_fields=['alert_sent', 'alert_sent_at', 'updated_at'])
+            results[index] = {
+                'success': True,
+                'referral_id': referral.id,
+                'referral_code': referral.referral_code,
+                'hospital_name': referral.hospital.name,
+                'hospital_contact': referral.hospital.phone_number,
+                'estimated_travel_time': referral.estimated_travel_time,
+                'capacity_status': referral.hospital.emergency_capacity_status,
+                'surge_batch': len(requests),
+                'over_capacity': placement.over_capacity
+            }
+        logger.info(
+            f"Surge batch: {len(referrals)} referrals to {len({p.hospital.id for _, _, p in referrals})} hospitals, "
+            f"{sum(p.over_capacity for _, _, p in referrals)} over capacity"
+        )
+        return results
+
+    # Gathering window
+
+    def submit(self, **request) -> Dict:
+        """
+        Queue one referral (assign_e_referral arguments) for the current
+        window and wait for its batch to be assigned
+        """
+        entry = {'request': request, 'done': threading.Event(), 'result': None}
+        with self._lock:
+            self._pending.append(entry)
+            flush_now = len(self._pending) >= settings.SURGE_BATCH_MAX_SIZE
+            if not flush_now and self._timer is None:
+                self._timer = threading.Timer(settings.SURGE_BATCH_WINDOW_SECONDS, self._flush_from_timer)
+                self._timer.daemon = True
+                self._timer.start()
+        if flush_now:
+            self._flush()
+
+        entry['done'].wait(settings.SURGE_BATCH_WINDOW_SECONDS + 60)
+        return entry['result'] or {'success': False, 'error': 'Surge batch assignment timed out'}
+
+    def _flush_from_timer(self):
+        try:
+            self._flush()
+        finally:
+            connection.close()  # The timer thread's own connection
+
+    def _flush(self):
+        with self._lock:
+            batch, self._pending = self._pending, []
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if not batch:
+            return
+        try:
+            results = self.assign([entry['request'] for entry in batch])
+        except Exception as e:
+            logger.error(f"Surge batch assignment failed: {e}", exc_info=True)
+            results = [{'success': False, 'error': str(e)}] * len(batch)
+        for entry, result in zip(batch, results):
+            entry['result'] = result
+            entry['done'].set()
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self.stats)
+            stats['pending'] = len(self._pending)
+        stats['mean_solve_ms'] = (
+            round(stats['solve_seconds'] / stats['batches'] * 1000, 1) if stats['batches'] else None
+        )
+        del stats['solve_seconds']
+        return stats
+
+
+# Singleton instance
+surge_assigner = SurgeAssigner()
@@ -1,7 +1,7 @@
 """
 Referral Views
 """
-from rest_framework import viewsets, status
+from rest_framework import serializers, viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
@@ -9,6 +9,13 @@ from django.utils import timezone
 from .models import Referral, EmergencyAlert
 from .serializers import ReferralSerializer, ReferralListSerializer, EmergencyAlertSerializer
 
+# batch-assign text fields -> the Referral field whose max_length bounds them
+TEXT_LIMITS = {
+    'condition': 'primary_condition',
+    'specialty': 'recommended_specialty',
+    'guideline_citation': 'guideline_citation',
+}
+
 
 class ReferralViewSet(viewsets.ModelViewSet):
     queryset = Referral.objects.all()
@@ -91,6 +98,125 @@ class ReferralViewSet(viewsets.ModelViewSet):
             status=status.HTTP_400_BAD_REQUEST
         )
     
+    @action(detail=False, methods=['get', 'post'])
+    def surge(self, request):
+        """
+        Surge mode status, or switch it (administrators and hospital staff)
+        POST body: { active: true, minutes: 60 } or { active: false }
+        """
+        from .surge import surge_assigner
+        
+        if request.method == 'POST':
+            if request.user.role not in ('ADMIN', 'HOSPITAL'):
+                return Response(
+                    {'error': 'Only administrators and hospital staff can switch surge mode'},
+                    status=status.HTTP_403_FORBIDDEN
+                )
+            try:
+                active = serializers.BooleanField().to_internal_value(request.data.get('active', True))
+            except serializers.ValidationError:
+                return Response({'error': 'active must be true or false'}, status=status.HTTP_400_BAD_REQUEST)
+            if active:
+                try:
+                    minutes = int(request.data.get('minutes', 60))
+                except (TypeError, ValueError):
+                    return Response({'error': 'Invalid minutes'}, status=status.HTTP_400_BAD_REQUEST)
+                surge_assigner.activate(max(1, minutes), request.user)
+            else:
+                surge_assigner.deactivate(request.user)
+        
+        return Response(surge_assigner.status())
+    
+    @action(detail=False, methods=['post'], url_path='batch-assign')
+    def batch_assign(self, request):
+        """
+        Assign many urgent cases at once (mass-casualty events), spreading
+        them over hospitals with free capacity; all referrals are created in
+        one transaction. Administrators and hospital staff may refer any
+        patient; VHTs only the patients they registered
+        POST body: { cases: [{ patient_id, condition, specialty, urgency_level,
+        triage_score, confidence_score, symptoms_summary, first_aid_instructions,
+        ai_reasoning, guideline_citation }, ...] }
+        """
+        from django.conf import settings
+        from patients.models import Patient
+        from .surge import surge_assigner
+        
+        if request.user.role not in ('ADMIN', 'HOSPITAL', 'VHT'):
+            return Response(
+                {'error': 'Only administrators, hospital staff and VHTs can assign referrals'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        cases = request.data.get('cases')
+        if not isinstance(cases, list) or not cases:
+            return Response({'error': 'cases list required'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(cases) > settings.SURGE_BATCH_MAX_SIZE:
+            return Response(
+                {'error': f'At most {settings.SURGE_BATCH_MAX_SIZE} cases per batch'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        patients = Patient.objects.all()
+        if request.user.role == 'VHT':
+            patients = patients.filter(registered_by=request.user)
+        patients = patients.in_bulk([
+            case.get('patient_id') for case in cases
+            if isinstance(case, dict) and isinstance(case.get('patient_id'), int)
+        ])
+        requests = []
+        for position, case in enumerate(cases):
+            patient = patients.get(case.get('patient_id')) if isinstance(case, dict) else None
+            if patient is None or case.get('urgency_level') not in dict(Referral.UrgencyLevel.choices):
+                return Response(
+                    {'error': f'Case {position}: valid patient_id and urgency_level required'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            try:
+                triage_score = int(case.get('triage_score', 9))
+                confidence_score = float(case.get('confidence_score', 0))
+            except (TypeError, ValueError):
+                return Response(
+                    {'error': f'Case {position}: invalid triage_score or confidence_score'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            texts = {
+                'condition': case.get('condition', 'Mass-casualty triage'),
+                'specialty': case.get('specialty', 'general'),
+                'symptoms_summary': case.get('symptoms_summary', ''),
+                'ai_reasoning': case.get('ai_reasoning', ''),
+                'guideline_citation': case.get('guideline_citation', ''),
+            }
+            invalid = [
+                key for key, value in texts.items()
+                if not isinstance(value, str) or (
+                    key in TEXT_LIMITS and len(value) > Referral._meta.get_field(TEXT_LIMITS[key]).max_length
+                )
+            ]
+            if not isinstance(case.get('first_aid_instructions', []), list):
+                invalid.append('first_aid_instructions')
+            if invalid:
+                return Response(
+                    {'error': f'Case {position}: invalid or too long: {", ".join(invalid)}'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            requests.append({
+                'patient': patient,
+                **texts,
+                'urgency_level': case['urgency_level'],
+                'triage_score': triage_score,
+                'confidence_score': confidence_score,
+                'first_aid_instructions': case.get('first_aid_instructions', []),
+                'user': request.user,
+            })
+        
+        results = surge_assigner.assign(requests)
+        return Response({
+            'assigned': sum(result['success'] for result in results),
+            'over_capacity': sum(result.get('over_capacity', False) for result in results),
+            'results': results
+        })
+    
     @action(detail=False, methods=['get'])
     def my_hospital(self, request):
         """Get referrals for the current user's hospital (hospital staff only)"""
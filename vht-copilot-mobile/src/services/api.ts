@@ -313,6 +313,83 @@ export const aiAPI = {
     });
     return response.data;
   },
+
+  // Translate a list (first-aid steps, notifications) in one request; same order as texts
+  translateBatch: async (
+    texts: string[],
+    targetLanguage: string = "lg",
+    sourceLanguage: string = "en",
+  ): Promise<{
+    translations: {
+      translated_text: string;
+      success: boolean;
+      service?: string;
+      error?: string;
+    }[];
+    success: boolean;
+  }> => {
+    const response = await api.post("/ai/translate/batch/", {
+      texts,
+      target_language: targetLanguage,
+      source_language: sourceLanguage,
+    });
+    return response.data;
+  },
+
+  // Live intake - send segments while recording so triage starts on stop
+  startLiveIntake: async (
+    patientId: string,
+    language?: string,
+  ): Promise<{ intake_id: string; status: string }> => {
+    const response = await api.post("/ai/live-intake/", {
+      patient_id: patientId,
+      language: language || "en",
+    });
+    return response.data;
+  },
+
+  uploadLiveSegment: async (
+    intakeId: string,
+    index: number,
+    segment: Blob,
+  ): Promise<{
+    index: number;
+    segment_transcription: string;
+    transcription: string;
+    symptoms: string[];
+    guidelines_ready: boolean;
+  }> => {
+    const formData = new FormData();
+    formData.append("index", String(index));
+    formData.append("audio_file", segment);
+
+    const response = await api.post(`/ai/live-intake/${intakeId}/segments/`, formData, {
+      headers: { "Content-Type": "multipart/form-data" },
+    });
+    return response.data;
+  },
+
+  finishLiveIntake: async (
+    intakeId: string,
+    segmentCount: number,
+  ): Promise<any> => {
+    const response = await api.post(`/ai/live-intake/${intakeId}/finish/`, {
+      segment_count: segmentCount,
+    });
+    return response.data;
+  },
+
+  // Spoken first-aid instruction (library id or text); audio_url is cacheable forever
+  getSpeech: async (
+    instructionOrText: { instruction?: string; text?: string },
+    language: string = "en",
+  ): Promise<{ audio_url: string; key: string; cache_hit: boolean }> => {
+    const response = await api.post("/ai/tts/", {
+      ...instructionOrText,
+      language,
+    });
+    return response.data;
+  },
 };
 
 // Note: Triage is now integrated into aiAPI.submitCase()